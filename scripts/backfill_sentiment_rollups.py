@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Backfill the pre-aggregated sentiment trend rollups for Project Dharma.
+
+Counts analysed posts written before the rollups existed (or by writers that
+bypass MongoDBManager) into the minute/hour/day buckets, newest day first. The
+backfill resumes where it stopped when run again. Use --reset, with ingestion
+paused, to rebuild the counters from scratch.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import structlog
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.config.settings import DatabaseSettings
+from shared.database.mongodb import MongoDBManager
+
+logger = structlog.get_logger(__name__)
+
+
+async def main():
+    """Backfill sentiment rollups."""
+    settings = DatabaseSettings()
+    parser = argparse.ArgumentParser(description="Backfill sentiment trend rollups for Project Dharma")
+    parser.add_argument("--uri", default=settings.mongodb_url, help="MongoDB connection string")
+    parser.add_argument("--database", default=settings.mongodb_database, help="MongoDB database name")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None,
+                        help="Earliest post timestamp to count (ISO 8601, UTC); defaults to the oldest post")
+    parser.add_argument("--days", type=int, default=None,
+                        help="Only backfill this many days back from now")
+    parser.add_argument("--chunk-hours", type=int, default=24,
+                        help="Posts aggregated per step")
+    parser.add_argument("--reset", action="store_true",
+                        help="Drop all counters first (pause ingestion while this runs)")
+    args = parser.parse_args()
+
+    start = args.start
+    if start is None and args.days is not None:
+        start = datetime.utcnow() - timedelta(days=args.days)
+
+    manager = MongoDBManager(args.uri, args.database)
+    await manager.connect()
+    try:
+        rollups = manager.sentiment_rollups
+        await rollups.ensure_indexes()
+        if args.reset:
+            await rollups.reset()
+            logger.warning("Sentiment rollups reset")
+
+        summary = await rollups.backfill(start, chunk=timedelta(hours=args.chunk_hours))
+        print(f"Counted {summary['posts']} posts into {summary['buckets']} bucket updates "
+              f"({summary['start']} to {summary['end']})")
+    except Exception as e:
+        logger.error("Sentiment rollup backfill failed", error=str(e))
+        print(f"\n❌ Backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        await manager.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
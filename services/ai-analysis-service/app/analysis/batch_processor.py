@@ -2,16 +2,16 @@
 
 import asyncio
 import time
-from typing import List, Dict, Any, Optional, Callable, Tuple
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Callable, Tuple, AsyncIterator
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import logging
 from datetime import datetime
-import queue
-import threading
 
 from shared.models.post import SentimentType
 from ..models.requests import SentimentAnalysisResponse
+from .sharded_executor import ShardedExecutor, ShardResult
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +26,9 @@ class BatchConfig:
     retry_attempts: int = 3
     use_multiprocessing: bool = False
     chunk_size: int = 1000  # For very large datasets
+    max_workers: Optional[int] = None  # Worker processes, defaults to the CPU count
+    max_pending_shards: Optional[int] = None  # Backpressure limit, defaults to 2 per worker
+    history_size: int = 1000  # Batch records kept for get_batch_history
     
     def validate(self) -> None:
         """Validate configuration parameters."""
@@ -39,6 +42,12 @@ class BatchConfig:
             raise ValueError("retry_attempts must be non-negative")
         if self.chunk_size <= 0:
             raise ValueError("chunk_size must be positive")
+        if self.max_workers is not None and self.max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        if self.max_pending_shards is not None and self.max_pending_shards <= 0:
+            raise ValueError("max_pending_shards must be positive")
+        if self.history_size <= 0:
+            raise ValueError("history_size must be positive")
 
 
 @dataclass
@@ -56,32 +65,47 @@ class BatchResult:
     batch_stats: Dict[str, Any]
 
 
+async def load_sentiment_analyzer():
+    """Build and initialize a SentimentAnalyzer inside a worker process."""
+    from .sentiment_analyzer import SentimentAnalyzer
+    
+    analyzer = SentimentAnalyzer()
+    await analyzer.initialize()
+    return analyzer
+
+
 class BatchProcessor:
     """High-performance batch processor for sentiment analysis."""
     
-    def __init__(self, sentiment_analyzer, config: Optional[BatchConfig] = None):
+    def __init__(
+        self,
+        sentiment_analyzer,
+        config: Optional[BatchConfig] = None,
+        worker_factory: Optional[Callable[[], Any]] = None
+    ):
         """Initialize batch processor.
         
         Args:
             sentiment_analyzer: Sentiment analyzer instance
             config: Batch processing configuration
+            worker_factory: Picklable module-level callable that builds the
+                analyzer in each worker process when ``use_multiprocessing`` is
+                set; defaults to ``load_sentiment_analyzer``
         """
         self.sentiment_analyzer = sentiment_analyzer
         self.config = config or BatchConfig()
         self.config.validate()
+        self.worker_factory = worker_factory or load_sentiment_analyzer
         
         # Performance tracking
         self.total_processed = 0
         self.total_processing_time = 0.0
-        self.batch_history = []
-        
-        # Thread/process pools
-        self.thread_pool = None
-        self.process_pool = None
+        self.total_batches = 0
+        self.batch_history = deque(maxlen=self.config.history_size)
         
-        # Queue for managing work
-        self.work_queue = queue.Queue()
-        self.result_queue = queue.Queue()
+        # Worker processes with pre-loaded models, started on first use
+        self.process_pool: Optional[ShardedExecutor] = None
+        self._pool_lock = asyncio.Lock()
         
         logger.info(f"BatchProcessor initialized with config: {self.config}")
     
@@ -119,29 +143,27 @@ class BatchProcessor:
         logger.info(f"Starting batch processing of {len(texts)} texts")
         start_time = time.time()
         
-        # Split into chunks if dataset is very large
-        if len(texts) > self.config.chunk_size:
+        if self.config.use_multiprocessing:
+            # Shards stream back from the workers, so large inputs need no chunking
+            batch_results = await self._process_batches_sharded(
+                texts, language, translate, progress_callback
+            )
+        elif len(texts) > self.config.chunk_size:
+            # Split into chunks if dataset is very large
             return await self._process_large_dataset(texts, language, translate, progress_callback)
-        
-        # Process in optimized batches
-        results = []
-        error_details = []
-        processed_count = 0
-        
-        # Create batches
-        batches = self._create_batches(texts)
-        
-        # Process batches concurrently
-        if self.config.max_concurrent_batches > 1:
+        elif self.config.max_concurrent_batches > 1:
             batch_results = await self._process_batches_concurrent(
-                batches, language, translate, progress_callback
+                self._create_batches(texts), language, translate, progress_callback
             )
         else:
             batch_results = await self._process_batches_sequential(
-                batches, language, translate, progress_callback
+                self._create_batches(texts), language, translate, progress_callback
             )
         
         # Aggregate results
+        results = []
+        error_details = []
+        processed_count = 0
         for batch_result in batch_results:
             if isinstance(batch_result, list):
                 results.extend(batch_result)
@@ -178,6 +200,7 @@ class BatchProcessor:
             "throughput": throughput_per_second
         }
         self.batch_history.append(batch_record)
+        self.total_batches += 1
         
         result = BatchResult(
             results=results,
@@ -263,6 +286,77 @@ class BatchProcessor:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         return results
     
+    async def get_process_pool(self) -> ShardedExecutor:
+        """Start the worker processes and load a model in each, once."""
+        async with self._pool_lock:
+            if self.process_pool is None:
+                pool = ShardedExecutor(
+                    self.worker_factory,
+                    max_workers=self.config.max_workers,
+                    max_pending_shards=self.config.max_pending_shards
+                )
+                try:
+                    await pool.start()
+                except BaseException:
+                    # Keep a pool that failed to start from being reused
+                    pool.shutdown(wait=False)
+                    raise
+                self.process_pool = pool
+        return self.process_pool
+    
+    async def stream_batch(
+        self,
+        texts: List[str],
+        language: Optional[str] = None,
+        translate: bool = True
+    ) -> AsyncIterator[ShardResult]:
+        """Analyze texts in worker processes, yielding each shard as it completes.
+        
+        Shards hold ``batch_size`` texts and arrive in completion order;
+        ``ShardResult.offset`` places them in ``texts``. Submission pauses
+        while ``max_pending_shards`` shards are running or unconsumed. Each
+        attempt at a shard is bounded by ``timeout_seconds`` and failed shards
+        are retried ``retry_attempts`` times, as in the in-process paths.
+        """
+        executor = await self.get_process_pool()
+        async for shard in executor.map_shards(
+            "batch_analyze_sentiment", texts, self.config.batch_size,
+            timeout=self.config.timeout_seconds, retries=self.config.retry_attempts,
+            language=language, translate=translate
+        ):
+            if isinstance(shard.error, BrokenProcessPool):
+                await self._discard_process_pool(executor)
+            yield shard
+    
+    async def _discard_process_pool(self, executor: ShardedExecutor) -> None:
+        """Drop a pool whose worker died so the next batch starts a fresh one."""
+        async with self._pool_lock:
+            if self.process_pool is executor:
+                logger.warning("Worker process died, discarding the process pool")
+                self.process_pool = None
+        executor.shutdown(wait=False)
+    
+    async def _process_batches_sharded(
+        self,
+        texts: List[str],
+        language: Optional[str],
+        translate: bool,
+        progress_callback: Optional[Callable[[int, int], None]]
+    ) -> List[Any]:
+        """Process batches in worker processes, keeping input order."""
+        
+        num_batches = (len(texts) + self.config.batch_size - 1) // self.config.batch_size
+        results: List[Any] = [None] * num_batches
+        completed = 0
+        
+        async for shard in self.stream_batch(texts, language, translate):
+            results[shard.index] = shard.results if shard.ok else shard.error
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, num_batches)
+        
+        return results
+    
     async def _process_batches_sequential(
         self,
         batches: List[List[str]],
@@ -429,19 +523,22 @@ class BatchProcessor:
                 self.total_processed / self.total_processing_time
                 if self.total_processing_time > 0 else 0.0
             ),
-            "total_batches_processed": len(self.batch_history),
+            "total_batches_processed": self.total_batches,
             "configuration": {
                 "batch_size": self.config.batch_size,
                 "max_concurrent_batches": self.config.max_concurrent_batches,
                 "timeout_seconds": self.config.timeout_seconds,
                 "retry_attempts": self.config.retry_attempts,
-                "chunk_size": self.config.chunk_size
-            }
+                "chunk_size": self.config.chunk_size,
+                "use_multiprocessing": self.config.use_multiprocessing,
+                "max_workers": self.process_pool.max_workers if self.process_pool else self.config.max_workers
+            },
+            "worker_stats": dict(self.process_pool.stats) if self.process_pool else {}
         }
     
     def get_batch_history(self) -> List[Dict[str, Any]]:
-        """Get batch processing history."""
-        return self.batch_history.copy()
+        """Get batch processing history, oldest first, up to ``history_size`` records."""
+        return list(self.batch_history)
     
     def optimize_config_for_dataset(self, dataset_size: int, target_throughput: float) -> BatchConfig:
         """Suggest optimal configuration for a given dataset size and target throughput.
@@ -493,10 +590,9 @@ class BatchProcessor:
     
     async def cleanup(self):
         """Clean up resources."""
-        if self.thread_pool:
-            self.thread_pool.shutdown(wait=True)
         if self.process_pool:
             self.process_pool.shutdown(wait=True)
+            self.process_pool = None
         
         logger.info("BatchProcessor cleanup completed")
 
@@ -3,6 +3,7 @@
 import asyncio
 import time
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
@@ -15,6 +16,10 @@ import networkx as nx
 
 from ..core.config import settings
 from ..models.requests import BotDetectionResponse
+from .bot_features import (
+    MODEL_FEATURES, ScoringModels, extract_feature_frame, feature_records,
+    init_scoring_worker, score_users
+)
 
 
 logger = logging.getLogger(__name__)
@@ -40,6 +45,10 @@ class BotDetector:
         # Feature extractors
         self.feature_extractors = {}
         
+        # Batch scoring workers, started with the current models
+        self._batch_executor: Optional[ProcessPoolExecutor] = None
+        self._batch_models: Optional[ScoringModels] = None
+        
         # Performance tracking
         self.total_analyses = 0
         self.total_processing_time = 0.0
@@ -235,6 +244,107 @@ class BotDetector:
             logger.error(f"Error analyzing user behavior: {e}")
             raise
     
+    async def analyze_users_batch(
+        self,
+        user_group: List[Dict[str, Any]],
+        platform: Optional[str] = None,
+        include_network_analysis: bool = True
+    ) -> List[BotDetectionResponse]:
+        """Analyze many users for bot indicators in one vectorized pass.
+        
+        Features are extracted as a columnar matrix and scored with a single
+        scaler, classifier and anomaly detector call per chunk. Chunks of
+        ``settings.bot_batch_chunk_size`` users run in a process pool, so the
+        event loop is not blocked.
+        
+        Args:
+            user_group: User profile and activity data, each with a ``user_id``
+                and optionally a ``platform``
+            platform: Platform for users without a ``platform`` key
+            include_network_analysis: Whether to include network analysis
+            
+        Returns:
+            BotDetectionResponse per user, in input order. ``processing_time_ms``
+            is the batch time amortized over its users.
+        """
+        if not user_group:
+            return []
+        
+        start_time = time.time()
+        
+        try:
+            executor = self._get_batch_executor()
+            loop = asyncio.get_running_loop()
+            chunk_size = settings.bot_batch_chunk_size
+            chunk_results = await asyncio.gather(*(
+                loop.run_in_executor(
+                    executor, score_users, user_group[start:start + chunk_size], include_network_analysis
+                )
+                for start in range(0, len(user_group), chunk_size)
+            ))
+            
+            processing_time = (time.time() - start_time) * 1000
+            
+            # Update performance tracking
+            self.total_analyses += len(user_group)
+            self.total_processing_time += processing_time
+            
+            analysis_timestamp = datetime.utcnow()
+            users = iter(user_group)
+            responses = []
+            for result in chunk_results:
+                for bot_probability, confidence, risk_indicators, features in zip(
+                    result['bot_probability'], result['confidence'], result['risk_indicators'], result['features']
+                ):
+                    user_data = next(users)
+                    responses.append(BotDetectionResponse(
+                        user_id=str(user_data.get('user_id', '')),
+                        platform=user_data.get('platform', platform),
+                        bot_probability=bot_probability,
+                        confidence=confidence,
+                        risk_indicators=risk_indicators,
+                        behavioral_features=features,
+                        model_version=self.model_version,
+                        analysis_timestamp=analysis_timestamp,
+                        processing_time_ms=processing_time / len(user_group)
+                    ))
+            
+            return responses
+            
+        except Exception as e:
+            logger.error(f"Error analyzing user batch: {e}")
+            raise
+    
+    def _get_batch_executor(self) -> ProcessPoolExecutor:
+        """Get the batch scoring pool, restarting it when the models have changed.
+        
+        Returns:
+            Process pool whose workers hold the current models
+        """
+        if self.classifier is None or self.scaler is None or self.anomaly_detector is None:
+            raise RuntimeError("Bot detector models are not initialized")
+        
+        models = ScoringModels(self.classifier, self.scaler, self.anomaly_detector, self.anomaly_threshold)
+        if self._batch_executor is None or self._batch_models != models:
+            if self._batch_executor is not None:
+                self._batch_executor.shutdown(wait=False)
+            # Models are pickled once per worker rather than with every chunk
+            self._batch_executor = ProcessPoolExecutor(
+                max_workers=settings.max_workers,
+                initializer=init_scoring_worker,
+                initargs=(models,)
+            )
+            self._batch_models = models
+        
+        return self._batch_executor
+    
+    async def shutdown(self) -> None:
+        """Shut down the batch scoring process pool."""
+        if self._batch_executor is not None:
+            self._batch_executor.shutdown(wait=True, cancel_futures=True)
+            self._batch_executor = None
+            self._batch_models = None
+    
     async def _extract_behavioral_features(
         self,
         user_data: Dict[str, Any],
@@ -329,28 +439,9 @@ class BotDetector:
             Numpy array of feature values
         """
         try:
-            # Define expected feature order
-            expected_features = [
-                'avg_posts_per_day',
-                'posting_time_variance',
-                'weekend_activity_ratio',
-                'duplicate_content_ratio',
-                'avg_content_length',
-                'hashtag_usage_frequency',
-                'mention_usage_frequency',
-                'avg_likes_per_post',
-                'avg_shares_per_post',
-                'engagement_consistency',
-                'follower_following_ratio',
-                'mutual_connections_ratio',
-                'network_clustering_coefficient',
-                'account_age_days',
-                'activity_burst_frequency'
-            ]
-            
             # Extract values in expected order
             feature_values = []
-            for feature_name in expected_features:
+            for feature_name in MODEL_FEATURES:
                 value = features.get(feature_name, 0.0)
                 # Handle potential None values
                 if value is None:
@@ -442,11 +533,8 @@ class BotDetector:
             if len(user_group) < 2:
                 return {"coordination_detected": False, "coordination_score": 0.0}
             
-            # Extract features for all users
-            user_features = []
-            for user_data in user_group:
-                features = await self._extract_behavioral_features(user_data, True)
-                user_features.append(features)
+            # Extract features for all users in one columnar pass
+            user_features = feature_records(extract_feature_frame(user_group, include_network_analysis=True))
             
             # Analyze coordination patterns
             coordination_score = await self._calculate_coordination_score(user_features)
@@ -492,18 +580,14 @@ class BotDetector:
             if len(feature_arrays) < 2:
                 return 0.0
             
-            # Calculate pairwise similarities
-            similarities = []
-            for i in range(len(feature_arrays)):
-                for j in range(i + 1, len(feature_arrays)):
-                    # Calculate cosine similarity
-                    similarity = np.dot(feature_arrays[i], feature_arrays[j]) / (
-                        np.linalg.norm(feature_arrays[i]) * np.linalg.norm(feature_arrays[j])
-                    )
-                    similarities.append(similarity)
-            
-            # Return average similarity as coordination score
-            return float(np.mean(similarities)) if similarities else 0.0
+            # Calculate pairwise cosine similarities
+            matrix = np.vstack(feature_arrays)
+            norms = np.linalg.norm(matrix, axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                similarities = (matrix @ matrix.T) / np.outer(norms, norms)
+            
+            # Return average similarity over distinct pairs as coordination score
+            return float(np.mean(similarities[np.triu_indices(len(feature_arrays), k=1)]))
             
         except Exception as e:
             logger.error(f"Error calculating coordination score: {e}")
@@ -0,0 +1,656 @@
+"""Columnar bot detection features and batch scoring.
+
+Computes the same features as the per-user extractors in ``bot_detector`` for
+many users at once: posts of all users are flattened into column arrays and
+every feature is a grouped numpy/pandas reduction over them. Scoring runs one
+scaler, classifier and anomaly detector call over the whole feature matrix.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Feature order expected by the scaler and classifier
+MODEL_FEATURES = [
+    'avg_posts_per_day',
+    'posting_time_variance',
+    'weekend_activity_ratio',
+    'duplicate_content_ratio',
+    'avg_content_length',
+    'hashtag_usage_frequency',
+    'mention_usage_frequency',
+    'avg_likes_per_post',
+    'avg_shares_per_post',
+    'engagement_consistency',
+    'follower_following_ratio',
+    'mutual_connections_ratio',
+    'network_clustering_coefficient',
+    'account_age_days',
+    'activity_burst_frequency'
+]
+
+# Common automation intervals in seconds (1 minute to 24 hours)
+AUTOMATION_INTERVALS = np.array([60, 300, 600, 1800, 3600, 7200, 21600, 43200, 86400], dtype=np.float64)
+
+HUMAN_RESPONSE_WORDS = ['thanks', 'thank', 'please', 'sorry', 'yes', 'no']
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass
+class ScoringModels:
+    """Fitted models used to score a feature matrix."""
+
+    classifier: Any
+    scaler: Any
+    anomaly_detector: Any
+    anomaly_threshold: float = -0.5
+
+
+class _PostColumns:
+    """Posts of a batch of users flattened into per-row column lists."""
+
+    def __init__(self, n_users: int):
+        self.n_posts = np.zeros(n_users, dtype=np.int64)
+        self.timestamp_error = np.zeros(n_users, dtype=bool)
+        self.content_error = np.zeros(n_users, dtype=bool)
+        self.network_error = np.zeros(n_users, dtype=bool)
+        self.behavioral_error = np.zeros(n_users, dtype=bool)
+        self.invalid_response_time = np.zeros(n_users, dtype=bool)
+        self.hashtag_posts = np.zeros(n_users)
+        self.mention_posts = np.zeros(n_users)
+        self.replies = np.zeros(n_users)
+        self.human_replies = np.zeros(n_users)
+        self.mention_count = np.zeros(n_users)
+
+        self.ts_user: List[int] = []
+        self.ts_local: List[float] = []
+        self.ts_instant: List[float] = []
+        self.ts_aware: List[bool] = []
+        self.text_user: List[int] = []
+        self.texts: List[str] = []
+        self.mention_user: List[int] = []
+        self.mentions: List[Any] = []
+        self.metric_user: List[int] = []
+        self.metrics: List[Tuple[float, float, float]] = []
+        self.response_user: List[int] = []
+        self.response_times: List[float] = []
+
+
+def is_human_like_response(content: Any) -> bool:
+    """Check if response content appears human-like (at least two indicators)."""
+    if not content or len(content.strip()) < 3:
+        return False
+
+    lowered = content.lower()
+    human_indicators = [
+        len(content.split()) > 3,
+        '?' in content,
+        '!' in content,
+        any(word in lowered for word in HUMAN_RESPONSE_WORDS),
+        not content.isupper(),
+        len(set(lowered.split())) > 2
+    ]
+    return sum(human_indicators) >= 2
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
+
+
+def _flatten_posts(users: List[Dict[str, Any]]) -> _PostColumns:
+    """Collect the per-post values every extractor needs in one pass."""
+    columns = _PostColumns(len(users))
+
+    for i, user_data in enumerate(users):
+        posts = user_data.get('posts', [])
+        if not posts:
+            continue
+        columns.n_posts[i] = len(posts)
+
+        for post in posts:
+            if not isinstance(post, dict):
+                continue
+
+            if 'timestamp' in post:
+                try:
+                    timestamp = _parse_datetime(post['timestamp'])
+                    # Wall-clock seconds give hours, weekdays and dates as the
+                    # extractors see them; instants give elapsed time
+                    local = (timestamp.replace(tzinfo=None) - _EPOCH).total_seconds()
+                    offset = timestamp.utcoffset()
+                    columns.ts_user.append(i)
+                    columns.ts_local.append(local)
+                    columns.ts_instant.append(local - offset.total_seconds() if offset is not None else local)
+                    columns.ts_aware.append(offset is not None)
+                except (ValueError, TypeError, AttributeError):
+                    columns.timestamp_error[i] = True
+
+            content = post.get('content', '')
+            if content and isinstance(content, str):
+                columns.text_user.append(i)
+                columns.texts.append(content.strip())
+
+            try:
+                hashtags = post.get('hashtags', [])
+                if hashtags and len(hashtags) > 0:
+                    columns.hashtag_posts[i] += 1
+                mentions = post.get('mentions', [])
+                if mentions and len(mentions) > 0:
+                    columns.mention_posts[i] += 1
+            except TypeError:
+                columns.content_error[i] = True
+            if isinstance(content, str):
+                columns.hashtag_posts[i] += '#' in content
+                columns.mention_posts[i] += '@' in content
+
+            try:
+                for mention in post.get('mentions', []):
+                    columns.mention_user.append(i)
+                    columns.mentions.append(mention)
+                    columns.mention_count[i] += 1
+            except TypeError:
+                columns.network_error[i] = True
+
+            if post.get('parent_post_id'):
+                columns.replies[i] += 1
+                if is_human_like_response(content):
+                    columns.human_replies[i] += 1
+
+            metrics = post.get('metrics')
+            if isinstance(metrics, dict):
+                try:
+                    engagement = tuple(float(metrics.get(name, 0)) for name in ('likes', 'shares', 'comments'))
+                    columns.metric_user.append(i)
+                    columns.metrics.append(engagement)
+                except (TypeError, ValueError):
+                    columns.behavioral_error[i] = True
+
+            response_time = post.get('response_time_seconds')
+            if response_time is not None:
+                columns.response_user.append(i)
+                try:
+                    columns.response_times.append(float(response_time))
+                except (TypeError, ValueError):
+                    columns.response_times.append(np.nan)
+                    columns.invalid_response_time[i] = True
+
+    return columns
+
+
+def _group_mean_var(values: np.ndarray, groups: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-group count, mean and population variance."""
+    counts = np.bincount(groups, minlength=n).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(groups, weights=values, minlength=n) / counts
+        variances = np.bincount(groups, weights=(values - means[groups]) ** 2, minlength=n) / counts
+    return counts, means, variances
+
+
+def _group_distinct(groups: np.ndarray, values: List[Any], n: int) -> np.ndarray:
+    """Number of distinct values per group."""
+    if len(groups) == 0:
+        return np.zeros(n)
+    distinct = pd.DataFrame({'group': groups, 'value': values}).drop_duplicates()
+    return np.bincount(distinct['group'].to_numpy(), minlength=n).astype(np.float64)
+
+
+def _group_run_counts(groups: np.ndarray, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sizes of the (group, key) runs, with the group of each run."""
+    if len(groups) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    order = np.lexsort((keys, groups))
+    groups, keys = groups[order], keys[order]
+    starts = np.flatnonzero(np.r_[True, (groups[1:] != groups[:-1]) | (keys[1:] != keys[:-1])])
+    return groups[starts], np.diff(np.r_[starts, len(groups)]).astype(np.float64)
+
+
+def _user_values(users: List[Dict[str, Any]], key: str, default: Any) -> np.ndarray:
+    return np.array([user_data.get(key, default) for user_data in users], dtype=object)
+
+
+def _as_float(values: np.ndarray) -> np.ndarray:
+    """Object column to float, with None as NaN."""
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _temporal_features(users: List[Dict[str, Any]], columns: _PostColumns, now: datetime) -> Dict[str, np.ndarray]:
+    n = len(users)
+    user = np.asarray(columns.ts_user, dtype=np.int64)
+    local = np.asarray(columns.ts_local, dtype=np.float64)
+    instant = np.asarray(columns.ts_instant, dtype=np.float64)
+    aware = np.asarray(columns.ts_aware, dtype=bool)
+
+    order = np.lexsort((instant, user))
+    user, local, instant, aware = user[order], local[order], instant[order], aware[order]
+    k = np.bincount(user, minlength=n).astype(np.float64)
+
+    # Timezone-aware and naive timestamps cannot be compared
+    mixed = np.bincount(user, weights=aware, minlength=n)
+    mixed = (mixed > 0) & (mixed < k)
+
+    first = np.zeros(n)
+    last = np.zeros(n)
+    if len(user):
+        starts = np.flatnonzero(np.r_[True, user[1:] != user[:-1]])
+        ends = np.r_[starts[1:], len(user)] - 1
+        first[user[starts]] = instant[starts]
+        last[user[ends]] = instant[ends]
+    span_days = (last - first) / 86400
+    avg_posts_per_day = np.where(
+        k > 1,
+        k / np.maximum(span_days, 1),
+        _as_float(_user_values(users, 'avg_posts_per_day', 0.0))
+    )
+
+    # Posting patterns
+    hours = (np.floor(local / 3600) % 24).astype(np.int64)
+    days = ((np.floor(local / 86400) + 3) % 7).astype(np.int64)  # 1970-01-01 was a Thursday
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hour_probs = np.bincount(user * 24 + hours, minlength=n * 24).reshape(n, 24) / k[:, None]
+        day_probs = np.bincount(user * 7 + days, minlength=n * 7).reshape(n, 7) / k[:, None]
+        hourly_entropy = -np.sum(hour_probs * np.log2(hour_probs + 1e-10), axis=1) / np.log2(24)
+        daily_entropy = -np.sum(day_probs * np.log2(day_probs + 1e-10), axis=1) / np.log2(7)
+        weekend_ratio = np.bincount(user, weights=days >= 5, minlength=n) / k
+        night_ratio = np.bincount(user, weights=(hours >= 23) | (hours <= 6), minlength=n) / k
+    _, _, hour_variance = _group_mean_var(hours.astype(np.float64), user, n)
+    has_pattern = k >= 2
+
+    # Automation indicators
+    same_user = user[1:] == user[:-1]
+    interval_user = user[1:][same_user]
+    intervals = np.diff(instant)[same_user]
+    interval_count, _, interval_variance = _group_mean_var(intervals, interval_user, n)
+    max_variance = np.var([0, 86400 * 7])
+    regular_score = np.zeros(n)
+    for target in AUTOMATION_INTERVALS:
+        close = np.abs(intervals - target) < target * 0.1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            regular_score = np.maximum(
+                regular_score, np.bincount(interval_user, weights=close, minlength=n) / interval_count
+            )
+
+    # Activity bursts: posts per (wall-clock) hour
+    hour_start = instant - np.mod(local, 3600)
+    burst_user, burst_counts = _group_run_counts(user, hour_start)
+    groups, burst_mean, burst_variance = _group_mean_var(burst_counts, burst_user, n)
+    burst_std = np.sqrt(burst_variance)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bursts = np.bincount(
+            burst_user, weights=burst_counts > burst_mean[burst_user] + 2 * burst_std[burst_user], minlength=n
+        ) / groups
+    burst_frequency = np.where(groups > 1, np.where(burst_std > 0, bursts, 0.0), 0.1)
+
+    account_age_days = np.full(n, 365.0)
+    failed = columns.timestamp_error | mixed
+    for i, user_data in enumerate(users):
+        account_created = user_data.get('account_created')
+        if not account_created or k[i] == 0:
+            continue
+        try:
+            account_created = _parse_datetime(account_created)
+            account_age = (now.replace(tzinfo=account_created.tzinfo) - account_created).days
+            account_age_days[i] = float(max(account_age, 0))
+        except (ValueError, TypeError, AttributeError):
+            failed[i] = True
+
+    defaults = (k == 0) | failed
+    features = {
+        'avg_posts_per_day': avg_posts_per_day,
+        'posting_time_variance': np.where(has_pattern, hour_variance / 144, 0.5),
+        'weekend_activity_ratio': np.where(has_pattern, weekend_ratio, 0.3),
+        'hourly_posting_entropy': np.where(has_pattern, hourly_entropy, 0.8),
+        'daily_posting_entropy': np.where(has_pattern, daily_entropy, 0.9),
+        'night_posting_ratio': np.where(has_pattern, night_ratio, 0.2),
+        'inter_post_time_variance': np.where(k >= 3, np.minimum(interval_variance / max_variance, 1.0), 0.5),
+        'regular_interval_score': np.where(k >= 6, regular_score, 0.1),
+        'activity_burst_frequency': np.where(k >= 5, burst_frequency, 0.1),
+        'account_age_days': account_age_days
+    }
+    default_values = {
+        'avg_posts_per_day': _as_float(_user_values(users, 'avg_posts_per_day', 0.0)),
+        'posting_time_variance': 0.5,
+        'weekend_activity_ratio': 0.3,
+        'activity_burst_frequency': 0.1,
+        'hourly_posting_entropy': 0.8,
+        'daily_posting_entropy': 0.9,
+        'inter_post_time_variance': 0.5,
+        'night_posting_ratio': 0.2,
+        'regular_interval_score': 0.1,
+        'account_age_days': 365.0
+    }
+    return {name: np.where(defaults, default_values[name], values) for name, values in features.items()}
+
+
+def _content_features(users: List[Dict[str, Any]], columns: _PostColumns) -> Dict[str, np.ndarray]:
+    n = len(users)
+    text_user = np.asarray(columns.text_user, dtype=np.int64)
+    texts = columns.texts
+    n_texts = np.bincount(text_user, minlength=n).astype(np.float64)
+    lowered = [text.lower() for text in texts]
+
+    # Diversity
+    duplicates = n_texts - _group_distinct(text_user, [text.strip() for text in lowered], n)
+    word_lists = [text.split() for text in lowered]
+    word_counts = np.fromiter((len(words) for words in word_lists), dtype=np.int64, count=len(word_lists))
+    words = np.array(list(chain.from_iterable(word_lists)), dtype=object)
+    word_user = np.repeat(text_user, word_counts)
+    word_text = np.repeat(np.arange(len(texts)), word_counts)
+    total_words = np.bincount(word_user, minlength=n).astype(np.float64)
+    unique_words = _group_distinct(word_user, list(words), n)
+
+    # Three-word phrases never cross post boundaries
+    within_post = word_text[:-2] == word_text[2:] if len(words) > 2 else np.zeros(0, dtype=bool)
+    phrases = words[:-2][within_post] + ' ' + words[1:-1][within_post] + ' ' + words[2:][within_post]
+    phrase_user = word_user[:-2][within_post]
+    total_phrases = np.bincount(phrase_user, minlength=n).astype(np.float64)
+    repeated_phrases = total_phrases - _group_distinct(phrase_user, list(phrases), n)
+
+    # Structure and linguistic patterns
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.float64, count=len(texts))
+    _, avg_length, length_variance = _group_mean_var(lengths, text_user, n)
+    has_url = np.fromiter(('http' in text for text in lowered), dtype=bool, count=len(texts))
+    caps = np.fromiter(
+        (len(text) >= 10 and sum(map(str.isupper, text)) / len(text) > 0.3 for text in texts),
+        dtype=bool, count=len(texts)
+    )
+    non_ascii = np.fromiter((not text.isascii() for text in texts), dtype=bool, count=len(texts))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        features = {
+            'duplicate_content_ratio': np.where(n_texts >= 2, duplicates / n_texts, 0.0),
+            'unique_word_ratio': np.where(n_texts >= 2, np.minimum(unique_words / np.maximum(total_words, 1), 1.0), 0.7),
+            'repetitive_phrase_score': np.where(
+                (n_texts >= 3) & (total_phrases > 0), np.minimum(repeated_phrases / total_phrases, 1.0), 0.1
+            ),
+            'avg_content_length': avg_length,
+            'content_length_variance': np.where(
+                avg_length > 0, np.minimum(length_variance / avg_length ** 2, 1.0), 0.0
+            ),
+            'url_sharing_frequency': np.bincount(text_user, weights=has_url, minlength=n) / n_texts,
+            'caps_lock_frequency': np.bincount(text_user, weights=caps, minlength=n) / n_texts,
+            'emoji_usage_frequency': np.bincount(text_user, weights=non_ascii, minlength=n) / n_texts,
+            'hashtag_usage_frequency': np.minimum(columns.hashtag_posts / columns.n_posts, 1.0),
+            'mention_usage_frequency': np.minimum(columns.mention_posts / columns.n_posts, 1.0)
+        }
+
+    defaults = (n_texts == 0) | columns.content_error
+    default_values = {
+        'duplicate_content_ratio': _as_float(_user_values(users, 'duplicate_content_ratio', 0.0)),
+        'avg_content_length': _as_float(_user_values(users, 'avg_content_length', 100.0)),
+        'hashtag_usage_frequency': _as_float(_user_values(users, 'hashtag_usage_frequency', 0.2)),
+        'mention_usage_frequency': _as_float(_user_values(users, 'mention_usage_frequency', 0.1)),
+        'content_length_variance': 0.5,
+        'unique_word_ratio': 0.7,
+        'repetitive_phrase_score': 0.1,
+        'url_sharing_frequency': 0.2,
+        'emoji_usage_frequency': 0.3,
+        'caps_lock_frequency': 0.1
+    }
+    return {name: np.where(defaults, default_values[name], values) for name, values in features.items()}
+
+
+def _behavioral_features(users: List[Dict[str, Any]], columns: _PostColumns) -> Dict[str, np.ndarray]:
+    n = len(users)
+    has_posts = columns.n_posts > 0
+
+    # Engagement
+    metric_user = np.asarray(columns.metric_user, dtype=np.int64)
+    metrics = np.asarray(columns.metrics, dtype=np.float64).reshape(-1, 3)
+    metric_count, means, variances = zip(*(_group_mean_var(metrics[:, j], metric_user, n) for j in range(3)))
+    metric_count = metric_count[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cvs = [np.where(mean == 0, 0.0, np.sqrt(variance) / mean) for mean, variance in zip(means, variances)]
+        consistency = np.where(
+            metric_count >= 2, np.minimum(1.0 / (1.0 + (cvs[0] + cvs[1] + cvs[2]) / 3), 1.0), 0.5
+        )
+        _, total_mean, total_variance = _group_mean_var(metrics.sum(axis=1), metric_user, n)
+        rate_variance = np.where(
+            metric_count > 1,
+            np.minimum(np.where(total_mean > 0, total_variance / total_mean ** 2, 0.0), 1.0),
+            0.3
+        )
+    has_metrics = metric_count > 0
+
+    # Response behaviour
+    response_count, response_mean, response_variance = _group_mean_var(
+        np.asarray(columns.response_times, dtype=np.float64), np.asarray(columns.response_user, dtype=np.int64), n
+    )
+    with np.errstate(invalid='ignore', divide='ignore'):
+        response_time_variance = np.where(
+            has_posts & (response_count > 1), np.minimum(response_variance / response_mean ** 2, 1.0), 0.5
+        )
+        human_ratio = np.where(has_posts & (columns.replies > 0), columns.human_replies / columns.replies, 0.7)
+
+    # Activity consistency: posts per wall-clock date
+    ts_user = np.asarray(columns.ts_user, dtype=np.int64)
+    day_user, day_counts = _group_run_counts(ts_user, np.floor(np.asarray(columns.ts_local) / 86400))
+    day_groups, day_mean, day_variance = _group_mean_var(day_counts, day_user, n)
+    n_timestamps = np.bincount(ts_user, minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        activity = np.where(
+            (columns.n_posts >= 5) & (n_timestamps >= 5) & (day_groups >= 2),
+            np.minimum(1.0 / (1.0 + np.sqrt(day_variance) / day_mean), 1.0),
+            0.6
+        )
+
+    likes_default = _as_float(_user_values(users, 'avg_likes_per_post', 5.0))
+    shares_default = _as_float(_user_values(users, 'avg_shares_per_post', 1.0))
+    consistency_default = _as_float(_user_values(users, 'engagement_consistency', 0.5))
+    # Where the per-user extractor would raise and fall back to defaults
+    failed = (columns.behavioral_error
+              | (columns.invalid_response_time & (response_count > 1))
+              | (columns.timestamp_error & (columns.n_posts >= 5)))
+    return {
+        'avg_likes_per_post': np.where(has_metrics & ~failed, means[0], likes_default),
+        'avg_shares_per_post': np.where(has_metrics & ~failed, means[1], shares_default),
+        'engagement_consistency': np.where(has_metrics & ~failed, consistency, consistency_default),
+        'engagement_rate_variance': np.where(has_metrics & ~failed, rate_variance, 0.3),
+        'response_time_variance': np.where(failed, 0.5, response_time_variance),
+        'human_interaction_ratio': np.where(failed, 0.7, human_ratio),
+        'activity_consistency_score': np.where(failed, 0.6, activity)
+    }
+
+
+def _network_features(users: List[Dict[str, Any]], columns: _PostColumns) -> Dict[str, np.ndarray]:
+    n = len(users)
+    followers = _as_float(_user_values(users, 'followers_count', 0))
+    following = _as_float(_user_values(users, 'following_count', 0))
+    has_connections = np.array(
+        [bool(user_data.get('connections', [])) or bool(user_data.get('connected_users', [])) for user_data in users],
+        dtype=bool
+    )
+    given_mutual = _as_float(_user_values(users, 'mutual_connections_ratio', None))
+    given_clustering = _as_float(_user_values(users, 'network_clustering_coefficient', None))
+    total_connections = followers + following
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.minimum(np.where(following > 0, followers / following, followers), 100.0)
+        estimated_mutual = np.where(
+            (followers == 0) | (following == 0), 0.0,
+            np.where(total_connections < 100, 0.3, np.where(total_connections < 1000, 0.2, 0.1))
+        )
+        reciprocal = np.where(
+            (followers == 0) | (following == 0), 0.0,
+            np.minimum(followers, following) / np.maximum(followers, following) * 0.5
+        )
+    estimated_clustering = np.where(
+        (followers < 100) & (following < 100), 0.4,
+        np.where((followers > 10000) | (following > 10000), 0.1, 0.2)
+    )
+
+    interactions = columns.mention_count + columns.replies
+    targets = _group_distinct(np.asarray(columns.mention_user, dtype=np.int64), columns.mentions, n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        diversity = np.where(
+            (columns.n_posts > 0) & (interactions > 0), np.minimum(targets / interactions, 1.0), 0.5
+        )
+
+    suspicious = np.array([len(user_data.get('suspicious_connections', [])) for user_data in users], dtype=np.float64)
+    connected = np.array([len(user_data.get('connected_users', []) or [1]) for user_data in users], dtype=np.float64)
+    account_age = _as_float(_user_values(users, 'account_age_days', 365))
+
+    features = {
+        'follower_following_ratio': ratio,
+        'mutual_connections_ratio': np.where(
+            has_connections, np.where(np.isnan(given_mutual), estimated_mutual, given_mutual), 0.1
+        ),
+        'reciprocal_connection_ratio': np.where(has_connections, reciprocal, 0.3),
+        'network_clustering_coefficient': np.where(
+            has_connections, np.where(np.isnan(given_clustering), estimated_clustering, given_clustering), 0.2
+        ),
+        'interaction_diversity_score': diversity,
+        'suspicious_connection_ratio': suspicious / connected,
+        'new_account_connection_ratio': np.where(account_age < 30, 0.4, np.where(account_age < 180, 0.2, 0.1)),
+        'bot_connection_ratio': np.where(
+            (followers == 0) & (following > 100), 0.15,
+            np.where((followers > 10000) & (following < 100), 0.02, 0.05)
+        )
+    }
+
+    defaults = columns.network_error
+    if defaults.any():
+        default_values = {
+            'follower_following_ratio': followers / np.maximum(following, 1),
+            'mutual_connections_ratio': _as_float(_user_values(users, 'mutual_connections_ratio', 0.1)),
+            'network_clustering_coefficient': _as_float(_user_values(users, 'network_clustering_coefficient', 0.2)),
+            'interaction_diversity_score': 0.5,
+            'reciprocal_connection_ratio': 0.3,
+            'suspicious_connection_ratio': 0.1,
+            'new_account_connection_ratio': 0.2,
+            'bot_connection_ratio': 0.05
+        }
+        features = {name: np.where(defaults, default_values[name], values) for name, values in features.items()}
+    return features
+
+
+def extract_feature_frame(
+    users: List[Dict[str, Any]],
+    include_network_analysis: bool = True,
+    now: Optional[datetime] = None
+) -> pd.DataFrame:
+    """Extract behavioral features for many users as one row per user.
+
+    Args:
+        users: User profile and activity data, as passed to ``analyze_user_behavior``
+        include_network_analysis: Whether to include network features
+        now: Reference time for account age (defaults to ``datetime.utcnow()``)
+
+    Returns:
+        DataFrame with one column per feature, in input order
+    """
+    columns = _flatten_posts(users)
+    features = _temporal_features(users, columns, now or datetime.utcnow())
+    features.update(_content_features(users, columns))
+    features.update(_behavioral_features(users, columns))
+    if include_network_analysis:
+        features.update(_network_features(users, columns))
+    return pd.DataFrame(features, index=pd.RangeIndex(len(users)))
+
+
+def feature_matrix(frame: pd.DataFrame) -> np.ndarray:
+    """Model feature matrix in ``MODEL_FEATURES`` order; missing values are 0."""
+    return frame.reindex(columns=MODEL_FEATURES).fillna(0.0).to_numpy(dtype=np.float64)
+
+
+def feature_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Per-user feature dictionaries, with missing values as None."""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+def score_feature_matrix(matrix: np.ndarray, models: ScoringModels) -> Tuple[np.ndarray, np.ndarray]:
+    """Bot probability and confidence for every row of a feature matrix.
+
+    One scaler, classifier and anomaly detector call covers the whole batch.
+    """
+    scaled = models.scaler.transform(matrix)
+    probabilities = models.classifier.predict_proba(scaled)
+    bot_probability = probabilities[:, 1] if probabilities.shape[1] > 1 else np.full(len(matrix), 0.5)
+
+    # Anomalous users get a fixed boost
+    anomaly_scores = models.anomaly_detector.decision_function(scaled)
+    bot_probability = np.where(
+        anomaly_scores < models.anomaly_threshold, np.minimum(1.0, bot_probability + 0.2), bot_probability
+    )
+    confidence = np.clip(np.abs(bot_probability - 0.5) * 2, 0.1, 0.95)
+    return bot_probability, confidence
+
+
+def detect_risk_indicators(frame: pd.DataFrame) -> List[List[str]]:
+    """Risk indicators per user, with the thresholds of ``BotDetector._detect_risk_indicators``."""
+    def column(name: str) -> np.ndarray:
+        if name not in frame:
+            return np.zeros(len(frame))
+        return frame[name].fillna(0.0).to_numpy(dtype=np.float64)
+
+    posts_per_day = column('avg_posts_per_day')
+    duplicate_ratio = column('duplicate_content_ratio')
+    engagement = column('engagement_consistency')
+    clustering = column('network_clustering_coefficient')
+    rules = [
+        ('extremely_high_posting_frequency', posts_per_day > 50),
+        ('high_posting_frequency', (posts_per_day > 20) & (posts_per_day <= 50)),
+        ('identical_content_repetition', duplicate_ratio > 0.8),
+        ('low_content_diversity', (duplicate_ratio > 0.5) & (duplicate_ratio <= 0.8)),
+        ('suspicious_account_age', column('account_age_days') < 30),
+        ('abnormal_engagement_patterns', engagement < 0.2),
+        ('unusual_activity_patterns', (engagement >= 0.2) & (engagement < 0.4)),
+        ('coordinated_behavior_detected', clustering > 0.8),
+        ('suspicious_network_connections', (clustering > 0.6) & (clustering <= 0.8)),
+        ('automated_response_patterns', column('posting_time_variance') < 0.1)
+    ]
+
+    indicators: List[List[str]] = [[] for _ in range(len(frame))]
+    for name, mask in rules:
+        for i in np.flatnonzero(mask):
+            indicators[i].append(name)
+    return indicators
+
+
+def score_users(
+    users: List[Dict[str, Any]],
+    include_network_analysis: bool = True,
+    models: Optional[ScoringModels] = None
+) -> Dict[str, List[Any]]:
+    """Extract features for and score a batch of users.
+
+    Args:
+        users: User profile and activity data
+        include_network_analysis: Whether to include network features
+        models: Models to score with; defaults to those installed by ``init_scoring_worker``
+
+    Returns:
+        Lists of bot probabilities, confidences, risk indicators and feature
+        dictionaries, in input order
+    """
+    models = models or _worker_models
+    if models is None:
+        raise RuntimeError("No scoring models; call init_scoring_worker first")
+
+    frame = extract_feature_frame(users, include_network_analysis)
+    bot_probability, confidence = score_feature_matrix(feature_matrix(frame), models)
+    return {
+        'bot_probability': bot_probability.tolist(),
+        'confidence': confidence.tolist(),
+        'risk_indicators': detect_risk_indicators(frame),
+        'features': feature_records(frame)
+    }
+
+
+_worker_models: Optional[ScoringModels] = None
+
+
+def init_scoring_worker(models: ScoringModels) -> None:
+    """Process pool initializer: keep the models for every ``score_users`` call in this worker."""
+    global _worker_models
+    _worker_models = models
@@ -19,6 +19,8 @@ from shared.models.campaign import (
     NetworkMetrics, ContentMetrics, TemporalPattern, ImpactMetrics
 )
 from ..core.config import settings
+from .interaction_graph import InteractionGraphBuilder, GraphBuildConfig
+from .network_metrics import NetworkMetricsCalculator
 from ..models.requests import CampaignDetectionResponse
 
 
@@ -41,6 +43,9 @@ class CampaignDetector:
         self.content_similarity_threshold = 0.8
         self.temporal_window_minutes = 60
         
+        # Exact metrics on small graphs, sampled ones on large graphs
+        self.network_metrics = NetworkMetricsCalculator()
+        
         # Performance tracking
         self.total_analyses = 0
         self.total_processing_time = 0.0
@@ -337,6 +342,9 @@ class CampaignDetector:
     async def _build_interaction_network(self, posts_data: List[Dict[str, Any]]) -> nx.Graph:
         """Build interaction network from posts data.
         
+        All posts are encoded once and user pairs are scored in vectorized blocks;
+        see ``InteractionGraphBuilder``.
+        
         Args:
             posts_data: List of post data
             
@@ -344,127 +352,16 @@ class CampaignDetector:
             NetworkX graph representing user interactions
         """
         try:
-            G = nx.Graph()
-            
-            # Add nodes (users)
-            users = set()
-            for post in posts_data:
-                user_id = post.get('user_id')
-                if user_id:
-                    users.add(user_id)
-                    G.add_node(user_id)
-            
-            # Add edges based on interactions
-            user_posts = defaultdict(list)
-            for post in posts_data:
-                user_id = post.get('user_id')
-                if user_id:
-                    user_posts[user_id].append(post)
-            
-            # Create edges based on content similarity and temporal proximity
-            user_list = list(users)
-            for i in range(len(user_list)):
-                for j in range(i + 1, len(user_list)):
-                    user1, user2 = user_list[i], user_list[j]
-                    
-                    # Calculate interaction strength
-                    interaction_strength = await self._calculate_interaction_strength(
-                        user_posts[user1], user_posts[user2]
-                    )
-                    
-                    if interaction_strength > 0.3:  # Threshold for creating edge
-                        G.add_edge(user1, user2, weight=interaction_strength)
-            
-            return G
+            builder = InteractionGraphBuilder(
+                self.sentence_transformer,
+                GraphBuildConfig(temporal_window_minutes=self.temporal_window_minutes)
+            )
+            return builder.build(posts_data)
             
         except Exception as e:
             logger.error(f"Error building interaction network: {e}")
             return nx.Graph()
     
-    async def _calculate_interaction_strength(
-        self,
-        user1_posts: List[Dict[str, Any]],
-        user2_posts: List[Dict[str, Any]]
-    ) -> float:
-        """Calculate interaction strength between two users.
-        
-        Args:
-            user1_posts: Posts from user 1
-            user2_posts: Posts from user 2
-            
-        Returns:
-            Interaction strength score (0.0 to 1.0)
-        """
-        try:
-            if not user1_posts or not user2_posts:
-                return 0.0
-            
-            # Extract content from posts
-            user1_contents = [post.get('content', '') for post in user1_posts]
-            user2_contents = [post.get('content', '') for post in user2_posts]
-            
-            # Calculate content similarity
-            all_contents = user1_contents + user2_contents
-            if len(all_contents) < 2:
-                return 0.0
-            
-            embeddings = self.sentence_transformer.encode(all_contents)
-            
-            # Calculate cross-user similarities
-            similarities = []
-            for i in range(len(user1_contents)):
-                for j in range(len(user1_contents), len(all_contents)):
-                    sim = cosine_similarity([embeddings[i]], [embeddings[j]])[0][0]
-                    similarities.append(sim)
-            
-            if not similarities:
-                return 0.0
-            
-            content_similarity = np.mean(similarities)
-            
-            # Calculate temporal proximity
-            user1_timestamps = []
-            user2_timestamps = []
-            
-            for post in user1_posts:
-                timestamp_str = post.get('timestamp')
-                if timestamp_str:
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        user1_timestamps.append(timestamp)
-                    except ValueError:
-                        continue
-            
-            for post in user2_posts:
-                timestamp_str = post.get('timestamp')
-                if timestamp_str:
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        user2_timestamps.append(timestamp)
-                    except ValueError:
-                        continue
-            
-            temporal_proximity = 0.0
-            if user1_timestamps and user2_timestamps:
-                min_time_diff = float('inf')
-                for t1 in user1_timestamps:
-                    for t2 in user2_timestamps:
-                        diff = abs((t1 - t2).total_seconds()) / 60  # in minutes
-                        min_time_diff = min(min_time_diff, diff)
-                
-                # Convert time difference to proximity score
-                if min_time_diff <= 60:  # Within 1 hour
-                    temporal_proximity = 1.0 - (min_time_diff / 60)
-            
-            # Combine content similarity and temporal proximity
-            interaction_strength = (content_similarity * 0.7) + (temporal_proximity * 0.3)
-            
-            return min(1.0, interaction_strength)
-            
-        except Exception as e:
-            logger.error(f"Error calculating interaction strength: {e}")
-            return 0.0
-    
     async def _calculate_coordination_score(
         self,
         content_similarity: float,
@@ -994,7 +891,10 @@ class CampaignDetector:
             return False
     
     async def _calculate_network_metrics(self, network_graph: nx.Graph) -> Dict[str, Any]:
-        """Calculate comprehensive network metrics.
+        """Calculate network metrics, sampling them on large graphs.
+        
+        Runs ``NetworkMetricsCalculator`` in the default executor; its size
+        policy and per-metric time budgets bound the cost on large graphs.
         
         Args:
             network_graph: NetworkX graph
@@ -1003,63 +903,8 @@ class CampaignDetector:
             Dictionary of network metrics
         """
         try:
-            if len(network_graph.nodes()) == 0:
-                return {}
-            
-            metrics = {}
-            
-            # Basic metrics
-            metrics['node_count'] = len(network_graph.nodes())
-            metrics['edge_count'] = len(network_graph.edges())
-            metrics['density'] = nx.density(network_graph)
-            
-            # Connectivity metrics
-            metrics['is_connected'] = nx.is_connected(network_graph)
-            if nx.is_connected(network_graph):
-                metrics['diameter'] = nx.diameter(network_graph)
-                metrics['average_path_length'] = nx.average_shortest_path_length(network_graph)
-            else:
-                # For disconnected graphs, calculate for largest component
-                largest_cc = max(nx.connected_components(network_graph), key=len)
-                subgraph = network_graph.subgraph(largest_cc)
-                if len(subgraph.nodes()) > 1:
-                    metrics['diameter'] = nx.diameter(subgraph)
-                    metrics['average_path_length'] = nx.average_shortest_path_length(subgraph)
-            
-            # Clustering metrics
-            metrics['average_clustering'] = nx.average_clustering(network_graph)
-            metrics['transitivity'] = nx.transitivity(network_graph)
-            
-            # Centrality metrics
-            degree_centrality = nx.degree_centrality(network_graph)
-            betweenness_centrality = nx.betweenness_centrality(network_graph)
-            closeness_centrality = nx.closeness_centrality(network_graph)
-            
-            metrics['max_degree_centrality'] = max(degree_centrality.values()) if degree_centrality else 0
-            metrics['max_betweenness_centrality'] = max(betweenness_centrality.values()) if betweenness_centrality else 0
-            metrics['max_closeness_centrality'] = max(closeness_centrality.values()) if closeness_centrality else 0
-            
-            # Identify key nodes
-            if degree_centrality:
-                top_degree_nodes = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-                metrics['top_degree_nodes'] = [node for node, centrality in top_degree_nodes]
-            
-            if betweenness_centrality:
-                top_betweenness_nodes = sorted(betweenness_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-                metrics['top_betweenness_nodes'] = [node for node, centrality in top_betweenness_nodes]
-            
-            # Community detection
-            try:
-                communities = list(nx.community.greedy_modularity_communities(network_graph))
-                metrics['community_count'] = len(communities)
-                metrics['modularity'] = nx.community.modularity(network_graph, communities)
-                metrics['largest_community_size'] = max(len(community) for community in communities) if communities else 0
-            except:
-                metrics['community_count'] = 0
-                metrics['modularity'] = 0
-                metrics['largest_community_size'] = 0
-            
-            return metrics
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.network_metrics.calculate, network_graph)
             
         except Exception as e:
             logger.error(f"Error calculating network metrics: {e}")
@@ -1540,47 +1385,6 @@ class CampaignDetector:
             logger.error(f"Error detecting coordination methods: {e}")
             return []
     
-    async def _calculate_network_metrics(self, network_graph: nx.Graph) -> Dict[str, Any]:
-        """Calculate network analysis metrics.
-        
-        Args:
-            network_graph: Network graph
-            
-        Returns:
-            Dictionary of network metrics
-        """
-        try:
-            if len(network_graph.nodes()) == 0:
-                return {}
-            
-            metrics = {
-                'total_nodes': len(network_graph.nodes()),
-                'total_edges': len(network_graph.edges()),
-                'density': nx.density(network_graph),
-                'is_connected': nx.is_connected(network_graph),
-                'number_of_components': nx.number_connected_components(network_graph)
-            }
-            
-            if len(network_graph.nodes()) > 1:
-                metrics['average_clustering'] = nx.average_clustering(network_graph)
-                
-                if nx.is_connected(network_graph):
-                    metrics['average_path_length'] = nx.average_shortest_path_length(network_graph)
-                    metrics['diameter'] = nx.diameter(network_graph)
-            
-            # Calculate centrality measures for top nodes
-            if len(network_graph.nodes()) > 0:
-                degree_centrality = nx.degree_centrality(network_graph)
-                top_nodes = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-                metrics['top_central_nodes'] = [{'node': node, 'centrality': centrality} 
-                                              for node, centrality in top_nodes]
-            
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Error calculating network metrics: {e}")
-            return {}
-    
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information and performance metrics.
         
@@ -0,0 +1,408 @@
+"""Vectorized interaction graph construction for campaign detection."""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+import numpy as np
+import networkx as nx
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GraphBuildConfig:
+    """Configuration for interaction graph construction."""
+
+    edge_threshold: float = 0.3
+    content_weight: float = 0.7
+    temporal_weight: float = 0.3
+    temporal_window_minutes: float = 60.0
+    candidate_strategy: str = "auto"  # "exact", "lsh" or "auto"
+    exact_user_limit: int = 20000  # "auto" switches to LSH above this
+    block_elements: int = 1 << 24  # Similarity block size (rows x users)
+    max_pairs_per_chunk: int = 1 << 22
+    encode_batch_size: int = 256
+    lsh_bands: int = 16
+    lsh_rows: int = 8  # Minimum bits per band; grows with the user count
+    lsh_target_bucket_size: int = 16
+    lsh_max_bucket_size: int = 64
+    seed: int = 42
+
+    def validate(self) -> None:
+        """Validate configuration parameters."""
+        if self.candidate_strategy not in ("exact", "lsh", "auto"):
+            raise ValueError("candidate_strategy must be 'exact', 'lsh' or 'auto'")
+        if self.content_weight <= 0:
+            raise ValueError("content_weight must be positive")
+        if self.temporal_weight < 0:
+            raise ValueError("temporal_weight must be non-negative")
+        if self.temporal_window_minutes <= 0:
+            raise ValueError("temporal_window_minutes must be positive")
+        if self.block_elements <= 0 or self.max_pairs_per_chunk <= 0:
+            raise ValueError("block_elements and max_pairs_per_chunk must be positive")
+        if not 1 <= self.lsh_rows <= 62:
+            raise ValueError("lsh_rows must be between 1 and 62")
+        if self.lsh_bands <= 0 or self.lsh_max_bucket_size <= 0 or self.lsh_target_bucket_size <= 0:
+            raise ValueError("lsh_bands and LSH bucket sizes must be positive")
+
+
+def _parse_timestamp_minutes(value: Any) -> float:
+    """Convert a post timestamp to epoch minutes (NaN when missing or invalid)."""
+    if isinstance(value, datetime):
+        timestamp = value
+    elif isinstance(value, str) and value:
+        try:
+            timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return np.nan
+    else:
+        return np.nan
+
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp() / 60.0
+
+
+def _expand_ranges(lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand half-open index ranges into flat (owner, partner) index arrays.
+
+    Args:
+        lo: Inclusive range starts, one per owner
+        hi: Exclusive range stops, one per owner
+
+    Returns:
+        Tuple of owner positions and partner indices
+    """
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    owners = np.repeat(np.arange(len(lo)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    partners = np.repeat(lo, counts) + offsets
+    return owners, partners
+
+
+def _iter_range_chunks(
+    lo: np.ndarray,
+    hi: np.ndarray,
+    max_pairs: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Expand index ranges in chunks holding at most ``max_pairs`` pairs.
+
+    A single owner whose range exceeds ``max_pairs`` is emitted on its own.
+
+    Yields:
+        Tuples of absolute owner indices and partner indices
+    """
+    counts = np.maximum(hi - lo, 0)
+    cumulative = np.cumsum(counts)
+    start = 0
+    n = len(lo)
+    while start < n:
+        base = cumulative[start - 1] if start > 0 else 0
+        stop = int(np.searchsorted(cumulative, base + max_pairs, side='right'))
+        stop = max(stop, start + 1)
+        owners, partners = _expand_ranges(lo[start:stop], hi[start:stop])
+        if len(owners):
+            yield owners + start, partners
+        start = stop
+
+
+class InteractionGraphBuilder:
+    """Builds user interaction graphs from a single embedding pass.
+
+    Every post is encoded once per build. The mean cross-user cosine similarity used by
+    the pairwise implementation equals the dot product of the two users' mean normalized
+    embeddings, so user pairs are scored with blocked matrix products (exact strategy) or
+    verified after random-hyperplane LSH bucketing (approximate strategy). Temporal
+    proximity is computed from sorted timestamp arrays with ``numpy.searchsorted``.
+    """
+
+    def __init__(self, encoder: Any, config: Optional[GraphBuildConfig] = None):
+        """Initialize the graph builder.
+
+        Args:
+            encoder: Sentence encoder exposing ``encode(texts, batch_size=...)``
+            config: Graph construction configuration
+        """
+        self.encoder = encoder
+        self.config = config or GraphBuildConfig()
+        self.config.validate()
+        self.last_build_stats: Dict[str, Any] = {}
+
+    def build(self, posts_data: List[Dict[str, Any]]) -> nx.Graph:
+        """Build the interaction network for a set of posts.
+
+        Args:
+            posts_data: List of post data dictionaries
+
+        Returns:
+            NetworkX graph with one node per user and weighted interaction edges
+        """
+        user_ids, post_users, contents, times = self._collect_posts(posts_data)
+
+        graph = nx.Graph()
+        graph.add_nodes_from(user_ids)
+        num_users = len(user_ids)
+
+        strategy = self._resolve_strategy(num_users)
+        self.last_build_stats = {
+            'users': num_users,
+            'posts': len(contents),
+            'strategy': strategy,
+            'edges': 0
+        }
+        if num_users < 2:
+            return graph
+
+        user_vectors = self._user_embeddings(contents, post_users, num_users)
+
+        if strategy == "exact":
+            rows, cols, weights = self._exact_edges(user_vectors, post_users, times)
+        else:
+            rows, cols, weights = self._lsh_edges(user_vectors, post_users, times)
+
+        graph.add_weighted_edges_from(
+            (user_ids[i], user_ids[j], float(w))
+            for i, j, w in zip(rows.tolist(), cols.tolist(), weights.tolist())
+        )
+        self.last_build_stats['edges'] = len(weights)
+        return graph
+
+    def _resolve_strategy(self, num_users: int) -> str:
+        """Pick the candidate generation strategy for a given user count."""
+        if self.config.candidate_strategy != "auto":
+            return self.config.candidate_strategy
+        return "exact" if num_users <= self.config.exact_user_limit else "lsh"
+
+    def _collect_posts(
+        self,
+        posts_data: List[Dict[str, Any]]
+    ) -> Tuple[List[Any], np.ndarray, List[str], np.ndarray]:
+        """Index posts by user and extract contents and timestamps.
+
+        Returns:
+            Tuple of user ids, per-post user index, post contents and epoch minutes
+        """
+        user_index: Dict[Any, int] = {}
+        post_users = []
+        contents = []
+        times = []
+
+        for post in posts_data:
+            user_id = post.get('user_id')
+            if not user_id:
+                continue
+            index = user_index.setdefault(user_id, len(user_index))
+            post_users.append(index)
+            contents.append(post.get('content') or '')
+            times.append(_parse_timestamp_minutes(post.get('timestamp')))
+
+        return (
+            list(user_index),
+            np.asarray(post_users, dtype=np.int64),
+            contents,
+            np.asarray(times, dtype=np.float64)
+        )
+
+    def _user_embeddings(
+        self,
+        contents: List[str],
+        post_users: np.ndarray,
+        num_users: int
+    ) -> np.ndarray:
+        """Encode all posts once and average the normalized vectors per user."""
+        embeddings = np.asarray(
+            self.encoder.encode(contents, batch_size=self.config.encode_batch_size),
+            dtype=np.float32
+        )
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1.0, norms)
+
+        order = np.argsort(post_users, kind='stable')
+        counts = np.bincount(post_users, minlength=num_users)
+        starts = np.cumsum(counts) - counts
+        sums = np.add.reduceat(embeddings[order], starts, axis=0)
+        return (sums / counts[:, None]).astype(np.float32)
+
+    def _combine(self, content: np.ndarray, proximity: np.ndarray) -> np.ndarray:
+        """Combine content similarity and temporal proximity into edge strength."""
+        strength = content * self.config.content_weight + proximity * self.config.temporal_weight
+        return np.minimum(strength, 1.0)
+
+    def _exact_edges(
+        self,
+        user_vectors: np.ndarray,
+        post_users: np.ndarray,
+        times: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score every user pair with blocked matrix products.
+
+        Each block covers a slice of users against all later users, so peak memory is
+        bounded by ``block_elements`` instead of growing with the square of the user count.
+        """
+        num_users = len(user_vectors)
+        window = self.config.temporal_window_minutes
+        block_rows = max(1, self.config.block_elements // num_users)
+
+        valid = ~np.isnan(times)
+        timeline_order = np.argsort(times[valid], kind='stable')
+        timeline_times = times[valid][timeline_order]
+        timeline_users = post_users[valid][timeline_order]
+
+        user_order = np.lexsort((times[valid], post_users[valid]))
+        by_user_times = times[valid][user_order]
+        by_user_users = post_users[valid][user_order]
+        user_starts = np.searchsorted(by_user_users, np.arange(num_users + 1))
+
+        rows_out, cols_out, weights_out = [], [], []
+        for start in range(0, num_users, block_rows):
+            stop = min(start + block_rows, num_users)
+            similarity = user_vectors[start:stop] @ user_vectors[start:].T
+            proximity = np.zeros_like(similarity)
+
+            post_lo, post_hi = user_starts[start], user_starts[stop]
+            block_times = by_user_times[post_lo:post_hi]
+            block_users = by_user_users[post_lo:post_hi]
+            lo = np.searchsorted(timeline_times, block_times - window, side='left')
+            hi = np.searchsorted(timeline_times, block_times + window, side='right')
+
+            for owners, partners in _iter_range_chunks(lo, hi, self.config.max_pairs_per_chunk):
+                owner_users = block_users[owners]
+                partner_users = timeline_users[partners]
+                keep = partner_users > owner_users
+                owner_users = owner_users[keep]
+                partner_users = partner_users[keep]
+                gap = np.abs(timeline_times[partners[keep]] - block_times[owners[keep]])
+                np.maximum.at(
+                    proximity,
+                    (owner_users - start, partner_users - start),
+                    (1.0 - gap / window).astype(np.float32)
+                )
+
+            strength = self._combine(similarity, proximity)
+            upper = np.arange(start, num_users)[None, :] > np.arange(start, stop)[:, None]
+            local_rows, local_cols = np.nonzero((strength > self.config.edge_threshold) & upper)
+            rows_out.append(local_rows + start)
+            cols_out.append(local_cols + start)
+            weights_out.append(strength[local_rows, local_cols])
+
+        return (
+            np.concatenate(rows_out),
+            np.concatenate(cols_out),
+            np.concatenate(weights_out)
+        )
+
+    def _lsh_candidates(self, user_vectors: np.ndarray) -> np.ndarray:
+        """Find candidate pairs that share a random-hyperplane LSH bucket.
+
+        Returns:
+            Sorted unique pair keys encoded as ``low * num_users + high``
+        """
+        num_users, dimensions = user_vectors.shape
+        bands = self.config.lsh_bands
+        # Enough bits per band that unrelated users rarely share a bucket
+        rows = int(np.ceil(np.log2(max(num_users / self.config.lsh_target_bucket_size, 1.0))))
+        rows = min(max(rows, self.config.lsh_rows), 62)
+        rng = np.random.default_rng(self.config.seed)
+        planes = rng.standard_normal((dimensions, bands * rows)).astype(np.float32)
+        bits = (user_vectors @ planes > 0).reshape(num_users, bands, rows)
+        codes = bits.astype(np.int64) @ (np.int64(1) << np.arange(rows, dtype=np.int64))
+
+        keys = []
+        positions = np.arange(num_users)
+        for band in range(bands):
+            order = np.argsort(codes[:, band], kind='stable')
+            sorted_codes = codes[order, band]
+            group_start = np.searchsorted(sorted_codes, sorted_codes, side='left')
+            lo = np.maximum(group_start, positions - self.config.lsh_max_bucket_size)
+            for owners, partners in _iter_range_chunks(lo, positions, self.config.max_pairs_per_chunk):
+                first, second = order[owners], order[partners]
+                keys.append(np.minimum(first, second) * num_users + np.maximum(first, second))
+
+        if not keys:
+            return np.empty(0, dtype=np.int64)
+        keys = np.concatenate(keys)
+        keys.sort()
+        return keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+    def _min_time_gaps(
+        self,
+        first: np.ndarray,
+        second: np.ndarray,
+        post_users: np.ndarray,
+        times: np.ndarray,
+        num_users: int
+    ) -> np.ndarray:
+        """Minimum posting time gap in minutes for each candidate pair (inf if unknown)."""
+        valid = ~np.isnan(times)
+        users = post_users[valid]
+        minutes = times[valid]
+        gaps = np.full(len(first), np.inf)
+        if len(minutes) == 0 or len(first) == 0:
+            return gaps
+
+        # Composite user-major keys let one searchsorted locate a time inside any user's block
+        minutes = minutes - minutes.min()
+        stride = minutes.max() + 2 * self.config.temporal_window_minutes + 1.0
+        order = np.lexsort((minutes, users))
+        keys = users[order] * stride + minutes[order]
+        sorted_minutes = minutes[order]
+        user_starts = np.searchsorted(users[order], np.arange(num_users + 1))
+        counts = np.diff(user_starts)
+
+        # Probe from the user with fewer timestamped posts
+        swap = counts[first] > counts[second]
+        probe = np.where(swap, second, first)
+        target = np.where(swap, first, second)
+
+        lo, hi = user_starts[probe], user_starts[probe + 1]
+        for pairs, post_positions in _iter_range_chunks(lo, hi, self.config.max_pairs_per_chunk):
+            query = sorted_minutes[post_positions]
+            owner = target[pairs]
+            block_lo, block_hi = user_starts[owner], user_starts[owner + 1]
+            insert = np.searchsorted(keys, owner * stride + query)
+
+            best = np.full(len(query), np.inf)
+            for candidate in (insert - 1, insert):
+                inside = (candidate >= block_lo) & (candidate < block_hi)
+                safe = np.clip(candidate, 0, len(keys) - 1)
+                gap = np.where(inside, np.abs(sorted_minutes[safe] - query), np.inf)
+                best = np.minimum(best, gap)
+            np.minimum.at(gaps, pairs, best)
+
+        return gaps
+
+    def _lsh_edges(
+        self,
+        user_vectors: np.ndarray,
+        post_users: np.ndarray,
+        times: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score LSH candidate pairs only (approximate; misses low-similarity pairs).
+
+        Pairs that would become edges purely through posting-time coincidence with low
+        content similarity are not generated, which is the intended trade-off for very
+        large user sets.
+        """
+        num_users = len(user_vectors)
+        keys = self._lsh_candidates(user_vectors)
+        first, second = keys // num_users, keys % num_users
+
+        similarity = np.empty(len(keys), dtype=np.float32)
+        step = max(1, self.config.block_elements // user_vectors.shape[1])
+        for start in range(0, len(keys), step):
+            stop = start + step
+            similarity[start:stop] = np.einsum(
+                'ij,ij->i', user_vectors[first[start:stop]], user_vectors[second[start:stop]]
+            )
+        gaps = self._min_time_gaps(first, second, post_users, times, num_users)
+        window = self.config.temporal_window_minutes
+        proximity = np.where(gaps <= window, 1.0 - gaps / window, 0.0)
+
+        strength = self._combine(similarity, proximity)
+        keep = strength > self.config.edge_threshold
+        self.last_build_stats['candidate_pairs'] = len(keys)
+        return first[keep], second[keep], strength[keep]
@@ -0,0 +1,489 @@
+"""Exact and sampled network metrics for campaign interaction graphs."""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from scipy.sparse import csgraph
+
+
+logger = logging.getLogger(__name__)
+
+METRIC_GROUPS = ("shortest_paths", "diameter", "clustering", "communities")
+
+
+@dataclass
+class NetworkMetricsConfig:
+    """Configuration for network metric computation."""
+
+    strategy: str = "auto"  # "exact", "approximate" or "auto"
+    exact_node_limit: int = 2000  # "auto" computes exact metrics up to these sizes
+    exact_edge_limit: int = 20000
+    sample_sources: int = 256  # BFS pivots for betweenness, closeness and path length
+    diameter_sweeps: int = 4  # BFS sweeps for the diameter lower bound
+    clustering_samples: int = 50000  # Wedges sampled for clustering and transitivity
+    community_method: str = "label_propagation"  # Approximate communities: or "louvain"
+    label_propagation_iterations: int = 30
+    time_budget_seconds: float = 5.0  # Per metric group unless overridden below
+    metric_time_budgets: Dict[str, float] = field(default_factory=dict)
+    bfs_block_elements: int = 1 << 21  # Nodes x sources per vectorized BFS block
+    top_k: int = 5
+    seed: int = 42
+
+    def validate(self) -> None:
+        """Validate configuration parameters."""
+        if self.strategy not in ("exact", "approximate", "auto"):
+            raise ValueError("strategy must be 'exact', 'approximate' or 'auto'")
+        if self.community_method not in ("louvain", "label_propagation"):
+            raise ValueError("community_method must be 'louvain' or 'label_propagation'")
+        if self.exact_node_limit < 0 or self.exact_edge_limit < 0:
+            raise ValueError("exact_node_limit and exact_edge_limit must be non-negative")
+        if self.sample_sources <= 0 or self.diameter_sweeps <= 0 or self.clustering_samples <= 0:
+            raise ValueError("sample_sources, diameter_sweeps and clustering_samples must be positive")
+        if self.label_propagation_iterations <= 0 or self.bfs_block_elements <= 0 or self.top_k <= 0:
+            raise ValueError("label_propagation_iterations, bfs_block_elements and top_k must be positive")
+        unknown = set(self.metric_time_budgets) - set(METRIC_GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown metric groups in metric_time_budgets: {sorted(unknown)}")
+        if self.time_budget_seconds <= 0 or any(budget <= 0 for budget in self.metric_time_budgets.values()):
+            raise ValueError("time budgets must be positive")
+
+    def time_budget(self, group: str) -> float:
+        """Time budget in seconds for a metric group."""
+        return self.metric_time_budgets.get(group, self.time_budget_seconds)
+
+
+def _adjacency(graph: nx.Graph, nodes: List[Any]) -> sparse.csr_array:
+    """Binary symmetric CSR adjacency without self-loops, indices sorted per row."""
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=None, dtype=np.float64, format="csr")
+    if nx.number_of_selfloops(graph):
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+    adjacency.sort_indices()
+    return adjacency
+
+
+def shortest_path_pass(
+    adjacency: sparse.csr_array,
+    sources: np.ndarray,
+    block_elements: int,
+    deadline: float
+) -> Dict[str, Any]:
+    """Brandes dependency accumulation from many BFS sources at once.
+
+    Each block of sources is a dense ``nodes x sources`` matrix: BFS levels are
+    expanded by sparse-dense products that also count shortest paths, and
+    dependencies are accumulated level by level on the way back. Blocks stop
+    once ``deadline`` passes (after at least one block).
+
+    Args:
+        adjacency: Binary symmetric CSR adjacency
+        sources: Source node indices, in the order they should be processed
+        block_elements: Upper bound on nodes x sources per block
+        deadline: ``time.perf_counter()`` value after which no block starts
+
+    Returns:
+        Raw betweenness sums, per-node distance sums and reach counts, and the
+        distance sum and eccentricity of every processed source
+    """
+    n = adjacency.shape[0]
+    block = max(1, min(len(sources), block_elements // max(n, 1)))
+    betweenness = np.zeros(n)
+    distance_sums = np.zeros(n)
+    reached_by = np.zeros(n, dtype=np.int64)
+    source_distance_sums: List[np.ndarray] = []
+    eccentricities: List[np.ndarray] = []
+    done = 0
+
+    for start in range(0, len(sources), block):
+        if done and time.perf_counter() > deadline:
+            break
+        batch = sources[start:start + block]
+        columns = np.arange(len(batch))
+
+        depth = np.full((n, len(batch)), -1, dtype=np.int32)
+        sigma = np.zeros((n, len(batch)))
+        depth[batch, columns] = 0
+        sigma[batch, columns] = 1.0
+        frontier = sigma.copy()
+        level = 0
+        while True:
+            paths = adjacency @ frontier
+            discovered = (paths > 0) & (depth < 0)
+            if not discovered.any():
+                break
+            level += 1
+            depth[discovered] = level
+            frontier = np.where(discovered, paths, 0.0)
+            sigma += frontier
+
+        delta = np.zeros_like(sigma)
+        coefficient = frontier
+        for current in range(level, 0, -1):
+            coefficient.fill(0.0)
+            np.divide(1.0 + delta, sigma, out=coefficient, where=depth == current)
+            delta += np.where(depth == current - 1, sigma * (adjacency @ coefficient), 0.0)
+        delta[batch, columns] = 0.0
+
+        reached = depth >= 0
+        distances = np.where(reached, depth, 0)
+        betweenness += delta.sum(axis=1)
+        distance_sums += distances.sum(axis=1)
+        reached_by += reached.sum(axis=1)
+        source_distance_sums.append(distances.sum(axis=0))
+        eccentricities.append(depth.max(axis=0))
+        done += len(batch)
+
+    return {
+        "betweenness": betweenness,
+        "distance_sums": distance_sums,
+        "reached_by": reached_by,
+        "sources": sources[:done],
+        "source_distance_sums": np.concatenate(source_distance_sums) if done else np.zeros(0),
+        "eccentricities": np.concatenate(eccentricities) if done else np.zeros(0, dtype=np.int32)
+    }
+
+
+def sweep_diameter(
+    adjacency: sparse.csr_array,
+    start: int,
+    sweeps: int,
+    deadline: float
+) -> Tuple[int, int]:
+    """Diameter lower bound from repeated BFS sweeps to the farthest node.
+
+    The first two sweeps are the classic double sweep; further sweeps restart
+    from the farthest node found so far. Returns the bound and sweeps run.
+    """
+    best = 0
+    current = start
+    done = 0
+    for _ in range(sweeps):
+        distances = csgraph.shortest_path(adjacency, method="D", directed=False, unweighted=True, indices=current)
+        distances[~np.isfinite(distances)] = -1
+        current = int(distances.argmax())
+        best = max(best, int(distances[current]))
+        done += 1
+        if time.perf_counter() > deadline:
+            break
+    return best, done
+
+
+def sample_clustering(
+    adjacency: sparse.csr_array,
+    samples: int,
+    rng: np.random.Generator
+) -> Tuple[float, float]:
+    """Estimate average clustering and transitivity by sampling wedges.
+
+    Average clustering samples one random wedge at a uniformly chosen node
+    (nodes with degree below two count as zero); transitivity samples wedges
+    uniformly, i.e. centres proportionally to ``d(d-1)``.
+    """
+    n = adjacency.shape[0]
+    indptr, indices = adjacency.indptr, adjacency.indices.astype(np.int64)
+    degrees = np.diff(indptr)
+    edge_keys = np.repeat(np.arange(n, dtype=np.int64), degrees) * n + indices
+
+    def closed(centres: np.ndarray) -> np.ndarray:
+        degree = degrees[centres]
+        first = (rng.random(len(centres)) * degree).astype(np.int64)
+        second = (rng.random(len(centres)) * (degree - 1)).astype(np.int64)
+        second += second >= first
+        keys = indices[indptr[centres] + first] * n + indices[indptr[centres] + second]
+        positions = np.minimum(np.searchsorted(edge_keys, keys), len(edge_keys) - 1)
+        return edge_keys[positions] == keys
+
+    nodes = rng.integers(0, n, samples)
+    nodes = nodes[degrees[nodes] >= 2]
+    average_clustering = float(closed(nodes).sum() / samples) if len(nodes) else 0.0
+
+    wedges = (degrees * (degrees - 1)).astype(np.float64)
+    if wedges.sum() == 0:
+        return average_clustering, 0.0
+    centres = rng.choice(n, samples, p=wedges / wedges.sum())
+    return average_clustering, float(closed(centres).mean())
+
+
+def label_propagation(
+    adjacency: sparse.csr_array,
+    max_iterations: int,
+    rng: np.random.Generator,
+    deadline: float
+) -> Tuple[np.ndarray, int]:
+    """Vectorized label propagation; returns community labels and iterations run.
+
+    Every node adopts its most frequent neighbour label, keeping its own label
+    among tied ones and otherwise breaking ties at random. Nodes are updated
+    in two random halves per iteration, which avoids the label oscillation of
+    fully synchronous updates on bipartite structures.
+    """
+    n = adjacency.shape[0]
+    degrees = np.diff(adjacency.indptr)
+    rows = np.repeat(np.arange(n), degrees)
+    columns = adjacency.indices
+    labels = np.arange(n)
+    iterations = 0
+
+    for _ in range(max_iterations):
+        changed = 0
+        active_half = rng.random(n) < 0.5
+        for active in (active_half, ~active_half):
+            edge_mask = active[rows]
+            if not edge_mask.any():
+                continue
+            edge_rows = rows[edge_mask]
+            edge_labels = labels[columns[edge_mask]]
+            # Count (row, label) pairs, then pick each row's most frequent label
+            pairs, counts = np.unique(edge_rows.astype(np.int64) * n + edge_labels, return_counts=True)
+            pair_rows = pairs // n
+            # Ties keep the current label, otherwise are broken at random
+            keeps = pairs % n == labels[pair_rows]
+            order = np.lexsort((rng.random(len(pairs)), ~keeps, -counts, pair_rows))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = pair_rows[order][1:] != pair_rows[order][:-1]
+            winners = order[first]
+            new_labels = pairs[winners] % n
+            changed += int((labels[pair_rows[winners]] != new_labels).sum())
+            labels[pair_rows[winners]] = new_labels
+        iterations += 1
+        if changed == 0 or time.perf_counter() > deadline:
+            break
+
+    return np.unique(labels, return_inverse=True)[1], iterations
+
+
+def modularity(adjacency: sparse.csr_array, labels: np.ndarray) -> float:
+    """Newman modularity of a partition given as one label per node."""
+    degrees = np.diff(adjacency.indptr).astype(np.float64)
+    total = degrees.sum()
+    if total == 0:
+        return 0.0
+    rows = np.repeat(np.arange(adjacency.shape[0]), np.diff(adjacency.indptr))
+    intra = np.count_nonzero(labels[rows] == labels[adjacency.indices])
+    community_degrees = np.bincount(labels, weights=degrees)
+    return float(intra / total - ((community_degrees / total) ** 2).sum())
+
+
+class NetworkMetricsCalculator:
+    """Computes campaign network metrics, exactly on small graphs and by sampling on large ones."""
+
+    def __init__(self, config: Optional[NetworkMetricsConfig] = None):
+        """Initialize the calculator.
+
+        Args:
+            config: Metric configuration; defaults to ``NetworkMetricsConfig()``
+        """
+        self.config = config or NetworkMetricsConfig()
+        self.config.validate()
+
+    def use_exact(self, graph: nx.Graph) -> bool:
+        """Whether the size policy selects exact computation for ``graph``."""
+        if self.config.strategy != "auto":
+            return self.config.strategy == "exact"
+        return (graph.number_of_nodes() <= self.config.exact_node_limit
+                and graph.number_of_edges() <= self.config.exact_edge_limit)
+
+    def calculate(self, graph: nx.Graph) -> Dict[str, Any]:
+        """Calculate network metrics; edge directions and weights are ignored.
+
+        Args:
+            graph: NetworkX graph
+
+        Returns:
+            Dictionary of network metrics. ``computation`` records the mode,
+            how each metric group was computed and per-group timings.
+        """
+        n = graph.number_of_nodes()
+        if n == 0:
+            return {}
+
+        if graph.is_directed():
+            graph = graph.to_undirected(as_view=True)
+        config = self.config
+        exact = self.use_exact(graph)
+        rng = np.random.default_rng(config.seed)
+        methods: Dict[str, str] = {}
+        timings: Dict[str, float] = {}
+
+        nodes = list(graph.nodes())
+        adjacency = _adjacency(graph, nodes)
+        degrees = np.diff(adjacency.indptr)
+        component_count, component_labels = csgraph.connected_components(adjacency, directed=False)
+        component_sizes = np.bincount(component_labels)
+        largest = int(component_sizes.argmax())
+        largest_size = int(component_sizes[largest])
+
+        edge_count = graph.number_of_edges()
+        metrics: Dict[str, Any] = {
+            'node_count': n,
+            'edge_count': edge_count,
+            'total_nodes': n,
+            'total_edges': edge_count,
+            'density': nx.density(graph),
+            'is_connected': component_count == 1,
+            'number_of_components': int(component_count)
+        }
+
+        degree_centrality = degrees / (n - 1) if n > 1 else np.zeros(n)
+        top_degree = self._top(degree_centrality)
+        metrics['max_degree_centrality'] = float(degree_centrality.max())
+        metrics['top_degree_nodes'] = [nodes[i] for i in top_degree]
+        metrics['top_central_nodes'] = [{'node': nodes[i], 'centrality': float(degree_centrality[i])}
+                                        for i in top_degree]
+
+        # Betweenness, closeness and path length share one multi-source BFS pass
+        started = time.perf_counter()
+        sources = rng.permutation(n)
+        if not exact:
+            sources = sources[:config.sample_sources]
+        paths = shortest_path_pass(adjacency, sources, config.bfs_block_elements,
+                                   started + config.time_budget("shortest_paths"))
+        processed = paths['sources']
+        complete = len(processed) == n
+        methods['shortest_paths'] = "exact" if complete else f"sampled_{len(processed)}_sources"
+
+        betweenness = paths['betweenness']
+        if n > 2:
+            betweenness = betweenness * n / len(processed) / ((n - 1) * (n - 2))
+        else:
+            betweenness = np.zeros(n)
+        closeness = self._closeness(paths, component_labels, component_sizes, complete)
+        metrics['max_betweenness_centrality'] = float(betweenness.max())
+        metrics['max_closeness_centrality'] = float(closeness.max())
+        metrics['top_betweenness_nodes'] = [nodes[i] for i in self._top(betweenness)]
+
+        in_largest = component_labels[processed] == largest
+        if largest_size > 1 and in_largest.any():
+            metrics['average_path_length'] = float(
+                paths['source_distance_sums'][in_largest].sum() / (in_largest.sum() * (largest_size - 1))
+            )
+        timings['shortest_paths'] = (time.perf_counter() - started) * 1000
+
+        # Diameter of the largest component
+        started = time.perf_counter()
+        if largest_size > 1:
+            diameter = int(paths['eccentricities'][in_largest].max()) if in_largest.any() else 0
+            if complete:
+                methods['diameter'] = "exact"
+            else:
+                start = int(rng.choice(np.flatnonzero(component_labels == largest)))
+                bound, sweeps = sweep_diameter(adjacency, start, config.diameter_sweeps,
+                                               started + config.time_budget("diameter"))
+                diameter = max(diameter, bound)
+                methods['diameter'] = f"lower_bound_{sweeps}_sweeps"
+            metrics['diameter'] = diameter
+        timings['diameter'] = (time.perf_counter() - started) * 1000
+
+        # Clustering
+        started = time.perf_counter()
+        if exact:
+            metrics['average_clustering'] = nx.average_clustering(graph)
+            metrics['transitivity'] = nx.transitivity(graph)
+            methods['clustering'] = "exact"
+        else:
+            metrics['average_clustering'], metrics['transitivity'] = sample_clustering(
+                adjacency, config.clustering_samples, rng
+            )
+            methods['clustering'] = f"sampled_{config.clustering_samples}_wedges"
+        timings['clustering'] = (time.perf_counter() - started) * 1000
+
+        # Communities
+        started = time.perf_counter()
+        try:
+            labels, methods['communities'] = self._communities(
+                graph, nodes, adjacency, exact, rng, started + config.time_budget("communities")
+            )
+            community_sizes = np.bincount(labels)
+            metrics['community_count'] = len(community_sizes)
+            metrics['modularity'] = modularity(adjacency, labels)
+            metrics['largest_community_size'] = int(community_sizes.max())
+        except Exception as e:
+            logger.warning(f"Community detection failed: {e}")
+            metrics['community_count'] = 0
+            metrics['modularity'] = 0
+            metrics['largest_community_size'] = 0
+            methods['communities'] = "failed"
+        timings['communities'] = (time.perf_counter() - started) * 1000
+
+        metrics['computation'] = {
+            'mode': "exact" if exact else "approximate",
+            'methods': methods,
+            'timings_ms': timings
+        }
+        return metrics
+
+    def _top(self, values: np.ndarray) -> np.ndarray:
+        """Indices of the ``top_k`` largest values, largest first."""
+        order = np.argsort(-values, kind="stable")
+        return order[:self.config.top_k]
+
+    @staticmethod
+    def _closeness(
+        paths: Dict[str, Any],
+        component_labels: np.ndarray,
+        component_sizes: np.ndarray,
+        complete: bool
+    ) -> np.ndarray:
+        """Wasserman-Faust closeness from the BFS pass (as ``nx.closeness_centrality``).
+
+        With sampled sources each node's distance sum is scaled up from the
+        sources in its component; nodes whose component has no other sampled
+        source get the upper bound ``(r - 1) / (n - 1)``.
+        """
+        n = len(component_labels)
+        if n < 2:
+            return np.zeros(n)
+        others = component_sizes[component_labels] - 1
+        sampled = paths['reached_by'].astype(np.float64)
+        if not complete:
+            sampled[paths['sources']] -= 1
+        distance_sums = paths['distance_sums']
+        closeness = others / (n - 1)
+        estimated = (sampled > 0) & (distance_sums > 0)
+        if complete:
+            closeness = np.where(estimated, others / np.where(estimated, distance_sums, 1) * closeness, 0.0)
+        else:
+            scaled_sums = distance_sums * others / np.where(estimated, sampled, 1)
+            closeness = np.where(estimated, others / np.where(estimated, scaled_sums, 1) * closeness, closeness)
+        return np.where(others > 0, closeness, 0.0)
+
+    def _communities(
+        self,
+        graph: nx.Graph,
+        nodes: List[Any],
+        adjacency: sparse.csr_array,
+        exact: bool,
+        rng: np.random.Generator,
+        deadline: float
+    ) -> Tuple[np.ndarray, str]:
+        """Community labels per node and a description of the method used.
+
+        Louvain (complete unless the budget runs out between levels) on exact
+        graphs; ``community_method`` on approximate ones.
+        """
+        if not exact and self.config.community_method == "label_propagation":
+            labels, iterations = label_propagation(
+                adjacency, self.config.label_propagation_iterations, rng, deadline
+            )
+            return labels, f"label_propagation_{iterations}_iterations"
+
+        # Each Louvain level coarsens the previous one; stop at the budget
+        communities = [set(nodes)]
+        method = "louvain"
+        partitions = nx.community.louvain_partitions(graph, weight=None, seed=self.config.seed)
+        for levels, partition in enumerate(partitions, 1):
+            communities = partition
+            if time.perf_counter() > deadline:
+                method = f"louvain_{levels}_levels"
+                break
+
+        index = {node: i for i, node in enumerate(nodes)}
+        labels = np.zeros(len(nodes), dtype=np.int64)
+        for label, community in enumerate(communities):
+            labels[[index[node] for node in community]] = label
+        return labels, method
@@ -0,0 +1,225 @@
+"""Process-sharded execution of batch jobs with pre-loaded worker models."""
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ShardResult:
+    """Outcome of one shard, streamed back as soon as its worker finishes."""
+
+    index: int
+    offset: int
+    size: int
+    results: Optional[Any] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_worker: Any = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _run_in_worker_loop(value: Any) -> Any:
+    """Resolve ``value`` on the worker's own event loop if it is awaitable."""
+    if inspect.isawaitable(value):
+        return _worker_loop.run_until_complete(value)
+    return value
+
+
+def init_shard_worker(worker_factory: Callable[[], Any]) -> None:
+    """Process pool initializer: build the worker object once per process.
+
+    ``worker_factory`` may be a coroutine function, so a model's async
+    ``initialize`` runs here, before the first shard arrives, and on the same
+    loop its later calls use.
+    """
+    global _worker, _worker_loop
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    _worker = _run_in_worker_loop(worker_factory())
+
+
+def run_shard(method: str, items: Sequence[Any], kwargs: Dict[str, Any]) -> Any:
+    """Call ``method`` of this process's worker object on one shard."""
+    if _worker is None:
+        raise RuntimeError("Shard worker is not initialized")
+    return _run_in_worker_loop(getattr(_worker, method)(list(items), **kwargs))
+
+
+def _worker_ready(barrier: Any) -> int:
+    barrier.wait()
+    return os.getpid()
+
+
+class ShardedExecutor:
+    """Splits batches into shards and scores them on a warm process pool.
+
+    Every worker process builds its model once with ``worker_factory`` (a
+    module-level, picklable callable) through the pool initializer; ``start``
+    forces all workers up so model loading is never billed to a request.
+
+    At most ``max_pending_shards`` shards are submitted or waiting to be
+    consumed across all callers. Submission blocks while the workers are
+    saturated, so a huge batch is never pickled into the pool's call queue in
+    one go and a slow consumer holds back the producers.
+    """
+
+    def __init__(self, worker_factory: Callable[[], Any], max_workers: Optional[int] = None,
+                 max_pending_shards: Optional[int] = None):
+        self.worker_factory = worker_factory
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending_shards = max_pending_shards or 2 * self.max_workers
+        if self.max_pending_shards < 1:
+            raise ValueError("max_pending_shards must be positive")
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"shards": 0, "failed_shards": 0, "items": 0, "saturated_waits": 0, "retries": 0}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=init_shard_worker,
+                initargs=(self.worker_factory,)
+            )
+        return self._pool
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; the pool outlives it
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending_shards)
+            self._slots_loop = loop
+        return self._slots
+
+    async def start(self) -> List[int]:
+        """Start every worker process and wait until its model is loaded."""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        # Starting and stopping the manager's server process blocks; keep it off the loop
+        manager = await loop.run_in_executor(None, multiprocessing.Manager)
+        try:
+            # Each call holds its process at the barrier, so every worker takes one
+            barrier = await loop.run_in_executor(None, manager.Barrier, self.max_workers)
+            pids = await asyncio.gather(*[
+                loop.run_in_executor(pool, _worker_ready, barrier) for _ in range(self.max_workers)
+            ])
+        finally:
+            await loop.run_in_executor(None, manager.shutdown)
+        logger.info(f"ShardedExecutor started {len(set(pids))} warm worker processes")
+        return sorted(pids)
+
+    async def _run_shard(self, pool: ProcessPoolExecutor, method: str, index: int, shard: Sequence[Any],
+                         kwargs: Dict[str, Any], timeout: Optional[float], retries: int,
+                         retry_delay: float) -> Any:
+        """Run one shard, giving each attempt ``timeout`` seconds and retrying failures."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(retries + 1):
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(pool, run_shard, method, shard, kwargs), timeout
+                )
+            except Exception as e:
+                if attempt >= retries:
+                    raise
+                self.stats["retries"] += 1
+                logger.warning(f"Shard {index} failed, retrying (attempt {attempt + 1}): {e!r}")
+                await asyncio.sleep(retry_delay * (attempt + 1))
+
+    async def map_shards(self, method: str, items: Sequence[Any], shard_size: int,
+                         timeout: Optional[float] = None, retries: int = 0, retry_delay: float = 1.0,
+                         **kwargs) -> AsyncIterator[ShardResult]:
+        """Run ``worker.method(shard, **kwargs)`` over ``items`` and stream results.
+
+        Yields one ``ShardResult`` per shard in completion order; ``offset``
+        places its results in the input. Failed shards are yielded with
+        ``error`` set instead of raising, so the other shards still complete.
+        Each attempt at a shard gets ``timeout`` seconds, and a failed or timed
+        out shard is resubmitted up to ``retries`` times with a growing delay.
+        A timed out call cannot be interrupted, so it keeps its worker busy
+        until it returns.
+        """
+        if shard_size <= 0:
+            raise ValueError("shard_size must be positive")
+        pool = self._get_pool()
+        slots = self._get_slots()
+        result_queue: asyncio.Queue = asyncio.Queue()
+        offsets = range(0, len(items), shard_size)
+        submitted: List[asyncio.Future] = []
+        closed = False
+
+        def on_done(index: int, offset: int, size: int, future: asyncio.Future):
+            if closed:
+                slots.release()
+            elif future.cancelled():
+                result_queue.put_nowait(ShardResult(index, offset, size, error=asyncio.CancelledError()))
+            elif future.exception() is not None:
+                result_queue.put_nowait(ShardResult(index, offset, size, error=future.exception()))
+            else:
+                result_queue.put_nowait(ShardResult(index, offset, size, results=future.result()))
+
+        async def feed():
+            for index, offset in enumerate(offsets):
+                if slots.locked():
+                    self.stats["saturated_waits"] += 1
+                await slots.acquire()
+                shard = items[offset:offset + shard_size]
+                # A broken pool refuses new work; the error is reported against the shard
+                future = asyncio.ensure_future(
+                    self._run_shard(pool, method, index, shard, kwargs, timeout, retries, retry_delay)
+                )
+                submitted.append(future)
+                future.add_done_callback(
+                    lambda done, i=index, o=offset, n=len(shard): on_done(i, o, n, done)
+                )
+
+        feeder = asyncio.create_task(feed())
+        try:
+            for _ in offsets:
+                shard = await result_queue.get()
+                # The slot is held until the consumer takes the shard
+                slots.release()
+                self.stats["shards"] += 1
+                self.stats["items"] += shard.size
+                if not shard.ok:
+                    self.stats["failed_shards"] += 1
+                    logger.error(f"Shard {shard.index} (offset {shard.offset}) failed: {shard.error!r}")
+                yield shard
+        finally:
+            # Abandoned early: stop submitting and hand back every slot still held
+            closed = True
+            feeder.cancel()
+            for future in submitted:
+                future.cancel()
+            while not result_queue.empty():
+                result_queue.get_nowait()
+                slots.release()
+
+    async def map(self, method: str, items: Sequence[Any], shard_size: int, timeout: Optional[float] = None,
+                  retries: int = 0, retry_delay: float = 1.0, **kwargs) -> List[ShardResult]:
+        """Run every shard and return the results in input order."""
+        shards = [
+            shard async for shard in self.map_shards(
+                method, items, shard_size, timeout=timeout, retries=retries, retry_delay=retry_delay, **kwargs
+            )
+        ]
+        return sorted(shards, key=lambda shard: shard.index)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
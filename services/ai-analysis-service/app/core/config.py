@@ -48,6 +48,8 @@ class Settings(BaseSettings):
     cache_ttl: int = Field(default=3600, env="CACHE_TTL")  # 1 hour
     max_batch_size: int = Field(default=100, env="MAX_BATCH_SIZE")
     max_coordination_group_size: int = Field(default=50, env="MAX_COORDINATION_GROUP_SIZE")
+    max_bot_batch_size: int = Field(default=10000, env="MAX_BOT_BATCH_SIZE")
+    bot_batch_chunk_size: int = Field(default=1000, env="BOT_BATCH_CHUNK_SIZE")
     
     # Logging configuration
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -67,6 +67,9 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down AI Analysis Service...")
     
     try:
+        if bot_detector:
+            await bot_detector.shutdown()
+        
         await shutdown_governance_service()
         logger.info("AI Analysis Service shutdown complete")
         
@@ -263,6 +266,34 @@ async def analyze_bot_behavior(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/v1/analyze/bot-detection/batch", response_model=List[BotDetectionResponse])
+async def analyze_bot_behavior_batch(
+    user_group: List[Dict[str, Any]],
+    platform: Optional[str] = None,
+    include_network_analysis: bool = True
+):
+    """Analyze many users for bot indicators in one batch."""
+    try:
+        if not bot_detector:
+            raise HTTPException(status_code=503, detail="Bot detector not available")
+        
+        if len(user_group) > settings.max_bot_batch_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Batch size {len(user_group)} exceeds maximum {settings.max_bot_batch_size}"
+            )
+        
+        return await bot_detector.analyze_users_batch(
+            user_group=user_group,
+            platform=platform,
+            include_network_analysis=include_network_analysis
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in batch bot detection: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/v1/analyze/coordinated-behavior")
 async def analyze_coordinated_behavior(
     user_group: List[Dict[str, Any]],
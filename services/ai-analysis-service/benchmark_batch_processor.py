@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Benchmark process-sharded batch jobs from 1 to N worker processes.
+
+Runs the two CPU-bound batch jobs through ``ShardedExecutor``, the executor
+``BatchProcessor`` uses when ``use_multiprocessing`` is set:
+
+* sentiment: a hashed n-gram text classifier trained in each worker's
+  initializer, scoring shards of ``--shard-size`` texts.
+* bot: ``score_users`` with the models ``BotDetector`` trains, scoring shards
+  of ``--user-shard-size`` users.
+
+Workers are started and their models loaded before timing, so the numbers are
+steady-state throughput. Speedup is relative to one worker; efficiency is
+speedup divided by workers and stays near 1.0 while the job scales linearly.
+Scaling stops at the number of CPUs available to this process.
+
+Usage:
+    python benchmark_batch_processor.py
+    python benchmark_batch_processor.py --workers 1 2 4 8 --texts 50000 --users 4000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.analysis.bot_features import score_users
+from app.analysis.sharded_executor import ShardedExecutor
+from benchmark_bot_features import make_users, train_models
+
+PRO = "proud great strong progress unity develop celebrate win support growth".split()
+ANTI = "corrupt fail weak crisis protest shame collapse attack fraud threat".split()
+NEUTRAL = "today weather market report meeting update city train schedule news".split()
+
+
+def make_texts(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        words = (PRO, ANTI, NEUTRAL)[i % 3]
+        texts.append(' '.join(rng.choice(words if rng.random() < 0.6 else NEUTRAL)
+                              for _ in range(rng.randint(8, 40))))
+    return texts
+
+
+class SentimentWorker:
+    """Text classifier built once per worker process."""
+
+    def __init__(self):
+        self.vectorizer = HashingVectorizer(ngram_range=(1, 3), n_features=2 ** 18, alternate_sign=False)
+        texts = make_texts(3000, seed=7)
+        labels = [i % 3 for i in range(len(texts))]
+        self.classifier = SGDClassifier(loss='log_loss', random_state=42).fit(self.vectorizer.transform(texts), labels)
+
+    def batch_analyze_sentiment(self, texts: List[str]) -> List[Dict[str, Any]]:
+        probabilities = self.classifier.predict_proba(self.vectorizer.transform(texts))
+        labels = np.argmax(probabilities, axis=1)
+        return [{'label': int(label), 'confidence': float(row[label])} for label, row in zip(labels, probabilities)]
+
+
+class BotWorker:
+    """Bot scoring models built once per worker process."""
+
+    def __init__(self):
+        self.models = train_models()
+
+    def score(self, users: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        return score_users(users, models=self.models)
+
+
+async def measure(factory, method: str, items: List[Any], shard_size: int, workers: int,
+                  rounds: int) -> Dict[str, float]:
+    executor = ShardedExecutor(factory, max_workers=workers)
+    try:
+        start = time.perf_counter()
+        await executor.start()
+        warmup = time.perf_counter() - start
+
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            shards = [shard async for shard in executor.map_shards(method, items, shard_size)]
+            best = min(best, time.perf_counter() - start)
+            assert all(shard.ok for shard in shards) and sum(shard.size for shard in shards) == len(items)
+        return {'warmup': warmup, 'seconds': best, 'saturated_waits': executor.stats['saturated_waits']}
+    finally:
+        executor.shutdown()
+
+
+def report(job: str, unit: str, count: int, runs: Dict[int, Dict[str, float]]):
+    base = runs[min(runs)]['seconds']
+    for workers, run in runs.items():
+        speedup = base / run['seconds']
+        print(f"{job:>10} {workers:>8} {count / run['seconds']:>12.0f} {unit:<6} {speedup:>8.2f}x "
+              f"{speedup / workers * min(runs):>11.2f} {run['warmup'] * 1000:>10.0f}", flush=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--texts', type=int, default=20000)
+    parser.add_argument('--shard-size', type=int, default=256)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--posts-per-user', type=int, default=20)
+    parser.add_argument('--user-shard-size', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    worker_counts = sorted(set(args.workers))
+
+    print(f"CPUs available: {len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()}")
+    print(f"{'job':>10} {'workers':>8} {'throughput':>12} {'':<6} {'speedup':>9} {'efficiency':>11} {'warmup ms':>10}")
+
+    texts = make_texts(args.texts, args.seed)
+    runs = {}
+    for workers in worker_counts:
+        runs[workers] = await measure(SentimentWorker, 'batch_analyze_sentiment', texts,
+                                      args.shard_size, workers, args.rounds)
+    report('sentiment', 'text/s', len(texts), runs)
+
+    users = make_users(args.users, args.posts_per_user, args.seed)
+    runs = {}
+    for workers in worker_counts:
+        runs[workers] = await measure(BotWorker, 'score', users, args.user_shard_size, workers, args.rounds)
+    report('bot', 'user/s', len(users), runs)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark bot detection scoring: one user at a time vs vectorized batches.
+
+Generates synthetic users with a mix of scheduled (bot-like) and irregular posting
+and scores them with the same models ``BotDetector`` trains on startup:
+
+* row: ``score_users`` called with a single user, the per-request cost of
+  ``analyze_user_behavior`` (feature extraction, scaler, classifier and anomaly
+  detector calls for every user).
+* batch: chunks of ``--chunk-size`` users scored in a process pool, as
+  ``BotDetector.analyze_users_batch`` does.
+
+Reports amortized per-user latency and throughput for each batch size.
+
+Usage:
+    python benchmark_bot_features.py
+    python benchmark_bot_features.py --users 100 1000 10000 --chunk-size 1000 --workers 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.analysis.bot_features import ScoringModels, init_scoring_worker, score_users
+
+WORDS = "vote rally farmers policy today news great thanks please yes no buy now #india @friend".split()
+
+
+def train_models() -> ScoringModels:
+    """Models trained like ``BotDetector._train_with_synthetic_data``."""
+    np.random.seed(42)
+    X = np.vstack([np.random.normal(0, 1, (700, 15)), np.random.normal(2, 1.5, (300, 15))])
+    y = np.hstack([np.zeros(700), np.ones(300)])
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    classifier = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42, class_weight='balanced')
+    classifier.fit(X_scaled, y)
+    anomaly_detector = IsolationForest(contamination=0.1, random_state=42).fit(X_scaled)
+    return ScoringModels(classifier, scaler, anomaly_detector)
+
+
+def make_users(count: int, posts_per_user: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime(2024, 3, 1)
+    users = []
+    for i in range(count):
+        bot = i % 4 == 0
+        timestamp = start + timedelta(minutes=rng.randint(0, 10000))
+        posts = []
+        for _ in range(posts_per_user):
+            timestamp += timedelta(seconds=3600 if bot else rng.randint(30, 20000))
+            posts.append({
+                'timestamp': timestamp.isoformat(),
+                'content': "Buy now" if bot else ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 12))),
+                'hashtags': ['deal'] if bot else [],
+                'mentions': ['friend'] if rng.random() < 0.2 else [],
+                'metrics': {'likes': rng.randint(0, 50), 'shares': rng.randint(0, 5), 'comments': rng.randint(0, 5)}
+            })
+        users.append({
+            'user_id': f"user_{i}",
+            'account_created': (start - timedelta(days=rng.randint(1, 2000))).isoformat(),
+            'followers_count': rng.randint(0, 5000),
+            'following_count': rng.randint(0, 5000),
+            'posts': posts
+        })
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--posts-per-user', type=int, default=20)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--row-max-users', type=int, default=1000,
+                        help="time the row path on at most this many users and extrapolate")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    models = train_models()
+    print(f"{'users':>7} {'row ms/user':>12} {'batch ms/user':>14} {'batch users/s':>14} {'speedup':>8}")
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_scoring_worker, initargs=(models,)) as pool:
+        # Warm up the workers so pool start-up is not billed to the first size
+        list(pool.map(score_users, [make_users(1, 2, args.seed)] * args.workers))
+
+        for count in args.users:
+            users = make_users(count, args.posts_per_user, args.seed)
+
+            row_users = users[:args.row_max_users]
+            start = time.perf_counter()
+            for user in row_users:
+                score_users([user], models=models)
+            row_ms = (time.perf_counter() - start) * 1000 / len(row_users)
+
+            start = time.perf_counter()
+            chunks = [users[i:i + args.chunk_size] for i in range(0, count, args.chunk_size)]
+            scored = sum(len(result['bot_probability']) for result in pool.map(score_users, chunks))
+            batch_seconds = time.perf_counter() - start
+            assert scored == count
+            batch_ms = batch_seconds * 1000 / count
+
+            print(f"{count:>7} {row_ms:>12.3f} {batch_ms:>14.3f} {count / batch_seconds:>14.0f} "
+                  f"{row_ms / batch_ms:>7.0f}x", flush=True)
+
+
+if __name__ == '__main__':
+    main()
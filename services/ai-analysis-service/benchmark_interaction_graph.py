@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Benchmark interaction graph construction: pairwise legacy vs embed-once builder.
+
+Reports wall time and peak RSS growth at several user counts, each run in a forked child
+process. The legacy path is the pre-vectorization algorithm (re-encode both users' posts
+for every user pair). It is only run up to ``--legacy-max-users`` because it grows
+quadratically in encoder calls; larger sizes report an estimate extrapolated from the
+measured per-pair cost.
+
+Usage:
+    python benchmark_interaction_graph.py --users 300 1000 10000 50000
+    python benchmark_interaction_graph.py --model all-MiniLM-L6-v2
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+import numpy as np
+import networkx as nx
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.analysis.interaction_graph import InteractionGraphBuilder, GraphBuildConfig
+
+
+class HashingEncoder:
+    """Fast deterministic encoder used when no sentence-transformer model is requested."""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+        self._token_cache: Dict[str, np.ndarray] = {}
+
+    def _token_vector(self, token: str) -> np.ndarray:
+        vector = self._token_cache.get(token)
+        if vector is None:
+            seed = int.from_bytes(hashlib.md5(token.encode()).digest()[:4], 'little')
+            vector = np.random.default_rng(seed).standard_normal(self.dimensions).astype(np.float32)
+            self._token_cache[token] = vector
+        return vector
+
+    def encode(self, texts, batch_size=32):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.split():
+                vectors[row] += self._token_vector(token)
+        return vectors
+
+
+def generate_posts(num_users: int, seed: int = 13) -> List[Dict[str, Any]]:
+    """Generate organic posts over 24 hours plus bursty coordinated clusters."""
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    scripts = [" ".join(rng.choice(vocabulary, 12)) for _ in range(max(1, num_users // 200))]
+    base = datetime(2024, 1, 1)
+    posts = []
+
+    for user in range(num_users):
+        coordinated = user % 10 == 0
+        for k in range(int(rng.integers(1, 4))):
+            if coordinated:
+                script = scripts[(user // 10) % len(scripts)]
+                content = f"{script} {rng.choice(vocabulary)}"
+                minute = ((user // 10) % len(scripts)) * 1440 / len(scripts) + rng.uniform(0, 15)
+            else:
+                content = " ".join(rng.choice(vocabulary, 10))
+                minute = rng.uniform(0, 1440)
+            posts.append({
+                'post_id': f"{user}_{k}",
+                'user_id': f"user{user}",
+                'content': content,
+                'timestamp': (base + timedelta(minutes=float(minute))).isoformat()
+            })
+    return posts
+
+
+def legacy_build_interaction_network(posts_data: List[Dict[str, Any]], encoder) -> nx.Graph:
+    """Pairwise implementation previously inlined in CampaignDetector."""
+    graph = nx.Graph()
+    user_posts: Dict[str, List[Dict[str, Any]]] = {}
+    for post in posts_data:
+        if post.get('user_id'):
+            user_posts.setdefault(post['user_id'], []).append(post)
+    graph.add_nodes_from(user_posts)
+
+    users = list(user_posts)
+    for i in range(len(users)):
+        for j in range(i + 1, len(users)):
+            posts1, posts2 = user_posts[users[i]], user_posts[users[j]]
+            contents1 = [p.get('content', '') for p in posts1]
+            contents2 = [p.get('content', '') for p in posts2]
+            embeddings = encoder.encode(contents1 + contents2)
+            similarities = [
+                cosine_similarity([embeddings[a]], [embeddings[b]])[0][0]
+                for a in range(len(contents1))
+                for b in range(len(contents1), len(contents1) + len(contents2))
+            ]
+            content_similarity = np.mean(similarities)
+
+            times1 = [datetime.fromisoformat(p['timestamp']) for p in posts1]
+            times2 = [datetime.fromisoformat(p['timestamp']) for p in posts2]
+            min_gap = min(abs((t1 - t2).total_seconds()) / 60 for t1 in times1 for t2 in times2)
+            proximity = 1.0 - min_gap / 60 if min_gap <= 60 else 0.0
+
+            strength = min(1.0, content_similarity * 0.7 + proximity * 0.3)
+            if strength > 0.3:
+                graph.add_edge(users[i], users[j], weight=strength)
+    return graph
+
+
+def _measure_child(func, results) -> None:
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    graph = func()
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((elapsed, (peak - baseline) / 1024, graph.number_of_edges(), graph.number_of_nodes()))
+
+
+def measure(label: str, func) -> Dict[str, Any]:
+    """Run ``func`` in a forked child and capture wall time and peak RSS growth (MB)."""
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    process = context.Process(target=_measure_child, args=(func, results))
+    process.start()
+    elapsed, peak_mb, edges, nodes = results.get()
+    process.join()
+    return {'label': label, 'seconds': elapsed, 'peak_mb': peak_mb, 'edges': edges, 'nodes': nodes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[300, 1000, 10000, 50000])
+    parser.add_argument('--legacy-max-users', type=int, default=300)
+    parser.add_argument('--strategies', nargs='+', default=['auto'], choices=['auto', 'exact', 'lsh'])
+    parser.add_argument('--model', default=None, help="SentenceTransformer model name (default: hashing encoder)")
+    args = parser.parse_args()
+
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        encoder = SentenceTransformer(args.model)
+    else:
+        encoder = HashingEncoder()
+
+    print(f"{'users':>8} {'posts':>8} {'implementation':>16} {'seconds':>10} {'peak MB':>10} {'edges':>10}")
+    legacy_seconds_per_pair = None
+    for num_users in args.users:
+        posts = generate_posts(num_users)
+        runs = []
+        for strategy in args.strategies:
+            builder = InteractionGraphBuilder(encoder, GraphBuildConfig(candidate_strategy=strategy))
+            resolved = builder._resolve_strategy(num_users)
+            runs.append(measure(f"builder:{resolved}", lambda: builder.build(posts)))
+
+        pairs = num_users * (num_users - 1) / 2
+        if num_users <= args.legacy_max_users:
+            legacy = measure("legacy", lambda: legacy_build_interaction_network(posts, encoder))
+            legacy_seconds_per_pair = legacy['seconds'] / pairs
+            runs.append(legacy)
+        elif legacy_seconds_per_pair is not None:
+            runs.append({
+                'label': "legacy (est.)",
+                'seconds': legacy_seconds_per_pair * pairs,
+                'peak_mb': float('nan'),
+                'edges': '-'
+            })
+
+        for run in runs:
+            print(f"{num_users:>8} {len(posts):>8} {run['label']:>16} {run['seconds']:>10.2f} "
+                  f"{run['peak_mb']:>10.1f} {run['edges']:>10}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark campaign network metrics: legacy networkx vs exact vs sampled calculator.
+
+Builds Barabasi-Albert (scale-free) graphs at several node counts and times three
+implementations:
+
+* legacy: the networkx calls ``CampaignDetector._calculate_network_metrics`` used to
+  make (exact betweenness, closeness, diameter, greedy modularity). Only run up to
+  ``--legacy-max-nodes``; larger sizes report an O(V*E) extrapolation.
+* exact: ``NetworkMetricsCalculator`` with ``strategy="exact"`` and no time budget,
+  used as the reference for errors up to ``--exact-max-nodes``.
+* approximate: the sampled calculator with the default configuration.
+
+Usage:
+    python benchmark_network_metrics.py
+    python benchmark_network_metrics.py --nodes 1000 10000 100000 --legacy-max-nodes 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+import networkx as nx
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.analysis.network_metrics import NetworkMetricsCalculator, NetworkMetricsConfig
+
+
+def legacy_metrics(graph: nx.Graph) -> Dict[str, Any]:
+    """The metric computation as it was before sampling."""
+    largest = graph.subgraph(max(nx.connected_components(graph), key=len))
+    betweenness = nx.betweenness_centrality(graph)
+    closeness = nx.closeness_centrality(graph)
+    communities = list(nx.community.greedy_modularity_communities(graph))
+    return {
+        'diameter': nx.diameter(largest),
+        'average_path_length': nx.average_shortest_path_length(largest),
+        'average_clustering': nx.average_clustering(graph),
+        'transitivity': nx.transitivity(graph),
+        'max_betweenness_centrality': max(betweenness.values()),
+        'max_closeness_centrality': max(closeness.values()),
+        'modularity': nx.community.modularity(graph, communities)
+    }
+
+
+def timed(function, graph):
+    start = time.perf_counter()
+    result = function(graph)
+    return result, time.perf_counter() - start
+
+
+def relative_error(approximate: float, exact: float) -> float:
+    return abs(approximate - exact) / exact if exact else abs(approximate)
+
+
+def format_seconds(seconds: Optional[float], estimated: bool = False) -> str:
+    if seconds is None:
+        return "-"
+    return f"{'~' if estimated else ''}{seconds:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--edges-per-node', type=int, default=3, help="Barabasi-Albert attachment count")
+    parser.add_argument('--legacy-max-nodes', type=int, default=5000)
+    parser.add_argument('--exact-max-nodes', type=int, default=10000)
+    parser.add_argument('--time-budget', type=float, default=5.0, help="per metric group, approximate run")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    exact_calculator = NetworkMetricsCalculator(NetworkMetricsConfig(strategy="exact", time_budget_seconds=1e9))
+    approximate_calculator = NetworkMetricsCalculator(NetworkMetricsConfig(
+        strategy="approximate", time_budget_seconds=args.time_budget, seed=args.seed
+    ))
+    legacy_rate = None
+
+    print(f"{'nodes':>7} {'edges':>7} {'legacy s':>9} {'exact s':>8} {'approx s':>9} {'speedup':>8} "
+          f"{'betw err':>9} {'top5':>5} {'close err':>10} {'apl err':>8} {'diam':>6} "
+          f"{'clust err':>10} {'modularity':>11}")
+    for nodes in args.nodes:
+        graph = nx.barabasi_albert_graph(nodes, args.edges_per_node, seed=args.seed)
+        edges = graph.number_of_edges()
+
+        legacy_seconds = None
+        if nodes <= args.legacy_max_nodes:
+            _, legacy_seconds = timed(legacy_metrics, graph)
+            legacy_rate = legacy_seconds / (nodes * edges)
+        estimated = legacy_seconds is None and legacy_rate is not None
+        if estimated:
+            legacy_seconds = legacy_rate * nodes * edges
+
+        exact, exact_seconds = None, None
+        if nodes <= args.exact_max_nodes:
+            exact, exact_seconds = timed(exact_calculator.calculate, graph)
+        approximate, approximate_seconds = timed(approximate_calculator.calculate, graph)
+
+        speedup = f"{legacy_seconds / approximate_seconds:.0f}x" if legacy_seconds else "-"
+        row = (f"{nodes:>7} {edges:>7} {format_seconds(legacy_seconds, estimated):>9} "
+               f"{format_seconds(exact_seconds):>8} {approximate_seconds:>9.2f} {speedup:>8}")
+        if exact:
+            top = len(set(approximate['top_betweenness_nodes']) & set(exact['top_betweenness_nodes']))
+            row += (
+                f" {relative_error(approximate['max_betweenness_centrality'], exact['max_betweenness_centrality']):>9.1%}"
+                f" {top:>3}/5"
+                f" {relative_error(approximate['max_closeness_centrality'], exact['max_closeness_centrality']):>10.1%}"
+                f" {relative_error(approximate['average_path_length'], exact['average_path_length']):>8.1%}"
+                f" {approximate['diameter']:>3}/{exact['diameter']:<2}"
+                f" {abs(approximate['average_clustering'] - exact['average_clustering']):>10.4f}"
+                f" {approximate['modularity']:>5.2f}/{exact['modularity']:<5.2f}"
+            )
+        else:
+            row += (f" {'-':>9} {'-':>5} {'-':>10} {'-':>8} {approximate['diameter']:>6}"
+                    f" {'-':>10} {approximate['modularity']:>11.2f}")
+        print(row, flush=True)
+        print(f"{'':>7} approximate methods: {approximate['computation']['methods']}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
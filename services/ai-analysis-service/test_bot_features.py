@@ -0,0 +1,148 @@
+"""Tests for vectorized bot detection features and batch scoring."""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.analysis.bot_features import (
+    MODEL_FEATURES, ScoringModels, detect_risk_indicators, extract_feature_frame,
+    feature_matrix, feature_records, init_scoring_worker, score_users
+)
+
+NOW = datetime(2024, 3, 10)
+
+
+def scheduled_bot():
+    start = datetime(2024, 3, 1, 9)
+    return {
+        'user_id': 'bot',
+        'account_created': '2024-03-01T00:00:00',
+        'followers_count': 10,
+        'following_count': 1000,
+        'posts': [
+            {
+                'timestamp': (start + timedelta(hours=i)).isoformat(),
+                'content': 'Buy now',
+                'hashtags': ['deal'],
+                'metrics': {'likes': 1, 'shares': 0, 'comments': 0}
+            }
+            for i in range(6)
+        ]
+    }
+
+
+def conversational_human():
+    start = datetime(2024, 3, 1, 8)
+    gaps = [0, 37, 250, 1300, 1345, 4000]
+    contents = ['Thanks for sharing', 'No, I disagree', 'Lovely morning', 'Yes please', 'Sorry, late reply', 'Dinner']
+    return {
+        'user_id': 'human',
+        'account_created': '2020-01-01T00:00:00Z',
+        'followers_count': 300,
+        'following_count': 280,
+        'posts': [
+            {
+                'timestamp': (start + timedelta(minutes=gap)).isoformat() + 'Z',
+                'content': content,
+                'parent_post_id': 'p' if i % 2 else None,
+                'mentions': ['friend'] if i % 3 == 0 else [],
+                'metrics': {'likes': 5 * i, 'shares': i, 'comments': 2}
+            }
+            for i, (gap, content) in enumerate(zip(gaps, contents))
+        ]
+    }
+
+
+@pytest.fixture(scope="module")
+def models():
+    rng = np.random.RandomState(42)
+    X = np.vstack([rng.normal(0, 1, (700, 15)), rng.normal(2, 1.5, (300, 15))])
+    y = np.hstack([np.zeros(700), np.ones(300)])
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    classifier = RandomForestClassifier(n_estimators=20, max_depth=10, random_state=42, class_weight='balanced')
+    classifier.fit(X_scaled, y)
+    anomaly_detector = IsolationForest(contamination=0.1, random_state=42).fit(X_scaled)
+    return ScoringModels(classifier, scaler, anomaly_detector)
+
+
+def test_feature_frame_values():
+    frame = extract_feature_frame([scheduled_bot(), conversational_human()], now=NOW)
+    bot, human = feature_records(frame)
+
+    assert bot['posting_time_variance'] < 0.1
+    assert bot['regular_interval_score'] == 1.0
+    assert bot['account_age_days'] == 9
+    assert bot['avg_posts_per_day'] == 6.0
+    assert bot['duplicate_content_ratio'] == pytest.approx(5 / 6)
+    assert bot['hashtag_usage_frequency'] == 1.0
+    assert bot['follower_following_ratio'] == pytest.approx(10 / 1000)
+
+    assert human['account_age_days'] == (NOW - datetime(2020, 1, 1)).days
+    assert human['duplicate_content_ratio'] == 0
+    assert human['unique_word_ratio'] == 1.0
+    assert human['mention_usage_frequency'] == pytest.approx(2 / 6)
+    assert human['regular_interval_score'] == 0.0
+
+
+def test_missing_data_uses_defaults():
+    frame = extract_feature_frame([{'user_id': 'empty'}, {'user_id': 'one', 'posts': [{'content': 'hi'}]}], now=NOW)
+    empty, one = feature_records(frame)
+
+    # Users without enough activity get the scalar extractors' defaults
+    assert empty['account_age_days'] == one['account_age_days'] == 365.0
+    assert empty['posting_time_variance'] == one['posting_time_variance'] == 0.5
+    assert empty['avg_content_length'] == 100.0 and one['avg_content_length'] == 2.0
+    assert empty['network_clustering_coefficient'] == 0.2
+
+    matrix = feature_matrix(frame)
+    assert matrix.shape == (2, len(MODEL_FEATURES))
+    assert not np.isnan(matrix).any()
+
+
+def test_network_features_are_optional():
+    frame = extract_feature_frame([scheduled_bot()], include_network_analysis=False, now=NOW)
+    assert 'network_clustering_coefficient' not in frame
+    assert feature_matrix(frame)[0, MODEL_FEATURES.index('network_clustering_coefficient')] == 0.0
+
+
+def test_risk_indicators():
+    frame = extract_feature_frame([scheduled_bot(), conversational_human()], now=NOW)
+    frame.loc[0, 'avg_posts_per_day'] = 60
+    bot, human = detect_risk_indicators(frame)
+
+    assert bot[:2] == ['extremely_high_posting_frequency', 'identical_content_repetition']
+    assert 'suspicious_account_age' in bot and 'automated_response_patterns' in bot
+    assert 'identical_content_repetition' not in human and 'suspicious_account_age' not in human
+
+
+def test_batch_scores_match_single_user_scores(models):
+    users = [scheduled_bot(), conversational_human(), {'user_id': 'empty'}] * 5
+    batch = score_users(users, models=models)
+
+    assert len(batch['bot_probability']) == len(users)
+    for i, user in enumerate(users):
+        single = score_users([user], models=models)
+        assert batch['bot_probability'][i] == pytest.approx(single['bot_probability'][0])
+        assert batch['confidence'][i] == pytest.approx(single['confidence'][0])
+        assert batch['risk_indicators'][i] == single['risk_indicators'][0]
+        assert 0.1 <= batch['confidence'][i] <= 0.95
+
+
+def test_worker_models(models):
+    init_scoring_worker(None)
+    with pytest.raises(RuntimeError):
+        score_users([scheduled_bot()])
+
+    init_scoring_worker(models)
+    try:
+        assert score_users([scheduled_bot()]) == score_users([scheduled_bot()], models=models)
+    finally:
+        init_scoring_worker(None)
@@ -0,0 +1,133 @@
+"""Tests for vectorized interaction graph construction."""
+
+import hashlib
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.analysis.interaction_graph import InteractionGraphBuilder, GraphBuildConfig
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words encoder standing in for SentenceTransformer."""
+
+    def __init__(self, dimensions: int = 64):
+        self.dimensions = dimensions
+        self.calls = 0
+
+    def encode(self, texts, batch_size=32):
+        self.calls += 1
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                digest = hashlib.md5(token.encode()).digest()
+                vectors[row, digest[0] % self.dimensions] += 1.0 if digest[1] % 2 else -1.0
+        return vectors
+
+
+def reference_strength(encoder, posts1, posts2):
+    """Pairwise interaction strength as computed before vectorization."""
+    emb = encoder.encode([p['content'] for p in posts1] + [p['content'] for p in posts2])
+    norms = np.linalg.norm(emb, axis=1, keepdims=True)
+    emb = emb / np.where(norms == 0, 1.0, norms)
+    content = float(np.mean(emb[:len(posts1)] @ emb[len(posts1):].T))
+
+    gaps = [
+        abs((datetime.fromisoformat(a['timestamp']) - datetime.fromisoformat(b['timestamp'])).total_seconds()) / 60
+        for a in posts1 for b in posts2
+    ]
+    proximity = 1.0 - min(gaps) / 60 if min(gaps) <= 60 else 0.0
+    return min(1.0, content * 0.7 + proximity * 0.3)
+
+
+def make_posts(num_users: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    templates = [
+        "stop the fake news about the border now",
+        "support our farmers and share this message",
+        "cricket match tonight was amazing",
+        "new phone launch event in the city",
+    ]
+    base = datetime(2024, 1, 1)
+    posts = []
+    for user in range(num_users):
+        for k in range(int(rng.integers(1, 4))):
+            words = templates[int(rng.integers(len(templates)))].split()
+            words.append(f"tag{int(rng.integers(20))}")
+            posts.append({
+                'post_id': f"p{user}_{k}",
+                'user_id': f"user{user}",
+                'content': " ".join(words),
+                'timestamp': (base + timedelta(minutes=float(rng.uniform(0, 600)))).isoformat()
+            })
+    return posts
+
+
+class TestInteractionGraphBuilder:
+    """Test the embed-once interaction graph builder."""
+
+    def test_exact_matches_pairwise_reference(self):
+        posts = make_posts(40)
+        encoder = HashingEncoder()
+        builder = InteractionGraphBuilder(
+            encoder, GraphBuildConfig(candidate_strategy="exact", block_elements=97)
+        )
+        graph = builder.build(posts)
+
+        by_user = {}
+        for post in posts:
+            by_user.setdefault(post['user_id'], []).append(post)
+        users = list(by_user)
+
+        expected = {}
+        for i in range(len(users)):
+            for j in range(i + 1, len(users)):
+                strength = reference_strength(encoder, by_user[users[i]], by_user[users[j]])
+                if strength > 0.3:
+                    expected[frozenset((users[i], users[j]))] = strength
+
+        actual = {frozenset(edge[:2]): edge[2]['weight'] for edge in graph.edges(data=True)}
+        assert set(actual) == set(expected)
+        for key, weight in expected.items():
+            assert actual[key] == pytest.approx(weight, abs=1e-5)
+
+    def test_encodes_posts_once(self):
+        encoder = HashingEncoder()
+        InteractionGraphBuilder(encoder).build(make_posts(30))
+        assert encoder.calls == 1
+
+    def test_lsh_finds_near_duplicate_cluster(self):
+        posts = make_posts(200)
+        for user in range(10):
+            posts.append({
+                'user_id': f"bot{user}",
+                'content': "coordinated message share before it is deleted",
+                'timestamp': datetime(2024, 1, 1, 5, user).isoformat()
+            })
+        builder = InteractionGraphBuilder(HashingEncoder(), GraphBuildConfig(candidate_strategy="lsh"))
+        graph = builder.build(posts)
+
+        bots = [f"bot{user}" for user in range(10)]
+        assert graph.subgraph(bots).number_of_edges() == 45
+        assert graph[bots[0]][bots[1]]['weight'] == pytest.approx(0.7 + 0.3 * (1 - 1 / 60), abs=1e-5)
+        assert builder.last_build_stats['strategy'] == "lsh"
+
+    def test_missing_timestamps_and_single_user(self):
+        builder = InteractionGraphBuilder(HashingEncoder())
+        graph = builder.build([{'user_id': 'a', 'content': 'hello'}, {'content': 'orphan'}])
+        assert list(graph.nodes()) == ['a']
+
+        graph = builder.build([
+            {'user_id': 'a', 'content': 'same words here'},
+            {'user_id': 'b', 'content': 'same words here', 'timestamp': 'not-a-date'},
+        ])
+        assert graph['a']['b']['weight'] == pytest.approx(0.7, abs=1e-5)
+
+    def test_invalid_config(self):
+        with pytest.raises(ValueError):
+            GraphBuildConfig(candidate_strategy="brute").validate()
@@ -0,0 +1,111 @@
+"""Tests for exact and sampled campaign network metrics."""
+
+import os
+import sys
+
+import networkx as nx
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.analysis.network_metrics import NetworkMetricsCalculator, NetworkMetricsConfig
+
+
+def disconnected_graph():
+    graph = nx.barabasi_albert_graph(300, 2, seed=1)
+    graph.add_edges_from([("a", "b"), ("b", "c")])
+    graph.add_node("isolated")
+    return graph
+
+
+def test_exact_metrics_match_networkx():
+    graph = disconnected_graph()
+    metrics = NetworkMetricsCalculator(NetworkMetricsConfig(strategy="exact")).calculate(graph)
+
+    betweenness = nx.betweenness_centrality(graph)
+    closeness = nx.closeness_centrality(graph)
+    largest = graph.subgraph(max(nx.connected_components(graph), key=len))
+    assert metrics['computation']['mode'] == "exact"
+    assert set(metrics['computation']['methods'].values()) == {"exact", "louvain"}
+    assert metrics['total_nodes'] == metrics['node_count'] == 304 and metrics['number_of_components'] == 3
+    assert metrics['total_edges'] == metrics['edge_count'] == graph.number_of_edges()
+    assert not metrics['is_connected']
+    assert metrics['max_betweenness_centrality'] == pytest.approx(max(betweenness.values()))
+    assert metrics['max_closeness_centrality'] == pytest.approx(max(closeness.values()))
+    assert metrics['top_betweenness_nodes'] == sorted(betweenness, key=betweenness.get, reverse=True)[:5]
+    assert metrics['average_path_length'] == pytest.approx(nx.average_shortest_path_length(largest))
+    assert metrics['diameter'] == nx.diameter(largest)
+    assert metrics['average_clustering'] == pytest.approx(nx.average_clustering(graph))
+    assert metrics['transitivity'] == pytest.approx(nx.transitivity(graph))
+
+
+def test_self_loops_and_edge_directions_are_ignored():
+    graph = nx.karate_club_graph()
+    noisy = nx.DiGraph(graph)
+    noisy.add_edge(0, 0)
+    calculator = NetworkMetricsCalculator(NetworkMetricsConfig(strategy="exact"))
+
+    expected = calculator.calculate(graph)
+    metrics = calculator.calculate(noisy)
+    for key in ('max_betweenness_centrality', 'max_closeness_centrality',
+                'average_path_length', 'diameter', 'average_clustering'):
+        assert metrics[key] == pytest.approx(expected[key])
+    assert metrics['top_betweenness_nodes'] == expected['top_betweenness_nodes']
+
+
+def test_sampled_metrics_are_close_to_exact():
+    graph = nx.barabasi_albert_graph(3000, 3, seed=7)
+    exact = NetworkMetricsCalculator(NetworkMetricsConfig(strategy="exact")).calculate(graph)
+    approximate = NetworkMetricsCalculator(NetworkMetricsConfig(strategy="approximate")).calculate(graph)
+
+    methods = approximate['computation']['methods']
+    assert methods['shortest_paths'] == "sampled_256_sources"
+    assert methods['diameter'].startswith("lower_bound")
+    assert methods['communities'].startswith("label_propagation")
+    assert approximate['max_betweenness_centrality'] == pytest.approx(exact['max_betweenness_centrality'], rel=0.15)
+    assert approximate['max_closeness_centrality'] == pytest.approx(exact['max_closeness_centrality'], rel=0.05)
+    assert approximate['average_path_length'] == pytest.approx(exact['average_path_length'], rel=0.03)
+    assert exact['diameter'] - 1 <= approximate['diameter'] <= exact['diameter']
+    assert approximate['average_clustering'] == pytest.approx(exact['average_clustering'], abs=0.01)
+    assert approximate['transitivity'] == pytest.approx(exact['transitivity'], abs=0.01)
+    assert len(set(approximate['top_betweenness_nodes'][:3]) & set(exact['top_betweenness_nodes'])) >= 2
+    assert approximate['modularity'] > 0.2
+    assert approximate['top_degree_nodes'] == exact['top_degree_nodes']
+
+
+def test_auto_policy_switches_on_graph_size():
+    calculator = NetworkMetricsCalculator(NetworkMetricsConfig(exact_node_limit=100, exact_edge_limit=1000))
+
+    assert calculator.use_exact(nx.path_graph(100))
+    assert not calculator.use_exact(nx.path_graph(101))
+    assert not calculator.use_exact(nx.complete_graph(50))
+    assert calculator.calculate(nx.path_graph(101))['computation']['mode'] == "approximate"
+
+
+def test_time_budget_stops_sampling_early():
+    graph = nx.barabasi_albert_graph(5000, 3, seed=3)
+    config = NetworkMetricsConfig(
+        strategy="exact",
+        bfs_block_elements=5000 * 8,
+        metric_time_budgets={"shortest_paths": 1e-6}
+    )
+    metrics = NetworkMetricsCalculator(config).calculate(graph)
+
+    # One block of eight sources runs before the budget is checked
+    assert metrics['computation']['methods']['shortest_paths'] == "sampled_8_sources"
+    assert metrics['computation']['methods']['diameter'].startswith("lower_bound")
+    assert metrics['max_betweenness_centrality'] > 0
+
+
+def test_small_and_invalid_inputs():
+    calculator = NetworkMetricsCalculator()
+    assert calculator.calculate(nx.Graph()) == {}
+
+    single = calculator.calculate(nx.empty_graph(1))
+    assert single['total_nodes'] == 1 and single['max_closeness_centrality'] == 0
+    assert 'diameter' not in single
+
+    with pytest.raises(ValueError):
+        NetworkMetricsConfig(strategy="fast").validate()
+    with pytest.raises(ValueError):
+        NetworkMetricsConfig(metric_time_budgets={"pagerank": 1.0}).validate()
@@ -0,0 +1,216 @@
+"""Tests for process-sharded batch processing."""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from test_sentiment_minimal import MockSentimentAnalyzer
+from app.analysis.sharded_executor import ShardedExecutor
+
+TEXTS = [
+    "India is a great country with rich culture",
+    "The weather is nice today",
+    "India is terrible and corrupt",
+    "भारत एक महान देश है",
+] * 20
+
+
+class PicklableMockAnalyzer(MockSentimentAnalyzer):
+    """Mock analyzer whose responses can cross a process boundary."""
+
+    async def batch_analyze_sentiment(self, texts, language=None, translate=True):
+        if any(text == "fail" for text in texts):
+            raise ValueError("bad shard")
+        if any(text == "die" for text in texts):
+            os._exit(1)
+        results = await super().batch_analyze_sentiment(texts, language, translate)
+        return [SimpleNamespace(**vars(result)) for result in results]
+
+
+async def load_mock_analyzer():
+    analyzer = PicklableMockAnalyzer()
+    await analyzer.initialize()
+    return analyzer
+
+
+class SlowWorker:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.loaded_at = time.monotonic()
+        self.calls = 0
+
+    def echo(self, items, delay=0.0):
+        time.sleep(delay)
+        return [(self.pid, self.loaded_at, item) for item in items]
+
+    def flaky(self, items):
+        self.calls += 1
+        if self.calls == 1:
+            raise ValueError("first call fails")
+        return list(items)
+
+
+def broken_worker():
+    raise RuntimeError("model failed to load")
+
+
+def test_process_batch_matches_in_process_results():
+    from app.analysis.batch_processor import BatchConfig, BatchProcessor
+
+    async def run():
+        config = BatchConfig(batch_size=8, use_multiprocessing=True, max_workers=2)
+        processor = BatchProcessor(MockSentimentAnalyzer(), config, worker_factory=load_mock_analyzer)
+        try:
+            progress = []
+            result = await processor.process_batch(TEXTS, progress_callback=lambda done, total: progress.append((done, total)))
+        finally:
+            await processor.cleanup()
+
+        expected = await MockSentimentAnalyzer().batch_analyze_sentiment(TEXTS)
+        assert result.successful_processed == len(TEXTS)
+        assert [r.sentiment for r in result.results] == [r.sentiment for r in expected]
+        assert progress[-1] == (10, 10)
+        assert processor.process_pool is None
+
+    asyncio.run(run())
+
+
+def test_workers_are_warm_and_load_once():
+    async def run():
+        executor = ShardedExecutor(SlowWorker, max_workers=2)
+        try:
+            pids = await executor.start()
+            assert len(set(pids)) == 2
+            shards = await executor.map("echo", list(range(40)), 4)
+        finally:
+            executor.shutdown()
+
+        assert [item for shard in shards for _, _, item in shard.results] == list(range(40))
+        # Every shard ran on one of the pre-started workers, each loaded once
+        loads = {(pid, loaded_at) for shard in shards for pid, loaded_at, _ in shard.results}
+        assert {pid for pid, _ in loads} <= set(pids)
+        assert len(loads) == len({pid for pid, _ in loads})
+
+    asyncio.run(run())
+
+
+def test_backpressure_limits_outstanding_shards():
+    async def run():
+        executor = ShardedExecutor(SlowWorker, max_workers=1, max_pending_shards=2)
+        try:
+            received = []
+            async for shard in executor.map_shards("echo", list(range(10)), 1, delay=0.01):
+                received.append(shard.index)
+                # Running plus unconsumed shards never exceed the limit
+                assert executor._slots._value >= 0
+                await asyncio.sleep(0.02)
+            assert sorted(received) == list(range(10))
+            assert executor.stats["saturated_waits"] > 0
+            assert executor._slots._value == 2
+
+            # Abandoning a stream gives its slots back
+            async for shard in executor.map_shards("echo", list(range(10)), 1):
+                break
+            await asyncio.sleep(0.2)
+            assert executor._slots._value == 2
+        finally:
+            executor.shutdown()
+
+    asyncio.run(run())
+
+
+def test_shards_are_retried_and_time_out():
+    async def run():
+        executor = ShardedExecutor(SlowWorker, max_workers=1)
+        try:
+            shards = await executor.map("flaky", list(range(4)), 2, retries=1, retry_delay=0.0)
+            assert [shard.results for shard in shards] == [[0, 1], [2, 3]]
+            assert executor.stats["retries"] == 1
+
+            shards = await executor.map("echo", [1], 1, timeout=0.1, delay=0.5)
+            assert isinstance(shards[0].error, asyncio.TimeoutError)
+        finally:
+            executor.shutdown()
+
+    asyncio.run(run())
+
+
+def test_pool_that_failed_to_start_is_not_kept():
+    from app.analysis.batch_processor import BatchConfig, BatchProcessor
+
+    async def run():
+        config = BatchConfig(use_multiprocessing=True, max_workers=1)
+        processor = BatchProcessor(MockSentimentAnalyzer(), config, worker_factory=broken_worker)
+        for _ in range(2):
+            with pytest.raises(Exception):
+                await processor.get_process_pool()
+            assert processor.process_pool is None
+
+    asyncio.run(run())
+
+
+def test_failed_shard_is_reported_without_losing_others():
+    from app.analysis.batch_processor import BatchConfig, BatchProcessor
+
+    async def run():
+        config = BatchConfig(batch_size=4, use_multiprocessing=True, max_workers=2, retry_attempts=0)
+        processor = BatchProcessor(MockSentimentAnalyzer(), config, worker_factory=load_mock_analyzer)
+        texts = TEXTS[:8] + ["fail"] + TEXTS[:3]
+        try:
+            result = await processor.process_batch(texts)
+        finally:
+            await processor.cleanup()
+
+        assert result.successful_processed == 8
+        assert result.failed_processed == 4
+        assert "bad shard" in result.error_details[0]["error"]
+
+    asyncio.run(run())
+
+
+def test_pool_with_a_dead_worker_is_replaced():
+    from app.analysis.batch_processor import BatchConfig, BatchProcessor
+
+    async def run():
+        config = BatchConfig(batch_size=4, use_multiprocessing=True, max_workers=1, retry_attempts=0)
+        processor = BatchProcessor(MockSentimentAnalyzer(), config, worker_factory=load_mock_analyzer)
+        try:
+            result = await processor.process_batch(["die"])
+            assert result.failed_processed == 1
+            assert processor.process_pool is None
+
+            result = await processor.process_batch(TEXTS[:8])
+            assert result.successful_processed == 8
+        finally:
+            await processor.cleanup()
+
+    asyncio.run(run())
+
+
+def test_history_is_a_ring_buffer():
+    from app.analysis.batch_processor import BatchConfig, BatchProcessor
+
+    async def run():
+        processor = BatchProcessor(MockSentimentAnalyzer(), BatchConfig(batch_size=4, history_size=3))
+        for count in range(1, 6):
+            await processor.process_batch(TEXTS[:count])
+        history = processor.get_batch_history()
+        assert [record["total_texts"] for record in history] == [3, 4, 5]
+        assert processor.get_performance_summary()["total_batches_processed"] == 5
+
+    asyncio.run(run())
+
+
+def test_config_validation():
+    from app.analysis.batch_processor import BatchConfig
+
+    with pytest.raises(ValueError):
+        BatchConfig(max_workers=0).validate()
+    with pytest.raises(ValueError):
+        BatchConfig(history_size=0).validate()
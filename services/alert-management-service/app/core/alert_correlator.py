@@ -4,11 +4,12 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from shared.models.alert import Alert, AlertType, AlertContext
 
 from .config import config
+from .correlation_index import ContentFeatures, content_features, content_similarity, temporal_groups
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,10 @@ class AlertCorrelator:
         self.correlation_threshold = config.alert_correlation_threshold
         self.correlation_rules = self._initialize_correlation_rules()
         self.correlation_cache: Dict[str, List[AlertCorrelation]] = {}
+        
+        # Tokenized alert content, reused across comparisons and batches
+        self.content_features_cache: "OrderedDict[str, ContentFeatures]" = OrderedDict()
+        self.max_content_features_cache_size = 10000
     
     def _initialize_correlation_rules(self) -> List[CorrelationRule]:
         """Initialize correlation rules."""
@@ -307,33 +312,20 @@ class AlertCorrelator:
         """Correlate alerts by temporal patterns."""
         correlations = []
         
-        # Group alerts by time windows
+        # Group alerts by time windows; each alert is checked against its
+        # neighbouring groups only
         time_window = timedelta(minutes=rule.time_window_minutes)
-        time_groups = []
-        
-        for alert in alerts:
-            alert_time = alert.created_at or datetime.utcnow()
-            
-            # Find existing group within time window
-            added_to_group = False
-            for group in time_groups:
-                group_start = min(a.created_at or datetime.utcnow() for a in group)
-                group_end = max(a.created_at or datetime.utcnow() for a in group)
-                
-                if (alert_time >= group_start - time_window and 
-                    alert_time <= group_end + time_window):
-                    group.append(alert)
-                    added_to_group = True
-                    break
-            
-            if not added_to_group:
-                time_groups.append([alert])
+        time_groups = [
+            [alert for _, alert in group.sorted_members()]
+            for group in temporal_groups(
+                ((alert, alert.created_at or datetime.utcnow()) for alert in alerts),
+                time_window
+            )
+        ]
         
         # Create correlations for temporal groups
         for group_alerts in time_groups:
             if len(group_alerts) >= 2:
-                group_alerts.sort(key=lambda a: a.created_at or datetime.utcnow())
-                
                 primary_alert = group_alerts[0]
                 related_alerts = group_alerts[1:]
                 
@@ -355,45 +347,25 @@ class AlertCorrelator:
     
     def _calculate_content_similarity(self, alert1: Alert, alert2: Alert) -> float:
         """Calculate content similarity between two alerts."""
-        context1 = alert1.context
-        context2 = alert2.context
-        
-        # Compare content samples
-        content1 = " ".join(context1.content_samples) if context1.content_samples else ""
-        content2 = " ".join(context2.content_samples) if context2.content_samples else ""
-        
-        if not content1 or not content2:
-            return 0.0
-        
-        # Simple token-based similarity
-        tokens1 = set(content1.lower().split())
-        tokens2 = set(content2.lower().split())
-        
-        if not tokens1 or not tokens2:
-            return 0.0
-        
-        intersection = len(tokens1.intersection(tokens2))
-        union = len(tokens1.union(tokens2))
-        
-        jaccard_similarity = intersection / union if union > 0 else 0.0
-        
-        # Boost similarity if keywords match
-        keywords1 = set(context1.keywords_matched) if context1.keywords_matched else set()
-        keywords2 = set(context2.keywords_matched) if context2.keywords_matched else set()
-        
-        keyword_overlap = len(keywords1.intersection(keywords2))
-        if keyword_overlap > 0:
-            jaccard_similarity += 0.1 * keyword_overlap
-        
-        # Boost similarity if hashtags match
-        hashtags1 = set(context1.hashtags_involved) if context1.hashtags_involved else set()
-        hashtags2 = set(context2.hashtags_involved) if context2.hashtags_involved else set()
-        
-        hashtag_overlap = len(hashtags1.intersection(hashtags2))
-        if hashtag_overlap > 0:
-            jaccard_similarity += 0.1 * hashtag_overlap
-        
-        return min(jaccard_similarity, 1.0)
+        return content_similarity(self._content_features(alert1), self._content_features(alert2))
+    
+    def _content_features(self, alert: Alert) -> ContentFeatures:
+        """Get the alert's token sets, tokenizing its content on first use."""
+        features = self.content_features_cache.get(alert.alert_id)
+        if features is not None:
+            self.content_features_cache.move_to_end(alert.alert_id)
+            return features
+        
+        context = alert.context
+        features = content_features(
+            context.content_samples,
+            context.keywords_matched,
+            context.hashtags_involved
+        )
+        self.content_features_cache[alert.alert_id] = features
+        if len(self.content_features_cache) > self.max_content_features_cache_size:
+            self.content_features_cache.popitem(last=False)
+        return features
     
     def _merge_correlations(self, correlations: List[AlertCorrelation]) -> List[AlertCorrelation]:
         """Merge overlapping correlations."""
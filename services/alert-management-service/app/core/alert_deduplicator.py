@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from shared.models.alert import Alert, AlertContext, AlertType
 
 from .config import config
+from .similarity_index import SimilarAlertIndex
 
 logger = logging.getLogger(__name__)
 
@@ -52,14 +53,20 @@ class AlertDeduplicator:
         )
         self.duplicate_groups: Dict[str, DuplicateGroup] = {}
         self.alert_hashes: Dict[str, str] = {}  # alert_id -> hash
-        self.similarity_threshold = 0.85
+        self.similarity_threshold = config.alert_similarity_threshold
         
-        # Content similarity cache
-        self.content_similarity_cache: Dict[Tuple[str, str], float] = {}
+        # Content index over the open groups; it also expires and caps them
+        self.similarity_index = SimilarAlertIndex(
+            window_seconds=self.deduplication_window.total_seconds(),
+            similarity_threshold=self.similarity_threshold,
+            max_groups=config.alert_deduplication_max_groups
+        )
     
     async def is_duplicate(self, alert_id: str, context: AlertContext) -> bool:
         """Check if alert is a duplicate of recent alerts."""
         try:
+            self._drop_groups(self.similarity_index.expire(datetime.utcnow()))
+            
             # Generate deduplication key
             dedup_key = self._generate_deduplication_key(context)
             
@@ -75,7 +82,7 @@ class AlertDeduplicator:
                 return True
             
             # Record as new unique alert
-            await self._record_new_alert(alert_id, dedup_key)
+            await self._record_new_alert(alert_id, dedup_key, " ".join(context.content_samples or []))
             return False
             
         except Exception as e:
@@ -131,71 +138,44 @@ class AlertDeduplicator:
             else:
                 # Clean up old group
                 del self.duplicate_groups[key_str]
+                self.similarity_index.remove(key_str)
         
         return False
     
     async def _is_similar_duplicate(self, alert_id: str, context: AlertContext) -> bool:
-        """Check for similar content duplicates."""
+        """Check for similar content duplicates among groups of the same type and platform."""
         if not context.content_samples:
             return False
         
-        current_content = " ".join(context.content_samples)
-        
-        # Check against recent alerts
-        cutoff_time = datetime.utcnow() - self.deduplication_window
+        match = self.similarity_index.find_similar(
+            self._similarity_scope(context.detection_method, context.source_platform),
+            " ".join(context.content_samples),
+            datetime.utcnow()
+        )
+        if match is None:
+            return False
         
-        for group_key, group in list(self.duplicate_groups.items()):
-            if group.last_seen < cutoff_time:
-                # Clean up old group
-                del self.duplicate_groups[group_key]
-                continue
-            
-            # Skip if different platform (unless both are None)
-            if (context.source_platform != group.key.platform and 
-                not (context.source_platform is None and group.key.platform is None)):
-                continue
-            
-            # Calculate content similarity
-            similarity = await self._calculate_content_similarity(
-                current_content,
-                group.key.content_hash
-            )
-            
-            if similarity >= self.similarity_threshold:
-                logger.debug(f"Found similar duplicate with similarity {similarity:.3f}")
-                await self._record_duplicate(alert_id, group.key)
-                return True
+        group_key, similarity = match
+        group = self.duplicate_groups.get(group_key)
+        if group is None:
+            return False
         
-        return False
+        logger.debug(f"Found similar duplicate with similarity {similarity:.3f}")
+        await self._record_duplicate(alert_id, group.key)
+        return True
     
-    async def _calculate_content_similarity(self, content1: str, content_hash: str) -> float:
-        """Calculate similarity between content and existing content hash."""
-        # For now, use simple token-based similarity
-        # In production, could use more sophisticated NLP similarity
-        
-        cache_key = (hashlib.md5(content1.encode()).hexdigest()[:8], content_hash)
-        
-        if cache_key in self.content_similarity_cache:
-            return self.content_similarity_cache[cache_key]
-        
-        # Simple token-based similarity
-        tokens1 = set(content1.lower().split())
-        
-        # For demonstration, assume we can retrieve content from hash
-        # In practice, might store content samples in duplicate groups
-        similarity = self._calculate_jaccard_similarity(tokens1, set())
-        
-        # Cache result
-        self.content_similarity_cache[cache_key] = similarity
-        
-        # Limit cache size
-        if len(self.content_similarity_cache) > 1000:
-            # Remove oldest entries
-            oldest_keys = list(self.content_similarity_cache.keys())[:100]
-            for key in oldest_keys:
-                del self.content_similarity_cache[key]
-        
-        return similarity
+    def _similarity_scope(self, alert_type: str, platform: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Only alerts of the same type on the same platform are compared."""
+        return (alert_type, platform)
+    
+    def _drop_groups(self, group_keys: List[str]):
+        """Forget groups expired or evicted by the similarity index."""
+        for key_str in group_keys:
+            group = self.duplicate_groups.pop(key_str, None)
+            if group is None:
+                continue
+            for alert_id in group.alerts:
+                self.alert_hashes.pop(alert_id, None)
     
     def _calculate_jaccard_similarity(self, set1: Set[str], set2: Set[str]) -> float:
         """Calculate Jaccard similarity between two sets."""
@@ -213,6 +193,7 @@ class AlertDeduplicator:
         
         if key_str in self.duplicate_groups:
             self.duplicate_groups[key_str].add_alert(alert_id)
+            self.similarity_index.touch(key_str, self.duplicate_groups[key_str].last_seen)
         else:
             # This shouldn't happen, but handle gracefully
             group = DuplicateGroup(
@@ -223,12 +204,15 @@ class AlertDeduplicator:
                 count=1
             )
             self.duplicate_groups[key_str] = group
+            self._drop_groups(self.similarity_index.add(
+                key_str, self._similarity_scope(dedup_key.alert_type, dedup_key.platform), "", group.last_seen
+            ))
         
         # Record alert hash
         self.alert_hashes[alert_id] = dedup_key.content_hash
     
-    async def _record_new_alert(self, alert_id: str, dedup_key: DeduplicationKey):
-        """Record new unique alert."""
+    async def _record_new_alert(self, alert_id: str, dedup_key: DeduplicationKey, content: str = ""):
+        """Record new unique alert and index its content for similarity lookups."""
         key_str = str(dedup_key)
         
         group = DuplicateGroup(
@@ -239,6 +223,9 @@ class AlertDeduplicator:
             count=1
         )
         self.duplicate_groups[key_str] = group
+        self._drop_groups(self.similarity_index.add(
+            key_str, self._similarity_scope(dedup_key.alert_type, dedup_key.platform), content, group.last_seen
+        ))
         
         # Record alert hash
         self.alert_hashes[alert_id] = dedup_key.content_hash
@@ -276,6 +263,7 @@ class AlertDeduplicator:
         
         for key in keys_to_remove:
             del self.duplicate_groups[key]
+            self.similarity_index.remove(key)
         
         logger.debug(f"Cleaned up {len(keys_to_remove)} old duplicate groups")
     
@@ -298,7 +286,7 @@ class AlertDeduplicator:
             "total_groups": total_groups,
             "total_duplicates_prevented": total_duplicates,
             "by_type": type_stats,
-            "cache_size": len(self.content_similarity_cache),
+            "similarity_index": self.similarity_index.get_stats(),
             "deduplication_window_minutes": config.alert_deduplication_window_minutes
         }
 
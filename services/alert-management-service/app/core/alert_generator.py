@@ -20,6 +20,7 @@ from .config import config
 from .alert_deduplicator import AlertDeduplicator
 from .alert_correlator import AlertCorrelator
 from .severity_calculator import SeverityCalculator
+from .rule_engine import RuleIndex, compile_conditions
 
 logger = logging.getLogger(__name__)
 
@@ -45,72 +46,26 @@ class AlertRule:
         self.last_triggered = None
         self.trigger_count = 0
     
+    @property
+    def conditions(self) -> Dict[str, Any]:
+        return self._conditions
+    
+    @conditions.setter
+    def conditions(self, conditions: Dict[str, Any]):
+        """Set the conditions and compile them for evaluation."""
+        self._conditions = conditions
+        self._predicate = compile_conditions(conditions)
+    
     def evaluate(self, data: Dict[str, Any]) -> bool:
         """Evaluate if the rule conditions are met."""
         if not self.enabled:
             return False
         
         try:
-            return self._evaluate_conditions(self.conditions, data)
+            return self._predicate(data)
         except Exception as e:
             logger.error(f"Error evaluating rule {self.rule_id}: {e}")
             return False
-    
-    def _evaluate_conditions(self, conditions: Dict[str, Any], data: Dict[str, Any]) -> bool:
-        """Recursively evaluate rule conditions."""
-        if "and" in conditions:
-            return all(self._evaluate_conditions(cond, data) for cond in conditions["and"])
-        
-        if "or" in conditions:
-            return any(self._evaluate_conditions(cond, data) for cond in conditions["or"])
-        
-        if "not" in conditions:
-            return not self._evaluate_conditions(conditions["not"], data)
-        
-        # Evaluate individual condition
-        field = conditions.get("field")
-        operator = conditions.get("operator")
-        value = conditions.get("value")
-        
-        if not all([field, operator, value is not None]):
-            return False
-        
-        data_value = self._get_nested_value(data, field)
-        
-        if operator == "eq":
-            return data_value == value
-        elif operator == "ne":
-            return data_value != value
-        elif operator == "gt":
-            return data_value > value
-        elif operator == "gte":
-            return data_value >= value
-        elif operator == "lt":
-            return data_value < value
-        elif operator == "lte":
-            return data_value <= value
-        elif operator == "in":
-            return data_value in value
-        elif operator == "contains":
-            return value in str(data_value).lower()
-        elif operator == "regex":
-            import re
-            return bool(re.search(value, str(data_value), re.IGNORECASE))
-        
-        return False
-    
-    def _get_nested_value(self, data: Dict[str, Any], field: str) -> Any:
-        """Get nested value from data using dot notation."""
-        keys = field.split(".")
-        value = data
-        
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return None
-        
-        return value
 
 
 class AlertGenerator:
@@ -121,6 +76,7 @@ class AlertGenerator:
         self.correlator = AlertCorrelator()
         self.severity_calculator = SeverityCalculator()
         self.rules: Dict[str, AlertRule] = {}
+        self.rule_index = RuleIndex()
         self.alert_cache: Dict[str, Alert] = {}
         self.rate_limiter = AlertRateLimiter()
         
@@ -219,14 +175,19 @@ class AlertGenerator:
         ))
     
     def add_rule(self, rule: AlertRule):
-        """Add a new alert rule."""
+        """Add a new alert rule.
+        
+        Re-add a rule after changing its conditions so the rule index is updated.
+        """
         self.rules[rule.rule_id] = rule
+        self.rule_index.add(rule.rule_id, rule.conditions)
         logger.info(f"Added alert rule: {rule.name} ({rule.rule_id})")
     
     def remove_rule(self, rule_id: str):
         """Remove an alert rule."""
         if rule_id in self.rules:
             del self.rules[rule_id]
+            self.rule_index.remove(rule_id)
             logger.info(f"Removed alert rule: {rule_id}")
     
     def enable_rule(self, rule_id: str):
@@ -251,9 +212,10 @@ class AlertGenerator:
                 logger.warning("Alert generation rate limit exceeded")
                 return alerts
             
-            # Evaluate all rules
+            # Evaluate the rules the index cannot rule out
             triggered_rules = []
-            for rule in self.rules.values():
+            for rule_id in self.rule_index.candidates(data):
+                rule = self.rules[rule_id]
                 if rule.evaluate(data):
                     triggered_rules.append(rule)
             
@@ -57,6 +57,8 @@ class AlertConfig(BaseSettings):
     
     # Alert generation configuration
     alert_deduplication_window_minutes: int = Field(default=30, env="ALERT_DEDUPLICATION_WINDOW")
+    alert_similarity_threshold: float = Field(default=0.85, env="ALERT_SIMILARITY_THRESHOLD")
+    alert_deduplication_max_groups: int = Field(default=100000, env="ALERT_DEDUPLICATION_MAX_GROUPS")
     alert_correlation_threshold: float = Field(default=0.8, env="ALERT_CORRELATION_THRESHOLD")
     max_alerts_per_hour: int = Field(default=100, env="MAX_ALERTS_PER_HOUR")
     
@@ -0,0 +1,160 @@
+"""Incremental temporal grouping and cached content features for alert correlation."""
+
+import heapq
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+@dataclass
+class TemporalGroup:
+    """Alerts whose timestamps chain together within the correlation window."""
+    group_id: int
+    start: Any
+    end: Any
+    members: List[Tuple[Any, Any]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def sorted_members(self) -> List[Tuple[Any, Any]]:
+        """Members by timestamp, ties in arrival order."""
+        return sorted(self.members, key=lambda member: member[0])
+
+
+class TemporalGroupIndex:
+    """Groups alerts into time clusters incrementally.
+
+    An alert joins a group when its timestamp is within ``window`` of the group's
+    bounds, and bridges two groups into one when it is within the window
+    of both. Groups are kept sorted by start time with cached bounds, so gaps
+    between neighbouring groups always exceed the window and an alert only has to
+    be checked against the groups either side of it (found with bisect).
+
+    Groups whose end falls more than ``retention`` (default: the window) behind the
+    time passed to ``expire`` are dropped, oldest end first, from a heap.
+
+    Timestamps are numbers with a numeric window, or datetimes with a timedelta.
+    """
+
+    def __init__(self, window: Any, retention: Optional[Any] = None):
+        if window < window * 0:
+            raise ValueError("window must be non-negative")
+        self.window = window
+        self.retention = window if retention is None else retention
+
+        self._starts: List[Any] = []
+        self._groups: List[TemporalGroup] = []
+        self._by_id: Dict[int, TemporalGroup] = {}
+        self._expiry: List[Tuple[Any, int]] = []
+        self._next_id = 0
+        self.merges = 0
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def groups(self) -> List[TemporalGroup]:
+        """Open groups by start time."""
+        return list(self._groups)
+
+    def add(self, key: Any, timestamp: Any) -> TemporalGroup:
+        """Add an alert and return the group it joined."""
+        position = bisect_right(self._starts, timestamp)
+        previous = self._groups[position - 1] if position > 0 else None
+        following = self._groups[position] if position < len(self._groups) else None
+
+        joins_previous = previous is not None and timestamp <= previous.end + self.window
+        joins_following = following is not None and timestamp >= following.start - self.window
+
+        if joins_previous and joins_following:
+            # The alert bridges the gap: fold the following group into the previous one
+            previous.members.extend(following.members)
+            previous.end = max(previous.end, following.end)
+            del self._starts[position]
+            del self._groups[position]
+            del self._by_id[following.group_id]
+            self.merges += 1
+            group = previous
+        elif joins_previous:
+            group = previous
+        elif joins_following:
+            group = following
+            group.start = timestamp
+            self._starts[position] = timestamp
+        else:
+            group = TemporalGroup(self._next_id, timestamp, timestamp)
+            self._next_id += 1
+            self._starts.insert(position, timestamp)
+            self._groups.insert(position, group)
+            self._by_id[group.group_id] = group
+            heapq.heappush(self._expiry, (group.end, group.group_id))
+
+        group.members.append((timestamp, key))
+        if timestamp > group.end or (joins_previous and joins_following):
+            group.end = max(group.end, timestamp)
+            # The old heap entry goes stale and is skipped when popped
+            heapq.heappush(self._expiry, (group.end, group.group_id))
+        return group
+
+    def expire(self, now: Any) -> List[TemporalGroup]:
+        """Drop groups that ended more than the retention period before now."""
+        cutoff = now - self.retention
+        expired = []
+        while self._expiry and self._expiry[0][0] < cutoff:
+            end, group_id = heapq.heappop(self._expiry)
+            group = self._by_id.get(group_id)
+            if group is None or group.end != end:
+                continue
+            self._remove(group)
+            expired.append(group)
+        return expired
+
+    def _remove(self, group: TemporalGroup) -> None:
+        position = bisect_right(self._starts, group.start) - 1
+        while self._groups[position] is not group:
+            position -= 1
+        del self._starts[position]
+        del self._groups[position]
+        del self._by_id[group.group_id]
+
+
+def temporal_groups(items: Iterable[Tuple[Any, Any]], window: Any) -> List[TemporalGroup]:
+    """Group (key, timestamp) pairs into time clusters, ordered by start time."""
+    index = TemporalGroupIndex(window)
+    for key, timestamp in items:
+        index.add(key, timestamp)
+    return index.groups()
+
+
+class ContentFeatures(NamedTuple):
+    """Token sets compared by content similarity correlation."""
+    tokens: frozenset
+    keywords: frozenset
+    hashtags: frozenset
+
+
+def content_features(
+    content_samples: Optional[List[str]],
+    keywords: Optional[List[str]],
+    hashtags: Optional[List[str]]
+) -> ContentFeatures:
+    """Tokenize an alert's content once for repeated similarity comparisons."""
+    content = " ".join(content_samples) if content_samples else ""
+    return ContentFeatures(
+        frozenset(content.lower().split()),
+        frozenset(keywords or ()),
+        frozenset(hashtags or ())
+    )
+
+
+def content_similarity(features1: ContentFeatures, features2: ContentFeatures) -> float:
+    """Token Jaccard similarity boosted by 0.1 per shared keyword and hashtag, capped at 1."""
+    tokens1, tokens2 = features1.tokens, features2.tokens
+    if not tokens1 or not tokens2:
+        return 0.0
+
+    intersection = len(tokens1 & tokens2)
+    similarity = intersection / (len(tokens1) + len(tokens2) - intersection)
+    similarity += 0.1 * len(features1.keywords & features2.keywords)
+    similarity += 0.1 * len(features1.hashtags & features2.hashtags)
+    return min(similarity, 1.0)
@@ -0,0 +1,366 @@
+"""Compiled evaluation of alert rule conditions and candidate rule indexing.
+
+Rule conditions are nested dicts of ``and``/``or``/``not`` nodes over leaf
+predicates (``{"field": "analysis.risk_score", "operator": "gte", "value": 0.6}``).
+``evaluate_conditions`` interprets them directly; ``compile_conditions`` turns them
+into a closure once per rule, so field paths are split and regexes compiled ahead of
+time. ``RuleIndex`` keeps one equality or threshold predicate per rule so an event
+is only evaluated against the rules it can possibly match.
+"""
+
+import math
+import operator as op
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+COMPARISONS = {
+    "eq": op.eq,
+    "ne": op.ne,
+    "gt": op.gt,
+    "gte": op.ge,
+    "lt": op.lt,
+    "lte": op.le,
+}
+
+THRESHOLD_OPERATORS = ("gt", "gte", "lt", "lte")
+
+
+def get_nested_value(data: Dict[str, Any], field: str) -> Any:
+    """Get nested value from data using dot notation."""
+    value = data
+    for key in field.split("."):
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return None
+    return value
+
+
+def evaluate_conditions(conditions: Dict[str, Any], data: Dict[str, Any]) -> bool:
+    """Recursively evaluate rule conditions.
+
+    Errors (e.g. ordering ``None`` against a number) propagate to the caller.
+    """
+    if "and" in conditions:
+        return all(evaluate_conditions(cond, data) for cond in conditions["and"])
+
+    if "or" in conditions:
+        return any(evaluate_conditions(cond, data) for cond in conditions["or"])
+
+    if "not" in conditions:
+        return not evaluate_conditions(conditions["not"], data)
+
+    # Evaluate individual condition
+    field = conditions.get("field")
+    operator = conditions.get("operator")
+    value = conditions.get("value")
+
+    if not all([field, operator, value is not None]):
+        return False
+
+    data_value = get_nested_value(data, field)
+
+    if operator in COMPARISONS:
+        return COMPARISONS[operator](data_value, value)
+    elif operator == "in":
+        return data_value in value
+    elif operator == "contains":
+        return value in str(data_value).lower()
+    elif operator == "regex":
+        return bool(re.search(value, str(data_value), re.IGNORECASE))
+
+    return False
+
+
+def compile_accessor(field: str) -> Callable[[Dict[str, Any]], Any]:
+    """Compile a dotted field path into a getter returning None for missing keys."""
+    keys = tuple(field.split("."))
+
+    if len(keys) == 1:
+        key = keys[0]
+
+        def get_value(data):
+            if isinstance(data, dict):
+                return data.get(key)
+            return None
+        return get_value
+
+    def get_nested(data):
+        value = data
+        for key in keys:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return get_nested
+
+
+def _always_false(data: Dict[str, Any]) -> bool:
+    return False
+
+
+def _raising(error: Exception) -> Predicate:
+    """A predicate that fails like the interpreter would on malformed conditions."""
+    def predicate(data):
+        raise error
+    return predicate
+
+
+def compile_conditions(conditions: Dict[str, Any]) -> Predicate:
+    """Compile rule conditions into a predicate equivalent to ``evaluate_conditions``.
+
+    Malformed conditions compile to a predicate that raises when called, so they
+    fail on evaluation exactly as the interpreter does.
+    """
+    try:
+        return _compile_node(conditions)
+    except Exception as e:
+        return _raising(e)
+
+
+def _compile_node(conditions: Dict[str, Any]) -> Predicate:
+    if "and" in conditions:
+        children = tuple(compile_conditions(cond) for cond in conditions["and"])
+
+        def conjunction(data):
+            for child in children:
+                if not child(data):
+                    return False
+            return True
+        return conjunction
+
+    if "or" in conditions:
+        children = tuple(compile_conditions(cond) for cond in conditions["or"])
+
+        def disjunction(data):
+            for child in children:
+                if child(data):
+                    return True
+            return False
+        return disjunction
+
+    if "not" in conditions:
+        child = compile_conditions(conditions["not"])
+        return lambda data: not child(data)
+
+    field = conditions.get("field")
+    operator = conditions.get("operator")
+    value = conditions.get("value")
+
+    if not all([field, operator, value is not None]):
+        return _always_false
+
+    get_value = compile_accessor(field)
+
+    if operator in COMPARISONS:
+        compare = COMPARISONS[operator]
+        return lambda data: compare(get_value(data), value)
+    elif operator == "in":
+        return lambda data: get_value(data) in value
+    elif operator == "contains":
+        return lambda data: value in str(get_value(data)).lower()
+    elif operator == "regex":
+        try:
+            pattern = re.compile(value, re.IGNORECASE)
+        except Exception:
+            # Invalid patterns keep failing on every evaluation
+            return lambda data: bool(re.search(value, str(get_value(data)), re.IGNORECASE))
+        return lambda data: pattern.search(str(get_value(data))) is not None
+
+    return _always_false
+
+
+@dataclass(frozen=True)
+class IndexKey:
+    """A predicate every event matching a rule must satisfy."""
+    field: str
+    operator: str
+    value: Any
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _required_predicates(conditions: Any) -> Iterable[Dict[str, Any]]:
+    """Leaf predicates that must all hold for the conditions to be true."""
+    if not isinstance(conditions, dict):
+        return
+    if "and" in conditions:
+        children = conditions["and"]
+        if isinstance(children, (list, tuple)):
+            for child in children:
+                yield from _required_predicates(child)
+        return
+    if "or" in conditions or "not" in conditions:
+        return
+    yield conditions
+
+
+def index_key(conditions: Dict[str, Any]) -> Optional[IndexKey]:
+    """Choose the predicate a rule is indexed by, preferring equality over thresholds.
+
+    Only predicates under top-level ``and`` nodes qualify. Equality values must be
+    hashable and thresholds must be finite numbers; a missing field never satisfies
+    either, since ``None`` neither equals a non-None value nor orders against numbers.
+    """
+    threshold = None
+    for predicate in _required_predicates(conditions):
+        field = predicate.get("field")
+        operator = predicate.get("operator")
+        value = predicate.get("value")
+        if not isinstance(field, str) or not field or value is None:
+            continue
+        if operator == "eq":
+            try:
+                hash(value)
+            except TypeError:
+                continue
+            return IndexKey(field, operator, value)
+        if threshold is None and operator in THRESHOLD_OPERATORS and _is_number(value) and math.isfinite(value):
+            threshold = IndexKey(field, operator, value)
+    return threshold
+
+
+class _ThresholdList:
+    """Rules with a threshold on one field and operator, sorted by threshold."""
+
+    def __init__(self, operator: str):
+        self.operator = operator
+        self.thresholds: List[float] = []
+        self.rule_ids: List[str] = []
+
+    def add(self, threshold: float, rule_id: str) -> None:
+        position = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(position, threshold)
+        self.rule_ids.insert(position, rule_id)
+
+    def remove(self, threshold: float, rule_id: str) -> None:
+        position = bisect_left(self.thresholds, threshold)
+        while self.rule_ids[position] != rule_id:
+            position += 1
+        del self.thresholds[position]
+        del self.rule_ids[position]
+
+    def matching(self, value: float) -> List[str]:
+        if self.operator == "gte":
+            return self.rule_ids[:bisect_right(self.thresholds, value)]
+        if self.operator == "gt":
+            return self.rule_ids[:bisect_left(self.thresholds, value)]
+        if self.operator == "lte":
+            return self.rule_ids[bisect_left(self.thresholds, value):]
+        return self.rule_ids[bisect_right(self.thresholds, value):]
+
+    def __len__(self) -> int:
+        return len(self.thresholds)
+
+
+class RuleIndex:
+    """Discrimination index from event field values to candidate rule IDs.
+
+    Each rule is indexed by one required equality or threshold predicate; rules
+    without one are always candidates. Candidates are returned in the order rules
+    were added, and still have to be evaluated in full.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, Optional[IndexKey]] = {}
+        self._order: Dict[str, int] = {}
+        self._sequence = 0
+        self._unindexed: Set[str] = set()
+        self._equality: Dict[str, Dict[Any, Set[str]]] = {}
+        self._thresholds: Dict[Tuple[str, str], _ThresholdList] = {}
+        self._accessors: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, rule_id: str) -> bool:
+        return rule_id in self._keys
+
+    def add(self, rule_id: str, conditions: Dict[str, Any]) -> Optional[IndexKey]:
+        """Index a rule, replacing any previous entry with the same ID."""
+        self.remove(rule_id)
+        key = index_key(conditions)
+        self._keys[rule_id] = key
+        self._order[rule_id] = self._sequence
+        self._sequence += 1
+
+        if key is None:
+            self._unindexed.add(rule_id)
+            return None
+
+        if key.field not in self._accessors:
+            self._accessors[key.field] = compile_accessor(key.field)
+        if key.operator == "eq":
+            self._equality.setdefault(key.field, {}).setdefault(key.value, set()).add(rule_id)
+        else:
+            thresholds = self._thresholds.get((key.field, key.operator))
+            if thresholds is None:
+                thresholds = self._thresholds[(key.field, key.operator)] = _ThresholdList(key.operator)
+            thresholds.add(key.value, rule_id)
+        return key
+
+    def remove(self, rule_id: str) -> None:
+        """Remove a rule from the index, if present."""
+        if rule_id not in self._keys:
+            return
+        key = self._keys.pop(rule_id)
+        del self._order[rule_id]
+
+        if key is None:
+            self._unindexed.discard(rule_id)
+        elif key.operator == "eq":
+            values = self._equality[key.field]
+            values[key.value].discard(rule_id)
+            if not values[key.value]:
+                del values[key.value]
+            if not values:
+                del self._equality[key.field]
+        else:
+            thresholds = self._thresholds[(key.field, key.operator)]
+            thresholds.remove(key.value, rule_id)
+            if not thresholds:
+                del self._thresholds[(key.field, key.operator)]
+
+    def candidates(self, data: Dict[str, Any]) -> List[str]:
+        """IDs of rules that may match the event, in the order they were added."""
+        candidates = set(self._unindexed)
+
+        for field, values in self._equality.items():
+            value = self._accessors[field](data)
+            if value is None:
+                continue
+            try:
+                rule_ids = values.get(value)
+            except TypeError:
+                # Unhashable event values cannot equal a hashable rule value
+                continue
+            if rule_ids:
+                candidates.update(rule_ids)
+
+        for (field, _), thresholds in self._thresholds.items():
+            value = self._accessors[field](data)
+            if value is None or isinstance(value, (str, dict, list)):
+                # Ordering these against numbers raises, so the rule cannot match
+                continue
+            if _is_number(value):
+                candidates.update(thresholds.matching(value))
+            else:
+                # Other types (bools, decimals, numpy scalars) may still compare
+                candidates.update(thresholds.rule_ids)
+
+        return sorted(candidates, key=self._order.__getitem__)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Number of rules by index kind."""
+        return {
+            "rules": len(self._keys),
+            "equality_indexed": sum(len(ids) for values in self._equality.values() for ids in values.values()),
+            "threshold_indexed": sum(len(thresholds) for thresholds in self._thresholds.values()),
+            "unindexed": len(self._unindexed),
+        }
@@ -0,0 +1,246 @@
+"""MinHash-LSH index of recent alert groups for similar-content deduplication."""
+
+import re
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def shingle_hashes(text: str, shingle_size: int = 3) -> np.ndarray:
+    """Sorted unique 32-bit hashes of the word shingles of a text.
+
+    Texts shorter than ``shingle_size`` words form a single shingle. Shingle hashes
+    are combined from token hashes, so each token is hashed once.
+    """
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return np.empty(0, dtype=np.uint32)
+    token_hashes = np.array([zlib.crc32(token.encode()) for token in tokens], dtype=np.uint64)
+    width = min(shingle_size, len(tokens))
+    count = len(tokens) - width + 1
+    combined = np.zeros(count, dtype=np.uint64)
+    for offset in range(width):
+        combined = combined * _SHINGLE_MULTIPLIER + token_hashes[offset:offset + count]
+    hashes = ((combined >> np.uint64(32)) ^ combined).astype(np.uint32)
+    hashes.sort()
+    if len(hashes) > 1:
+        hashes = hashes[np.concatenate(([True], hashes[1:] != hashes[:-1]))]
+    return hashes
+
+
+def jaccard_similarity(shingles1: np.ndarray, shingles2: np.ndarray) -> float:
+    """Jaccard similarity of two sorted unique shingle hash arrays."""
+    if not len(shingles1) or not len(shingles2):
+        return 0.0
+    intersection = len(np.intersect1d(shingles1, shingles2, assume_unique=True))
+    return intersection / (len(shingles1) + len(shingles2) - intersection)
+
+
+class MinHasher:
+    """MinHash signatures from multiply-shift hashes of shingle hashes."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = (rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        values = shingles.astype(np.uint64)
+        # uint64 arithmetic wraps, which is what multiply-shift hashing relies on
+        hashed = (self._a[:, None] * values[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+
+@dataclass
+class _IndexedGroup:
+    scope: Hashable
+    shingles: np.ndarray
+    band_keys: List[Tuple[Any, ...]]
+    last_seen: datetime
+    bucket: int
+
+
+@dataclass
+class _TimeBucket:
+    bucket: int
+    tables: Dict[Tuple[Any, ...], List[str]] = field(default_factory=dict)
+    group_keys: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SimilarityIndexStats:
+    """Similar-alert index statistics."""
+    lookups: int = 0
+    candidates_checked: int = 0
+    matches: int = 0
+    expired_groups: int = 0
+    evicted_groups: int = 0
+
+
+class SimilarAlertIndex:
+    """Finds recent alert groups with similar content without scanning them all.
+
+    Group contents are shingled into MinHash signatures and split into LSH bands;
+    groups that share a band with a query are verified with the exact Jaccard
+    similarity of their shingles. Band tables live in a ring of time buckets that
+    together cover the deduplication window: a group is (re)inserted into the
+    current bucket whenever it is touched, and a whole bucket of tables is dropped
+    once it falls out of the window. Groups are also evicted least recently seen
+    first beyond ``max_groups``.
+
+    Groups without content are tracked for expiry and eviction only.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        similarity_threshold: float = 0.85,
+        max_groups: int = 100000,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        bucket_count: int = 6,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        if window_seconds <= 0 or bucket_count <= 0 or max_groups <= 0:
+            raise ValueError("window_seconds, bucket_count and max_groups must be positive")
+
+        self.window_seconds = window_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_groups = max_groups
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.bucket_count = bucket_count
+        self.bucket_seconds = window_seconds / bucket_count
+        self.hasher = MinHasher(num_perm, seed)
+        self.stats = SimilarityIndexStats()
+
+        self._groups: "OrderedDict[str, _IndexedGroup]" = OrderedDict()
+        self._buckets: Deque[_TimeBucket] = deque()
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def __contains__(self, group_key: str) -> bool:
+        return group_key in self._groups
+
+    def _bucket_of(self, now: datetime) -> int:
+        return int(now.timestamp() // self.bucket_seconds)
+
+    def _band_keys(self, scope: Hashable, shingles: np.ndarray) -> List[Tuple[Any, ...]]:
+        if not len(shingles):
+            return []
+        signature = self.hasher.signature(shingles).tobytes()
+        width = self.rows * 4
+        return [(scope, band, signature[band * width:(band + 1) * width]) for band in range(self.bands)]
+
+    def _current_bucket(self, now: datetime) -> _TimeBucket:
+        bucket = self._bucket_of(now)
+        if not self._buckets or self._buckets[-1].bucket < bucket:
+            self._buckets.append(_TimeBucket(bucket))
+        return self._buckets[-1]
+
+    def expire(self, now: datetime) -> List[str]:
+        """Drop buckets older than the window; returns the keys of expired groups."""
+        oldest = self._bucket_of(now) - self.bucket_count
+        expired = []
+        while self._buckets and self._buckets[0].bucket < oldest:
+            bucket = self._buckets.popleft()
+            for group_key in bucket.group_keys:
+                group = self._groups.get(group_key)
+                # Groups touched since live in a newer bucket
+                if group is not None and group.bucket == bucket.bucket:
+                    del self._groups[group_key]
+                    expired.append(group_key)
+        self.stats.expired_groups += len(expired)
+        return expired
+
+    def add(self, group_key: str, scope: Hashable, text: str, now: datetime) -> List[str]:
+        """Index a group; returns the keys of groups evicted to stay within max_groups."""
+        self.remove(group_key)
+        shingles = shingle_hashes(text, self.shingle_size) if text else np.empty(0, dtype=np.uint32)
+        group = _IndexedGroup(scope, shingles, self._band_keys(scope, shingles), now, self._bucket_of(now))
+        self._groups[group_key] = group
+        self._insert(group_key, group, now)
+
+        evicted = []
+        while len(self._groups) > self.max_groups:
+            evicted_key, _ = self._groups.popitem(last=False)
+            evicted.append(evicted_key)
+        self.stats.evicted_groups += len(evicted)
+        return evicted
+
+    def touch(self, group_key: str, now: datetime) -> None:
+        """Mark a group as seen, keeping it in the window."""
+        group = self._groups.get(group_key)
+        if group is None:
+            return
+        self._groups.move_to_end(group_key)
+        group.last_seen = now
+        if group.bucket != self._bucket_of(now):
+            self._insert(group_key, group, now)
+
+    def _insert(self, group_key: str, group: _IndexedGroup, now: datetime) -> None:
+        bucket = self._current_bucket(now)
+        # Entries left behind in older buckets are skipped on lookup and dropped on expiry
+        group.bucket = bucket.bucket
+        bucket.group_keys.append(group_key)
+        for band_key in group.band_keys:
+            bucket.tables.setdefault(band_key, []).append(group_key)
+
+    def remove(self, group_key: str) -> None:
+        """Stop matching a group; its table entries are dropped with their buckets."""
+        self._groups.pop(group_key, None)
+
+    def find_similar(self, scope: Hashable, text: str, now: datetime) -> Optional[Tuple[str, float]]:
+        """Most similar live group in the same scope at or above the threshold."""
+        self.stats.lookups += 1
+        shingles = shingle_hashes(text, self.shingle_size) if text else np.empty(0, dtype=np.uint32)
+        band_keys = self._band_keys(scope, shingles)
+        if not band_keys:
+            return None
+
+        cutoff = now.timestamp() - self.window_seconds
+        checked: Set[str] = set()
+        best = None
+        for bucket in self._buckets:
+            for band_key in band_keys:
+                for group_key in bucket.tables.get(band_key, ()):
+                    if group_key in checked:
+                        continue
+                    checked.add(group_key)
+                    group = self._groups.get(group_key)
+                    if group is None or group.scope != scope or group.last_seen.timestamp() < cutoff:
+                        continue
+                    similarity = jaccard_similarity(shingles, group.shingles)
+                    if similarity >= self.similarity_threshold and (best is None or similarity > best[1]):
+                        best = (group_key, similarity)
+
+        self.stats.candidates_checked += len(checked)
+        if best is not None:
+            self.stats.matches += 1
+        return best
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size and lookup statistics."""
+        return {
+            "indexed_groups": len(self._groups),
+            "time_buckets": len(self._buckets),
+            "band_entries": sum(len(keys) for bucket in self._buckets for keys in bucket.tables.values()),
+            "lookups": self.stats.lookups,
+            "candidates_checked": self.stats.candidates_checked,
+            "matches": self.stats.matches,
+            "expired_groups": self.stats.expired_groups,
+            "evicted_groups": self.stats.evicted_groups
+        }
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Replay benchmark for temporal alert correlation: interval index vs linear group scan.
+
+Generates a day of bursty synthetic alerts (bursts start at random times, alerts
+within a burst are seconds apart, and arrival order is jittered so some alerts
+come in late) and streams them through:
+
+* indexed: ``TemporalGroupIndex`` with heap expiry of groups older than the
+  retention period, as a long-running correlator would use it.
+* legacy: the scan ``AlertCorrelator._temporal_correlation`` used to do, checking
+  every group and recomputing its min/max timestamps for each alert. Only run on
+  the first ``--legacy-alerts`` alerts.
+
+Reports alerts/sec, open groups and peak traced memory. Also times content
+similarity over each closed group with token sets cached per alert vs
+re-tokenized per comparison.
+
+Usage:
+    python benchmark_alert_correlation.py
+    python benchmark_alert_correlation.py --alerts 100000 --mean-burst-size 5 --legacy-alerts 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.correlation_index import TemporalGroupIndex, content_features, content_similarity
+
+DAY_SECONDS = 24 * 3600
+WORDS = [f"w{i}" for i in range(2000)]
+
+
+def generate_alerts(count, mean_burst_size, burst_gap_seconds, jitter_seconds, rng):
+    """(arrival time, event time, alert id, content) sorted by arrival."""
+    alerts = []
+    while len(alerts) < count:
+        burst_start = rng.uniform(0, DAY_SECONDS)
+        topic = rng.sample(WORDS, 20)
+        timestamp = burst_start
+        for _ in range(min(int(rng.expovariate(1 / mean_burst_size)) + 1, count - len(alerts))):
+            timestamp += rng.expovariate(1 / burst_gap_seconds)
+            content = " ".join(rng.choice(topic) if rng.random() < 0.7 else rng.choice(WORDS) for _ in range(15))
+            arrival = timestamp + rng.expovariate(1 / jitter_seconds) if jitter_seconds else timestamp
+            alerts.append((arrival, timestamp, f"alert{len(alerts)}", content))
+    alerts.sort()
+    return alerts
+
+
+def legacy_replay(alerts, window):
+    groups = []
+    for _, timestamp, alert_id, _ in alerts:
+        for group in groups:
+            group_start = min(t for t, _ in group)
+            group_end = max(t for t, _ in group)
+            if group_start - window <= timestamp <= group_end + window:
+                group.append((timestamp, alert_id))
+                break
+        else:
+            groups.append([(timestamp, alert_id)])
+    return groups
+
+
+def indexed_replay(alerts, window, retention):
+    index = TemporalGroupIndex(window, retention)
+    closed = []
+    peak_groups = 0
+    for arrival, timestamp, alert_id, _ in alerts:
+        closed.extend(index.expire(arrival))
+        index.add(alert_id, timestamp)
+        peak_groups = max(peak_groups, len(index))
+    return index, closed + index.groups(), peak_groups
+
+
+def traced(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def pairwise_similarity(groups, contents, cached, max_group_size):
+    features = {}
+    comparisons = 0
+    for group in groups:
+        ids = [alert_id for _, alert_id in group.sorted_members()[:max_group_size]]
+        for i, first in enumerate(ids):
+            for second in ids[i + 1:]:
+                if cached:
+                    if first not in features:
+                        features[first] = content_features([contents[first]], None, None)
+                    if second not in features:
+                        features[second] = content_features([contents[second]], None, None)
+                    content_similarity(features[first], features[second])
+                else:
+                    content_similarity(content_features([contents[first]], None, None),
+                                       content_features([contents[second]], None, None))
+                comparisons += 1
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--alerts', type=int, default=20000, help="alerts in the replayed day")
+    parser.add_argument('--mean-burst-size', type=float, default=10)
+    parser.add_argument('--burst-gap-seconds', type=float, default=2, help="mean gap between alerts in a burst")
+    parser.add_argument('--window-seconds', type=float, default=30)
+    parser.add_argument('--retention-seconds', type=float, default=600, help="how late an alert may arrive")
+    parser.add_argument('--jitter-seconds', type=float, default=20, help="mean arrival delay")
+    parser.add_argument('--legacy-alerts', type=int, default=5000)
+    parser.add_argument('--max-group-size', type=int, default=50, help="alerts per group compared for content")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    alerts = generate_alerts(args.alerts, args.mean_burst_size, args.burst_gap_seconds, args.jitter_seconds, rng)
+
+    (index, groups, peak_groups), seconds, peak_mb = traced(
+        indexed_replay, alerts, args.window_seconds, args.retention_seconds
+    )
+    print(f"indexed, {len(alerts)} alerts: {len(alerts) / seconds:,.0f} alerts/s, {len(groups)} groups "
+          f"({index.merges} merges), peak {peak_groups} open groups, peak memory {peak_mb:.1f} MB")
+
+    subset = alerts[:args.legacy_alerts]
+    _, subset_seconds, subset_peak = traced(indexed_replay, subset, args.window_seconds, args.retention_seconds)
+    legacy_groups, legacy_seconds, legacy_peak = traced(legacy_replay, subset, args.window_seconds)
+    print(f"first {len(subset)} alerts:")
+    print(f"  legacy:  {len(subset) / legacy_seconds:>10,.0f} alerts/s, {len(legacy_groups)} groups, "
+          f"peak memory {legacy_peak:.1f} MB")
+    print(f"  indexed: {len(subset) / subset_seconds:>10,.0f} alerts/s, peak memory {subset_peak:.1f} MB")
+
+    contents = {alert_id: content for _, _, alert_id, content in alerts}
+    for cached in (False, True):
+        start = time.perf_counter()
+        comparisons = pairwise_similarity(groups, contents, cached, args.max_group_size)
+        elapsed = time.perf_counter() - start
+        print(f"content similarity, token sets {'cached' if cached else 're-tokenized'}: "
+              f"{comparisons / elapsed:,.0f} comparisons/s")
+
+
+if __name__ == '__main__':
+    main()
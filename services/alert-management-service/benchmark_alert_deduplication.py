@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Benchmark similar-alert deduplication: MinHash-LSH index vs a linear scan of open groups.
+
+Streams synthetic alerts through ``SimilarAlertIndex`` the way ``AlertDeduplicator``
+uses it (expire, look up, then touch the matched group or add a new one). Each
+alert starts a new story, is a lightly edited repost of a recent story in the
+same alert type and platform, or is a heavier rewrite of one that counts as a
+new story; an alert is a true duplicate when its story already has an open group.
+Reports lookup p50/p99, dedup precision and recall, and compares lookup latency
+with a linear Jaccard scan over the open groups for the first ``--linear-alerts``
+alerts.
+
+Usage:
+    python benchmark_alert_deduplication.py
+    python benchmark_alert_deduplication.py --alerts 100000 --rate 20 --linear-alerts 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.similarity_index import SimilarAlertIndex, jaccard_similarity, shingle_hashes
+
+ALERT_TYPES = ["high_risk_content", "bot_network", "coordinated_campaign", "viral_misinformation",
+               "volume_spike", "sentiment_anomaly"]
+PLATFORMS = ["twitter", "youtube", "telegram", "facebook", "instagram"]
+WORDS = [f"w{i}" for i in range(20000)]
+
+
+def edit(text, words, rng):
+    tokens = text.split()
+    for _ in range(words):
+        tokens[rng.randrange(len(tokens))] = rng.choice(WORDS)
+    return " ".join(tokens)
+
+
+def generate_alerts(count, repost_ratio, related_ratio, rng):
+    """(scope, story id, text) per alert.
+
+    Reposts change one word of a recent story. Related alerts rewrite several
+    words of a recent story and count as a new story, so matching them lowers
+    precision.
+    """
+    stories = []
+    alerts = []
+    for _ in range(count):
+        draw = rng.random()
+        if stories and draw < repost_ratio:
+            story_id = rng.randrange(max(0, len(stories) - 2000), len(stories))
+            scope, text = stories[story_id]
+            text = edit(text, 1, rng)
+        elif stories and draw < repost_ratio + related_ratio:
+            scope, text = stories[rng.randrange(max(0, len(stories) - 2000), len(stories))]
+            text = edit(text, rng.randint(3, 8), rng)
+            story_id = len(stories)
+            stories.append((scope, text))
+        else:
+            story_id = len(stories)
+            scope = (rng.choice(ALERT_TYPES), rng.choice(PLATFORMS))
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 80)))
+            stories.append((scope, text))
+        alerts.append((scope, story_id, text))
+    return alerts
+
+
+def run_indexed(alerts, start, step, window_seconds):
+    index = SimilarAlertIndex(window_seconds=window_seconds)
+    group_story = {}
+    open_stories = {}
+    latencies = []
+    flagged = correct = true_duplicates = caught = 0
+
+    for i, (scope, story_id, text) in enumerate(alerts):
+        now = start + step * i
+        for key in index.expire(now):
+            story = group_story.pop(key)
+            if open_stories.get(story) == key:
+                del open_stories[story]
+        is_true_duplicate = story_id in open_stories
+
+        began = time.perf_counter()
+        match = index.find_similar(scope, text, now)
+        latencies.append(time.perf_counter() - began)
+
+        true_duplicates += is_true_duplicate
+        if match is not None:
+            flagged += 1
+            correct += group_story[match[0]] == story_id
+            caught += is_true_duplicate
+            index.touch(match[0], now)
+        else:
+            key = f"group{i}"
+            index.add(key, scope, text, now)
+            group_story[key] = story_id
+            open_stories[story_id] = key
+
+    return np.array(latencies), flagged, correct, true_duplicates, caught, index
+
+
+def run_linear(alerts, start, step, window_seconds, threshold):
+    groups = {}
+    latencies = []
+    for i, (scope, _, text) in enumerate(alerts):
+        now = start + step * i
+        began = time.perf_counter()
+        shingles = shingle_hashes(text)
+        cutoff = now - timedelta(seconds=window_seconds)
+        best = None
+        for key, (group_scope, group_shingles, last_seen) in groups.items():
+            if last_seen < cutoff or group_scope != scope:
+                continue
+            similarity = jaccard_similarity(shingles, group_shingles)
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        latencies.append(time.perf_counter() - began)
+        if best is None:
+            groups[f"group{i}"] = (scope, shingles, now)
+        else:
+            groups[best[0]] = groups[best[0]][:2] + (now,)
+    return np.array(latencies), len(groups)
+
+
+def percentiles(latencies):
+    return np.percentile(latencies, 50) * 1e6, np.percentile(latencies, 99) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--alerts', type=int, default=100000)
+    parser.add_argument('--rate', type=float, default=20.0, help="alerts per simulated second")
+    parser.add_argument('--window-minutes', type=float, default=30.0)
+    parser.add_argument('--repost-ratio', type=float, default=0.4)
+    parser.add_argument('--related-ratio', type=float, default=0.1)
+    parser.add_argument('--linear-alerts', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    alerts = generate_alerts(args.alerts, args.repost_ratio, args.related_ratio, rng)
+    start = datetime(2024, 3, 10)
+    step = timedelta(seconds=1 / args.rate)
+    window_seconds = args.window_minutes * 60
+
+    latencies, flagged, correct, true_duplicates, caught, index = run_indexed(alerts, start, step, window_seconds)
+    p50, p99 = percentiles(latencies)
+    print(f"LSH index, {args.alerts} alerts: lookup p50 {p50:.0f} us, p99 {p99:.0f} us")
+    print(f"  flagged {flagged} duplicates, precision {correct / max(flagged, 1):.4f}, "
+          f"recall {caught / max(true_duplicates, 1):.4f}")
+    print(f"  {index.get_stats()}")
+
+    subset = alerts[:args.linear_alerts]
+    indexed, *_ = run_indexed(subset, start, step, window_seconds)
+    linear, groups = run_linear(subset, start, step, window_seconds, index.similarity_threshold)
+    print(f"first {len(subset)} alerts ({groups} groups at the end):")
+    print(f"  linear scan: p50 {percentiles(linear)[0]:.0f} us, p99 {percentiles(linear)[1]:.0f} us")
+    print(f"  LSH index:   p50 {percentiles(indexed)[0]:.0f} us, p99 {percentiles(indexed)[1]:.0f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Benchmark alert rule evaluation: interpreted vs compiled vs compiled with the rule index.
+
+Generates rule sets shaped like the default rules (an ``and`` of a platform or
+event type equality and one or two score thresholds, plus some keyword rules
+with no indexable predicate) and a stream of events, then reports events/sec for:
+
+* interpreted: every rule walked with ``evaluate_conditions``, as
+  ``AlertGenerator.process_data`` used to do.
+* compiled: every rule's compiled predicate.
+* indexed: compiled predicates of the ``RuleIndex`` candidates only.
+
+All three must trigger the same rules for every event.
+
+Usage:
+    python benchmark_rule_engine.py
+    python benchmark_rule_engine.py --rules 10 100 1000 --events 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.rule_engine import RuleIndex, compile_conditions, evaluate_conditions
+
+PLATFORMS = ["twitter", "youtube", "telegram", "facebook", "instagram", "reddit", "web", "news"]
+EVENT_TYPES = ["post", "comment", "share", "profile", "campaign", "bot_report"]
+SCORES = ["analysis.risk_score", "analysis.confidence_score", "metrics.viral_score",
+          "bot_analysis.bot_probability", "campaign.coordination_score"]
+
+
+def build_rules(count, rng):
+    rules = {}
+    for i in range(count):
+        if i % 10 == 9:
+            conditions = {"or": [
+                {"field": "content", "operator": "contains", "value": f"keyword{i}"},
+                {"field": "content", "operator": "regex", "value": rf"\bterm{i}\b"}
+            ]}
+        else:
+            discriminator = (
+                {"field": "platform", "operator": "eq", "value": rng.choice(PLATFORMS)} if i % 2
+                else {"field": "event_type", "operator": "eq", "value": f"{rng.choice(EVENT_TYPES)}_{i % 50}"}
+            )
+            thresholds = [
+                {"field": field, "operator": "gte", "value": round(rng.uniform(0.5, 0.95), 2)}
+                for field in rng.sample(SCORES, rng.randint(1, 2))
+            ]
+            conditions = {"and": [discriminator] + thresholds}
+        rules[f"rule_{i}"] = conditions
+    return rules
+
+
+def build_events(count, rng):
+    events = []
+    for i in range(count):
+        event = {
+            "platform": rng.choice(PLATFORMS),
+            "event_type": f"{rng.choice(EVENT_TYPES)}_{rng.randrange(50)}",
+            "content": f"post {i} mentions keyword{rng.randrange(1000)}",
+            "analysis": {"risk_score": rng.random(), "confidence_score": rng.random()},
+            "metrics": {"viral_score": rng.random(), "views": rng.randrange(10000)}
+        }
+        if rng.random() < 0.2:
+            event["bot_analysis"] = {"bot_probability": rng.random()}
+        events.append(event)
+    return events
+
+
+def safely(predicate, data):
+    try:
+        return predicate(data)
+    except Exception:
+        return False
+
+
+def run_interpreted(rules, events):
+    return [[rule_id for rule_id, conditions in rules.items()
+             if safely(lambda data: evaluate_conditions(conditions, data), event)]
+            for event in events]
+
+
+def run_compiled(predicates, events):
+    return [[rule_id for rule_id, predicate in predicates.items() if safely(predicate, event)]
+            for event in events]
+
+
+def run_indexed(index, predicates, events):
+    return [[rule_id for rule_id in index.candidates(event) if safely(predicates[rule_id], event)]
+            for event in events]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rules', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    events = build_events(args.events, rng)
+
+    print(f"{'rules':>6} {'interpreted ev/s':>17} {'compiled ev/s':>14} {'indexed ev/s':>13} "
+          f"{'speedup':>8} {'candidates/ev':>14}")
+    for count in args.rules:
+        rules = build_rules(count, rng)
+        predicates = {rule_id: compile_conditions(conditions) for rule_id, conditions in rules.items()}
+        index = RuleIndex()
+        for rule_id, conditions in rules.items():
+            index.add(rule_id, conditions)
+
+        interpreted, interpreted_seconds = timed(run_interpreted, rules, events)
+        compiled, compiled_seconds = timed(run_compiled, predicates, events)
+        indexed, indexed_seconds = timed(run_indexed, index, predicates, events)
+        assert interpreted == compiled == indexed
+
+        candidates = sum(len(index.candidates(event)) for event in events) / len(events)
+        print(f"{count:>6} {len(events) / interpreted_seconds:>17.0f} {len(events) / compiled_seconds:>14.0f} "
+              f"{len(events) / indexed_seconds:>13.0f} {interpreted_seconds / indexed_seconds:>7.1f}x "
+              f"{candidates:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
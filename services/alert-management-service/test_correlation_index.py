@@ -0,0 +1,113 @@
+"""Tests for incremental temporal grouping and cached content similarity."""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.correlation_index import (
+    TemporalGroupIndex, content_features, content_similarity, temporal_groups
+)
+
+START = datetime(2024, 3, 10)
+
+
+def scan_groups(items, window):
+    """The linear scan _temporal_correlation used to do."""
+    groups = []
+    for key, timestamp in items:
+        for group in groups:
+            times = [t for _, t in group]
+            if min(times) - window <= timestamp <= max(times) + window:
+                group.append((key, timestamp))
+                break
+        else:
+            groups.append([(key, timestamp)])
+    return [[key for key, _ in group] for group in groups]
+
+
+def legacy_similarity(samples1, samples2, keywords1, keywords2, hashtags1, hashtags2):
+    content1 = " ".join(samples1) if samples1 else ""
+    content2 = " ".join(samples2) if samples2 else ""
+    if not content1 or not content2:
+        return 0.0
+    tokens1 = set(content1.lower().split())
+    tokens2 = set(content2.lower().split())
+    if not tokens1 or not tokens2:
+        return 0.0
+    similarity = len(tokens1 & tokens2) / len(tokens1 | tokens2)
+    similarity += 0.1 * len(set(keywords1 or []) & set(keywords2 or []))
+    similarity += 0.1 * len(set(hashtags1 or []) & set(hashtags2 or []))
+    return min(similarity, 1.0)
+
+
+def test_matches_linear_scan_on_time_ordered_alerts():
+    rng = random.Random(11)
+    window = timedelta(minutes=45)
+    for _ in range(200):
+        times = sorted(START + timedelta(minutes=rng.choice([0, 1, 30, 45, 46, 90, 200]) * rng.random() * 10)
+                       for _ in range(rng.randint(1, 40)))
+        # Exact boundaries included
+        times += [times[-1] + window, times[-1] + window + window + timedelta(microseconds=1)]
+        items = list(enumerate(times))
+
+        groups = [[key for _, key in group.sorted_members()] for group in temporal_groups(items, window)]
+        assert groups == scan_groups(items, window)
+
+
+def test_out_of_order_alerts_join_and_merge_groups():
+    index = TemporalGroupIndex(15)
+    first = index.add("a", 100)
+    second = index.add("b", 140)
+    assert len(index) == 2 and first is not second
+
+    # Extends the second group backwards, keeping the gap to the first above the window
+    assert index.add("c", 125) is second and second.start == 125
+    # Within the window of both groups: they merge
+    merged = index.add("d", 112)
+    assert merged is first and len(index) == 1 and index.merges == 1
+    assert (merged.start, merged.end) == (100, 140)
+    assert [key for _, key in merged.sorted_members()] == ["a", "d", "c", "b"]
+
+    assert index.add("e", 50) is not merged
+    assert [(group.start, group.end) for group in index.groups()] == [(50, 50), (100, 140)]
+
+
+def test_groups_expire_by_end_time():
+    index = TemporalGroupIndex(timedelta(minutes=5), retention=timedelta(minutes=30))
+    early = index.add("a", START)
+    late = index.add("b", START + timedelta(minutes=20))
+    index.add("c", START + timedelta(minutes=2))
+
+    assert index.expire(START + timedelta(minutes=32)) == []
+    assert index.expire(START + timedelta(minutes=33)) == [early]
+    # A group extended later expires by its new end
+    index.add("d", START + timedelta(minutes=24))
+    assert index.expire(START + timedelta(minutes=52)) == []
+    assert index.expire(START + timedelta(minutes=55)) == [late]
+    assert len(index) == 0
+
+    # Expired groups are gone: a late alert starts a new group
+    assert len(index.add("e", START)) == 1
+
+
+def test_content_similarity_matches_previous_calculation():
+    rng = random.Random(3)
+    vocabulary = ["fake", "News", "india", "vote", "rally", "#tag", "protest", "  "]
+
+    def sample():
+        return rng.choice([None, [], [""], [" ".join(rng.choices(vocabulary, k=rng.randint(1, 8)))],
+                           [" ".join(rng.choices(vocabulary, k=3)), " ".join(rng.choices(vocabulary, k=3))]])
+
+    def tags():
+        return rng.choice([None, [], rng.sample(vocabulary, rng.randint(1, 3))])
+
+    for _ in range(2000):
+        args = [sample(), sample(), tags(), tags(), tags(), tags()]
+        features1 = content_features(args[0], args[2], args[4])
+        features2 = content_features(args[1], args[3], args[5])
+        assert content_similarity(features1, features2) == pytest.approx(legacy_similarity(*args))
@@ -0,0 +1,172 @@
+"""Tests for compiled rule conditions and the candidate rule index."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.rule_engine import (
+    IndexKey, RuleIndex, compile_conditions, evaluate_conditions, index_key
+)
+
+FIELDS = ["platform", "event_type", "analysis.risk_score", "analysis.sentiment", "metrics.views", "content"]
+VALUES = {
+    "platform": ["twitter", "youtube", "telegram", None, 3],
+    "event_type": ["post", "comment", "share", ["post"]],
+    "analysis.risk_score": [0.1, 0.5, 0.6, 0.9, None, "high", True, float("nan")],
+    "analysis.sentiment": ["Pro-India", "Neutral", "Anti-India", None],
+    "metrics.views": [0, 10, 1000, 5000, None, 1000.0],
+    "content": ["Fake NEWS spreading", "hello", "", None, 42],
+}
+OPERAND_VALUES = VALUES["platform"] + VALUES["analysis.risk_score"] + VALUES["metrics.views"] + [
+    "fake", "^hello", "[unclosed", ["twitter", "youtube"], ("post", "share"), "", 0
+]
+OPERATORS = ["eq", "ne", "gt", "gte", "lt", "lte", "in", "contains", "regex", "unknown", None]
+
+
+def outcome(evaluate, conditions, data):
+    """Evaluate the way AlertRule.evaluate does: errors count as no match."""
+    try:
+        return bool(evaluate(conditions, data))
+    except Exception:
+        return False
+
+
+def random_conditions(rng, depth=0):
+    if depth < 3 and rng.random() < 0.4:
+        kind = rng.choice(["and", "and", "or", "not"])
+        if kind == "not":
+            return {"not": random_conditions(rng, depth + 1)}
+        return {kind: [random_conditions(rng, depth + 1) for _ in range(rng.randint(1, 4))]}
+    field = rng.choice(FIELDS)
+    operator = rng.choice(OPERATORS)
+    value = rng.choice(VALUES[field] + OPERAND_VALUES)
+    return {"field": field, "operator": operator, "value": value}
+
+
+def random_event(rng):
+    event = {}
+    for field in FIELDS:
+        if rng.random() < 0.3:
+            continue
+        target = event
+        *parents, key = field.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[key] = rng.choice(VALUES[field])
+    return event
+
+
+def test_compiled_conditions_match_interpreter():
+    rng = random.Random(13)
+    for _ in range(3000):
+        conditions = random_conditions(rng)
+        predicate = compile_conditions(conditions)
+        for _ in range(10):
+            event = random_event(rng)
+            assert outcome(lambda c, d: predicate(d), conditions, event) == \
+                outcome(evaluate_conditions, conditions, event), (conditions, event)
+
+
+def test_compiled_operators():
+    data = {"content": "Fake NEWS spreading", "analysis": {"risk_score": 0.7}, "tags": ["a"]}
+
+    assert compile_conditions({"field": "content", "operator": "regex", "value": r"fake\s+news"})(data)
+    assert compile_conditions({"field": "content", "operator": "contains", "value": "news"})(data)
+    assert not compile_conditions({"field": "content", "operator": "contains", "value": "NEWS"})(data)
+    assert compile_conditions({"field": "analysis.risk_score", "operator": "in", "value": [0.7, 0.8]})(data)
+    assert not compile_conditions({"field": "analysis.missing", "operator": "ne", "value": None})(data)
+    assert not compile_conditions({"field": "analysis.risk_score", "operator": "between", "value": 1})(data)
+    # A path through a non-dict value is treated as missing
+    assert compile_conditions({"field": "tags.0", "operator": "eq", "value": "a"})(data) is False
+
+    # Malformed conditions fail on evaluation, like the interpreter
+    for conditions in ({"field": "content", "operator": "regex", "value": "[unclosed"},
+                       {"and": 5},
+                       ["not", "a", "dict"],
+                       {"field": "analysis.risk_score", "operator": "gt", "value": "high"}):
+        with pytest.raises(Exception):
+            compile_conditions(conditions)(data)
+
+
+def test_index_key_selection():
+    assert index_key({"and": [
+        {"field": "analysis.risk_score", "operator": "gte", "value": 0.6},
+        {"and": [{"field": "platform", "operator": "eq", "value": "twitter"}]}
+    ]}) == IndexKey("platform", "eq", "twitter")
+    assert index_key({"field": "metrics.views", "operator": "lt", "value": 10}) == IndexKey("metrics.views", "lt", 10)
+
+    # Nothing is required under or/not, and unhashable or non-numeric operands are skipped
+    assert index_key({"or": [{"field": "platform", "operator": "eq", "value": "twitter"}]}) is None
+    assert index_key({"not": {"field": "platform", "operator": "eq", "value": "twitter"}}) is None
+    assert index_key({"and": [
+        {"field": "platform", "operator": "eq", "value": ["twitter"]},
+        {"field": "score", "operator": "gte", "value": float("nan")},
+        {"field": "score", "operator": "gte", "value": "0.5"},
+        {"field": "content", "operator": "contains", "value": "fake"}
+    ]}) is None
+
+
+@pytest.mark.parametrize("operator, expected", [
+    ("gte", ["r0.5", "r0.6", "r0.6b"]),
+    ("gt", ["r0.5"]),
+    ("lte", ["r0.6", "r0.6b", "r0.9"]),
+    ("lt", ["r0.9"]),
+])
+def test_threshold_candidates(operator, expected):
+    index = RuleIndex()
+    for rule_id, threshold in [("r0.9", 0.9), ("r0.5", 0.5), ("r0.6", 0.6), ("r0.6b", 0.6)]:
+        index.add(rule_id, {"field": "score", "operator": operator, "value": threshold})
+
+    assert sorted(index.candidates({"score": 0.6})) == sorted(expected)
+    assert index.candidates({"score": None}) == []
+    assert index.candidates({"score": "0.6"}) == []
+
+
+def test_index_add_remove_and_order():
+    index = RuleIndex()
+    index.add("twitter", {"field": "platform", "operator": "eq", "value": "twitter"})
+    index.add("catch_all", {"field": "content", "operator": "contains", "value": "fake"})
+    index.add("views", {"field": "metrics.views", "operator": "gte", "value": 1000})
+    index.add("twitter_views", {"and": [
+        {"field": "metrics.views", "operator": "gte", "value": 10},
+        {"field": "platform", "operator": "eq", "value": "twitter"}
+    ]})
+
+    event = {"platform": "twitter", "metrics": {"views": 5000}}
+    assert index.candidates(event) == ["twitter", "catch_all", "views", "twitter_views"]
+    assert index.candidates({"platform": "youtube"}) == ["catch_all"]
+    assert index.candidates({"platform": ["twitter"]}) == ["catch_all"]
+    assert index.get_stats() == {"rules": 4, "equality_indexed": 2, "threshold_indexed": 1, "unindexed": 1}
+
+    index.remove("twitter")
+    index.remove("views")
+    index.remove("missing")
+    assert index.candidates(event) == ["catch_all", "twitter_views"]
+
+    # Re-adding replaces the previous entry and moves the rule to the end
+    index.add("catch_all", {"field": "platform", "operator": "eq", "value": "youtube"})
+    assert index.candidates(event) == ["twitter_views"]
+    assert index.candidates({"platform": "youtube"}) == ["catch_all"]
+    assert len(index) == 2 and "views" not in index
+
+
+def test_index_never_drops_a_matching_rule():
+    rng = random.Random(29)
+    rules = {f"rule{i}": random_conditions(rng) for i in range(400)}
+    index = RuleIndex()
+    for rule_id, conditions in rules.items():
+        index.add(rule_id, conditions)
+
+    pruned = 0
+    for _ in range(500):
+        event = random_event(rng)
+        candidates = index.candidates(event)
+        matching = [rule_id for rule_id, conditions in rules.items()
+                    if outcome(evaluate_conditions, conditions, event)]
+        assert [rule_id for rule_id in candidates if rule_id in matching] == matching
+        pruned += len(rules) - len(candidates)
+    assert pruned > 0
@@ -0,0 +1,95 @@
+"""Tests for the MinHash-LSH similar-alert index."""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.similarity_index import SimilarAlertIndex, jaccard_similarity, shingle_hashes
+
+NOW = datetime(2024, 3, 10, 12, 0)
+WORDS = [f"word{i}" for i in range(5000)]
+
+
+def story(rng, length=60):
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def edit(text, rng, words=1):
+    tokens = text.split()
+    for _ in range(words):
+        tokens[rng.randrange(len(tokens))] = rng.choice(WORDS)
+    return " ".join(tokens)
+
+
+def test_shingles_and_jaccard():
+    assert len(shingle_hashes("Fake news, fake NEWS!", 3)) == 2
+    assert len(shingle_hashes("two words", 3)) == 1
+    assert len(shingle_hashes("   ")) == 0
+
+    a = shingle_hashes("the quick brown fox jumps over the lazy dog")
+    b = shingle_hashes("The quick brown fox jumps over the LAZY dog.")
+    c = shingle_hashes("the quick brown cat jumps over the lazy dog")
+    assert jaccard_similarity(a, b) == 1.0
+    assert jaccard_similarity(a, c) == pytest.approx(4 / 10)
+    assert jaccard_similarity(a, np.empty(0, dtype=np.uint32)) == 0.0
+
+
+def test_finds_near_duplicates_within_scope():
+    rng = random.Random(3)
+    index = SimilarAlertIndex(window_seconds=1800)
+    stories = [story(rng) for _ in range(200)]
+    for i, text in enumerate(stories):
+        index.add(f"group{i}", ("high_risk", "twitter"), text, NOW)
+
+    match = index.find_similar(("high_risk", "twitter"), edit(stories[42], rng), NOW)
+    assert match is not None and match[0] == "group42" and match[1] >= 0.85
+
+    # Same content on another platform or of another type is a different scope
+    assert index.find_similar(("high_risk", "youtube"), stories[42], NOW) is None
+    assert index.find_similar(("high_risk", "twitter"), story(rng), NOW) is None
+    assert index.find_similar(("high_risk", "twitter"), "", NOW) is None
+    # Only a handful of groups are verified, not all 200
+    assert index.stats.candidates_checked < 20
+
+
+def test_groups_expire_with_their_time_bucket():
+    rng = random.Random(5)
+    index = SimilarAlertIndex(window_seconds=600, bucket_count=6)
+    old, kept = story(rng), story(rng)
+    index.add("old", "scope", old, NOW)
+    index.add("kept", "scope", kept, NOW)
+
+    index.touch("kept", NOW + timedelta(minutes=8))
+    later = NOW + timedelta(minutes=12)
+    assert index.find_similar("scope", old, later) is None
+    assert index.expire(later) == ["old"]
+    assert "old" not in index and "kept" in index
+    assert index.find_similar("scope", kept, later)[0] == "kept"
+
+    assert index.expire(NOW + timedelta(minutes=30)) == ["kept"]
+    assert len(index) == 0 and index.get_stats()["time_buckets"] == 0
+
+
+def test_least_recently_seen_groups_are_evicted_over_capacity():
+    rng = random.Random(7)
+    index = SimilarAlertIndex(window_seconds=1800, max_groups=3)
+    texts = {key: story(rng) for key in "abcd"}
+    for key in "abc":
+        assert index.add(key, "scope", texts[key], NOW) == []
+    index.touch("a", NOW)
+
+    assert index.add("d", "scope", texts["d"], NOW) == ["b"]
+    assert index.find_similar("scope", texts["b"], NOW) is None
+    assert index.find_similar("scope", texts["a"], NOW)[0] == "a"
+
+    # Removed and re-added groups match their new content only
+    index.add("a", "scope", texts["b"], NOW)
+    assert index.find_similar("scope", texts["b"], NOW)[0] == "a"
+    assert index.find_similar("scope", texts["a"], NOW) is None
+    assert index.stats.evicted_groups == 1
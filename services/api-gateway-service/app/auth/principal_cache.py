@@ -0,0 +1,184 @@
+"""Cache of resolved principals (user record plus permissions) keyed by access token."""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class PrincipalCache:
+    """Two-level cache of principals so authenticated requests skip the user lookups.
+
+    Entries are keyed by a digest of the access token and live in an in-process
+    LRU with a TTL, backed by Redis so replicas share what others resolved.
+    Changing a user's role or permissions calls ``invalidate_user``, which drops
+    the user's entries here and in Redis and publishes the user id so other
+    replicas drop their local copies too. If Redis is unavailable the cache
+    falls back to local entries only; the TTL bounds how stale any entry can get.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 10000,
+        key_prefix: str = "principal",
+        enabled: bool = True
+    ):
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.key_prefix = key_prefix
+        self.channel = f"{key_prefix}:invalidate"
+        self.enabled = enabled and ttl_seconds > 0
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._user_tokens: Dict[int, Set[str]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        # Bumped by every invalidation, so a lookup that raced one is not cached
+        self.version = 0
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+    @staticmethod
+    def token_id(token: str) -> str:
+        """Stable id for a token that does not keep the token itself in memory or Redis."""
+        return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+    def _redis_key(self, token_id: str) -> str:
+        return f"{self.key_prefix}:token:{token_id}"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.key_prefix}:user:{user_id}"
+
+    def _store_local(self, token_id: str, user_id: int, principal: Dict[str, Any], expires_at: float) -> None:
+        self._entries[token_id] = (user_id, principal, expires_at)
+        self._entries.move_to_end(token_id)
+        self._user_tokens.setdefault(user_id, set()).add(token_id)
+        while len(self._entries) > self.max_entries:
+            self._drop_local(next(iter(self._entries)))
+
+    def _drop_local(self, token_id: str) -> None:
+        user_id, _, _ = self._entries.pop(token_id)
+        tokens = self._user_tokens.get(user_id)
+        if tokens is not None:
+            tokens.discard(token_id)
+            if not tokens:
+                del self._user_tokens[user_id]
+
+    async def get(self, token_id: str) -> Optional[Dict[str, Any]]:
+        """Cached principal for a token, or None."""
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        entry = self._entries.get(token_id)
+        if entry is not None:
+            if entry[2] > now:
+                self._entries.move_to_end(token_id)
+                self.stats["local_hits"] += 1
+                return entry[1]
+            self._drop_local(token_id)
+
+        if self.redis_client is not None:
+            try:
+                cached = await self.redis_client.get(self._redis_key(token_id))
+            except Exception as e:
+                logger.warning("Principal cache read failed", error=str(e))
+                cached = None
+            if cached is not None:
+                principal = json.loads(cached)
+                self._store_local(token_id, principal["id"], principal, now + self.ttl_seconds)
+                self.stats["redis_hits"] += 1
+                return principal
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, token_id: str, principal: Dict[str, Any], version: Optional[int] = None) -> None:
+        """Cache a resolved principal; ``principal["id"]`` is the user id.
+
+        Pass the ``version`` read before the principal was loaded: if a user was
+        invalidated in between, the principal may be stale and is not cached.
+        """
+        if not self.enabled or (version is not None and version != self.version):
+            return
+
+        user_id = principal["id"]
+        self._store_local(token_id, user_id, principal, time.monotonic() + self.ttl_seconds)
+        if self.redis_client is None:
+            return
+
+        ttl_ms = int(self.ttl_seconds * 1000)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.set(self._redis_key(token_id), json.dumps(principal), px=ttl_ms)
+            pipe.sadd(self._user_key(user_id), token_id)
+            pipe.pexpire(self._user_key(user_id), ttl_ms)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("Principal cache write failed", error=str(e))
+
+    def drop_local_user(self, user_id: int) -> None:
+        """Forget this replica's entries for a user."""
+        self.version += 1
+        for token_id in list(self._user_tokens.get(user_id, ())):
+            self._drop_local(token_id)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Drop a user's cached principals everywhere after their role or permissions change."""
+        self.stats["invalidations"] += 1
+        self.drop_local_user(user_id)
+        if self.redis_client is None:
+            return
+
+        try:
+            user_key = self._user_key(user_id)
+            token_ids = await self.redis_client.smembers(user_key)
+            pipe = self.redis_client.pipeline(transaction=False)
+            for token_id in token_ids:
+                if isinstance(token_id, bytes):
+                    token_id = token_id.decode()
+                pipe.delete(self._redis_key(token_id))
+            pipe.delete(user_key)
+            pipe.publish(self.channel, str(user_id))
+            await pipe.execute()
+        except Exception as e:
+            logger.error("Principal cache invalidation failed", user_id=user_id, error=str(e))
+
+    async def listen(self) -> None:
+        """Drop local entries for users invalidated on other replicas."""
+        pubsub = self.redis_client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    self.drop_local_user(int(message["data"]))
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await pubsub.aclose()
+
+    def start(self, redis_client=None) -> None:
+        """Attach Redis and start listening for invalidations from other replicas."""
+        if redis_client is not None:
+            self.redis_client = redis_client
+        if self.enabled and self.redis_client is not None and self._listener is None:
+            self._listener = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        """Stop the invalidation listener."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
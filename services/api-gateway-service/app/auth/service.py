@@ -5,18 +5,27 @@ from datetime import datetime
 from fastapi import HTTPException, status
 import structlog
 
+from ..core.config import settings
 from ..core.security import security_manager
 from ..core.database import db_manager, UserRepository
 from .models import LoginResponse, UserInfo, CurrentUser
+from .principal_cache import PrincipalCache
 
 logger = structlog.get_logger()
 
+# Principals resolved from access tokens, shared with the RBAC service for invalidation
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.security_principal_cache_ttl,
+    max_entries=settings.security_principal_cache_max_entries
+)
+
 
 class AuthenticationService:
     """Handles user authentication operations."""
     
     def __init__(self):
         self.user_repo = UserRepository(db_manager)
+        self.principal_cache = principal_cache
     
     async def authenticate_user(self, username: str, password: str) -> Optional[dict]:
         """Authenticate user with username and password."""
@@ -143,6 +152,13 @@ class AuthenticationService:
         """Get current user from access token."""
         token_data = security_manager.verify_token(token, "access")
         
+        # Signature and expiry are checked on every request; only the lookups are cached
+        token_id = self.principal_cache.token_id(token)
+        cached = await self.principal_cache.get(token_id)
+        if cached is not None:
+            return CurrentUser(**cached)
+        cache_version = self.principal_cache.version
+        
         user = await self.user_repo.get_user_by_id(token_data.user_id)
         if not user:
             raise HTTPException(
@@ -152,7 +168,7 @@ class AuthenticationService:
         
         permissions = await self.user_repo.get_user_permissions(user["id"])
         
-        return CurrentUser(
+        current_user = CurrentUser(
             id=user["id"],
             username=user["username"],
             email=user["email"],
@@ -161,6 +177,8 @@ class AuthenticationService:
             full_name=user.get("full_name"),
             department=user.get("department")
         )
+        await self.principal_cache.set(token_id, current_user.model_dump(), cache_version)
+        return current_user
     
     async def register_user(self, user_data: dict) -> UserInfo:
         """Register new user (admin only)."""
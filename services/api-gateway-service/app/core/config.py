@@ -27,6 +27,11 @@ class APIGatewaySettings(BaseSettings):
     security_algorithm: str = Field(default="HS256", description="JWT algorithm")
     security_access_token_expire_minutes: int = Field(default=30, description="Access token expiration")
     security_refresh_token_expire_days: int = Field(default=7, description="Refresh token expiration")
+    security_principal_cache_ttl: float = Field(default=60.0, description="Seconds a resolved user is cached, 0 disables")
+    security_principal_cache_max_entries: int = Field(default=10000, description="Tokens cached per replica")
+    security_audit_batch_size: int = Field(default=500, description="Audit events per insert")
+    security_audit_flush_interval: float = Field(default=1.0, description="Seconds between audit flushes")
+    security_audit_max_pending: int = Field(default=10000, description="Queued audit events before callers flush")
     
     # Rate limiting settings
     rate_limit_default_rate_limit: str = Field(default="100/minute", description="Default rate limit")
@@ -34,6 +39,9 @@ class APIGatewaySettings(BaseSettings):
     rate_limit_admin_rate_limit: str = Field(default="1000/minute")
     rate_limit_analyst_rate_limit: str = Field(default="500/minute")
     rate_limit_viewer_rate_limit: str = Field(default="100/minute")
+    rate_limit_algorithm: str = Field(default="sliding_log", description="sliding_log or gcra")
+    rate_limit_local_precheck: bool = Field(default=True, description="Reject floods in-process before Redis")
+    rate_limit_local_max_keys: int = Field(default=10000, description="Clients tracked by the local pre-check")
     
     # Database settings
     db_postgresql_url: str = Field(default="postgresql://localhost:5432/dharma")
@@ -45,6 +53,9 @@ class APIGatewaySettings(BaseSettings):
     service_alert_management_url: str = Field(default="http://alert-management-service:8003")
     service_dashboard_url: str = Field(default="http://dashboard-service:8004")
     service_health_check_timeout: int = Field(default=5, description="Health check timeout in seconds")
+    service_streaming_enabled: bool = Field(default=True, description="Relay upstream responses without buffering")
+    service_http2: bool = Field(default=False, description="Use HTTP/2 to upstreams (needs httpx[http2])")
+    service_hedging_enabled: bool = Field(default=True, description="Send slow idempotent GETs a second time")
     
     class Config:
         env_file = ".env"
@@ -1,5 +1,6 @@
 """Rate limiting middleware using slowapi and Redis."""
 
+import math
 from typing import Optional
 from fastapi import Request, HTTPException, status
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -10,6 +11,7 @@ import structlog
 
 from ..core.config import settings
 from ..auth.dependencies import get_current_user
+from .redis_rate_limiter import RateLimitResult, RedisRateLimiter
 
 logger = structlog.get_logger()
 
@@ -72,6 +74,12 @@ class RateLimitMiddleware:
     
     def __init__(self):
         self.redis_client = redis_client
+        self.limiter = RedisRateLimiter(
+            redis_client,
+            algorithm=settings.rate_limit_algorithm,
+            local_precheck=settings.rate_limit_local_precheck,
+            local_max_keys=settings.rate_limit_local_max_keys
+        )
     
     async def __call__(self, request: Request, call_next):
         """Process request with rate limiting."""
@@ -83,21 +91,30 @@ class RateLimitMiddleware:
             rate_limit = get_rate_limit_for_user(request)
             
             # Check rate limit
-            if await self.is_rate_limited(user_key, rate_limit):
+            result = await self.check_rate_limit(user_key, rate_limit)
+            if not result.allowed:
                 logger.warning(
                     "Rate limit exceeded",
                     user_key=user_key,
                     rate_limit=rate_limit,
-                    path=request.url.path
+                    path=request.url.path,
+                    source=result.source
                 )
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     detail="Rate limit exceeded. Please try again later.",
-                    headers={"Retry-After": "60"}
+                    headers={
+                        "Retry-After": str(max(1, math.ceil(result.retry_after))),
+                        "X-RateLimit-Limit": str(result.limit),
+                        "X-RateLimit-Remaining": "0"
+                    }
                 )
             
             # Process request
             response = await call_next(request)
+            if result.limit:
+                response.headers["X-RateLimit-Limit"] = str(result.limit)
+                response.headers["X-RateLimit-Remaining"] = str(result.remaining)
             return response
             
         except HTTPException:
@@ -107,46 +124,14 @@ class RateLimitMiddleware:
             # Don't block requests if rate limiting fails
             return await call_next(request)
     
+    async def check_rate_limit(self, user_key: str, rate_limit: str) -> RateLimitResult:
+        """Count the request and check it against the limit in one Redis round trip."""
+        return await self.limiter.check(user_key, rate_limit)
+    
     async def is_rate_limited(self, user_key: str, rate_limit: str) -> bool:
         """Check if user is rate limited."""
-        try:
-            # Parse rate limit (e.g., "100/minute")
-            limit_parts = rate_limit.split("/")
-            if len(limit_parts) != 2:
-                return False
-            
-            max_requests = int(limit_parts[0])
-            time_window = limit_parts[1]
-            
-            # Convert time window to seconds
-            window_seconds = {
-                "second": 1,
-                "minute": 60,
-                "hour": 3600,
-                "day": 86400
-            }.get(time_window, 60)
-            
-            # Use sliding window rate limiting
-            redis_key = f"rate_limit:{user_key}:{time_window}"
-            
-            # Get current count
-            current_count = await self.redis_client.get(redis_key)
-            current_count = int(current_count) if current_count else 0
-            
-            if current_count >= max_requests:
-                return True
-            
-            # Increment counter
-            pipe = self.redis_client.pipeline()
-            pipe.incr(redis_key)
-            pipe.expire(redis_key, window_seconds)
-            await pipe.execute()
-            
-            return False
-            
-        except Exception as e:
-            logger.error("Rate limit check error", error=str(e))
-            return False
+        result = await self.check_rate_limit(user_key, rate_limit)
+        return not result.allowed
 
 
 # Global rate limit middleware instance
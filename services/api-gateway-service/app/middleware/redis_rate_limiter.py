@@ -0,0 +1,206 @@
+"""Atomic Redis rate limiter backends with an optional local token-bucket pre-check."""
+
+import itertools
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+WINDOW_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400
+}
+
+# Sliding-window log: one sorted-set member per allowed request in the window.
+# KEYS[1] = log key; ARGV = now_ms, window_ms, limit, member
+SLIDING_LOG_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return {1, limit - count - 1, 0}
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {0, 0, tonumber(oldest[2]) + window - now}
+"""
+
+# Generic cell rate algorithm: one theoretical arrival time (TAT) per key.
+# KEYS[1] = TAT key; ARGV = now_ms, window_ms, limit
+GCRA_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local interval = window / limit
+
+local tat = tonumber(redis.call('GET', key)) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if now < allow_at then
+    return {0, 0, math.ceil(allow_at - now)}
+end
+
+redis.call('SET', key, string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((window - (new_tat - now)) / interval), 0}
+"""
+
+SCRIPTS = {
+    "sliding_log": SLIDING_LOG_SCRIPT,
+    "gcra": GCRA_SCRIPT
+}
+
+
+@lru_cache(maxsize=64)
+def parse_rate_limit(rate_limit: str) -> Optional[Tuple[int, int]]:
+    """Parse a limit such as "100/minute" into (requests, window seconds).
+
+    Unknown periods count as a minute, as before; malformed limits return None.
+    """
+    limit_parts = rate_limit.split("/")
+    if len(limit_parts) != 2:
+        return None
+    try:
+        max_requests = int(limit_parts[0])
+    except ValueError:
+        return None
+    if max_requests <= 0:
+        return None
+    return max_requests, WINDOW_SECONDS.get(limit_parts[1], 60)
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of one rate limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Seconds until a request may be allowed, 0 if allowed
+    source: str = "redis"  # "redis", "local" or "error"
+
+
+class LocalTokenBucket:
+    """In-process token buckets that reject obvious floods before Redis is asked.
+
+    Each key gets a bucket of ``limit`` tokens refilled at ``limit / window``. A
+    bucket never rejects a request the shared limit would allow: a token is only
+    kept for requests Redis allowed, and no sliding window or GCRA limit admits
+    more than the bucket does. When Redis rejects a request, the key is also held
+    until the retry time Redis reported, since no request can pass before then.
+    Buckets are kept for the ``max_keys`` most recently seen keys; a dropped
+    bucket starts full again.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def acquire(self, key: str, limit: int, window_seconds: float, now: float) -> float:
+        """Take a token; returns 0 on success, otherwise seconds until one is available."""
+        rate = limit / window_seconds
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(limit), now, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            if now < bucket[2]:
+                return bucket[2] - now
+            bucket[0] = min(float(limit), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    def reject(self, key: str, limit: int, until: float) -> None:
+        """Return the token of a request the shared limit rejected and hold the key until ``until``."""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket[0] = min(float(limit), bucket[0] + 1)
+            bucket[2] = max(bucket[2], until)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RedisRateLimiter:
+    """Rate limiter that decides each request with a single EVALSHA.
+
+    The check and the update run in one Lua script, so concurrent requests cannot
+    both pass on the same remaining slot, and there is one round trip per request.
+    ``sliding_log`` enforces at most ``limit`` requests in any window; ``gcra``
+    keeps one timestamp per key and allows bursts of up to ``limit``.
+
+    Timestamps come from the gateway clock, so gateway hosts should be NTP-synced.
+    Redis errors fail open, like the middleware always has.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        algorithm: str = "sliding_log",
+        key_prefix: str = "rate_limit",
+        local_precheck: bool = True,
+        local_max_keys: int = 10000
+    ):
+        if algorithm not in SCRIPTS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        self.redis_client = redis_client
+        self.algorithm = algorithm
+        self.key_prefix = key_prefix
+        self.script = redis_client.register_script(SCRIPTS[algorithm])
+        self.local_buckets = LocalTokenBucket(local_max_keys) if local_precheck else None
+
+        # Sorted-set members must be unique across gateway instances
+        self._member_prefix = os.urandom(4).hex()
+        self._member_counter = itertools.count()
+
+    async def check(self, user_key: str, rate_limit: str, now: Optional[float] = None) -> RateLimitResult:
+        """Count a request against the limit and report whether it is allowed."""
+        parsed = parse_rate_limit(rate_limit)
+        if parsed is None:
+            return RateLimitResult(True, 0, 0, 0.0, source="error")
+        max_requests, window_seconds = parsed
+        now = time.time() if now is None else now
+
+        if self.local_buckets is not None:
+            wait = self.local_buckets.acquire(user_key, max_requests, window_seconds, now)
+            if wait:
+                return RateLimitResult(False, max_requests, 0, wait, source="local")
+
+        redis_key = f"{self.key_prefix}:{self.algorithm}:{user_key}:{window_seconds}"
+        now_ms = int(now * 1000)
+        args = [now_ms, window_seconds * 1000, max_requests]
+        if self.algorithm == "sliding_log":
+            args.append(f"{now_ms}:{self._member_prefix}:{next(self._member_counter)}")
+
+        try:
+            allowed, remaining, retry_after_ms = await self.script(keys=[redis_key], args=args)
+        except Exception as e:
+            logger.error("Rate limit check error", error=str(e))
+            return RateLimitResult(True, max_requests, max_requests, 0.0, source="error")
+
+        retry_after = max(int(retry_after_ms), 0) / 1000
+        if not allowed and self.local_buckets is not None:
+            self.local_buckets.reject(user_key, max_requests, now + retry_after)
+        return RateLimitResult(bool(allowed), max_requests, int(remaining), retry_after)
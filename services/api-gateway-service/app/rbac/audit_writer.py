@@ -0,0 +1,156 @@
+"""Batched audit log writer."""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+AUDIT_COLUMNS = (
+    "user_id", "action", "resource_type", "resource_id", "details",
+    "ip_address", "user_agent", "success", "timestamp"
+)
+
+AuditRow = Tuple[Any, ...]
+
+
+def build_insert_query(row_count: int) -> str:
+    """Multi-row INSERT for ``row_count`` audit rows."""
+    width = len(AUDIT_COLUMNS)
+    values = ", ".join(
+        "(" + ", ".join(f"${row * width + column + 1}" for column in range(width)) + ")"
+        for row in range(row_count)
+    )
+    return f"INSERT INTO audit_logs ({', '.join(AUDIT_COLUMNS)}) VALUES {values}"
+
+
+class AuditLogWriter:
+    """Queues audit events and writes them in multi-row inserts.
+
+    Once ``start`` has been called, events are written by a background task
+    whenever ``batch_size`` rows are queued or every ``flush_interval`` seconds,
+    so requests never wait on the insert. Each row keeps the time the event was
+    logged. When ``max_pending`` rows are waiting (the database is slow or
+    down), the caller flushes itself, which pushes back on request
+    throughput instead of growing the queue. Without a running writer every
+    event is written immediately, as before.
+    """
+
+    def __init__(
+        self,
+        get_connection: Callable[[], AsyncContextManager],
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000
+    ):
+        self.get_connection = get_connection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: List[AuditRow] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._queries: Dict[int, str] = {}
+        self.stats = {"logged": 0, "written": 0, "batches": 0, "failed": 0, "dropped": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def log(
+        self,
+        user_id: int,
+        action: str,
+        resource_type: str,
+        resource_id: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        success: bool = True
+    ) -> bool:
+        """Queue an audit event; returns False only if it was written inline and failed."""
+        row = (
+            user_id, action, resource_type, resource_id, details,
+            ip_address, user_agent, success, datetime.now(timezone.utc)
+        )
+        self.stats["logged"] += 1
+        if not self.running:
+            return await self._write([row])
+
+        self._pending.append(row)
+        if len(self._pending) >= self.max_pending:
+            return await self.flush()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> bool:
+        """Write every queued event now."""
+        async with self._flush_lock:
+            ok = True
+            while self._pending:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                if not await self._write(batch):
+                    ok = False
+                    self._requeue(batch)
+                    break
+            return ok
+
+    async def _write(self, batch: List[AuditRow]) -> bool:
+        query = self._queries.get(len(batch))
+        if query is None:
+            query = self._queries[len(batch)] = build_insert_query(len(batch))
+        args = [value for row in batch for value in row]
+        try:
+            async with self.get_connection() as conn:
+                await conn.execute(query, *args)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error("Failed to write audit events", count=len(batch), error=str(e))
+            return False
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        return True
+
+    def _requeue(self, batch: List[AuditRow]) -> None:
+        """Put a failed batch back for the next flush, dropping the oldest rows past max_pending."""
+        self._pending[:0] = batch
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.stats["dropped"] += overflow
+            logger.error("Dropped audit events", count=overflow)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start writing events from a background task."""
+        if not self.running:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write what is still queued."""
+        if self._task is not None:
+            # Let a write in progress finish rather than cancelling it halfway
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def __len__(self) -> int:
+        return len(self._pending)
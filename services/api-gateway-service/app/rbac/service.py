@@ -4,8 +4,11 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 import structlog
 
+from ..core.config import settings
 from ..core.database import db_manager
 from ..auth.models import CurrentUser
+from ..auth.service import principal_cache
+from .audit_writer import AuditLogWriter
 from .models import (
     Role, Permission, PermissionCheck, PermissionResult, 
     AuditLogEntry, DEFAULT_ROLE_PERMISSIONS
@@ -19,6 +22,12 @@ class RBACService:
     
     def __init__(self):
         self.db = db_manager
+        self.audit_writer = AuditLogWriter(
+            lambda: self.db.get_pg_connection(),
+            batch_size=settings.security_audit_batch_size,
+            flush_interval=settings.security_audit_flush_interval,
+            max_pending=settings.security_audit_max_pending
+        )
     
     async def check_permission(
         self, 
@@ -168,6 +177,7 @@ class RBACService:
                     "UPDATE users SET role = $1, updated_at = CURRENT_TIMESTAMP WHERE id = $2",
                     new_role.value, user_id
                 )
+                await principal_cache.invalidate_user(user_id)
                 
                 # Log audit event
                 await self.log_audit_event(
@@ -226,6 +236,7 @@ class RBACService:
                     "UPDATE users SET permissions = $1, updated_at = CURRENT_TIMESTAMP WHERE id = $2",
                     new_perms, user_id
                 )
+                await principal_cache.invalidate_user(user_id)
                 
                 # Log audit event
                 await self.log_audit_event(
@@ -273,25 +284,21 @@ class RBACService:
         user_agent: Optional[str] = None,
         success: bool = True
     ) -> bool:
-        """Log audit event."""
-        try:
-            async with self.db.get_pg_connection() as conn:
-                query = """
-                    INSERT INTO audit_logs 
-                    (user_id, action, resource_type, resource_id, details, 
-                     ip_address, user_agent, success, timestamp)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, CURRENT_TIMESTAMP)
-                """
-                await conn.execute(
-                    query,
-                    user_id, action, resource_type, resource_id,
-                    details, ip_address, user_agent, success
-                )
-                return True
-                
-        except Exception as e:
-            logger.error("Failed to log audit event", error=str(e))
-            return False
+        """Log audit event.
+        
+        Events are queued and written in batches by the audit writer, so the
+        caller does not wait for the insert.
+        """
+        return await self.audit_writer.log(
+            user_id=user_id,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            details=details,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            success=success
+        )
     
     async def get_audit_logs(
         self,
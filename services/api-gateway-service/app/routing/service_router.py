@@ -1,14 +1,20 @@
 """Service routing and circuit breaker implementation."""
 
 import asyncio
+from dataclasses import replace
 from typing import Dict, Any, Optional
 from enum import Enum
 import httpx
 from fastapi import HTTPException, status, Request
+from fastapi.responses import StreamingResponse
 import structlog
 from datetime import datetime, timedelta
 
 from ..core.config import settings
+from .upstream import (
+    DEFAULT_UPSTREAM_POOLS, IDEMPOTENT_METHODS, UpstreamPoolConfig, create_upstream_client,
+    filter_headers, relay_response, send_hedged
+)
 
 logger = structlog.get_logger()
 
@@ -63,7 +69,7 @@ class ServiceRouter:
     """Routes requests to appropriate microservices."""
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.clients: Dict[str, httpx.AsyncClient] = {}
         self.circuit_breakers: Dict[str, CircuitBreaker] = {}
         self.service_urls = {
             "data-collection": settings.service_data_collection_url,
@@ -71,6 +77,22 @@ class ServiceRouter:
             "alert-management": settings.service_alert_management_url,
             "dashboard": settings.service_dashboard_url,
         }
+        self.pool_configs: Dict[str, UpstreamPoolConfig] = {
+            service_name: replace(
+                DEFAULT_UPSTREAM_POOLS.get(service_name, UpstreamPoolConfig()),
+                http2=settings.service_http2
+            )
+            for service_name in self.service_urls
+        }
+        self.hedged_requests = 0
+    
+    def get_client(self, service_name: str) -> httpx.AsyncClient:
+        """Get or create the pooled HTTP client for a service."""
+        client = self.clients.get(service_name)
+        if client is None:
+            config = self.pool_configs.get(service_name, UpstreamPoolConfig())
+            client = self.clients[service_name] = create_upstream_client(config)
+        return client
     
     def get_circuit_breaker(self, service_name: str) -> CircuitBreaker:
         """Get or create circuit breaker for service."""
@@ -111,18 +133,8 @@ class ServiceRouter:
         
         return service_mapping.get(service_path)
     
-    async def route_request(
-        self,
-        request: Request,
-        service_name: str,
-        path: str,
-        method: str,
-        headers: Dict[str, str],
-        body: Optional[bytes] = None,
-        params: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """Route request to target service with circuit breaker."""
-        
+    def _get_target_url(self, service_name: str, path: str) -> str:
+        """Check the circuit breaker and build the upstream URL for a request."""
         circuit_breaker = self.get_circuit_breaker(service_name)
         
         if not circuit_breaker.can_execute():
@@ -143,22 +155,37 @@ class ServiceRouter:
                 detail=f"Service {service_name} not found"
             )
         
-        # Construct target URL
-        target_url = f"{service_url.rstrip('/')}/{path.lstrip('/')}"
+        return f"{service_url.rstrip('/')}/{path.lstrip('/')}"
+    
+    async def _send(
+        self,
+        service_name: str,
+        path: str,
+        method: str,
+        headers: Dict[str, str],
+        body: Optional[bytes],
+        params: Optional[Dict[str, Any]],
+        stream: bool
+    ) -> httpx.Response:
+        """Send a request upstream, hedging idempotent GETs, and map failures to HTTP errors."""
+        target_url = self._get_target_url(service_name, path)
+        circuit_breaker = self.get_circuit_breaker(service_name)
+        client = self.get_client(service_name)
+        
+        def build_request() -> httpx.Request:
+            return client.build_request(
+                method=method,
+                url=target_url,
+                headers=headers,
+                params=params,
+                content=body or None
+            )
+        
+        hedge_delay = None
+        if settings.service_hedging_enabled and method.upper() in IDEMPOTENT_METHODS:
+            hedge_delay = self.pool_configs.get(service_name, UpstreamPoolConfig()).hedge_delay
         
         try:
-            # Prepare request
-            request_kwargs = {
-                "method": method,
-                "url": target_url,
-                "headers": headers,
-                "params": params
-            }
-            
-            if body:
-                request_kwargs["content"] = body
-            
-            # Make request
             logger.info(
                 "Routing request to service",
                 service=service_name,
@@ -167,18 +194,13 @@ class ServiceRouter:
                 target_url=target_url
             )
             
-            response = await self.client.request(**request_kwargs)
+            response, hedged = await send_hedged(client, build_request, hedge_delay, stream=stream)
+            if hedged:
+                self.hedged_requests += 1
             
             # Record success
             circuit_breaker.record_success()
-            
-            # Return response data
-            return {
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "content": response.content,
-                "json": response.json() if response.headers.get("content-type", "").startswith("application/json") else None
-            }
+            return response
             
         except httpx.TimeoutException:
             circuit_breaker.record_failure()
@@ -204,6 +226,46 @@ class ServiceRouter:
                 detail=f"Error communicating with service {service_name}"
             )
     
+    async def route_request(
+        self,
+        request: Request,
+        service_name: str,
+        path: str,
+        method: str,
+        headers: Dict[str, str],
+        body: Optional[bytes] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Route request to target service with circuit breaker, buffering the response."""
+        response = await self._send(service_name, path, method, headers, body, params, stream=False)
+        
+        # Return response data
+        return {
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "content": response.content,
+            "json": response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+        }
+    
+    async def stream_request(
+        self,
+        request: Request,
+        service_name: str,
+        path: str,
+        method: str,
+        headers: Dict[str, str],
+        body: Optional[bytes] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> StreamingResponse:
+        """Route request to target service and relay the response body as it arrives.
+        
+        Upstream bytes are passed through undecoded, so large exports and reports
+        are never held in memory or re-serialized by the gateway.
+        """
+        headers = dict(filter_headers(headers.items(), drop=("host", "content-length")))
+        response = await self._send(service_name, path, method, headers, body, params, stream=True)
+        return relay_response(response)
+    
     async def health_check_service(self, service_name: str) -> bool:
         """Check if service is healthy."""
         service_url = self.service_urls.get(service_name)
@@ -212,7 +274,7 @@ class ServiceRouter:
         
         try:
             health_url = f"{service_url.rstrip('/')}/health"
-            response = await self.client.get(
+            response = await self.get_client(service_name).get(
                 health_url,
                 timeout=settings.service_health_check_timeout
             )
@@ -224,10 +286,11 @@ class ServiceRouter:
     async def get_service_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all services."""
         status_info = {}
+        service_names = list(self.service_urls.keys())
+        health = await asyncio.gather(*(self.health_check_service(name) for name in service_names))
         
-        for service_name in self.service_urls.keys():
+        for service_name, is_healthy in zip(service_names, health):
             circuit_breaker = self.get_circuit_breaker(service_name)
-            is_healthy = await self.health_check_service(service_name)
             
             status_info[service_name] = {
                 "healthy": is_healthy,
@@ -239,8 +302,9 @@ class ServiceRouter:
         return status_info
     
     async def close(self):
-        """Close HTTP client."""
-        await self.client.aclose()
+        """Close HTTP clients."""
+        await asyncio.gather(*(client.aclose() for client in self.clients.values()))
+        self.clients.clear()
 
 
 # Global service router instance
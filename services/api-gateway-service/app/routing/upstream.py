@@ -0,0 +1,173 @@
+"""Upstream connection pools, hedged sends and streaming pass-through for the service router."""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import httpx
+import structlog
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+logger = structlog.get_logger()
+
+# Headers that describe one connection and must not be relayed by a proxy (RFC 9110 7.6.1)
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade"
+})
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass(frozen=True)
+class UpstreamPoolConfig:
+    """Connection pool and timeout settings for one upstream service."""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    http2: bool = False
+    hedge_delay: Optional[float] = None  # Seconds before a GET is sent again, None disables hedging
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+
+# Collection takes many small writes, analysis calls are slow model inference,
+# and dashboard reports and exports are few but large.
+DEFAULT_UPSTREAM_POOLS = {
+    "data-collection": UpstreamPoolConfig(
+        max_connections=200, max_keepalive_connections=50, read_timeout=15.0, hedge_delay=0.5
+    ),
+    "ai-analysis": UpstreamPoolConfig(
+        max_connections=100, max_keepalive_connections=20, read_timeout=60.0, hedge_delay=2.0
+    ),
+    "alert-management": UpstreamPoolConfig(
+        max_connections=100, max_keepalive_connections=20, read_timeout=15.0, hedge_delay=0.3
+    ),
+    "dashboard": UpstreamPoolConfig(
+        max_connections=50, max_keepalive_connections=10, keepalive_expiry=60.0, read_timeout=120.0,
+        hedge_delay=1.0
+    )
+}
+
+
+def create_upstream_client(config: UpstreamPoolConfig, **kwargs) -> httpx.AsyncClient:
+    """Create a client with the upstream's pool limits, falling back to HTTP/1.1 without h2."""
+    http2 = config.http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(limits=config.limits(), timeout=config.timeout(), http2=http2, **kwargs)
+
+
+def filter_headers(headers: Iterable[Tuple[str, str]], drop: Iterable[str] = ()) -> List[Tuple[str, str]]:
+    """Drop hop-by-hop headers, those named in Connection, and any extra names in ``drop``."""
+    headers = list(headers)
+    excluded = set(HOP_BY_HOP_HEADERS)
+    excluded.update(name.lower() for name in drop)
+    for name, value in headers:
+        if name.lower() == "connection":
+            excluded.update(token.strip().lower() for token in value.split(","))
+    return [(name, value) for name, value in headers if name.lower() not in excluded]
+
+
+async def _discard(tasks: Iterable[asyncio.Future]) -> None:
+    """Cancel losing attempts and close any response that arrived anyway."""
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, httpx.Response):
+            await result.aclose()
+
+
+async def send_hedged(
+    client: httpx.AsyncClient,
+    build_request: Callable[[], httpx.Request],
+    hedge_delay: Optional[float],
+    stream: bool = False
+) -> Tuple[httpx.Response, bool]:
+    """Send a request, sending a second copy if the first is slow or fails.
+
+    The copy goes out when the first attempt has not answered within
+    ``hedge_delay`` seconds, or straight away if it failed before then; the first
+    response wins and the other attempt is cancelled. Only use this for
+    idempotent requests. Returns the response and whether a copy was sent.
+    """
+    if hedge_delay is None:
+        return await client.send(build_request(), stream=stream), False
+
+    first = asyncio.ensure_future(client.send(build_request(), stream=stream))
+    try:
+        done, _ = await asyncio.wait({first}, timeout=hedge_delay)
+    except asyncio.CancelledError:
+        await _discard([first])
+        raise
+
+    error = None
+    pending = set()
+    if done:
+        if first.exception() is None:
+            return first.result(), False
+        error = first.exception()
+    else:
+        pending.add(first)
+    pending.add(asyncio.ensure_future(client.send(build_request(), stream=stream)))
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            responses = [task.result() for task in done if task.exception() is None]
+            if responses:
+                for response in responses[1:]:
+                    await response.aclose()
+                await _discard(pending)
+                return responses[0], True
+            error = next(iter(done)).exception()
+    except asyncio.CancelledError:
+        await _discard(pending)
+        raise
+    raise error
+
+
+def relay_response(response: httpx.Response) -> StreamingResponse:
+    """Relay a streamed upstream response to the client without decoding it.
+
+    The raw bytes are passed through as received, so Content-Encoding and
+    Content-Length stay valid. The upstream response is closed when the body is
+    done or the client goes away.
+    """
+    async def body():
+        try:
+            async for chunk in response.aiter_raw():
+                yield chunk
+        finally:
+            await response.aclose()
+
+    relayed = StreamingResponse(body(), status_code=response.status_code, background=BackgroundTask(response.aclose))
+    relayed.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1"))
+        for name, value in filter_headers(response.headers.multi_items())
+    ]
+    return relayed
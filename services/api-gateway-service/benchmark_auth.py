@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Benchmark authenticated request overhead: per-request lookups and audit inserts vs caching and batching.
+
+Runs the gateway's real authentication dependencies (``get_current_user`` and a
+``require_permissions`` checker) for many concurrent requests against a
+simulated PostgreSQL pool, where every query waits ``--query-ms`` and holds one
+of ``--pool-size`` connections like asyncpg does. Redis is fakeredis.
+
+* before: principal cache disabled, audit events inserted one per request.
+* after: principal cache (local LRU backed by Redis) and the batched audit
+  writer, as started in the gateway lifespan.
+
+Each mode first sends one request per user, then measures ``--requests``
+requests spread over the users. Reports requests/sec, p50/p99 latency and
+database statements per request.
+
+Usage:
+    python benchmark_auth.py
+    python benchmark_auth.py --requests 20000 --concurrency 200 --users 500 --query-ms 1
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import structlog
+from fakeredis.aioredis import FakeRedis
+from fastapi.security import HTTPAuthorizationCredentials
+
+os.environ.setdefault("SECURITY_SECRET_KEY", "benchmark-only")
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.auth.dependencies import get_current_user, require_permissions
+from app.auth.service import principal_cache
+from app.core.database import db_manager
+from app.core.security import security_manager
+from app.rbac.service import rbac_service
+
+
+class SimulatedConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def _query(self):
+        self.pool.statements += 1
+        await asyncio.sleep(self.pool.query_seconds)
+
+    async def fetchrow(self, query, user_id):
+        await self._query()
+        return {"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.org",
+                "role": "analyst", "is_active": True, "full_name": None, "department": None,
+                "permissions": [], "last_login": None, "created_at": None}
+
+    async def execute(self, query, *args):
+        await self._query()
+
+
+class SimulatedPool:
+    """Pool of ``size`` connections whose statements each take ``query_seconds``."""
+
+    def __init__(self, size, query_seconds):
+        self.connections = asyncio.Semaphore(size)
+        self.query_seconds = query_seconds
+        self.statements = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self.connections:
+            yield SimulatedConnection(self)
+
+
+async def run_mode(mode, args, tokens):
+    pool = SimulatedPool(args.pool_size, args.query_ms / 1000)
+    db_manager.pg_pool = pool
+    principal_cache._entries.clear()
+    principal_cache._user_tokens.clear()
+    principal_cache.enabled = mode == "after"
+    if mode == "after":
+        principal_cache.start(FakeRedis(decode_responses=True, max_connections=args.concurrency * 2))
+        rbac_service.audit_writer.start()
+
+    checker = require_permissions(["alerts:read"])
+    latencies = []
+
+    async def worker(queue, latencies):
+        while not queue.empty():
+            token = queue.get_nowait()
+            request = SimpleNamespace(
+                url=SimpleNamespace(path="/api/v1/alerts"),
+                client=SimpleNamespace(host="10.0.0.1"),
+                headers={"user-agent": "benchmark"}
+            )
+            began = time.perf_counter()
+            user = await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+            await checker(request, current_user=user)
+            latencies.append(time.perf_counter() - began)
+
+    async def run_requests(tokens_to_send, latencies):
+        queue = asyncio.Queue()
+        for token in tokens_to_send:
+            queue.put_nowait(token)
+        await asyncio.gather(*(worker(queue, latencies) for _ in range(args.concurrency)))
+
+    # One request per user first, so both modes are measured warm
+    await run_requests(tokens, [])
+    warm_statements = pool.statements
+
+    start = time.perf_counter()
+    await run_requests([tokens[i % len(tokens)] for i in range(args.requests)], latencies)
+    elapsed = time.perf_counter() - start
+
+    await principal_cache.stop()
+    await rbac_service.audit_writer.stop()
+    # Includes the audit rows still queued at the end, written by stop()
+    statements = pool.statements - warm_statements
+    latencies = np.array(latencies) * 1000
+    return {
+        "throughput": args.requests / elapsed,
+        "p50": np.percentile(latencies, 50),
+        "p99": np.percentile(latencies, 99),
+        "statements": statements / args.requests
+    }
+
+
+async def main_async(args):
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
+    tokens = [
+        security_manager.create_access_token({"sub": f"user{user_id}", "user_id": user_id, "role": "analyst"})
+        for user_id in range(1, args.users + 1)
+    ]
+    print(f"{args.requests} authenticated requests, {args.concurrency} concurrent, {args.users} users, "
+          f"{args.query_ms} ms per query, pool of {args.pool_size}:")
+    for mode in ("before", "after"):
+        result = await run_mode(mode, args, tokens)
+        print(f"  {mode:<7} {result['throughput']:9,.0f} req/s, p50 {result['p50']:6.2f} ms, "
+              f"p99 {result['p99']:6.2f} ms, {result['statements']:.3f} DB statements/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--query-ms', type=float, default=1.0)
+    parser.add_argument('--pool-size', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Benchmark gateway proxying of large responses: buffered JSON re-serialization vs streaming.
+
+Starts a local stub upstream that serves a JSON export of ``--size-mb`` MB and
+fetches it, each mode in a fresh process so peak RSS is comparable:
+
+* direct: httpx straight from the stub, the baseline.
+* buffered: ``ServiceRouter.route_request`` followed by the ``JSONResponse`` the
+  proxy endpoint used to build (read all, parse, re-serialize).
+* streaming: ``ServiceRouter.stream_request`` relaying raw bytes through a
+  ``StreamingResponse``.
+
+The gateway responses are driven as ASGI apps in-process, so the figures are
+the gateway's own cost without a client socket. Reports time to first byte,
+total time, gateway-added latency over direct, and peak RSS growth.
+
+Usage:
+    python benchmark_proxy.py
+    python benchmark_proxy.py --size-mb 100 --repeat 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+os.environ.setdefault("SECURITY_SECRET_KEY", "benchmark-only")
+sys.path.insert(0, os.path.dirname(__file__))
+
+MODES = ("direct", "buffered", "streaming")
+CHUNK_SIZE = 64 * 1024
+
+
+def make_export(size_mb):
+    record = b'{"id": 123456, "platform": "twitter", "sentiment": "neutral", "text": "' + b"x" * 120 + b'"}'
+    count = size_mb * 1024 * 1024 // (len(record) + 1)
+    return b"[" + b",".join([record] * count) + b"]"
+
+
+def start_stub_upstream(body):
+    """Serve ``body`` as JSON on a local port from a background thread, HTTP/1.1 keep-alive."""
+    ready = threading.Event()
+    port = []
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                if not request:
+                    break
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n" % len(body))
+                view = memoryview(body)
+                for start in range(0, len(body), CHUNK_SIZE):
+                    writer.write(view[start:start + CHUNK_SIZE])
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port.append(server.sockets[0].getsockname()[1])
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait()
+    return port[0]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def drive(response):
+    """Run an ASGI response and return (time to first body byte, bytes sent)."""
+    start = time.perf_counter()
+    first_byte = None
+    sent = 0
+
+    async def receive():
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first_byte, sent
+        chunk = message.get("body", b"")
+        if chunk and first_byte is None:
+            first_byte = time.perf_counter() - start
+        sent += len(chunk)
+
+    await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    return first_byte, sent
+
+
+async def fetch(mode, port, repeat):
+    import httpx
+    from fastapi.responses import JSONResponse
+    from app.routing.service_router import ServiceRouter
+
+    url = f"http://127.0.0.1:{port}"
+    router = ServiceRouter()
+    router.service_urls["dashboard"] = url
+    direct = httpx.AsyncClient(timeout=120)
+    baseline = peak_rss_mb()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if mode == "direct":
+            first_byte, received = None, 0
+            async with direct.stream("GET", f"{url}/reports/export") as response:
+                async for chunk in response.aiter_raw():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - start
+                    received += len(chunk)
+        elif mode == "buffered":
+            data = await router.route_request(None, "dashboard", "reports/export", "GET", {})
+            response = JSONResponse(content=data["json"], status_code=data["status_code"])
+            offset = time.perf_counter() - start
+            first_byte, received = await drive(response)
+            first_byte += offset
+            del data, response
+        else:
+            response = await router.stream_request(None, "dashboard", "reports/export", "GET", {})
+            offset = time.perf_counter() - start
+            first_byte, received = await drive(response)
+            first_byte += offset
+        timings.append((first_byte, time.perf_counter() - start, received))
+
+    await direct.aclose()
+    await router.close()
+    first_byte, total, received = min(timings, key=lambda timing: timing[1])
+    return {"first_byte": first_byte, "total": total, "bytes": received, "rss_growth": peak_rss_mb() - baseline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3, help="fetches per mode, the fastest is reported")
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(asyncio.run(fetch(args.mode, args.port, args.repeat))))
+        return
+
+    port = start_stub_upstream(make_export(args.size_mb))
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--port", str(port), "--repeat", str(args.repeat)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{args.size_mb} MB JSON export through the gateway:")
+    direct_total = results["direct"]["total"]
+    for mode in MODES:
+        result = results[mode]
+        added = "" if mode == "direct" else f", +{(result['total'] - direct_total) * 1000:,.0f} ms over direct"
+        print(f"  {mode:<10} first byte {result['first_byte'] * 1000:8.1f} ms, total {result['total'] * 1000:8,.0f} ms"
+              f"{added}, {result['bytes'] / 1e6:,.0f} MB sent, peak RSS +{result['rss_growth']:,.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,10 +12,12 @@ import structlog
 from app.core.config import settings
 from app.core.database import db_manager
 from app.auth.routes import router as auth_router
+from app.auth.service import principal_cache
 from app.auth.dependencies import get_current_user
 from app.auth.models import CurrentUser
 from app.middleware.rate_limiting import limiter, RateLimitExceeded
 from app.routing.service_router import service_router
+from app.rbac.service import rbac_service
 
 # Configure structured logging
 structlog.configure(
@@ -50,6 +52,10 @@ async def lifespan(app: FastAPI):
         await db_manager.initialize()
         logger.info("Database connections initialized")
         
+        # Start batched audit writes and principal cache invalidation
+        rbac_service.audit_writer.start()
+        principal_cache.start(db_manager.redis_client)
+        
         # Initialize service router
         logger.info("Service router initialized")
         
@@ -59,6 +65,10 @@ async def lifespan(app: FastAPI):
         # Shutdown
         logger.info("Shutting down API Gateway service")
         
+        # Write queued audit events before the database goes away
+        await principal_cache.stop()
+        await rbac_service.audit_writer.stop()
+        
         # Close database connections
         await db_manager.close()
         
@@ -242,6 +252,18 @@ async def proxy_to_service(
         body = await request.body()
     
     try:
+        # Relay the upstream response as it arrives
+        if settings.service_streaming_enabled:
+            return await service_router.stream_request(
+                request=request,
+                service_name=service_name,
+                path=path,
+                method=method,
+                headers=headers,
+                body=body,
+                params=params
+            )
+        
         # Route request to service
         response_data = await service_router.route_request(
             request=request,
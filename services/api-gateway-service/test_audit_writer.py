@@ -0,0 +1,109 @@
+"""Tests for the batched audit log writer."""
+
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.rbac.audit_writer import AUDIT_COLUMNS, AuditLogWriter, build_insert_query
+
+
+class RecordingDatabase:
+    """Records executed statements; fails while ``down`` is set."""
+
+    def __init__(self):
+        self.statements = []
+        self.down = False
+
+    @asynccontextmanager
+    async def get_pg_connection(self):
+        yield self
+
+    async def execute(self, query, *args):
+        if self.down:
+            raise ConnectionError("database down")
+        self.statements.append((query, args))
+
+    def rows(self):
+        width = len(AUDIT_COLUMNS)
+        return [args[i:i + width] for _, args in self.statements for i in range(0, len(args), width)]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_build_insert_query_numbers_parameters_per_row():
+    query = build_insert_query(2)
+    assert query.startswith("INSERT INTO audit_logs (user_id, action,")
+    assert query.endswith("VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9), ($10, $11, $12, $13, $14, $15, $16, $17, $18)")
+
+
+def test_events_are_written_inline_without_a_running_writer():
+    async def scenario():
+        db = RecordingDatabase()
+        writer = AuditLogWriter(db.get_pg_connection)
+        assert await writer.log(1, "access_granted", "endpoint", "/alerts", success=True)
+        return db
+
+    db = run(scenario())
+    assert len(db.statements) == 1
+    row = db.rows()[0]
+    assert row[:4] == (1, "access_granted", "endpoint", "/alerts") and row[7] is True
+    # audit_logs.timestamp is TIMESTAMPTZ, so rows carry an explicit UTC offset
+    assert row[8].utcoffset() == timedelta(0)
+
+
+def test_running_writer_batches_by_size_and_interval():
+    async def scenario():
+        db = RecordingDatabase()
+        writer = AuditLogWriter(db.get_pg_connection, batch_size=50, flush_interval=0.05)
+        writer.start()
+        for i in range(120):
+            assert await writer.log(i, "access_granted", "endpoint")
+        # Nothing waited on the database
+        assert db.statements == []
+
+        # A full batch wakes the writer, which drains the queue
+        await asyncio.sleep(0.01)
+        assert [len(args) // len(AUDIT_COLUMNS) for _, args in db.statements] == [50, 50, 20]
+
+        # A partial batch waits for the interval
+        for i in range(120, 125):
+            await writer.log(i, "access_granted", "endpoint")
+        await asyncio.sleep(0.01)
+        assert len(db.statements) == 3
+        await asyncio.sleep(0.1)
+        assert len(db.statements) == 4
+
+        await writer.log(125, "access_granted", "endpoint")
+        await writer.stop()
+        return db, writer
+
+    db, writer = run(scenario())
+    assert [row[0] for row in db.rows()] == list(range(126))
+    assert writer.stats["written"] == 126 and len(writer) == 0
+
+
+def test_failed_batches_are_retried_and_bounded():
+    async def scenario():
+        db = RecordingDatabase()
+        db.down = True
+        writer = AuditLogWriter(db.get_pg_connection, batch_size=10, max_pending=25)
+        writer.start()
+        for i in range(40):
+            await writer.log(i, "access_denied", "endpoint", success=False)
+        assert len(writer) <= 25 and writer.stats["dropped"] > 0
+
+        db.down = False
+        await writer.stop()
+        return db, writer
+
+    db, writer = run(scenario())
+    written = [row[0] for row in db.rows()]
+    # The newest events survive, in order
+    assert written == list(range(40 - len(written), 40))
+    assert writer.stats["written"] + writer.stats["dropped"] == 40
@@ -0,0 +1,123 @@
+"""Tests for the principal cache and its cross-replica invalidation."""
+
+import asyncio
+import os
+import sys
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.auth.principal_cache import PrincipalCache
+
+
+def principal(user_id, role="analyst"):
+    return {"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@example.org",
+            "role": role, "permissions": ["alerts:read"], "full_name": None, "department": None}
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_local_hits_and_ttl_expiry():
+    async def scenario():
+        cache = PrincipalCache(ttl_seconds=0.05)
+        token_id = cache.token_id("token-a")
+        assert await cache.get(token_id) is None
+        await cache.set(token_id, principal(1))
+        assert (await cache.get(token_id))["role"] == "analyst"
+        await asyncio.sleep(0.06)
+        assert await cache.get(token_id) is None
+        return cache.stats
+
+    stats = run(scenario())
+    assert (stats["local_hits"], stats["misses"]) == (1, 2)
+
+
+def test_lru_eviction_keeps_user_index_consistent():
+    async def scenario():
+        cache = PrincipalCache(max_entries=2)
+        for name in ("a", "b", "c"):
+            await cache.set(name, principal(ord(name)))
+        assert await cache.get("a") is None and len(cache) == 2
+        assert ord("a") not in cache._user_tokens
+        await cache.invalidate_user(ord("b"))
+        assert await cache.get("b") is None and await cache.get("c") is not None
+
+    run(scenario())
+
+
+def test_redis_shares_entries_and_invalidation_reaches_other_replicas():
+    async def scenario():
+        server = FakeServer()
+        replica_a = PrincipalCache(FakeRedis(server=server, decode_responses=True))
+        replica_b = PrincipalCache(FakeRedis(server=server, decode_responses=True))
+        replica_b.start()
+        await asyncio.sleep(0.01)
+
+        token_id = replica_a.token_id("token-a")
+        await replica_a.set(token_id, principal(7))
+        # Resolved once on replica A, served to replica B from Redis and then locally
+        assert (await replica_b.get(token_id))["id"] == 7
+        assert (await replica_b.get(token_id))["id"] == 7
+        assert (replica_b.stats["redis_hits"], replica_b.stats["local_hits"]) == (1, 1)
+
+        await replica_a.invalidate_user(7)
+        for _ in range(100):
+            if len(replica_b) == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert len(replica_b) == 0
+        assert await replica_b.get(token_id) is None
+        assert await replica_a.get(token_id) is None
+        await replica_b.stop()
+
+    run(scenario())
+
+
+def test_lookup_racing_an_invalidation_is_not_cached():
+    async def scenario():
+        cache = PrincipalCache()
+        version = cache.version
+        # The role changes while the old principal is being loaded
+        await cache.invalidate_user(3)
+        await cache.set("token", principal(3, role="viewer"), version)
+        assert await cache.get("token") is None
+
+        await cache.set("token", principal(3, role="admin"), cache.version)
+        assert (await cache.get("token"))["role"] == "admin"
+
+    run(scenario())
+
+
+def test_redis_errors_fall_back_to_local_entries():
+    class BrokenRedis:
+        async def get(self, key):
+            raise ConnectionError("redis down")
+
+        def pipeline(self, transaction=True):
+            raise ConnectionError("redis down")
+
+        async def smembers(self, key):
+            raise ConnectionError("redis down")
+
+    async def scenario():
+        cache = PrincipalCache(BrokenRedis())
+        assert await cache.get("token") is None
+        await cache.set("token", principal(1))
+        assert await cache.get("token") is not None
+        await cache.invalidate_user(1)
+        assert await cache.get("token") is None
+
+    run(scenario())
+
+
+def test_disabled_cache_never_stores():
+    async def scenario():
+        cache = PrincipalCache(ttl_seconds=0)
+        await cache.set("token", principal(1))
+        return await cache.get("token")
+
+    assert run(scenario()) is None
@@ -0,0 +1,133 @@
+"""Tests for the atomic Redis rate limiter and its local pre-check."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.middleware.redis_rate_limiter import LocalTokenBucket, RedisRateLimiter, parse_rate_limit
+
+NOW = 1_700_000_000.0
+
+
+class FailingScript:
+    async def __call__(self, keys, args):
+        raise ConnectionError("redis down")
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_parse_rate_limit():
+    assert parse_rate_limit("100/minute") == (100, 60)
+    assert parse_rate_limit("5/second") == (5, 1)
+    assert parse_rate_limit("7/fortnight") == (7, 60)
+    assert parse_rate_limit("100") is None
+    assert parse_rate_limit("many/minute") is None
+    assert parse_rate_limit("0/minute") is None
+
+
+def test_sliding_log_is_exact_at_window_edges():
+    async def scenario():
+        limiter = RedisRateLimiter(FakeRedis(), local_precheck=False)
+        # A burst at the end of one minute
+        for i in range(5):
+            result = await limiter.check("user:1", "5/minute", now=NOW + 59.9)
+            assert result.allowed and result.remaining == 4 - i
+        # A fixed-window counter would reset here; the sliding window still holds the burst
+        denied = await limiter.check("user:1", "5/minute", now=NOW + 60.1)
+        assert not denied.allowed
+        assert denied.retry_after == pytest.approx(59.8)
+
+        assert not (await limiter.check("user:1", "5/minute", now=NOW + 119.899)).allowed
+        assert (await limiter.check("user:1", "5/minute", now=NOW + 119.9)).allowed
+        # Other users and limits are counted separately
+        assert (await limiter.check("user:2", "5/minute", now=NOW + 60.1)).allowed
+        assert (await limiter.check("user:1", "5/second", now=NOW + 60.1)).allowed
+
+    run(scenario())
+
+
+def test_gcra_allows_burst_then_paces():
+    async def scenario():
+        limiter = RedisRateLimiter(FakeRedis(), algorithm="gcra", local_precheck=False)
+        results = [await limiter.check("user:1", "10/minute", now=NOW) for _ in range(11)]
+        assert all(result.allowed for result in results[:10])
+        assert [result.remaining for result in results[:3]] == [9, 8, 7]
+        assert not results[10].allowed and results[10].retry_after == pytest.approx(6.0)
+
+        assert not (await limiter.check("user:1", "10/minute", now=NOW + 5.9)).allowed
+        assert (await limiter.check("user:1", "10/minute", now=NOW + 6.0)).allowed
+        assert not (await limiter.check("user:1", "10/minute", now=NOW + 6.0)).allowed
+
+    run(scenario())
+
+
+def test_concurrent_requests_never_exceed_limit():
+    async def scenario(algorithm):
+        limiter = RedisRateLimiter(FakeRedis(), algorithm=algorithm, local_precheck=False)
+        results = await asyncio.gather(*(limiter.check("user:1", "20/minute", now=NOW) for _ in range(100)))
+        return sum(result.allowed for result in results)
+
+    assert run(scenario("sliding_log")) == 20
+    assert run(scenario("gcra")) == 20
+
+
+def test_local_precheck_absorbs_floods_without_rejecting_allowed_requests():
+    async def scenario():
+        redis_client = FakeRedis()
+        limiter = RedisRateLimiter(redis_client, local_max_keys=2)
+        results = [await limiter.check("user:1", "5/minute", now=NOW) for _ in range(50)]
+        assert sum(result.allowed for result in results) == 5
+        assert {result.source for result in results[5:]} == {"local"}
+        assert results[5].retry_after == pytest.approx(12.0)
+
+        # Another gateway used up the shared limit: Redis denies and the token is refunded
+        other_gateway = RedisRateLimiter(redis_client, local_precheck=False)
+        for _ in range(5):
+            assert (await other_gateway.check("user:2", "5/minute", now=NOW)).allowed
+        denied = await limiter.check("user:2", "5/minute", now=NOW + 1)
+        assert not denied.allowed and denied.source == "redis"
+        assert limiter.local_buckets._buckets["user:2"][0] == pytest.approx(5.0)
+        # Until the shared window frees a slot, the key is rejected locally
+        held = await limiter.check("user:2", "5/minute", now=NOW + 30)
+        assert not held.allowed and held.source == "local" and held.retry_after == pytest.approx(30.0)
+        assert (await limiter.check("user:2", "5/minute", now=NOW + 60)).allowed
+
+        # Least recently seen buckets are dropped
+        await limiter.check("user:3", "5/minute", now=NOW + 1)
+        assert len(limiter.local_buckets) == 2 and "user:1" not in limiter.local_buckets._buckets
+
+    run(scenario())
+
+
+def test_local_bucket_refills_at_limit_rate():
+    buckets = LocalTokenBucket()
+    for _ in range(3):
+        assert buckets.acquire("key", 3, 30, NOW) == 0
+    assert buckets.acquire("key", 3, 30, NOW) == pytest.approx(10.0)
+    assert buckets.acquire("key", 3, 30, NOW + 10) == 0
+    assert buckets.acquire("key", 3, 30, NOW + 1000) == 0
+    assert buckets._buckets["key"][0] == pytest.approx(2.0)
+
+
+def test_fails_open_on_redis_errors():
+    async def scenario():
+        limiter = RedisRateLimiter(FakeRedis(), local_precheck=False)
+        limiter.script = FailingScript()
+        result = await limiter.check("user:1", "1/minute", now=NOW)
+        assert result.allowed and result.source == "error"
+
+        assert (await limiter.check("user:1", "not-a-limit", now=NOW)).allowed
+
+    run(scenario())
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        RedisRateLimiter(FakeRedis(), algorithm="fixed_window")
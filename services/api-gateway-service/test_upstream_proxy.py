@@ -0,0 +1,133 @@
+"""Tests for hedged upstream sends and streaming pass-through."""
+
+import asyncio
+import gzip
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.routing.upstream import (
+    UpstreamPoolConfig, create_upstream_client, filter_headers, relay_response, send_hedged
+)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def make_client(delays, calls):
+    """Client whose n-th request waits delays[n] seconds; a None delay fails to connect."""
+    async def handler(request):
+        attempt = len(calls)
+        calls.append(request)
+        delay = delays[attempt]
+        if delay is None:
+            raise httpx.ConnectError("refused", request=request)
+        await asyncio.sleep(delay)
+        return httpx.Response(200, text=f"attempt {attempt}")
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def hedged(delays, hedge_delay):
+    async def scenario():
+        calls = []
+        async with make_client(delays, calls) as client:
+            build = lambda: client.build_request("GET", "http://upstream/reports")
+            response, was_hedged = await send_hedged(client, build, hedge_delay)
+            return response.text, was_hedged, len(calls)
+
+    return run(scenario())
+
+
+def test_fast_response_is_not_hedged():
+    assert hedged([0.0, 0.0], hedge_delay=0.2) == ("attempt 0", False, 1)
+
+
+def test_slow_response_is_hedged_and_first_answer_wins():
+    assert hedged([1.0, 0.0], hedge_delay=0.05) == ("attempt 1", True, 2)
+    assert hedged([0.1, 1.0], hedge_delay=0.05) == ("attempt 0", True, 2)
+
+
+def test_failed_attempt_is_retried_without_waiting():
+    text, was_hedged, calls = hedged([None, 0.0], hedge_delay=10)
+    assert (text, was_hedged, calls) == ("attempt 1", True, 2)
+
+
+def test_error_raised_when_every_attempt_fails():
+    with pytest.raises(httpx.ConnectError):
+        hedged([None, None], hedge_delay=0.01)
+    with pytest.raises(httpx.ConnectError):
+        hedged([None], hedge_delay=None)
+
+
+def test_filter_headers_drops_hop_by_hop_and_connection_tokens():
+    headers = [
+        ("Content-Type", "text/csv"),
+        ("Connection", "keep-alive, X-Trace"),
+        ("X-Trace", "1"),
+        ("Transfer-Encoding", "chunked"),
+        ("Host", "gateway"),
+        ("Set-Cookie", "a=1"),
+        ("Set-Cookie", "b=2")
+    ]
+    assert filter_headers(headers, drop=("host",)) == [
+        ("Content-Type", "text/csv"), ("Set-Cookie", "a=1"), ("Set-Cookie", "b=2")
+    ]
+
+
+def test_relay_passes_raw_bytes_through():
+    payload = b'{"rows": [' + b",".join(b'{"id": %d}' % i for i in range(20000)) + b"]}"
+    compressed = gzip.compress(payload)
+
+    async def chunks():
+        for start in range(0, len(compressed), 4096):
+            yield compressed[start:start + 4096]
+
+    async def handler(request):
+        return httpx.Response(
+            201,
+            headers=[("Content-Type", "application/json"), ("Content-Encoding", "gzip"),
+                     ("Set-Cookie", "a=1"), ("Set-Cookie", "b=2"), ("Connection", "close")],
+            content=chunks()
+        )
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            upstream = await client.send(client.build_request("GET", "http://upstream/export"), stream=True)
+            relayed = relay_response(upstream)
+
+            messages = []
+
+            async def receive():
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                messages.append(message)
+
+            await relayed({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+            return upstream, messages
+
+    upstream, messages = run(scenario())
+    start, *body = messages
+    assert start["status"] == 201
+    headers = [(name.decode(), value.decode()) for name, value in start["headers"]]
+    assert ("content-encoding", "gzip") in headers
+    assert [value for name, value in headers if name == "set-cookie"] == ["a=1", "b=2"]
+    assert "connection" not in dict(headers)
+    assert b"".join(message.get("body", b"") for message in body) == compressed
+    assert upstream.is_closed
+
+
+def test_upstream_client_falls_back_to_http1_without_h2():
+    config = UpstreamPoolConfig(max_connections=7, http2=True)
+
+    async def scenario():
+        async with create_upstream_client(config) as client:
+            return client.timeout
+
+    assert run(scenario()).read == config.read_timeout
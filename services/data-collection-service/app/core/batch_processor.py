@@ -4,13 +4,14 @@ Batch processing service for historical data ingestion
 import asyncio
 import json
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, AsyncGenerator
+from typing import Dict, Any, List, Optional, AsyncGenerator, Iterator, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import structlog
 
 from app.core.data_pipeline import DataIngestionPipeline, ProcessingStatus, ProcessingMetrics
 from app.core.config import get_settings
+from app.core.streaming_readers import ReadCheckpoint, StreamingFileReader, process_chunks
 from shared.models.post import Platform
 from shared.database.redis import RedisManager
 
@@ -53,26 +54,31 @@ class BatchDataLoader:
         self.settings = get_settings()
     
     async def load_from_file(self, file_path: str, platform: Platform) -> AsyncGenerator[Dict[str, Any], None]:
-        """Load data from JSON file"""
+        """Stream items from a JSON, JSON Lines or CSV file, optionally gzip/zstd compressed"""
+        async for chunk, _ in self.load_chunks_from_file(file_path, platform):
+            for item in chunk:
+                yield item
+    
+    async def load_chunks_from_file(self, file_path: str, platform: Platform,
+                                    chunk_size: Optional[int] = None,
+                                    checkpoint: Optional[ReadCheckpoint] = None
+                                    ) -> AsyncGenerator[Tuple[List[Dict[str, Any]], ReadCheckpoint], None]:
+        """Stream fixed-size chunks of items from a file with constant memory
+        
+        Each chunk comes with the checkpoint to resume from once it has been processed.
+        """
         try:
-            import aiofiles
-            
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                
-            data = json.loads(content)
+            reader = StreamingFileReader(
+                file_path,
+                block_size=self.settings.batch_read_block_size,
+                max_item_bytes=self.settings.batch_max_item_bytes
+            )
+            async for chunk, position in reader.iter_chunks(chunk_size or self.settings.batch_chunk_size, checkpoint):
+                yield chunk, position
             
-            # Handle different file formats
-            if isinstance(data, list):
-                for item in data:
-                    yield item
-            elif isinstance(data, dict):
-                # Handle paginated API responses
-                if 'data' in data and isinstance(data['data'], list):
-                    for item in data['data']:
-                        yield item
-                else:
-                    yield data
+            if reader.stats.malformed_items:
+                logger.warning("Skipped malformed items", file_path=file_path,
+                               malformed_items=reader.stats.malformed_items)
                     
         except Exception as e:
             logger.error("Failed to load data from file", file_path=file_path, error=str(e))
@@ -82,11 +88,14 @@ class BatchDataLoader:
         """Load data from API export format"""
         try:
             if platform == Platform.TWITTER:
-                yield from self._process_twitter_export(api_data)
+                for item in self._process_twitter_export(api_data):
+                    yield item
             elif platform == Platform.YOUTUBE:
-                yield from self._process_youtube_export(api_data)
+                for item in self._process_youtube_export(api_data):
+                    yield item
             elif platform == Platform.TELEGRAM:
-                yield from self._process_telegram_export(api_data)
+                for item in self._process_telegram_export(api_data):
+                    yield item
             else:
                 # Generic processing
                 if isinstance(api_data, list):
@@ -99,7 +108,7 @@ class BatchDataLoader:
             logger.error("Failed to load data from API export", platform=platform, error=str(e))
             raise
     
-    def _process_twitter_export(self, data: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+    def _process_twitter_export(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
         """Process Twitter API export format"""
         # Handle Twitter API v2 response format
         if 'data' in data:
@@ -127,7 +136,7 @@ class BatchDataLoader:
                 
                 yield processed_tweet
     
-    def _process_youtube_export(self, data: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+    def _process_youtube_export(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
         """Process YouTube API export format"""
         if 'items' in data:
             for item in data['items']:
@@ -159,7 +168,7 @@ class BatchDataLoader:
                     }
                     yield processed_comment
     
-    def _process_telegram_export(self, data: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+    def _process_telegram_export(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
         """Process Telegram export format"""
         if 'messages' in data:
             for message in data['messages']:
@@ -194,6 +203,7 @@ class BatchProcessor:
         self.pipeline = None
         self.active_jobs: Dict[str, BatchJob] = {}
         self.max_concurrent_jobs = 3
+        self.max_concurrent_chunks = self.settings.batch_max_concurrent_chunks
     
     async def initialize(self):
         """Initialize batch processor"""
@@ -314,19 +324,32 @@ class BatchProcessor:
             self.active_jobs[job.job_id] = job
             await self._store_job(job)
             
-            # Load data from source
-            data_items = []
-            async for item in self._load_job_data(job):
-                data_items.append(item)
+            # Stream chunks from the source through the pipeline, resuming from a checkpoint
+            checkpoint = await self._load_checkpoint(job.job_id)
             
-            if not data_items:
-                raise ValueError("No data items found in source")
+            async def process_chunk(chunk: List[Dict[str, Any]]) -> ProcessingMetrics:
+                return await self.pipeline.process_batch_data(job.platform, chunk, job.collection_id)
+            
+            async def save_checkpoint(position: Optional[ReadCheckpoint]):
+                if position is not None:
+                    await self._store_checkpoint(job.job_id, position)
             
-            # Process data through pipeline
-            metrics = await self.pipeline.process_batch_data(
-                job.platform, data_items, job.collection_id
+            chunk_metrics = await process_chunks(
+                self._load_job_chunks(job, checkpoint),
+                process_chunk,
+                self.max_concurrent_chunks,
+                on_checkpoint=save_checkpoint
             )
             
+            if not chunk_metrics and checkpoint is None:
+                raise ValueError("No data items found in source")
+            
+            metrics = ProcessingMetrics(start_time=job.started_at)
+            for result in chunk_metrics:
+                metrics.merge(result)
+            metrics.end_time = datetime.utcnow()
+            await self._clear_checkpoint(job.job_id)
+            
             # Update job completion
             job.status = BatchJobStatus.COMPLETED
             job.completed_at = datetime.utcnow()
@@ -346,22 +369,60 @@ class BatchProcessor:
             job.error_message = str(e)
             await self._store_job(job)
     
-    async def _load_job_data(self, job: BatchJob) -> AsyncGenerator[Dict[str, Any], None]:
-        """Load data for a batch job"""
+    async def _load_job_chunks(self, job: BatchJob, checkpoint: Optional[ReadCheckpoint] = None
+                               ) -> AsyncGenerator[Tuple[List[Dict[str, Any]], Optional[ReadCheckpoint]], None]:
+        """Load data for a batch job in fixed-size chunks"""
         data_source = job.data_source
+        chunk_size = job.parameters.get('chunk_size', self.settings.batch_chunk_size)
         
         if data_source.startswith('file://'):
             file_path = data_source[7:]  # Remove 'file://' prefix
-            async for item in self.data_loader.load_from_file(file_path, job.platform):
-                yield item
+            async for chunk, position in self.data_loader.load_chunks_from_file(
+                file_path, job.platform, chunk_size, checkpoint
+            ):
+                yield chunk, position
         elif data_source.startswith('api://'):
-            # Handle API data source
+            # API exports are already in memory, so there is nothing to resume
             api_data = job.parameters.get('api_data', {})
+            chunk = []
             async for item in self.data_loader.load_from_api_export(api_data, job.platform):
-                yield item
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    yield chunk, None
+                    chunk = []
+            if chunk:
+                yield chunk, None
         else:
             raise ValueError(f"Unsupported data source format: {data_source}")
     
+    async def _load_checkpoint(self, job_id: str) -> Optional[ReadCheckpoint]:
+        """Load the resume position of an interrupted job"""
+        try:
+            checkpoint_data = await self.redis.get(f"batch_job_checkpoint:{job_id}")
+            if checkpoint_data:
+                checkpoint = ReadCheckpoint.from_dict(checkpoint_data)
+                logger.info("Resuming batch job from checkpoint", job_id=job_id,
+                           offset=checkpoint.offset, items=checkpoint.items)
+                return checkpoint
+        except Exception as e:
+            logger.error("Failed to load job checkpoint", job_id=job_id, error=str(e))
+        return None
+    
+    async def _store_checkpoint(self, job_id: str, checkpoint: ReadCheckpoint):
+        """Store the position up to which every chunk has been processed"""
+        try:
+            await self.redis.set(f"batch_job_checkpoint:{job_id}", checkpoint.to_dict(),
+                                 expire=86400 * 7)  # 7 day TTL
+        except Exception as e:
+            logger.error("Failed to store job checkpoint", job_id=job_id, error=str(e))
+    
+    async def _clear_checkpoint(self, job_id: str):
+        """Remove the checkpoint of a finished job"""
+        try:
+            await self.redis.delete(f"batch_job_checkpoint:{job_id}")
+        except Exception as e:
+            logger.error("Failed to clear job checkpoint", job_id=job_id, error=str(e))
+    
     async def _store_job(self, job: BatchJob):
         """Store job in Redis"""
         try:
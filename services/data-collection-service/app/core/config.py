@@ -69,6 +69,16 @@ class Settings(BaseSettings):
     # Rate limiting
     default_rate_limit: int = Field(default=100, env="DEFAULT_RATE_LIMIT")
     
+    # Write-behind buffer for Kafka sends and MongoDB writes
+    write_buffer_max_batch_size: int = Field(default=500, env="WRITE_BUFFER_MAX_BATCH_SIZE")
+    write_buffer_max_batch_age: float = Field(default=0.5, env="WRITE_BUFFER_MAX_BATCH_AGE")
+    
+    # Batch file ingestion
+    batch_chunk_size: int = Field(default=1000, env="BATCH_CHUNK_SIZE")
+    batch_max_concurrent_chunks: int = Field(default=4, env="BATCH_MAX_CONCURRENT_CHUNKS")
+    batch_read_block_size: int = Field(default=1 << 20, env="BATCH_READ_BLOCK_SIZE")
+    batch_max_item_bytes: int = Field(default=16 << 20, env="BATCH_MAX_ITEM_BYTES")
+    
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     
@@ -5,7 +5,7 @@ import asyncio
 import json
 import hashlib
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Union, AsyncGenerator
+from typing import Dict, Any, List, Optional, Tuple, Union, AsyncGenerator
 from dataclasses import dataclass
 from enum import Enum
 import structlog
@@ -13,6 +13,10 @@ from pydantic import ValidationError
 
 from app.core.kafka_producer import KafkaDataProducer
 from app.core.config import get_settings
+from app.core.deduplication import (
+    BatchDuplicateDetector, DeduplicationConfig, DedupItem, normalize_content
+)
+from app.core.write_buffer import WriteBehindBuffer, WriteBufferConfig
 from shared.models.post import Post, PostCreate, Platform
 from shared.database.mongodb import MongoDBManager
 from shared.database.redis import RedisManager
@@ -53,6 +57,14 @@ class ProcessingMetrics:
         if self.start_time and self.end_time:
             return self.end_time - self.start_time
         return None
+    
+    def merge(self, other: "ProcessingMetrics"):
+        """Add the item counts of another run, e.g. one chunk of a batch job"""
+        self.total_items += other.total_items
+        self.processed_items += other.processed_items
+        self.failed_items += other.failed_items
+        self.duplicate_items += other.duplicate_items
+        self.validation_errors += other.validation_errors
 
 
 class DataValidator:
@@ -188,42 +200,29 @@ class DataValidator:
         return data
 
 
-class DuplicateDetector:
+class DuplicateDetector(BatchDuplicateDetector):
     """Detects and handles duplicate content"""
     
-    def __init__(self, redis_manager: RedisManager):
-        self.redis = redis_manager
-        self.duplicate_ttl = 86400 * 7  # 7 days
+    def __init__(self, redis_manager: RedisManager, config: Optional[DeduplicationConfig] = None):
+        super().__init__(redis_manager, config)
+        self.duplicate_ttl = self.config.duplicate_ttl
     
     async def is_duplicate(self, platform: Platform, post_id: str, content: str) -> bool:
-        """Check if content is duplicate"""
-        # Create content hash
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
-        
-        # Check by post_id first
-        post_key = f"post:{platform}:{post_id}"
-        if await self.redis.exists(post_key):
-            return True
-        
-        # Check by content hash
-        content_key = f"content_hash:{content_hash}"
-        if await self.redis.exists(content_key):
-            return True
-        
-        # Store for future duplicate detection
-        await self.redis.setex(post_key, self.duplicate_ttl, "1")
-        await self.redis.setex(content_key, self.duplicate_ttl, "1")
-        
-        return False
+        """Check if content is duplicate, marking it as seen if not"""
+        results = await self.check_and_mark_batch([DedupItem(platform, post_id, content)])
+        return results[0].is_duplicate
     
     async def mark_as_processed(self, platform: Platform, post_id: str, content: str):
-        """Mark content as processed"""
-        content_hash = hashlib.sha256(content.encode()).hexdigest()
-        post_key = f"post:{platform}:{post_id}"
-        content_key = f"content_hash:{content_hash}"
+        """Mark content as processed
         
-        await self.redis.setex(post_key, self.duplicate_ttl, "1")
-        await self.redis.setex(content_key, self.duplicate_ttl, "1")
+        ``is_duplicate`` and ``check_and_mark_batch`` already mark items, so this only
+        writes keys that are missing, in one round trip.
+        """
+        item = DedupItem(platform, post_id, content)
+        pipe = self.redis.client.pipeline(transaction=False)
+        pipe.set(self._post_key(item), "1", nx=True, ex=self.duplicate_ttl)
+        pipe.set(self._content_key(normalize_content(content), content), post_id, nx=True, ex=self.duplicate_ttl)
+        await pipe.execute()
 
 
 class DataIngestionPipeline:
@@ -237,12 +236,23 @@ class DataIngestionPipeline:
         self.validator = DataValidator()
         self.duplicate_detector = DuplicateDetector(self.redis)
         self.processing_metrics = ProcessingMetrics()
+        self.write_buffer: Optional[WriteBehindBuffer] = None
     
     async def initialize(self):
         """Initialize pipeline components"""
         try:
             await self.mongodb.connect()
             await self.redis.connect()
+            self.write_buffer = WriteBehindBuffer(
+                self.mongodb.database.posts,
+                self.kafka_producer,
+                WriteBufferConfig(
+                    max_batch_size=self.settings.write_buffer_max_batch_size,
+                    max_batch_age=self.settings.write_buffer_max_batch_age
+                ),
+                rollups=self.mongodb.sentiment_rollups
+            )
+            await self.write_buffer.start()
             logger.info("Data ingestion pipeline initialized successfully")
         except Exception as e:
             logger.error("Failed to initialize data ingestion pipeline", error=str(e))
@@ -251,6 +261,7 @@ class DataIngestionPipeline:
     async def process_streaming_data(self, platform: Platform, data: Dict[str, Any], 
                                    collection_id: str) -> bool:
         """Process single item from streaming data"""
+        validated_data = None
         try:
             # Validate and preprocess data
             validated_data = await self.validator.validate_post_data(platform, data)
@@ -263,26 +274,19 @@ class DataIngestionPipeline:
                            platform=platform, post_id=validated_data["post_id"])
                 return False
             
-            # Send to Kafka for real-time processing
-            success = await self.kafka_producer.send_data(
-                platform.value, validated_data, collection_id
+            # Buffered send to Kafka and store in MongoDB, batched with concurrent callers
+            result = await self.write_buffer.write(
+                platform.value, self._prepare_post_document(validated_data), collection_id
             )
             
-            if success:
-                # Store in MongoDB for persistence
-                await self._store_post_data(validated_data)
-                
-                # Mark as processed
-                await self.duplicate_detector.mark_as_processed(
-                    platform, validated_data["post_id"], validated_data["content"]
-                )
-                
+            if result.success:
                 logger.info("Successfully processed streaming data", 
                           platform=platform, post_id=validated_data["post_id"])
                 return True
             else:
-                logger.error("Failed to send data to Kafka", 
-                           platform=platform, post_id=validated_data["post_id"])
+                logger.error("Failed to write streaming data", platform=platform,
+                           post_id=validated_data["post_id"], stage=result.stage, error=result.error)
+                await self._release_duplicate_marks(platform, [validated_data])
                 return False
                 
         except ValidationError as e:
@@ -292,6 +296,8 @@ class DataIngestionPipeline:
         except Exception as e:
             logger.error("Unexpected error in streaming pipeline", 
                         platform=platform, error=str(e))
+            if validated_data is not None:
+                await self._release_duplicate_marks(platform, [validated_data])
             return False
     
     async def process_batch_data(self, platform: Platform, data_batch: List[Dict[str, Any]], 
@@ -305,11 +311,15 @@ class DataIngestionPipeline:
         logger.info("Starting batch processing", 
                    platform=platform, batch_size=len(data_batch))
         
-        # Process in chunks to avoid memory issues
+        # Validate and deduplicate in chunks; the write buffer batches the writes
         chunk_size = 100
+        submitted = []
         for i in range(0, len(data_batch), chunk_size):
             chunk = data_batch[i:i + chunk_size]
-            await self._process_batch_chunk(platform, chunk, collection_id, metrics)
+            submitted.extend(await self._process_batch_chunk(platform, chunk, collection_id, metrics))
+        
+        await self.write_buffer.flush()
+        await self._collect_write_results(platform, submitted, metrics)
         
         metrics.end_time = datetime.utcnow()
         
@@ -325,71 +335,88 @@ class DataIngestionPipeline:
         return metrics
     
     async def _process_batch_chunk(self, platform: Platform, chunk: List[Dict[str, Any]], 
-                                 collection_id: str, metrics: ProcessingMetrics):
-        """Process a chunk of batch data"""
-        tasks = []
+                                 collection_id: str,
+                                 metrics: ProcessingMetrics) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        """Validate and deduplicate a chunk, buffering unique items for writing"""
+        validated = await asyncio.gather(
+            *(self.validator.validate_post_data(platform, item) for item in chunk),
+            return_exceptions=True
+        )
         
-        for item in chunk:
-            task = self._process_batch_item(platform, item, collection_id, metrics)
-            tasks.append(task)
+        valid_items = []
+        for result in validated:
+            if isinstance(result, ValidationError):
+                metrics.validation_errors += 1
+            elif isinstance(result, Exception):
+                logger.error("Error validating batch item", platform=platform, error=str(result))
+                metrics.failed_items += 1
+            else:
+                valid_items.append(result)
         
-        # Process chunk concurrently
-        await asyncio.gather(*tasks, return_exceptions=True)
-    
-    async def _process_batch_item(self, platform: Platform, data: Dict[str, Any], 
-                                collection_id: str, metrics: ProcessingMetrics):
-        """Process single item in batch"""
+        if not valid_items:
+            return []
+        
+        # Check and mark the whole chunk for duplicates in one round trip
         try:
-            # Validate and preprocess data
-            validated_data = await self.validator.validate_post_data(platform, data)
-            
-            # Check for duplicates
-            if await self.duplicate_detector.is_duplicate(
-                platform, validated_data["post_id"], validated_data["content"]
-            ):
+            dedup_results = await self.duplicate_detector.check_and_mark_batch([
+                DedupItem(platform, item["post_id"], item["content"]) for item in valid_items
+            ])
+        except Exception as e:
+            logger.error("Duplicate detection failed for chunk", platform=platform, error=str(e))
+            metrics.failed_items += len(valid_items)
+            return []
+        
+        submitted = []
+        for item, dedup_result in zip(valid_items, dedup_results):
+            if dedup_result.is_duplicate:
                 metrics.duplicate_items += 1
-                return
-            
-            # Send to Kafka
-            success = await self.kafka_producer.send_data(
-                platform.value, validated_data, collection_id
-            )
-            
-            if success:
-                # Store in MongoDB
-                await self._store_post_data(validated_data)
-                
-                # Mark as processed
-                await self.duplicate_detector.mark_as_processed(
-                    platform, validated_data["post_id"], validated_data["content"]
+                continue
+            try:
+                future = await self.write_buffer.submit(
+                    platform.value, self._prepare_post_document(item), collection_id
                 )
-                
+                submitted.append((item, future))
+            except Exception as e:
+                logger.error("Error buffering batch item", platform=platform, error=str(e))
+                metrics.failed_items += 1
+                await self._release_duplicate_marks(platform, [item])
+        return submitted
+    
+    async def _collect_write_results(self, platform: Platform,
+                                     submitted: List[Tuple[Dict[str, Any], asyncio.Future]],
+                                     metrics: ProcessingMetrics):
+        """Tally buffered write outcomes and release marks of failed items"""
+        results = await asyncio.gather(*(future for _, future in submitted))
+        failed = []
+        for (item, _), result in zip(submitted, results):
+            if result.success:
                 metrics.processed_items += 1
             else:
                 metrics.failed_items += 1
-                
-        except ValidationError:
-            metrics.validation_errors += 1
-        except Exception as e:
-            logger.error("Error processing batch item", platform=platform, error=str(e))
-            metrics.failed_items += 1
+                failed.append(item)
+                logger.error("Error writing batch item", platform=platform,
+                           post_id=result.post_id, stage=result.stage, error=result.error)
+        if failed:
+            await self._release_duplicate_marks(platform, failed)
     
-    async def _store_post_data(self, validated_data: Dict[str, Any]):
-        """Store validated post data in MongoDB"""
+    async def _release_duplicate_marks(self, platform: Platform, items: List[Dict[str, Any]]):
+        """Let items that failed after passing duplicate detection be retried"""
         try:
-            # Add processing metadata
-            validated_data["processing_metadata"] = {
-                "ingested_at": datetime.utcnow(),
-                "pipeline_version": "1.0.0",
-                "status": ProcessingStatus.COMPLETED
-            }
-            
-            # Insert into MongoDB
-            await self.mongodb.insert_document("posts", validated_data)
-            
+            await self.duplicate_detector.release([
+                DedupItem(platform, item["post_id"], item["content"]) for item in items
+            ])
         except Exception as e:
-            logger.error("Failed to store post data in MongoDB", error=str(e))
-            raise
+            logger.warning("Failed to release duplicate marks", platform=platform, error=str(e))
+    
+    def _prepare_post_document(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Post document to send and store, with processing metadata"""
+        document = dict(validated_data)
+        document["processing_metadata"] = {
+            "ingested_at": datetime.utcnow(),
+            "pipeline_version": "1.0.0",
+            "status": ProcessingStatus.COMPLETED
+        }
+        return document
     
     async def get_processing_status(self, collection_id: str) -> Dict[str, Any]:
         """Get processing status for a collection"""
@@ -437,6 +464,8 @@ class DataIngestionPipeline:
     async def cleanup(self):
         """Cleanup pipeline resources"""
         try:
+            if self.write_buffer is not None:
+                await self.write_buffer.close()
             await self.kafka_producer.close()
             await self.mongodb.disconnect()
             await self.redis.disconnect()
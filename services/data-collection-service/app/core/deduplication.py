@@ -0,0 +1,328 @@
+"""
+Batch duplicate and near-duplicate detection for ingested posts
+"""
+import hashlib
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_RETWEET_PREFIX = re.compile(r"^rt @\w+:?\s*")
+# Drops emoji, symbols and punctuation; keeps word characters and Indic combining marks
+_NOISE_PATTERN = re.compile(r"[^\w\s\u0900-\u0dff]")
+_SHINGLE_BASE = np.uint64(1000003)
+_SIGNATURE_BLOCK = 64
+
+
+def normalize_content(content: str) -> str:
+    """Normalize text so trivially different reposts compare equal
+
+    Lower-cases, strips URLs, a leading ``RT @user:`` and emoji/punctuation, and
+    collapses whitespace.
+    """
+    text = _URL_PATTERN.sub(" ", (content or "").lower())
+    text = _RETWEET_PREFIX.sub("", text.strip())
+    text = _NOISE_PATTERN.sub(" ", text)
+    return " ".join(text.split())
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of the normalized content, shared by exact duplicate checks and upserts"""
+    return hashlib.sha256((normalize_content(content) or content or "").encode()).hexdigest()
+
+
+@dataclass
+class DeduplicationConfig:
+    """Duplicate detection settings"""
+    duplicate_ttl: int = 86400 * 7  # Exact post_id/content matches, 7 days
+    near_duplicate_enabled: bool = True
+    jaccard_threshold: float = 0.7
+    shingle_size: int = 4
+    num_bands: int = 16
+    rows_per_band: int = 4
+    # Each band keeps at most 2**slot_bits entries per window, bounding index memory
+    slot_bits: int = 18
+    near_duplicate_window: int = 3600
+    key_prefix: str = "dedup"
+    seed: int = 1
+
+    @property
+    def num_permutations(self) -> int:
+        return self.num_bands * self.rows_per_band
+
+    @property
+    def min_band_matches(self) -> int:
+        """Matching bands needed for the estimated Jaccard to reach the threshold
+
+        A pair with Jaccard similarity J shares a band with probability J**rows,
+        so ``(matches / bands) ** (1 / rows)`` estimates J.
+        """
+        return max(1, math.ceil(self.num_bands * self.jaccard_threshold ** self.rows_per_band - 1e-9))
+
+    def validate(self):
+        """Validate configuration"""
+        if not 0.0 < self.jaccard_threshold <= 1.0:
+            raise ValueError("jaccard_threshold must be in (0, 1]")
+        if self.num_bands <= 0 or self.rows_per_band <= 0 or self.shingle_size <= 0:
+            raise ValueError("num_bands, rows_per_band and shingle_size must be positive")
+        if not 1 <= self.slot_bits <= 32:
+            raise ValueError("slot_bits must be between 1 and 32")
+        if self.duplicate_ttl <= 0 or self.near_duplicate_window <= 0:
+            raise ValueError("duplicate_ttl and near_duplicate_window must be positive")
+
+
+@dataclass
+class DedupItem:
+    """Item submitted for duplicate detection"""
+    platform: str
+    post_id: str
+    content: str
+
+
+@dataclass
+class DedupResult:
+    """Outcome of duplicate detection for one item"""
+    post_id: str
+    is_duplicate: bool = False
+    reason: Optional[str] = None  # "post_id", "exact" or "near"
+    duplicate_of: Optional[str] = None
+    similarity: Optional[float] = None
+
+
+@dataclass
+class DeduplicationStats:
+    """Running duplicate detection counters"""
+    checked: int = 0
+    post_id_duplicates: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    batches: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.post_id_duplicates + self.exact_duplicates + self.near_duplicates
+
+    @property
+    def dedup_ratio(self) -> float:
+        return self.duplicates / self.checked if self.checked else 0.0
+
+
+class MinHasher:
+    """Vectorized MinHash signatures and LSH band slots over character shingles"""
+
+    def __init__(self, config: DeduplicationConfig):
+        self.config = config
+        rng = np.random.default_rng(config.seed)
+        # Multiply-shift hashing: h(x) = (a * x + b) >> 32 with odd 64-bit a
+        self._a = rng.integers(1, 2 ** 63, size=config.num_permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=config.num_permutations, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 2 ** 63, size=(config.num_bands, config.rows_per_band),
+                                      dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+    def shingle_hashes(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Rolling hashes of every character shingle of every text
+
+        Returns the concatenated hashes and the offset at which each text's run starts.
+        Texts shorter than ``shingle_size`` are zero-padded to a single shingle.
+        """
+        size = self.config.shingle_size
+        code_points = []
+        for text in texts:
+            cps = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+            if len(cps) < size:
+                cps = np.pad(cps, (0, size - len(cps)))
+            code_points.append(cps)
+
+        lengths = np.fromiter((len(cps) for cps in code_points), dtype=np.int64, count=len(code_points))
+        counts = lengths - size + 1
+        flat = np.concatenate(code_points).astype(np.uint64)
+        windows = len(flat) - size + 1
+        hashes = np.zeros(windows, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for j in range(size):
+                hashes = hashes * _SHINGLE_BASE + flat[j:j + windows]
+
+        # Keep only windows that start and end inside a single text
+        text_starts = np.cumsum(lengths) - lengths
+        offsets = np.cumsum(counts) - counts
+        index = np.repeat(text_starts - offsets, counts) + np.arange(counts.sum())
+        return hashes[index], offsets
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """MinHash signatures, one row of ``num_permutations`` values per text"""
+        hashes, offsets = self.shingle_hashes(texts)
+        ends = np.append(offsets[1:], len(hashes))
+        signatures = np.empty((self.config.num_permutations, len(texts)), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            hashes ^= hashes >> np.uint64(29)
+            # Permutation-major blocks keep the temporaries cache-sized and the reduction contiguous
+            for start in range(0, len(texts), _SIGNATURE_BLOCK):
+                stop = min(start + _SIGNATURE_BLOCK, len(texts))
+                low, high = offsets[start], ends[stop - 1]
+                permuted = self._a[:, None] * hashes[None, low:high]
+                permuted += self._b[:, None]
+                permuted >>= np.uint64(32)
+                signatures[:, start:stop] = np.minimum.reduceat(permuted, offsets[start:stop] - low, axis=1)
+        return signatures.T
+
+    def band_slots(self, signatures: np.ndarray) -> np.ndarray:
+        """Map each band of each signature to a ``slot_bits``-bit slot"""
+        bands = signatures.reshape(len(signatures), self.config.num_bands, self.config.rows_per_band)
+        with np.errstate(over="ignore"):
+            mixed = (bands * self._band_mix[None, :, :]).sum(axis=2, dtype=np.uint64)
+            mixed ^= mixed >> np.uint64(31)
+            mixed *= np.uint64(0x9E3779B97F4A7C15)
+        return mixed >> np.uint64(64 - self.config.slot_bits)
+
+
+class BatchDuplicateDetector:
+    """Checks and marks whole chunks of posts for duplicates in one Redis pipeline
+
+    Exact duplicates are caught by ``post_id`` and by a hash of the normalized content,
+    so reposts that only add a URL or emoji match exactly. Near duplicates are found
+    with MinHash LSH: each of ``num_bands`` bands maps a post to a slot in a per-band
+    Redis hash, and a post whose slots point at the same earlier post in enough bands
+    to reach ``jaccard_threshold`` is a near duplicate. Band hashes are rotated every
+    ``near_duplicate_window`` seconds (current and previous windows are consulted), so
+    the index holds at most ``2 * num_bands * 2**slot_bits`` entries.
+
+    Items are marked while they are checked. Call ``release`` for items that were
+    accepted but could not be processed so that a retry is not rejected.
+    """
+
+    def __init__(self, redis_manager, config: Optional[DeduplicationConfig] = None):
+        self.redis = redis_manager
+        self.config = config or DeduplicationConfig()
+        self.config.validate()
+        self.minhasher = MinHasher(self.config)
+        self.stats = DeduplicationStats()
+
+    def _post_key(self, item: DedupItem) -> str:
+        platform = getattr(item.platform, "value", item.platform)
+        return f"post:{platform}:{item.post_id}"
+
+    def _content_key(self, normalized: str, content: str) -> str:
+        return f"content_hash:{hashlib.sha256((normalized or content).encode()).hexdigest()}"
+
+    def _band_key(self, window: int, band: int) -> str:
+        return f"{self.config.key_prefix}:lsh:{window}:{band}"
+
+    async def check_and_mark_batch(self, items: Sequence[DedupItem]) -> List[DedupResult]:
+        """Classify and mark a chunk of items with a single pipelined round trip
+
+        Args:
+            items: Items to check, in arrival order; later items are compared with
+                earlier items of the same chunk
+
+        Returns:
+            One result per item, in order
+        """
+        if not items:
+            return []
+
+        config = self.config
+        normalized = [normalize_content(item.content) for item in items]
+        lsh_rows = [i for i, text in enumerate(normalized) if config.near_duplicate_enabled and text]
+        slots = None
+        if lsh_rows:
+            signatures = self.minhasher.signatures([normalized[i] for i in lsh_rows])
+            slots = self.minhasher.band_slots(signatures)
+
+        window = int(time.time() // config.near_duplicate_window)
+        windows = (window, window - 1)
+        fields = [[f"{slot:x}" for slot in row] for row in slots.tolist()] if slots is not None else []
+
+        pipe = self.redis.client.pipeline(transaction=False)
+        for item, text in zip(items, normalized):
+            pipe.set(self._post_key(item), "1", nx=True, ex=config.duplicate_ttl)
+            pipe.set(self._content_key(text, item.content), item.post_id, nx=True, ex=config.duplicate_ttl)
+        if lsh_rows:
+            for w in windows:
+                for band in range(config.num_bands):
+                    pipe.hmget(self._band_key(w, band), [row[band] for row in fields])
+            for band in range(config.num_bands):
+                band_key = self._band_key(window, band)
+                pipe.hset(band_key, mapping={row[band]: items[i].post_id for i, row in zip(lsh_rows, fields)})
+                pipe.expire(band_key, 2 * config.near_duplicate_window)
+        replies = await pipe.execute()
+
+        # One HMGET reply per (window, band), holding the post ids stored before this chunk
+        lookups = replies[2 * len(items):2 * len(items) + len(windows) * config.num_bands] if lsh_rows else []
+
+        results = []
+        seen_in_chunk: List[Dict[str, str]] = [{} for _ in range(config.num_bands)]
+        lsh_position = {i: position for position, i in enumerate(lsh_rows)}
+        for i, item in enumerate(items):
+            result = DedupResult(post_id=item.post_id)
+            post_is_new, content_is_new = replies[2 * i], replies[2 * i + 1]
+
+            if not post_is_new:
+                result.is_duplicate, result.reason = True, "post_id"
+                self.stats.post_id_duplicates += 1
+            elif not content_is_new:
+                result.is_duplicate, result.reason, result.similarity = True, "exact", 1.0
+                self.stats.exact_duplicates += 1
+            elif i in lsh_position:
+                position = lsh_position[i]
+                stored = [lookup[position] for lookup in lookups]
+                match, similarity = self._best_candidate(item.post_id, fields[position], stored, seen_in_chunk)
+                if match is not None:
+                    result.is_duplicate, result.reason = True, "near"
+                    result.duplicate_of, result.similarity = match, similarity
+                    self.stats.near_duplicates += 1
+
+            if i in lsh_position:
+                for band, slot in enumerate(fields[lsh_position[i]]):
+                    seen_in_chunk[band][slot] = item.post_id
+            results.append(result)
+
+        self.stats.checked += len(items)
+        self.stats.batches += 1
+        return results
+
+    def _best_candidate(self, post_id: str, item_fields: List[str], stored: List[Optional[str]],
+                        seen_in_chunk: List[Dict[str, str]]) -> Tuple[Optional[str], Optional[float]]:
+        bands = self.config.num_bands
+        matches: Dict[str, int] = {}
+        for band, slot in enumerate(item_fields):
+            candidates = set(stored[band::bands])
+            candidates.add(seen_in_chunk[band].get(slot))
+            candidates.discard(None)
+            candidates.discard(post_id)
+            for candidate in candidates:
+                matches[candidate] = matches.get(candidate, 0) + 1
+
+        if not matches:
+            return None, None
+        candidate, count = max(matches.items(), key=lambda entry: entry[1])
+        if count < self.config.min_band_matches:
+            return None, None
+        similarity = (count / self.config.num_bands) ** (1.0 / self.config.rows_per_band)
+        return candidate, round(similarity, 3)
+
+    async def release(self, items: Sequence[DedupItem]):
+        """Remove exact-match marks for accepted items whose processing failed"""
+        if not items:
+            return
+        pipe = self.redis.client.pipeline(transaction=False)
+        for item in items:
+            pipe.delete(self._post_key(item), self._content_key(normalize_content(item.content), item.content))
+        await pipe.execute()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Duplicate detection counters"""
+        return {
+            "checked": self.stats.checked,
+            "post_id_duplicates": self.stats.post_id_duplicates,
+            "exact_duplicates": self.stats.exact_duplicates,
+            "near_duplicates": self.stats.near_duplicates,
+            "dedup_ratio": self.stats.dedup_ratio,
+            "batches": self.stats.batches
+        }
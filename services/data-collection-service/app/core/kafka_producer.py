@@ -4,7 +4,7 @@ Kafka producer for streaming collected data
 import json
 import asyncio
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from kafka import KafkaProducer
 from kafka.errors import KafkaError
 import structlog
@@ -31,14 +31,15 @@ class KafkaDataProducer:
     def _initialize_producer(self):
         """Initialize Kafka producer with error handling"""
         try:
-            self.producer = KafkaProducer(
+            producer_config = {
                 **self.config.producer_config,
-                value_serializer=lambda x: json.dumps(x, default=str).encode('utf-8'),
-                retries=3,
-                retry_backoff_ms=1000,
-                request_timeout_ms=30000,
-                acks='all'
-            )
+                "value_serializer": lambda x: json.dumps(x, default=str).encode('utf-8'),
+                "retries": 3,
+                "retry_backoff_ms": 1000,
+                "request_timeout_ms": 30000,
+                "acks": 'all'
+            }
+            self.producer = KafkaProducer(**producer_config)
             logger.info("Kafka producer initialized successfully")
         except Exception as e:
             logger.error("Failed to initialize Kafka producer", error=str(e))
@@ -87,6 +88,64 @@ class KafkaDataProducer:
             logger.error("Unexpected error sending to Kafka", error=str(e), platform=platform)
             return False
     
+    async def send_batch(self, messages: List[Tuple[str, Dict[str, Any], str]]) -> List[Optional[str]]:
+        """Send (platform, data, collection_id) messages with a single flush
+        
+        Returns one entry per message: None if it was acknowledged, otherwise the error.
+        """
+        if not messages:
+            return []
+        if not self.producer:
+            logger.error("Kafka producer not initialized")
+            return ["Kafka producer not initialized"] * len(messages)
+        
+        # The producer blocks while flushing, so keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._send_batch_blocking, messages)
+    
+    def _send_batch_blocking(self, messages: List[Tuple[str, Dict[str, Any], str]]) -> List[Optional[str]]:
+        """Queue every message, flush once and collect per-message outcomes"""
+        timestamp = datetime.utcnow().isoformat()
+        futures = []
+        for platform, data, collection_id in messages:
+            topic = self.topics.get(platform)
+            if not topic:
+                futures.append(f"Unknown platform: {platform}")
+                continue
+            message = {
+                "collection_id": collection_id,
+                "platform": platform,
+                "timestamp": timestamp,
+                "data": data
+            }
+            try:
+                futures.append(self.producer.send(topic, value=message))
+            except Exception as e:
+                futures.append(str(e))
+        
+        try:
+            self.producer.flush(timeout=30)
+        except Exception as e:
+            logger.error("Kafka flush failed", error=str(e), batch_size=len(messages))
+        
+        errors = []
+        for future in futures:
+            if isinstance(future, str):
+                errors.append(future)
+                continue
+            try:
+                future.get(timeout=0)
+                errors.append(None)
+            except Exception as e:
+                errors.append(str(e) or type(e).__name__)
+        
+        failed = sum(1 for error in errors if error)
+        if failed:
+            logger.error("Failed to send part of batch to Kafka", batch_size=len(messages), failed=failed)
+        else:
+            logger.debug("Batch sent to Kafka", batch_size=len(messages))
+        return errors
+    
     async def close(self):
         """Close Kafka producer"""
         if self.producer:
@@ -0,0 +1,173 @@
+"""
+In-memory stand-ins for the Kafka producer and MongoDB collection
+
+Used by tests and load benchmarks of the ingestion pipeline. Every request to a
+stand-in costs ``request_latency_ms`` to model the network round trip.
+"""
+import asyncio
+import copy
+import itertools
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from kafka.errors import KafkaError
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+class MemoryRecordFuture:
+    """Minimal kafka-python FutureRecordMetadata"""
+
+    def __init__(self, producer: "MemoryKafkaProducer", topic: str):
+        self._producer = producer
+        self.topic = topic
+        self.offset: Optional[int] = None
+        self.exception: Optional[Exception] = None
+        self.is_done = False
+
+    def get(self, timeout: Optional[float] = None):
+        if not self.is_done:
+            self._producer.flush(timeout)
+        if self.exception is not None:
+            raise self.exception
+        return SimpleNamespace(topic=self.topic, partition=0, offset=self.offset)
+
+
+class MemoryKafkaProducer:
+    """kafka-python compatible producer that acknowledges records in one request per flush
+
+    Accepts and ignores ``KafkaProducer`` keyword arguments other than
+    ``value_serializer`` so it can be patched in for ``kafka.KafkaProducer``.
+    """
+
+    def __init__(self, request_latency_ms: float = 1.0,
+                 fail_when: Optional[Callable[[Any], bool]] = None,
+                 value_serializer: Optional[Callable[[Any], bytes]] = None, **kwargs):
+        self.request_latency = request_latency_ms / 1000
+        self.fail_when = fail_when
+        self.value_serializer = value_serializer
+        self.records: Dict[str, List[Any]] = {}
+        self.requests = 0
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def send(self, topic: str, value: Any = None, key: Any = None):
+        future = MemoryRecordFuture(self, topic)
+        payload = self.value_serializer(value) if self.value_serializer else value
+        with self._lock:
+            self._pending.append((future, value, payload))
+        return future
+
+    def flush(self, timeout: Optional[float] = None):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            self.requests += 1
+            time.sleep(self.request_latency)
+            for future, value, payload in pending:
+                if self.fail_when and self.fail_when(value):
+                    future.exception = KafkaError("Simulated broker rejection")
+                else:
+                    records = self.records.setdefault(future.topic, [])
+                    future.offset = len(records)
+                    records.append(payload)
+                future.is_done = True
+
+    def close(self, timeout: Optional[float] = None):
+        self.flush(timeout)
+
+
+class MemoryCollection:
+    """Async MongoDB collection supporting the subset of the API used by the pipeline
+
+    ``unique_fields`` behave like unique indexes and produce duplicate key errors.
+    """
+
+    def __init__(self, request_latency_ms: float = 1.0, unique_fields: Sequence[str] = ()):
+        self.request_latency = request_latency_ms / 1000
+        self.unique_fields = tuple(unique_fields)
+        self.documents: List[Dict[str, Any]] = []
+        self.requests = 0
+        self.fail_requests = False
+        self._ids = itertools.count(1)
+        self._indexes: Dict[str, Dict[Any, Dict[str, Any]]] = {field: {} for field in self.unique_fields}
+
+    async def _round_trip(self):
+        self.requests += 1
+        await asyncio.sleep(self.request_latency)
+        if self.fail_requests:
+            raise ConnectionError("Simulated MongoDB outage")
+
+    def _find(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        candidates = self.documents
+        for field, value in query.items():
+            if field in self._indexes:
+                candidates = [self._indexes[field][value]] if value in self._indexes[field] else []
+                break
+        for document in candidates:
+            if all(document.get(field) == value for field, value in query.items()):
+                return document
+        return None
+
+    def _insert(self, document: Dict[str, Any]) -> Any:
+        for field in self.unique_fields:
+            if field in document and document[field] in self._indexes[field]:
+                raise DuplicateKeyError(f"E11000 duplicate key error dup key: {{ {field}: {document[field]!r} }}")
+        stored = copy.deepcopy(document)
+        stored.setdefault("_id", next(self._ids))
+        self.documents.append(stored)
+        for field in self.unique_fields:
+            if field in stored:
+                self._indexes[field][stored[field]] = stored
+        return stored["_id"]
+
+    async def insert_one(self, document: Dict[str, Any]):
+        await self._round_trip()
+        return SimpleNamespace(inserted_id=self._insert(document))
+
+    async def find_one(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        await self._round_trip()
+        return copy.deepcopy(self._find(query))
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        await self._round_trip()
+        return sum(1 for document in self.documents
+                   if all(document.get(field) == value for field, value in query.items()))
+
+    async def bulk_write(self, requests: Sequence[Any], ordered: bool = True):
+        await self._round_trip()
+        result = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "upserted": [], "writeErrors": []}
+
+        for index, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    self._insert(request._doc)
+                    result["nInserted"] += 1
+                elif isinstance(request, UpdateOne):
+                    if self._find(request._filter) is not None:
+                        result["nMatched"] += 1
+                    elif request._upsert:
+                        document = dict(request._filter)
+                        for operator in ("$setOnInsert", "$set"):
+                            document.update(request._doc.get(operator, {}))
+                        result["upserted"].append({"index": index, "_id": self._insert(document)})
+                        result["nUpserted"] += 1
+                else:
+                    raise TypeError(f"Unsupported bulk request {type(request).__name__}")
+            except DuplicateKeyError as e:
+                result["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return SimpleNamespace(
+            inserted_count=result["nInserted"],
+            upserted_count=result["nUpserted"],
+            matched_count=result["nMatched"],
+            upserted_ids={entry["index"]: entry["_id"] for entry in result["upserted"]},
+            bulk_api_result=result
+        )
@@ -0,0 +1,431 @@
+"""
+Streaming, constant-memory readers for batch ingestion files
+"""
+import asyncio
+import codecs
+import csv
+import gzip
+import io
+import json
+import os
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+logger = structlog.get_logger()
+
+FORMAT_EXTENSIONS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "json",
+    ".csv": "csv"
+}
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".zst": "zstd",
+    ".zstd": "zstd"
+}
+_WHITESPACE = " \t\r\n"
+
+
+@dataclass
+class ReadCheckpoint:
+    """Resumable position in a streamed file
+
+    ``offset`` counts bytes of the decompressed input up to the end of the last item
+    handed out, so plain files resume with a seek and compressed files by skipping.
+    """
+    offset: int = 0
+    items: int = 0
+    json_container: Optional[str] = None  # "array" or "data" once inside a JSON array
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReadCheckpoint":
+        return cls(**{key: data.get(key) for key in ("offset", "items", "json_container")
+                      if data.get(key) is not None})
+
+
+@dataclass
+class ReaderStats:
+    """Counters for one streamed file"""
+    items: int = 0
+    malformed_items: int = 0
+    bytes_read: int = 0
+
+
+class _JsonStream:
+    """Incremental JSON tokenizer over a byte stream with a bounded text window"""
+
+    def __init__(self, raw, block_size: int, max_item_bytes: int, byte_pos: int = 0):
+        self.raw = raw
+        self.block_size = block_size
+        self.max_item_bytes = max_item_bytes
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.byte_pos = byte_pos
+        self.eof = False
+
+    def fill(self, min_chars: int = 0) -> bool:
+        """Append at least one block (or ``min_chars``) of text; False at end of input"""
+        if self.eof:
+            return False
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        target = len(self.buffer) + max(min_chars, 1)
+        while len(self.buffer) < target:
+            block = self.raw.read(max(self.block_size, min_chars))
+            if not block:
+                self.buffer += self.decoder.decode(b"", final=True)
+                self.eof = True
+                break
+            self.buffer += self.decoder.decode(block)
+        return True
+
+    def advance(self, new_pos: int):
+        consumed = self.buffer[self.pos:new_pos]
+        self.byte_pos += len(consumed) if consumed.isascii() else len(consumed.encode("utf-8"))
+        self.pos = new_pos
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it, '' at end of input"""
+        while True:
+            index = self.pos
+            length = len(self.buffer)
+            while index < length and self.buffer[index] in _WHITESPACE:
+                index += 1
+            self.advance(index)
+            if index < length:
+                return self.buffer[index]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at byte {self.byte_pos}, found {found or 'end of input'!r}")
+        self.advance(self.pos + 1)
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+                # A number that ends the buffer may continue in the next block
+                if end < len(self.buffer) or self.eof:
+                    self.advance(end)
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            pending = len(self.buffer) - self.pos
+            if pending > self.max_item_bytes:
+                raise ValueError(f"JSON item at byte {self.byte_pos} exceeds {self.max_item_bytes} bytes")
+            self.fill(min_chars=pending)
+
+
+class _CountingLines:
+    """Iterates decoded lines of a binary stream, tracking bytes consumed"""
+
+    def __init__(self, raw, offset: int, encoding: str = "utf-8"):
+        self.raw = raw
+        self.offset = offset
+        self.encoding = encoding
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.raw.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode(self.encoding)
+
+
+class StreamingFileReader:
+    """Streams items from JSON Lines, CSV or JSON files, optionally gzip/zstd compressed
+
+    Memory use is bounded by ``block_size`` plus the largest single item, whatever the
+    file size. JSON documents may be a top-level array, an object whose ``data`` key
+    holds the array (API exports) or a single object.
+    """
+
+    def __init__(self, file_path: str, file_format: Optional[str] = None,
+                 compression: Optional[str] = None, block_size: int = 1 << 20,
+                 max_item_bytes: int = 16 << 20):
+        self.file_path = file_path
+        name = file_path.lower()
+        detected_compression = None
+        for extension, kind in COMPRESSION_EXTENSIONS.items():
+            if name.endswith(extension):
+                detected_compression = kind
+                name = name[:-len(extension)]
+                break
+        self.compression = compression or detected_compression
+        self.file_format = file_format or FORMAT_EXTENSIONS.get(os.path.splitext(name)[1])
+        self.block_size = block_size
+        self.max_item_bytes = max_item_bytes
+        self.stats = ReaderStats()
+        self.json_container: Optional[str] = None
+
+        if self.compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"Unsupported compression: {self.compression}")
+        if self.compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compressed input requires the zstandard package")
+
+    def _open(self):
+        if self.compression == "gzip":
+            return gzip.open(self.file_path, "rb")
+        if self.compression == "zstd":
+            raw = open(self.file_path, "rb")
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True),
+                                     buffer_size=self.block_size)
+        return open(self.file_path, "rb", buffering=self.block_size)
+
+    def _skip(self, raw, current: int, target: int):
+        """Move the stream from byte ``current`` to ``target`` of the decompressed input"""
+        if target <= current:
+            return
+        if self.compression is None:
+            raw.seek(target)
+            return
+        remaining = target - current
+        while remaining > 0:
+            skipped = len(raw.read(min(remaining, self.block_size)))
+            if not skipped:
+                raise ValueError(f"Checkpoint offset {target} is past the end of {self.file_path}")
+            remaining -= skipped
+
+    def _sniff_format(self, raw) -> str:
+        head = raw.peek(64)[:64] if hasattr(raw, "peek") else b""
+        stripped = head.lstrip()
+        if stripped.startswith(b"["):
+            return "json"
+        if stripped.startswith(b"{"):
+            # One object per line is JSON Lines; a pretty-printed document is JSON
+            first_line = head.split(b"\n", 1)[0].strip()
+            return "jsonl" if first_line.endswith(b"}") else "json"
+        return "csv"
+
+    def iter_items(self, checkpoint: Optional[ReadCheckpoint] = None) -> Iterator[Tuple[Any, int]]:
+        """Yield ``(item, end_offset)`` pairs, starting after ``checkpoint`` if given"""
+        checkpoint = checkpoint or ReadCheckpoint()
+        with self._open() as raw:
+            file_format = self.file_format or self._sniff_format(raw)
+            if file_format == "jsonl":
+                yield from self._iter_jsonl(raw, checkpoint)
+            elif file_format == "csv":
+                yield from self._iter_csv(raw, checkpoint)
+            elif file_format == "json":
+                yield from self._iter_json(raw, checkpoint)
+            else:
+                raise ValueError(f"Unsupported file format: {file_format}")
+
+    def _iter_jsonl(self, raw, checkpoint: ReadCheckpoint) -> Iterator[Tuple[Any, int]]:
+        self._skip(raw, 0, checkpoint.offset)
+        offset = checkpoint.offset
+        while True:
+            line = raw.readline(self.max_item_bytes + 1)
+            if not line:
+                break
+            offset += len(line)
+            if len(line) > self.max_item_bytes and not line.endswith(b"\n"):
+                # Drop the rest of an oversized line without holding it in memory
+                while line and not line.endswith(b"\n"):
+                    line = raw.readline(self.block_size)
+                    offset += len(line)
+                self._malformed("Item exceeds max_item_bytes", offset)
+                continue
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                self._malformed(str(e), offset)
+                continue
+            self.stats.bytes_read = offset
+            yield item, offset
+
+    def _iter_csv(self, raw, checkpoint: ReadCheckpoint) -> Iterator[Tuple[Any, int]]:
+        lines = _CountingLines(raw, 0)
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None:
+            return
+        if checkpoint.offset > lines.offset:
+            self._skip(raw, lines.offset, checkpoint.offset)
+            lines.offset = checkpoint.offset
+
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                self._malformed(f"Expected {len(header)} columns, found {len(row)}", lines.offset)
+                continue
+            self.stats.bytes_read = lines.offset
+            yield dict(zip(header, row)), lines.offset
+
+    def _iter_json(self, raw, checkpoint: ReadCheckpoint) -> Iterator[Tuple[Any, int]]:
+        if checkpoint.json_container:
+            # Resume inside the array, just after the last item handed out
+            self._skip(raw, 0, checkpoint.offset)
+            stream = _JsonStream(raw, self.block_size, self.max_item_bytes, checkpoint.offset)
+            self.json_container = checkpoint.json_container
+            yield from self._iter_json_array(stream, first=False)
+            return
+        if checkpoint.offset:
+            # A document without an array is a single item, already handed out
+            return
+
+        stream = _JsonStream(raw, self.block_size, self.max_item_bytes)
+        start = stream.peek()
+        if start == "[":
+            stream.advance(stream.pos + 1)
+            self.json_container = "array"
+            yield from self._iter_json_array(stream, first=True)
+        elif start == "{":
+            yield from self._iter_json_object(stream)
+        elif start:
+            item = stream.value()
+            yield item, stream.byte_pos
+
+    def _iter_json_array(self, stream: _JsonStream, first: bool) -> Iterator[Tuple[Any, int]]:
+        while True:
+            char = stream.peek()
+            if char == "]":
+                stream.advance(stream.pos + 1)
+                return
+            if not char:
+                raise ValueError(f"Unterminated JSON array in {self.file_path}")
+            if not first:
+                stream.expect(",")
+            first = False
+            item = stream.value()
+            self.stats.bytes_read = stream.byte_pos
+            yield item, stream.byte_pos
+
+    def _iter_json_object(self, stream: _JsonStream) -> Iterator[Tuple[Any, int]]:
+        """Stream the ``data`` array of an API export, or yield the object itself"""
+        stream.expect("{")
+        others: Dict[str, Any] = {}
+        found_data = False
+        first = True
+        while stream.peek() != "}":
+            if not first:
+                stream.expect(",")
+            first = False
+            key = stream.value()
+            stream.expect(":")
+            if key == "data" and not found_data and stream.peek() == "[":
+                stream.advance(stream.pos + 1)
+                self.json_container = "data"
+                found_data = True
+                yield from self._iter_json_array(stream, first=True)
+            else:
+                value = stream.value()
+                if not found_data:
+                    others[key] = value
+        stream.expect("}")
+        if not found_data:
+            yield others, stream.byte_pos
+
+    def _malformed(self, error: str, offset: int):
+        self.stats.malformed_items += 1
+        logger.warning("Skipping malformed item", file_path=self.file_path, offset=offset, error=error)
+
+    async def iter_chunks(self, chunk_size: int,
+                          checkpoint: Optional[ReadCheckpoint] = None) -> AsyncIterator[Tuple[List[Any], ReadCheckpoint]]:
+        """Yield lists of up to ``chunk_size`` items with the checkpoint after each list
+
+        Reading and parsing run in the default executor so the event loop stays free.
+        """
+        checkpoint = checkpoint or ReadCheckpoint()
+        items_read = checkpoint.items
+        iterator = self.iter_items(checkpoint)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                chunk, offset = await loop.run_in_executor(None, _take, iterator, chunk_size)
+                if not chunk:
+                    break
+                items_read += len(chunk)
+                self.stats.items = items_read
+                yield chunk, ReadCheckpoint(offset, items_read, self.json_container)
+        finally:
+            await loop.run_in_executor(None, iterator.close)
+
+
+def _take(iterator: Iterator[Tuple[Any, int]], count: int) -> Tuple[List[Any], Optional[int]]:
+    chunk = []
+    offset = None
+    for item, offset in iterator:
+        chunk.append(item)
+        if len(chunk) >= count:
+            break
+    return chunk, offset
+
+
+async def process_chunks(chunks: AsyncIterator[Tuple[List[Any], Any]],
+                         process: Callable[[List[Any]], Awaitable[Any]],
+                         max_concurrency: int,
+                         on_checkpoint: Optional[Callable[[Any], Awaitable[None]]] = None) -> List[Any]:
+    """Run ``process`` over chunks with at most ``max_concurrency`` in flight
+
+    Chunks may finish out of order; ``on_checkpoint`` is called with the checkpoint of
+    the newest chunk whose predecessors have all finished, so resuming from it never
+    skips unprocessed items. Pulling stops while the limit is reached, which bounds
+    the number of items held in memory.
+
+    Returns:
+        Results of ``process`` in chunk order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: Dict[int, Any] = {}
+    done: Dict[int, Any] = {}
+    next_to_commit = 0
+    tasks = set()
+    commit_lock = asyncio.Lock()
+
+    async def run(sequence: int, chunk: List[Any], checkpoint: Any):
+        nonlocal next_to_commit
+        try:
+            results[sequence] = await process(chunk)
+        finally:
+            semaphore.release()
+        async with commit_lock:
+            done[sequence] = checkpoint
+            committed = None
+            while next_to_commit in done:
+                committed = done.pop(next_to_commit)
+                next_to_commit += 1
+            if committed is not None and on_checkpoint is not None:
+                await on_checkpoint(committed)
+
+    sequence = 0
+    try:
+        async for chunk, checkpoint in chunks:
+            await semaphore.acquire()
+            task = asyncio.create_task(run(sequence, chunk, checkpoint))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sequence += 1
+        if tasks:
+            await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return [results[i] for i in range(sequence)]
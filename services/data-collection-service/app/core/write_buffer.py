@@ -0,0 +1,244 @@
+"""
+Write-behind buffer batching Kafka sends and MongoDB writes for ingested posts
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import structlog
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.deduplication import content_hash
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class WriteBufferConfig:
+    """Write-behind buffer settings"""
+    max_batch_size: int = 500
+    max_batch_age: float = 0.5  # Seconds the oldest buffered document may wait
+    upsert_key: str = "content_hash"
+
+    def validate(self):
+        """Validate configuration"""
+        if self.max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if self.max_batch_age <= 0:
+            raise ValueError("max_batch_age must be positive")
+
+
+@dataclass
+class WriteResult:
+    """Outcome of a buffered write for one document"""
+    post_id: Optional[str]
+    success: bool
+    inserted: bool = False  # False when the upsert matched an existing document
+    stage: Optional[str] = None  # "kafka" or "mongodb" when the write failed
+    error: Optional[str] = None
+
+
+@dataclass
+class WriteBufferStats:
+    """Running write-behind buffer counters"""
+    flushes: int = 0
+    size_flushes: int = 0
+    age_flushes: int = 0
+    shutdown_flushes: int = 0
+    documents_written: int = 0
+    kafka_failures: int = 0
+    mongodb_failures: int = 0
+
+
+@dataclass
+class _PendingWrite:
+    platform: str
+    collection_id: str
+    document: Dict[str, Any]
+    future: asyncio.Future
+
+
+class WriteBehindBuffer:
+    """Accumulates validated documents and writes them in batches
+
+    Each flush sends all buffered documents to Kafka with one producer flush, then
+    writes those Kafka accepted to MongoDB with a single unordered ``bulk_write`` of
+    upserts keyed on the content hash, so replays and concurrent writers do not
+    create duplicates. A flush happens when ``max_batch_size`` documents are
+    buffered, when the oldest has waited ``max_batch_age`` seconds, or on ``close``.
+    Failures are reported per document through the future returned by ``submit``.
+    Newly inserted documents are counted in ``rollups`` (the sentiment trend
+    counters) when given.
+    """
+
+    def __init__(self, collection, kafka_producer, config: Optional[WriteBufferConfig] = None,
+                 rollups=None):
+        self.collection = collection
+        self.kafka_producer = kafka_producer
+        self.rollups = rollups
+        self.config = config or WriteBufferConfig()
+        self.config.validate()
+        self.stats = WriteBufferStats()
+        self._pending: List[_PendingWrite] = []
+        self._oldest = 0.0
+        self._has_pending = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self):
+        """Start the age-based flush loop"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._age_flush_loop())
+
+    async def submit(self, platform: str, document: Dict[str, Any], collection_id: str) -> asyncio.Future:
+        """Buffer a document; the returned future resolves to its ``WriteResult``
+
+        Waits for a flush when the buffer is full, which applies backpressure to
+        fast producers.
+        """
+        if self._closed:
+            raise RuntimeError("Write buffer is closed")
+
+        document.setdefault(self.config.upsert_key, content_hash(document.get("content", "")))
+        future = asyncio.get_running_loop().create_future()
+        if not self._pending:
+            self._oldest = time.monotonic()
+            self._has_pending.set()
+        self._pending.append(_PendingWrite(platform, collection_id, document, future))
+
+        if len(self._pending) >= self.config.max_batch_size:
+            await self._flush("size")
+        return future
+
+    async def write(self, platform: str, document: Dict[str, Any], collection_id: str) -> WriteResult:
+        """Buffer a document and wait until it has been written"""
+        return await (await self.submit(platform, document, collection_id))
+
+    async def flush(self) -> List[WriteResult]:
+        """Write everything buffered so far"""
+        return await self._flush("manual")
+
+    async def close(self):
+        """Stop the flush loop and write remaining documents"""
+        self._closed = True
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush("shutdown")
+
+    async def _age_flush_loop(self):
+        while True:
+            await self._has_pending.wait()
+            delay = self._oldest + self.config.max_batch_age - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await self._flush("age")
+            except Exception as e:
+                logger.error("Write buffer flush failed", error=str(e))
+
+    async def _flush(self, trigger: str) -> List[WriteResult]:
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            self._has_pending.clear()
+            if not batch:
+                return []
+
+            start = time.perf_counter()
+            try:
+                results = await self._write_batch(batch)
+            except Exception as e:
+                # Unexpected errors fail the batch rather than strand callers
+                logger.error("Write buffer flush failed", trigger=trigger, error=str(e))
+                results = [WriteResult(p.document.get("post_id"), False, stage="kafka", error=str(e))
+                           for p in batch]
+
+            for pending, result in zip(batch, results):
+                if not pending.future.done():
+                    pending.future.set_result(result)
+
+            self.stats.flushes += 1
+            if trigger in ("size", "age", "shutdown"):
+                setattr(self.stats, f"{trigger}_flushes", getattr(self.stats, f"{trigger}_flushes") + 1)
+            logger.info("Flushed write buffer",
+                        trigger=trigger,
+                        documents=len(batch),
+                        failed=sum(1 for result in results if not result.success),
+                        duration_ms=round((time.perf_counter() - start) * 1000, 2))
+            return results
+
+    async def _write_batch(self, batch: List[_PendingWrite]) -> List[WriteResult]:
+        results = [WriteResult(p.document.get("post_id"), True) for p in batch]
+
+        # Downstream consumers must see a document before it is stored
+        kafka_errors = await self.kafka_producer.send_batch(
+            [(p.platform, p.document, p.collection_id) for p in batch]
+        )
+        accepted = []
+        for index, error in enumerate(kafka_errors):
+            if error:
+                results[index].success, results[index].stage, results[index].error = False, "kafka", error
+                self.stats.kafka_failures += 1
+            else:
+                accepted.append(index)
+
+        if not accepted:
+            return results
+
+        key = self.config.upsert_key
+        operations = [
+            UpdateOne({key: batch[i].document[key]}, {"$setOnInsert": batch[i].document}, upsert=True)
+            for i in accepted
+        ]
+        write_errors: Dict[int, str] = {}
+        upserted: Dict[int, Any] = {}
+        try:
+            bulk_result = await self.collection.bulk_write(operations, ordered=False)
+            upserted = bulk_result.upserted_ids or {}
+        except BulkWriteError as e:
+            # Unordered writes apply every operation that did not fail
+            write_errors = {error["index"]: error.get("errmsg", "write error")
+                            for error in e.details.get("writeErrors", [])}
+            upserted = {entry["index"]: entry["_id"] for entry in e.details.get("upserted", [])}
+        except Exception as e:
+            write_errors = {position: str(e) for position in range(len(accepted))}
+
+        for position, index in enumerate(accepted):
+            if position in write_errors:
+                results[index].success, results[index].stage = False, "mongodb"
+                results[index].error = write_errors[position]
+                self.stats.mongodb_failures += 1
+            else:
+                results[index].inserted = position in upserted
+                self.stats.documents_written += 1
+
+        # Matched upserts are replays of documents that were already counted
+        inserted = [batch[index].document for index in accepted if results[index].inserted]
+        if self.rollups is not None and inserted:
+            try:
+                await self.rollups.record(inserted)
+            except Exception as e:
+                # Never fail ingestion; reset and backfill to repair the counters
+                logger.error("Failed to update sentiment rollups", documents=len(inserted), error=str(e))
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Write-behind buffer counters"""
+        return {
+            "buffered": len(self._pending),
+            "flushes": self.stats.flushes,
+            "size_flushes": self.stats.size_flushes,
+            "age_flushes": self.stats.age_flushes,
+            "shutdown_flushes": self.stats.shutdown_flushes,
+            "documents_written": self.stats.documents_written,
+            "kafka_failures": self.stats.kafka_failures,
+            "mongodb_failures": self.stats.mongodb_failures
+        }
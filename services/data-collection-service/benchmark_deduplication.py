@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Benchmark duplicate detection: per-item exact checks vs batched MinHash-LSH detection.
+
+Feeds a synthetic stream with known duplicates (redelivered post ids, reposts that only
+add "RT @user:", a URL or emoji, and one-word edits) at ``--rate`` items/sec in chunks
+and reports the share of true duplicates caught, false positives, Redis round trips,
+the per-item detector cost and the per-item time spent waiting on Redis. At 10k
+items/sec the per-item budget is 100 microseconds. Uses fakeredis unless
+``--redis-url`` is given; fakeredis parses commands in Python on the same thread, so
+its "redis us" column is far above what a real server costs.
+
+Usage:
+    python benchmark_deduplication.py
+    python benchmark_deduplication.py --items 50000 --chunk-size 1000 --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.deduplication import BatchDuplicateDetector, DeduplicationConfig, DedupItem
+
+EMOJI = ["🔥", "🇮🇳", "👏", "😡", "🙏"]
+
+
+def generate_stream(count: int, seed: int = 5):
+    """Return (items, is_duplicate flags)"""
+    rng = random.Random(seed)
+    vocabulary = [f"{rng.choice('bcdfghjklmnprstv')}{rng.choice('aeiou')}{rng.choice('bcdfghjklmnprstv')}"
+                  f"{rng.choice('aeiou')}{rng.choice(['', 'n', 'r', 'sh'])}" for _ in range(4000)]
+    originals, items, flags = [], [], []
+
+    for i in range(count):
+        roll = rng.random()
+        if originals and roll < 0.05:
+            source = rng.choice(originals[-2000:])
+            items.append(DedupItem("twitter", source.post_id, source.content))
+        elif originals and roll < 0.20:
+            source = rng.choice(originals[-2000:])
+            variant = rng.choice([
+                f"RT @user{rng.randint(1, 999)}: {source.content}",
+                f"{source.content} https://t.co/{rng.randint(10**6, 10**7)}",
+                f"{source.content} {rng.choice(EMOJI)}{rng.choice(EMOJI)}",
+            ])
+            items.append(DedupItem("twitter", f"p{i}", variant))
+        elif originals and roll < 0.30:
+            words = rng.choice(originals[-2000:]).content.split()
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            items.append(DedupItem("twitter", f"p{i}", " ".join(words)))
+        else:
+            content = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(12, 30)))
+            item = DedupItem("twitter", f"p{i}", content)
+            originals.append(item)
+            items.append(item)
+            flags.append(False)
+            continue
+        flags.append(True)
+    return items, flags
+
+
+class LegacyDetector:
+    """Per-item exact detection as previously done in DuplicateDetector"""
+
+    def __init__(self, client, ttl: int = 86400 * 7):
+        self.client = client
+        self.ttl = ttl
+
+    async def is_duplicate(self, item: DedupItem) -> bool:
+        content_key = f"legacy:content_hash:{hashlib.sha256(item.content.encode()).hexdigest()}"
+        post_key = f"legacy:post:{item.platform}:{item.post_id}"
+        if await self.client.exists(post_key):
+            return True
+        if await self.client.exists(content_key):
+            return True
+        await self.client.setex(post_key, self.ttl, "1")
+        await self.client.setex(content_key, self.ttl, "1")
+        return False
+
+
+class TimedRedis:
+    """Client proxy that accumulates time spent waiting on Redis replies"""
+
+    def __init__(self, client):
+        self.client = client
+        self.redis_seconds = 0.0
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name == "pipeline":
+            def pipeline(*args, **kwargs):
+                pipe = attr(*args, **kwargs)
+                execute = pipe.execute
+
+                async def timed_execute(*a, **kw):
+                    return await self._timed(execute(*a, **kw))
+                pipe.execute = timed_execute
+                return pipe
+            return pipeline
+        if name in ("exists", "setex"):
+            return lambda *a, **kw: self._timed(attr(*a, **kw))
+        return attr
+
+    async def _timed(self, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.redis_seconds += time.perf_counter() - start
+
+
+async def make_client(redis_url):
+    if redis_url:
+        import redis.asyncio as redis
+        client = redis.from_url(redis_url, decode_responses=True)
+    else:
+        import fakeredis.aioredis
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    await client.flushdb()
+    return client
+
+
+async def paced(chunks, rate: float, process):
+    """Submit chunks no faster than ``rate`` items/sec; return busy seconds and lag"""
+    start = time.perf_counter()
+    busy = 0.0
+    submitted = 0
+    for chunk in chunks:
+        due = start + submitted / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        t0 = time.perf_counter()
+        await process(chunk)
+        busy += time.perf_counter() - t0
+        submitted += len(chunk)
+    lag = time.perf_counter() - (start + submitted / rate)
+    return busy, max(0.0, lag)
+
+
+async def run(args):
+    items, flags = generate_stream(args.items)
+    chunks = [items[i:i + args.chunk_size] for i in range(0, len(items), args.chunk_size)]
+    true_duplicates = sum(flags)
+    rows = []
+
+    client = TimedRedis(await make_client(args.redis_url))
+    legacy = LegacyDetector(client)
+    legacy_flags = []
+
+    async def legacy_chunk(chunk):
+        for item in chunk:
+            legacy_flags.append(await legacy.is_duplicate(item))
+
+    busy, lag = await paced(chunks, args.rate, legacy_chunk)
+    rows.append(("legacy exact", legacy_flags, busy, client.redis_seconds, lag, 4 * len(items)))
+
+    await client.flushdb()
+    client.redis_seconds = 0.0
+    detector = BatchDuplicateDetector(SimpleNamespace(client=client),
+                                      DeduplicationConfig(jaccard_threshold=args.jaccard))
+    batch_flags = []
+
+    async def batch_chunk(chunk):
+        results = await detector.check_and_mark_batch(chunk)
+        batch_flags.extend(result.is_duplicate for result in results)
+
+    busy, lag = await paced(chunks, args.rate, batch_chunk)
+    rows.append(("batch minhash", batch_flags, busy, client.redis_seconds, lag, len(chunks)))
+    await client.aclose()
+
+    print(f"items={len(items)} true duplicates={true_duplicates} rate={args.rate:.0f}/s chunk={args.chunk_size}")
+    print(f"{'detector':>14} {'caught':>8} {'false +':>8} {'dedup ratio':>12} {'us/item':>9} "
+          f"{'redis us':>9} {'round trips':>12} {'lag s':>7}")
+    for label, detected, busy, redis_seconds, lag, round_trips in rows:
+        caught = sum(1 for d, f in zip(detected, flags) if d and f) / max(1, true_duplicates)
+        false_positive = sum(1 for d, f in zip(detected, flags) if d and not f)
+        ratio = sum(detected) / len(detected)
+        print(f"{label:>14} {caught:>8.1%} {false_positive:>8} {ratio:>12.1%} "
+              f"{(busy - redis_seconds) / len(items) * 1e6:>9.1f} {redis_seconds / len(items) * 1e6:>9.1f} "
+              f"{round_trips:>12} {lag:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=10000.0)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--jaccard', type=float, default=0.7)
+    parser.add_argument('--redis-url', default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Benchmark constant-memory file ingestion and check peak RSS against a ceiling.
+
+Writes a synthetic export (JSON Lines by default, or a JSON array / CSV, optionally
+gzip compressed) of ``--size-gb``, then streams it through ``StreamingFileReader`` and
+``process_chunks`` with a stand-in chunk processor, checkpointing as chunks finish.
+Each run happens in a child process so its peak RSS is measured in isolation. For
+comparison the previous loader (read the whole file, ``json.loads``, collect every
+item into a list) runs on a much smaller JSON array of ``--legacy-mb``.
+
+Exits with status 1 if the streaming run's peak RSS exceeds ``--max-rss-mb``.
+
+Usage:
+    python benchmark_streaming_ingest.py
+    python benchmark_streaming_ingest.py --size-gb 0.5 --format json --compress gzip --max-rss-mb 256
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import structlog
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.streaming_readers import StreamingFileReader, process_chunks
+
+FIELDS = ["post_id", "user_id", "timestamp", "content"]
+
+
+def make_post(i: int):
+    return {
+        "post_id": str(10 ** 12 + i),
+        "user_id": f"user_{i % 50000}",
+        "timestamp": "2024-01-15T10:30:00Z",
+        "content": f"Post {i} about the farmers rally in Delhi, किसान आंदोलन #protest " + "lorem ipsum " * (i % 20)
+    }
+
+
+def generate_file(path: str, file_format: str, compress: bool, size_bytes: int) -> int:
+    """Write posts until the uncompressed size reaches ``size_bytes``; return the item count"""
+    opener = gzip.open if compress else open
+    written = 0
+    count = 0
+    with opener(path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS) if file_format == "csv" else None
+        if writer:
+            writer.writeheader()
+        elif file_format == "json":
+            f.write("[\n")
+        while written < size_bytes:
+            lines = []
+            for i in range(count, count + 10000):
+                post = make_post(i)
+                if file_format == "jsonl":
+                    lines.append(json.dumps(post, ensure_ascii=False) + "\n")
+                elif file_format == "json":
+                    lines.append(("  " if i == 0 else ",\n  ") + json.dumps(post, ensure_ascii=False))
+            if writer:
+                writer.writerows(make_post(i) for i in range(count, count + 10000))
+                written = f.tell() if not compress else written + 10000 * 200
+            else:
+                text = "".join(lines)
+                f.write(text)
+                written += len(text.encode("utf-8"))
+            count += 10000
+        if file_format == "json":
+            f.write("\n]\n")
+    return count
+
+
+def run_streaming(path: str, chunk_size: int, concurrency: int, queue):
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    async def main():
+        reader = StreamingFileReader(path)
+        last_checkpoint = None
+        items = 0
+
+        async def process(chunk):
+            nonlocal items
+            items += len(chunk)
+            await asyncio.sleep(0)
+
+        async def on_checkpoint(position):
+            nonlocal last_checkpoint
+            last_checkpoint = position
+
+        start = time.perf_counter()
+        await process_chunks(reader.iter_chunks(chunk_size), process, concurrency, on_checkpoint)
+        return time.perf_counter() - start, items, last_checkpoint.offset
+
+    elapsed, items, offset = asyncio.run(main())
+    queue.put((elapsed, items, offset))
+
+
+def run_legacy(path: str, queue):
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    data = json.loads(content)
+    items = [item for item in data]
+    queue.put((time.perf_counter() - start, len(items), len(content)))
+
+
+def measure(target, *args):
+    """Run ``target`` in a child process; return its result and peak RSS in MB"""
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=target, args=(*args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    # ru_maxrss is the largest of all waited-for children; runs go smallest first
+    return result, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-gb', type=float, default=2.0)
+    parser.add_argument('--format', choices=["jsonl", "json", "csv"], default="jsonl")
+    parser.add_argument('--compress', choices=["none", "gzip"], default="none")
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--max-rss-mb', type=float, default=256.0, help="peak RSS ceiling for the streaming run")
+    parser.add_argument('--legacy-mb', type=float, default=100.0, help="size of the whole-file comparison; 0 skips it")
+    parser.add_argument('--workdir', default=None, help="directory for the generated files")
+    args = parser.parse_args()
+
+    compress = args.compress == "gzip"
+    workdir = tempfile.mkdtemp(dir=args.workdir)
+    path = os.path.join(workdir, f"export.{args.format}" + (".gz" if compress else ""))
+    legacy_path = os.path.join(workdir, "legacy.json")
+    try:
+        start = time.perf_counter()
+        generated = generate_file(path, args.format, compress, int(args.size_gb * 1024 ** 3))
+        print(f"generated {generated} items, {os.path.getsize(path) / 1024 ** 2:.0f} MB on disk "
+              f"in {time.perf_counter() - start:.0f}s", flush=True)
+
+        print(f"{'loader':>10} {'items':>10} {'input MB':>9} {'items/sec':>10} {'MB/sec':>8} {'peak RSS MB':>12}")
+        (elapsed, items, offset), peak = measure(run_streaming, path, args.chunk_size, args.concurrency)
+        print(f"{'streaming':>10} {items:>10} {offset / 1024 ** 2:>9.0f} {items / elapsed:>10.0f} "
+              f"{offset / 1024 ** 2 / elapsed:>8.1f} {peak:>12.0f}", flush=True)
+        streaming_peak = peak
+        assert items == generated, f"read {items} of {generated} items"
+
+        if args.legacy_mb > 0:
+            generate_file(legacy_path, "json", False, int(args.legacy_mb * 1024 ** 2))
+            (elapsed, items, size), peak = measure(run_legacy, legacy_path)
+            print(f"{'whole-file':>10} {items:>10} {size / 1024 ** 2:>9.0f} {items / elapsed:>10.0f} "
+                  f"{size / 1024 ** 2 / elapsed:>8.1f} {peak:>12.0f}", flush=True)
+    finally:
+        for leftover in (path, legacy_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        os.rmdir(workdir)
+
+    if streaming_peak > args.max_rss_mb:
+        print(f"FAIL: streaming peak RSS {streaming_peak:.0f} MB exceeds {args.max_rss_mb:.0f} MB")
+        sys.exit(1)
+    print(f"OK: streaming peak RSS {streaming_peak:.0f} MB <= {args.max_rss_mb:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
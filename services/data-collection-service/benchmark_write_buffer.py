@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark ingestion writes: per-item Kafka send + insert vs the write-behind buffer.
+
+Runs against the in-memory Kafka producer and MongoDB collection, where each request
+costs a simulated round trip. The per-item path mirrors the previous pipeline: chunks
+of 100 gathered, each item waiting for its Kafka acknowledgement and then doing an
+``insert_one``. The buffered path submits the same documents to ``WriteBehindBuffer``,
+which writes each batch with one producer flush and one unordered ``bulk_write``.
+
+Usage:
+    python benchmark_write_buffer.py
+    python benchmark_write_buffer.py --docs 50000 --batch-size 1000 --kafka-latency-ms 5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import structlog
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.config import KafkaConfig
+from app.core.kafka_producer import KafkaDataProducer
+from app.core.memory_backends import MemoryCollection, MemoryKafkaProducer
+from app.core.write_buffer import WriteBehindBuffer, WriteBufferConfig
+
+
+def make_document(i: int):
+    return {"post_id": f"post_{i}", "user_id": f"user_{i % 500}", "platform": "twitter",
+            "content": f"Post {i} about the farmers rally in Delhi #protest", "metrics": {"likes": i % 97}}
+
+
+def make_backends(args):
+    with patch('app.core.kafka_producer.KafkaProducer',
+               lambda **config: MemoryKafkaProducer(request_latency_ms=args.kafka_latency_ms, **config)):
+        kafka_producer = KafkaDataProducer(KafkaConfig())
+    collection = MemoryCollection(request_latency_ms=args.mongo_latency_ms, unique_fields=("content_hash",))
+    return kafka_producer, collection
+
+
+async def run_per_item(args, docs: int):
+    kafka_producer, collection = make_backends(args)
+
+    async def write(document):
+        if await kafka_producer.send_data("twitter", document, "bench"):
+            await collection.insert_one(document)
+
+    start = time.perf_counter()
+    for i in range(0, docs, 100):
+        await asyncio.gather(*(write(make_document(j)) for j in range(i, min(i + 100, docs))))
+    elapsed = time.perf_counter() - start
+    return elapsed, kafka_producer.producer.requests, collection.requests, len(collection.documents)
+
+
+async def run_buffered(args, docs: int):
+    kafka_producer, collection = make_backends(args)
+    buffer = WriteBehindBuffer(collection, kafka_producer,
+                               WriteBufferConfig(max_batch_size=args.batch_size, max_batch_age=args.max_age))
+    await buffer.start()
+
+    start = time.perf_counter()
+    futures = [await buffer.submit("twitter", make_document(i), "bench") for i in range(docs)]
+    await buffer.close()
+    results = await asyncio.gather(*futures)
+    elapsed = time.perf_counter() - start
+    assert all(result.success for result in results)
+    return elapsed, kafka_producer.producer.requests, collection.requests, len(collection.documents)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=20000)
+    parser.add_argument('--per-item-docs', type=int, default=2000,
+                        help="the per-item path is slow; run it on fewer documents")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--max-age', type=float, default=0.5)
+    parser.add_argument('--kafka-latency-ms', type=float, default=2.0, help="simulated producer round trip")
+    parser.add_argument('--mongo-latency-ms', type=float, default=1.0, help="simulated MongoDB round trip")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'writes':>9} {'docs':>7} {'docs/sec':>10} {'kafka reqs':>11} {'mongo reqs':>11} {'stored':>7}")
+    for label, runner, count in (("per-item", run_per_item, args.per_item_docs),
+                                 ("buffered", run_buffered, args.docs)):
+        elapsed, kafka_requests, mongo_requests, stored = asyncio.run(runner(args, count))
+        print(f"{label:>9} {count:>7} {count / elapsed:>10.0f} {kafka_requests:>11} "
+              f"{mongo_requests:>11} {stored:>7}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
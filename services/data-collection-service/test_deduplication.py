@@ -0,0 +1,113 @@
+"""
+Test batch duplicate and near-duplicate detection
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+import fakeredis.aioredis
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.deduplication import (
+    BatchDuplicateDetector, DeduplicationConfig, DedupItem, normalize_content
+)
+
+
+BASE = "Massive rally in Delhi today as farmers demand fair prices for their crops and better support"
+
+
+class CountingRedis(fakeredis.aioredis.FakeRedis):
+    """Fake Redis client that counts pipeline round trips"""
+
+    round_trips = 0
+
+    def pipeline(self, *args, **kwargs):
+        CountingRedis.round_trips += 1
+        return super().pipeline(*args, **kwargs)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def detector(server):
+    redis_manager = SimpleNamespace(client=CountingRedis(server=server, decode_responses=True))
+    return BatchDuplicateDetector(redis_manager, DeduplicationConfig())
+
+
+def item(post_id, content, platform="twitter"):
+    return DedupItem(platform, post_id, content)
+
+
+def test_normalization_ignores_urls_emoji_and_retweet_prefix():
+    assert normalize_content(f"RT @news_desk: {BASE} 🔥🔥 https://t.co/x1y2") == normalize_content(BASE)
+    assert normalize_content("भारत   जीता! 🎉") == "भारत जीता"
+
+
+@pytest.mark.asyncio
+async def test_chunk_is_checked_and_marked_in_one_round_trip(detector):
+    CountingRedis.round_trips = 0
+    results = await detector.check_and_mark_batch([
+        item("1", BASE),
+        item("2", f"RT @user: {BASE} https://t.co/abc"),
+        item("1", BASE),
+        item("3", "Completely unrelated post about the cricket world cup final"),
+    ])
+
+    assert CountingRedis.round_trips == 1
+    assert [r.reason for r in results] == [None, "exact", "post_id", None]
+    assert detector.stats.dedup_ratio == 0.5
+
+
+@pytest.mark.asyncio
+async def test_near_duplicates_across_and_within_chunks(detector):
+    await detector.check_and_mark_batch([item("1", BASE)])
+    results = await detector.check_and_mark_batch([
+        item("2", BASE.replace("today", "yesterday")),
+        item("3", "Election results announced: ruling party retains majority in the state assembly"),
+        item("4", "Election results announced: ruling party retains majority in the state assembly polls"),
+    ])
+
+    assert results[0].reason == "near" and results[0].duplicate_of == "1"
+    assert results[0].similarity >= detector.config.jaccard_threshold
+    assert not results[1].is_duplicate
+    assert results[2].reason == "near" and results[2].duplicate_of == "3"
+
+
+@pytest.mark.asyncio
+async def test_dissimilar_posts_are_not_flagged(detector):
+    posts = [
+        "Monsoon arrives early in Kerala bringing relief from the heat",
+        "New metro line inaugurated connecting the airport to the city centre",
+        "Stock markets close higher led by banking and IT shares",
+        "Scientists launch a new satellite to monitor air quality over the region",
+    ]
+    results = await detector.check_and_mark_batch([item(str(i), text) for i, text in enumerate(posts)])
+    assert not any(r.is_duplicate for r in results)
+
+
+@pytest.mark.asyncio
+async def test_release_allows_retry(detector):
+    first = await detector.check_and_mark_batch([item("1", BASE)])
+    await detector.release([item("1", BASE)])
+    retry = await detector.check_and_mark_batch([item("1", BASE)])
+
+    assert not first[0].is_duplicate
+    assert not retry[0].is_duplicate
+
+
+@pytest.mark.asyncio
+async def test_band_index_is_bounded_and_expires(detector, server):
+    config = detector.config
+    await detector.check_and_mark_batch([item(str(i), f"{BASE} {i} " * 3) for i in range(200)])
+
+    client = detector.redis.client
+    band_keys = await client.keys(f"{config.key_prefix}:lsh:*")
+    assert len(band_keys) == config.num_bands
+    for key in band_keys:
+        assert await client.hlen(key) <= 2 ** config.slot_bits
+        assert 0 < await client.ttl(key) <= 2 * config.near_duplicate_window
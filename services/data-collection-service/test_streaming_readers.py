@@ -0,0 +1,146 @@
+"""
+Test streaming file readers and chunked ingestion
+"""
+import asyncio
+import csv
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.streaming_readers import ReadCheckpoint, StreamingFileReader, process_chunks
+
+
+POSTS = [
+    {"post_id": str(i), "user_id": f"u{i}", "content": f"पोस्ट {i} about the rally, \"quoted\"\nand wrapped"}
+    for i in range(7)
+]
+
+
+async def read_all(reader, chunk_size=3, checkpoint=None):
+    chunks = []
+    async for chunk, position in reader.iter_chunks(chunk_size, checkpoint):
+        chunks.append((chunk, position))
+    return chunks
+
+
+def flatten(chunks):
+    return [item for chunk, _ in chunks for item in chunk]
+
+
+@pytest.mark.asyncio
+async def test_jsonl_skips_malformed_lines_and_resumes(tmp_path):
+    path = tmp_path / "posts.jsonl"
+    lines = [json.dumps(post, ensure_ascii=False) for post in POSTS]
+    lines.insert(2, "{not json")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    reader = StreamingFileReader(str(path))
+    chunks = await read_all(reader)
+    assert flatten(chunks) == POSTS
+    assert reader.stats.malformed_items == 1
+    assert chunks[-1][1].offset == path.stat().st_size
+
+    resumed = await read_all(StreamingFileReader(str(path)), checkpoint=chunks[0][1])
+    assert flatten(resumed) == POSTS[3:]
+    assert resumed[-1][1].items == len(POSTS)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("document", [POSTS, {"meta": {"count": 7}, "data": POSTS, "next": None}])
+async def test_json_array_is_parsed_incrementally_and_resumes(tmp_path, document):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps(document, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    # A tiny block size forces items to straddle reads
+    chunks = await read_all(StreamingFileReader(str(path), block_size=16))
+    assert flatten(chunks) == POSTS
+
+    resumed = await read_all(StreamingFileReader(str(path), block_size=16), checkpoint=chunks[1][1])
+    assert flatten(resumed) == POSTS[6:]
+
+
+@pytest.mark.asyncio
+async def test_json_object_without_data_array_is_one_item(tmp_path):
+    path = tmp_path / "single.json"
+    path.write_text(json.dumps(POSTS[0]), encoding="utf-8")
+
+    chunks = await read_all(StreamingFileReader(str(path)))
+    assert flatten(chunks) == [POSTS[0]]
+    assert flatten(await read_all(StreamingFileReader(str(path)), checkpoint=chunks[0][1])) == []
+
+
+@pytest.mark.asyncio
+async def test_csv_with_quoted_newlines_resumes(tmp_path):
+    path = tmp_path / "posts.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["post_id", "user_id", "content"])
+        writer.writeheader()
+        writer.writerows(POSTS)
+
+    chunks = await read_all(StreamingFileReader(str(path)), chunk_size=4)
+    assert flatten(chunks) == POSTS
+
+    resumed = await read_all(StreamingFileReader(str(path)), checkpoint=chunks[0][1])
+    assert flatten(resumed) == POSTS[4:]
+
+
+@pytest.mark.asyncio
+async def test_gzip_resumes_by_skipping_decompressed_bytes(tmp_path):
+    path = tmp_path / "posts.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for post in POSTS:
+            f.write(json.dumps(post) + "\n")
+
+    reader = StreamingFileReader(str(path))
+    assert (reader.compression, reader.file_format) == ("gzip", "jsonl")
+    chunks = await read_all(reader, chunk_size=5)
+    assert flatten(chunks) == POSTS
+
+    resumed = await read_all(StreamingFileReader(str(path)), checkpoint=ReadCheckpoint.from_dict(
+        json.loads(json.dumps(chunks[0][1].to_dict()))
+    ))
+    assert flatten(resumed) == POSTS[5:]
+
+
+@pytest.mark.asyncio
+async def test_oversized_jsonl_item_is_skipped(tmp_path):
+    path = tmp_path / "posts.jsonl"
+    path.write_text(json.dumps({"content": "x" * 1000}) + "\n" + json.dumps(POSTS[0]) + "\n")
+
+    reader = StreamingFileReader(str(path), max_item_bytes=300, block_size=64)
+    assert flatten(await read_all(reader)) == [POSTS[0]]
+    assert reader.stats.malformed_items == 1
+
+
+@pytest.mark.asyncio
+async def test_process_chunks_bounds_concurrency_and_commits_in_order():
+    in_flight = 0
+    peak = 0
+    committed = []
+
+    async def chunks():
+        for i in range(6):
+            yield [i], i
+
+    async def process(chunk):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Earlier chunks finish last
+        await asyncio.sleep(0.02 * (3 - chunk[0] % 3))
+        in_flight -= 1
+        return chunk[0] * 10
+
+    async def on_checkpoint(position):
+        committed.append(position)
+
+    results = await process_chunks(chunks(), process, max_concurrency=3, on_checkpoint=on_checkpoint)
+
+    assert results == [0, 10, 20, 30, 40, 50]
+    assert peak == 3
+    assert committed == sorted(committed) and committed[-1] == 5
@@ -0,0 +1,142 @@
+"""
+Test the write-behind buffer for batched Kafka sends and MongoDB writes
+"""
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.config import KafkaConfig
+from app.core.deduplication import content_hash
+from app.core.kafka_producer import KafkaDataProducer
+from app.core.memory_backends import MemoryCollection, MemoryKafkaProducer
+from app.core.write_buffer import WriteBehindBuffer, WriteBufferConfig
+
+
+def make_kafka_producer(**kwargs):
+    with patch('app.core.kafka_producer.KafkaProducer',
+               lambda **config: MemoryKafkaProducer(request_latency_ms=0, **kwargs, **config)):
+        return KafkaDataProducer(KafkaConfig())
+
+
+class RecordingRollups:
+    def __init__(self, fail=False):
+        self.recorded = []
+        self.fail = fail
+
+    async def record(self, posts):
+        if self.fail:
+            raise RuntimeError("rollups unavailable")
+        self.recorded.extend(post["post_id"] for post in posts)
+
+
+def make_buffer(collection=None, kafka_producer=None, rollups=None, **config):
+    return WriteBehindBuffer(
+        collection or MemoryCollection(request_latency_ms=0, unique_fields=("content_hash", "post_id")),
+        kafka_producer or make_kafka_producer(),
+        WriteBufferConfig(**config),
+        rollups=rollups
+    )
+
+
+def post(post_id, content=None):
+    return {"post_id": post_id, "user_id": "u1", "content": content or f"Post number {post_id} about the rally"}
+
+
+@pytest.mark.asyncio
+async def test_size_flush_uses_one_request_per_backend():
+    buffer = make_buffer(max_batch_size=3, max_batch_age=60)
+    futures = [await buffer.submit("twitter", post(str(i)), "c1") for i in range(3)]
+
+    results = [future.result() for future in futures]
+    assert all(result.success and result.inserted for result in results)
+    assert buffer.kafka_producer.producer.requests == 1
+    assert buffer.collection.requests == 1
+    assert len(buffer.kafka_producer.producer.records["dharma.twitter.raw"]) == 3
+    stored = await buffer.collection.find_one({"post_id": "0"})
+    assert stored["content_hash"] == content_hash(post("0")["content"])
+    assert buffer.stats.size_flushes == 1
+
+
+@pytest.mark.asyncio
+async def test_age_and_shutdown_flushes():
+    buffer = make_buffer(max_batch_size=100, max_batch_age=0.05)
+    await buffer.start()
+
+    result = await asyncio.wait_for(buffer.write("twitter", post("1"), "c1"), timeout=2)
+    assert result.success and buffer.stats.age_flushes == 1
+
+    future = await buffer.submit("youtube", post("2"), "c1")
+    await buffer.close()
+    assert future.result().success and buffer.stats.shutdown_flushes == 1
+    with pytest.raises(RuntimeError):
+        await buffer.submit("twitter", post("3"), "c1")
+
+
+@pytest.mark.asyncio
+async def test_per_document_errors_do_not_fail_the_batch():
+    kafka_producer = make_kafka_producer(fail_when=lambda message: message["data"]["post_id"] == "rejected")
+    buffer = make_buffer(kafka_producer=kafka_producer, max_batch_size=100)
+    await buffer.collection.insert_one({"post_id": "taken", "content_hash": "other"})
+
+    futures = [await buffer.submit("twitter", post(post_id), "c1")
+               for post_id in ("ok-1", "rejected", "taken", "ok-2")]
+    futures.append(await buffer.submit("unknown", post("no-topic"), "c1"))
+    results = await buffer.flush()
+
+    assert [r.success for r in results] == [True, False, False, True, False]
+    assert [r.stage for r in results] == [None, "kafka", "mongodb", None, "kafka"]
+    assert "duplicate key" in results[2].error
+    assert [f.result() for f in futures] == results
+    assert await buffer.collection.count_documents({"post_id": "rejected"}) == 0
+    assert buffer.stats.documents_written == 2
+
+
+@pytest.mark.asyncio
+async def test_upsert_on_content_hash_is_idempotent():
+    buffer = make_buffer()
+    await buffer.submit("twitter", post("1", "Same words"), "c1")
+    await buffer.submit("twitter", post("2", "Same   words!"), "c1")
+    first, replay = await buffer.flush()
+
+    assert first.success and first.inserted
+    assert replay.success and not replay.inserted
+    assert len(buffer.collection.documents) == 1
+
+
+@pytest.mark.asyncio
+async def test_mongodb_outage_reports_errors_and_allows_retry():
+    buffer = make_buffer()
+    buffer.collection.fail_requests = True
+    await buffer.submit("twitter", post("1"), "c1")
+    results = await buffer.flush()
+
+    assert not results[0].success and results[0].stage == "mongodb"
+    buffer.collection.fail_requests = False
+    await buffer.submit("twitter", post("1"), "c1")
+    retry, = await buffer.flush()
+    assert retry.success and retry.inserted
+
+
+@pytest.mark.asyncio
+async def test_only_inserted_documents_are_counted_in_rollups():
+    kafka_producer = make_kafka_producer(fail_when=lambda message: message["data"]["post_id"] == "rejected")
+    buffer = make_buffer(kafka_producer=kafka_producer, rollups=RecordingRollups())
+    for post_id, content in (("1", "First"), ("rejected", None), ("2", "Second"), ("3", "First")):
+        await buffer.submit("twitter", post(post_id, content), "c1")
+    await buffer.flush()
+
+    assert buffer.rollups.recorded == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_rollup_failures_do_not_fail_the_batch():
+    buffer = make_buffer(rollups=RecordingRollups(fail=True))
+    await buffer.submit("twitter", post("1"), "c1")
+    result, = await buffer.flush()
+
+    assert result.success and result.inserted
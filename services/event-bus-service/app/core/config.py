@@ -20,6 +20,11 @@ class EventBusConfig(BaseSettings):
     kafka_producer_retry_backoff_ms: int = 1000
     kafka_consumer_group_id: str = "event-bus-group"
     kafka_consumer_auto_offset_reset: str = "latest"
+    kafka_producer_linger_ms: int = 5
+    kafka_publish_max_in_flight: int = 1000  # Unacknowledged sends before publishing waits
+    kafka_consumer_concurrency: int = 16  # Ordered lanes handling events in parallel
+    kafka_consumer_max_pending: int = 1000  # Polled events buffered or in progress
+    kafka_consumer_max_poll_records: int = 500
     
     # Temporal settings
     temporal_host: str = "localhost:7233"
@@ -61,6 +66,11 @@ def get_kafka_config() -> Dict[str, Any]:
     """Get Kafka configuration"""
     return {
         "bootstrap_servers": config.kafka_bootstrap_servers,
+        "linger_ms": config.kafka_producer_linger_ms,
+        "max_in_flight": config.kafka_publish_max_in_flight,
+        "consumer_concurrency": config.kafka_consumer_concurrency,
+        "consumer_max_pending": config.kafka_consumer_max_pending,
+        "max_poll_records": config.kafka_consumer_max_poll_records,
         "producer_config": {
             "acks": config.kafka_producer_acks,
             "retries": config.kafka_producer_retries,
@@ -0,0 +1,92 @@
+"""
+Concurrent, per-key ordered dispatch of consumed events
+"""
+import asyncio
+import logging
+import zlib
+from typing import Any, Awaitable, Callable, Hashable, List, Optional
+
+from shared.messaging import PartitionOffsetTracker
+
+logger = logging.getLogger(__name__)
+
+class KeyedDispatcher:
+    """Runs a handler over messages concurrently while keeping per-key order
+
+    Each message is hashed by key to one of ``concurrency`` ordered lanes; a
+    lane handles its messages one at a time, so two events with the same key
+    are never processed concurrently or out of order, while different keys
+    proceed in parallel. At most ``max_pending`` messages are buffered or in
+    progress; ``submit`` waits for room, which holds back polling.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], concurrency: int = 16,
+                 max_pending: int = 1000):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.handler = handler
+        self.concurrency = concurrency
+        self.tracker = PartitionOffsetTracker()
+        self._room = asyncio.Semaphore(max_pending)
+        self._lanes: List[asyncio.Queue] = [asyncio.Queue() for _ in range(concurrency)]
+        self._workers: List[asyncio.Task] = []
+        self._in_progress = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.stats = {"dispatched": 0, "completed": 0, "failed": 0}
+
+    def lane_for(self, key: Optional[bytes], partition: Hashable) -> int:
+        """Stable lane for a key; unkeyed messages keep their partition's order"""
+        if key is None:
+            key = repr(partition).encode("utf-8")
+        elif isinstance(key, str):
+            key = key.encode("utf-8")
+        return zlib.crc32(key) % self.concurrency
+
+    @property
+    def pending(self) -> int:
+        """Messages queued or being handled"""
+        return self._in_progress
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work(lane)) for lane in self._lanes]
+
+    async def submit(self, partition: Hashable, offset: int, key: Optional[bytes], message: Any):
+        """Queue a message for its key's lane, waiting while max_pending are outstanding"""
+        await self._room.acquire()
+        self.start()
+        self.tracker.track(partition, offset)
+        self._in_progress += 1
+        self._idle.clear()
+        self.stats["dispatched"] += 1
+        self._lanes[self.lane_for(key, partition)].put_nowait((partition, offset, message))
+
+    async def _work(self, lane: asyncio.Queue):
+        while True:
+            partition, offset, message = await lane.get()
+            try:
+                await self.handler(message)
+                self.stats["completed"] += 1
+            except Exception as e:
+                # Handlers report their own errors; the offset still moves on
+                self.stats["failed"] += 1
+                logger.error(f"Unhandled error processing message at {partition}@{offset}: {e}")
+            finally:
+                self.tracker.complete(partition, offset)
+                self._in_progress -= 1
+                if self._in_progress == 0:
+                    self._idle.set()
+                self._room.release()
+
+    async def drain(self):
+        """Wait until every submitted message has been handled"""
+        await self._idle.wait()
+
+    async def close(self):
+        """Finish outstanding messages and stop the lane workers"""
+        await self.drain()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -4,13 +4,20 @@ Event Bus implementation for cross-service communication
 import json
 import uuid
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Callable, Any, Optional
 from dataclasses import dataclass
 from kafka import KafkaProducer, KafkaConsumer
 from kafka.errors import KafkaError
+from kafka.structs import OffsetAndMetadata
 import logging
 
+from shared.messaging import PartitionOffsetTracker
+
+from .dispatch import KeyedDispatcher
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -33,39 +40,73 @@ class Event:
             "correlation_id": self.correlation_id
         }
 
+def _offset_and_metadata(offset: int) -> OffsetAndMetadata:
+    """Commit value for an offset across kafka-python versions"""
+    # kafka-python 2.1 added leader_epoch
+    if len(OffsetAndMetadata._fields) == 3:
+        return OffsetAndMetadata(offset, "", -1)
+    return OffsetAndMetadata(offset, "")
+
+def _settle(future: asyncio.Future, value: Any = None, error: Optional[BaseException] = None):
+    if future.done():
+        return
+    if error is None:
+        future.set_result(value)
+    else:
+        future.set_exception(error)
+
 class EventBus:
-    """Event-driven communication between services"""
+    """Event-driven communication between services
+
+    Sends are pipelined: each one registers a callback on the producer's
+    future instead of blocking on it, and at most ``max_in_flight`` sends are
+    unacknowledged at a time. Consumers poll off the event loop and hand each
+    batch to a ``KeyedDispatcher``, which runs handlers concurrently while
+    keeping events with the same key in order. Offsets are committed
+    manually, only up to the last contiguously handled message.
+    """
     
-    def __init__(self, kafka_config: Dict[str, Any]):
+    def __init__(self, kafka_config: Dict[str, Any], producer_factory: Optional[Callable] = None,
+                 consumer_factory: Optional[Callable] = None):
         self.kafka_config = kafka_config
+        self.producer_factory = producer_factory
+        self.consumer_factory = consumer_factory
         self.producer = None
         self.consumers = {}
         self.event_handlers = {}
         self.running = False
+        self.send_timeout = kafka_config.get('send_timeout_seconds', 10)
+        self.max_in_flight = kafka_config.get('max_in_flight', 1000)
+        self.consumer_concurrency = kafka_config.get('consumer_concurrency', 16)
+        self.consumer_max_pending = kafka_config.get('consumer_max_pending', 1000)
+        self.max_poll_records = kafka_config.get('max_poll_records', 500)
+        self._in_flight = None
+        self._consumer_tasks = {}
         
     async def initialize(self):
         """Initialize Kafka producer and consumers"""
         try:
-            self.producer = KafkaProducer(
+            producer_factory = self.producer_factory or KafkaProducer
+            self.producer = producer_factory(
                 bootstrap_servers=self.kafka_config.get('bootstrap_servers', ['localhost:9092']),
                 value_serializer=lambda x: json.dumps(x).encode('utf-8'),
                 key_serializer=lambda x: x.encode('utf-8') if x else None,
                 acks='all',
                 retries=3,
-                retry_backoff_ms=1000
+                retry_backoff_ms=1000,
+                # Retried batches must not overtake later ones for the same key
+                max_in_flight_requests_per_connection=1,
+                linger_ms=self.kafka_config.get('linger_ms', 5)
             )
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
             logger.info("Event bus producer initialized")
         except Exception as e:
             logger.error(f"Failed to initialize event bus producer: {e}")
             raise
-    
-    async def publish_event(self, topic: str, event_type: str, data: Dict[str, Any], 
-                          source_service: str, correlation_id: Optional[str] = None):
-        """Publish event to topic"""
-        if not self.producer:
-            raise RuntimeError("Event bus not initialized")
-            
-        event = Event(
+
+    def _new_event(self, event_type: str, data: Dict[str, Any], source_service: str,
+                   correlation_id: Optional[str] = None) -> Event:
+        return Event(
             event_id=str(uuid.uuid4()),
             event_type=event_type,
             source_service=source_service,
@@ -73,26 +114,87 @@ class EventBus:
             data=data,
             correlation_id=correlation_id
         )
+
+    async def _send(self, topic: str, event: Event, key: Optional[str] = None) -> asyncio.Future:
+        """Hand an event to the producer once the in-flight window has room
+
+        Returns a future resolved with the record metadata when the broker
+        acknowledges the send.
+        """
+        if not self.producer:
+            raise RuntimeError("Event bus not initialized")
+
+        loop = asyncio.get_running_loop()
+        await self._in_flight.acquire()
+        acked = loop.create_future()
+        acked.add_done_callback(lambda _: self._in_flight.release())
+        try:
+            future = self.producer.send(topic, value=event.to_dict(), key=key or event.event_id)
+        except Exception as e:
+            _settle(acked, error=e)
+            raise
+        # Callbacks run on the producer's I/O thread
+        future.add_callback(lambda metadata: loop.call_soon_threadsafe(_settle, acked, metadata))
+        future.add_errback(lambda error: loop.call_soon_threadsafe(_settle, acked, None, error))
+        return acked
+    
+    async def publish_event(self, topic: str, event_type: str, data: Dict[str, Any], 
+                          source_service: str, correlation_id: Optional[str] = None):
+        """Publish event to topic"""
+        event = self._new_event(event_type, data, source_service, correlation_id)
         
         try:
-            future = self.producer.send(topic, value=event.to_dict(), key=event.event_id)
-            record_metadata = future.get(timeout=10)
+            acked = await self._send(topic, event)
+            await asyncio.wait_for(acked, timeout=self.send_timeout)
             logger.info(f"Event published to {topic}: {event.event_id}")
             return event.event_id
-        except KafkaError as e:
+        except (KafkaError, asyncio.TimeoutError) as e:
             logger.error(f"Failed to publish event to {topic}: {e}")
-            raise 
+            raise
+
+    async def publish_many(self, topic: str, events: List[Dict[str, Any]], source_service: str) -> List[str]:
+        """Publish several events to a topic with pipelined sends
+
+        Each item has ``event_type`` and ``data`` and optionally
+        ``correlation_id`` and ``key``; events sharing a key land on the same
+        partition in order (the event id is used when no key is given).
+        Returns the event ids in input order once every send is acknowledged,
+        or raises the first send error after all sends have settled.
+        """
+        event_ids = []
+        pending = []
+        for item in events:
+            event = self._new_event(item["event_type"], item["data"], source_service, item.get("correlation_id"))
+            event_ids.append(event.event_id)
+            pending.append(await self._send(topic, event, key=item.get("key")))
+
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*pending, return_exceptions=True), timeout=self.send_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out publishing {len(events)} events to {topic}")
+            raise
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            logger.error(f"Failed to publish {len(errors)} of {len(events)} events to {topic}: {errors[0]}")
+            raise errors[0]
+        logger.info(f"Published {len(events)} events to {topic}")
+        return event_ids
    
     async def subscribe_to_events(self, topics: List[str], group_id: str, handler: Callable):
         """Subscribe to events and register handler"""
         try:
-            consumer = KafkaConsumer(
+            consumer_factory = self.consumer_factory or KafkaConsumer
+            consumer = consumer_factory(
                 *topics,
                 bootstrap_servers=self.kafka_config.get('bootstrap_servers', ['localhost:9092']),
                 group_id=group_id,
                 value_deserializer=lambda m: json.loads(m.decode('utf-8')),
                 auto_offset_reset='latest',
-                enable_auto_commit=True
+                # Offsets are committed once their events have been handled
+                enable_auto_commit=False,
+                max_poll_records=self.max_poll_records
             )
             
             self.consumers[group_id] = consumer
@@ -101,7 +203,7 @@ class EventBus:
             logger.info(f"Subscribed to topics {topics} with group {group_id}")
             
             # Start consuming in background task
-            asyncio.create_task(self._consume_events(consumer, handler, group_id))
+            self._consumer_tasks[group_id] = asyncio.create_task(self._consume_events(consumer, handler, group_id))
             
         except Exception as e:
             logger.error(f"Failed to subscribe to topics {topics}: {e}")
@@ -110,28 +212,57 @@ class EventBus:
     async def _consume_events(self, consumer: KafkaConsumer, handler: Callable, group_id: str):
         """Consume events from Kafka topics"""
         self.running = True
+        loop = asyncio.get_running_loop()
+        # The consumer is not thread-safe, so every call goes through one thread
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"consumer-{group_id}")
+
+        async def process(message):
+            try:
+                event = Event(**message.value)
+                
+                # Process event with handler
+                await handler(message.topic, event)
+                
+            except Exception as e:
+                logger.error(f"Error processing event from {message.topic}: {e}")
+                await self._handle_event_processing_error(e, message, group_id)
+
+        dispatcher = KeyedDispatcher(process, self.consumer_concurrency, self.consumer_max_pending)
         
         try:
             while self.running:
-                message_batch = consumer.poll(timeout_ms=1000)
+                message_batch = await loop.run_in_executor(executor, functools.partial(consumer.poll, timeout_ms=1000))
                 
                 for topic_partition, messages in message_batch.items():
                     for message in messages:
-                        try:
-                            event_data = message.value
-                            event = Event(**event_data)
-                            
-                            # Process event with handler
-                            await handler(message.topic, event)
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing event from {message.topic}: {e}")
-                            await self._handle_event_processing_error(e, message, group_id)
+                        # Waits while consumer_max_pending events are outstanding
+                        await dispatcher.submit(topic_partition, message.offset, message.key, message)
+                
+                await self._commit_offsets(consumer, dispatcher.tracker, executor)
+
+            await dispatcher.close()
+            await self._commit_offsets(consumer, dispatcher.tracker, executor)
                             
         except Exception as e:
             logger.error(f"Consumer {group_id} error: {e}")
         finally:
-            consumer.close()
+            await dispatcher.close()
+            await loop.run_in_executor(executor, consumer.close)
+            executor.shutdown(wait=False)
+
+    async def _commit_offsets(self, consumer: KafkaConsumer, tracker: PartitionOffsetTracker,
+                              executor: ThreadPoolExecutor):
+        """Commit offsets up to the last contiguously handled event per partition"""
+        offsets = tracker.take_committable()
+        if not offsets:
+            return
+        commit = {tp: _offset_and_metadata(offset) for tp, offset in offsets.items()}
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, functools.partial(consumer.commit, commit))
+        except Exception as e:
+            # The next commit includes these offsets again
+            tracker.restore(offsets)
+            logger.error(f"Failed to commit offsets: {e}")
     
     async def _handle_event_processing_error(self, error: Exception, message, group_id: str):
         """Handle event processing errors"""
@@ -156,11 +287,12 @@ class EventBus:
     async def shutdown(self):
         """Shutdown event bus"""
         self.running = False
+
+        # Consumers finish their in-flight events and commit before closing
+        if self._consumer_tasks:
+            await asyncio.wait(list(self._consumer_tasks.values()), timeout=self.send_timeout)
         
         if self.producer:
             self.producer.close()
             
-        for consumer in self.consumers.values():
-            consumer.close()
-            
         logger.info("Event bus shutdown complete")
\ No newline at end of file
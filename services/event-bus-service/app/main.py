@@ -8,6 +8,7 @@ from typing import Dict, Any
 from fastapi import FastAPI, HTTPException
 from contextlib import asynccontextmanager
 
+from .core.config import get_kafka_config
 from .core.event_bus import EventBus
 from .workflows.orchestrator import WorkflowOrchestrator
 from .monitoring.workflow_monitor import WorkflowMonitor, ErrorRecoveryManager
@@ -31,9 +32,7 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Event Bus Service...")
     
     # Initialize Kafka configuration
-    kafka_config = {
-        "bootstrap_servers": ["localhost:9092"]
-    }
+    kafka_config = get_kafka_config()
     
     # Initialize services
     event_bus = EventBus(kafka_config)
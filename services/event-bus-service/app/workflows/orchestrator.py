@@ -11,6 +11,8 @@ from temporalio.client import Client
 from temporalio.worker import Worker
 from temporalio.common import RetryPolicy
 
+from .scheduler import DagNode, DagScheduler
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -23,6 +25,7 @@ class WorkflowStep:
     depends_on: List[str] = None
     retry_policy: Optional[RetryPolicy] = None
     timeout: Optional[timedelta] = None
+    resource_tags: List[str] = None  # Steps sharing a tag never run at the same time
 
 @dataclass
 class WorkflowDefinition:
@@ -32,6 +35,8 @@ class WorkflowDefinition:
     description: str
     steps: List[WorkflowStep]
     max_execution_time: timedelta = timedelta(hours=1)
+    max_parallelism: int = 8
+    failure_policy: str = "cancel_dependents"  # or "cancel_all"
 
 class WorkflowOrchestrator:
     """Orchestrates complex workflows using Temporal"""
@@ -225,69 +230,60 @@ class DataProcessingWorkflow:
     
     @workflow.run
     async def run(self, workflow_def: WorkflowDefinition) -> Dict[str, Any]:
-        """Execute the data processing workflow"""
-        results = {}
-        completed_steps = set()
-        
-        # Execute steps based on dependencies
-        for step in self._get_execution_order(workflow_def.steps):
-            try:
-                # Check if dependencies are met
-                if step.depends_on:
-                    missing_deps = set(step.depends_on) - completed_steps
-                    if missing_deps:
-                        raise workflow.ApplicationError(f"Missing dependencies: {missing_deps}")
-                
-                # Execute step
-                result = await workflow.execute_activity(
-                    execute_workflow_step,
-                    step,
-                    start_to_close_timeout=step.timeout or timedelta(minutes=10),
-                    retry_policy=step.retry_policy or RetryPolicy(
-                        initial_interval=timedelta(seconds=1),
-                        maximum_interval=timedelta(seconds=60),
-                        maximum_attempts=3
-                    )
+        """Execute the data processing workflow, running independent steps in parallel"""
+        # Timeouts and retries are left to the activity options so Temporal tracks them
+        nodes = [
+            DagNode(
+                node_id=step.step_id,
+                depends_on=list(step.depends_on or []),
+                payload=step,
+                resources=frozenset(step.resource_tags or []),
+                cost=(step.timeout or timedelta(minutes=10)).total_seconds()
+            )
+            for step in workflow_def.steps
+        ]
+        try:
+            scheduler = DagScheduler(
+                nodes,
+                max_parallelism=workflow_def.max_parallelism,
+                failure_policy=workflow_def.failure_policy
+            )
+        except ValueError as e:
+            raise workflow.ApplicationError(str(e))
+
+        async def execute_step(node: DagNode) -> Dict[str, Any]:
+            step = node.payload
+            result = await workflow.execute_activity(
+                execute_workflow_step,
+                step,
+                start_to_close_timeout=step.timeout or timedelta(minutes=10),
+                retry_policy=step.retry_policy or RetryPolicy(
+                    initial_interval=timedelta(seconds=1),
+                    maximum_interval=timedelta(seconds=60),
+                    maximum_attempts=3
                 )
-                
-                results[step.step_id] = result
-                completed_steps.add(step.step_id)
-                
-                logger.info(f"Completed workflow step: {step.step_id}")
-                
-            except Exception as e:
-                logger.error(f"Workflow step {step.step_id} failed: {e}")
-                results[step.step_id] = {"error": str(e)}
-                raise workflow.ApplicationError(f"Step {step.step_id} failed: {e}")
-        
+            )
+            logger.info(f"Completed workflow step: {step.step_id}")
+            return result
+
+        outcome = await scheduler.run(execute_step)
+        results = dict(outcome.results)
+        for step_id, error in outcome.errors.items():
+            results[step_id] = {"error": str(error)}
+
+        if not outcome.succeeded:
+            raise workflow.ApplicationError(
+                f"Steps {sorted(outcome.errors)} failed; skipped {outcome.cancelled}",
+                results
+            )
+
         return {
             "workflow_id": workflow_def.workflow_id,
             "status": "completed",
             "results": results,
-            "completed_at": datetime.utcnow().isoformat()
+            "completed_at": workflow.now().isoformat()
         }
-    
-    def _get_execution_order(self, steps: List[WorkflowStep]) -> List[WorkflowStep]:
-        """Determine execution order based on dependencies"""
-        ordered_steps = []
-        remaining_steps = steps.copy()
-        
-        while remaining_steps:
-            # Find steps with no unmet dependencies
-            ready_steps = []
-            for step in remaining_steps:
-                if not step.depends_on or all(dep in [s.step_id for s in ordered_steps] for dep in step.depends_on):
-                    ready_steps.append(step)
-            
-            if not ready_steps:
-                raise workflow.ApplicationError("Circular dependency detected in workflow steps")
-            
-            # Add ready steps to execution order
-            for step in ready_steps:
-                ordered_steps.append(step)
-                remaining_steps.remove(step)
-        
-        return ordered_steps
+
 
 @activity.defn
 async def execute_workflow_step(step: WorkflowStep) -> Dict[str, Any]:
@@ -0,0 +1,205 @@
+"""
+Topological DAG scheduler for workflow steps
+"""
+import asyncio
+import heapq
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FAILURE_POLICIES = ("cancel_dependents", "cancel_all")
+
+@dataclass
+class DagNode:
+    """One schedulable step of a DAG"""
+    node_id: str
+    depends_on: List[str] = field(default_factory=list)
+    payload: Any = None
+    timeout: Optional[float] = None  # Seconds per attempt, None for no limit
+    max_attempts: int = 1
+    resources: FrozenSet[str] = frozenset()  # Steps sharing a tag never run at the same time
+    cost: float = 1.0  # Expected duration, used to start the longest remaining chains first
+
+@dataclass
+class DagResult:
+    """Outcome of a DAG run"""
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+    cancelled: List[str] = field(default_factory=list)
+    attempts: Dict[str, int] = field(default_factory=dict)
+    completion_order: List[str] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.errors and not self.cancelled
+
+def topological_order(nodes: Iterable[DagNode]) -> List[DagNode]:
+    """Order nodes so every node comes after its dependencies (Kahn's algorithm, O(V + E))"""
+    nodes = list(nodes)
+    by_id = {node.node_id: node for node in nodes}
+    if len(by_id) != len(nodes):
+        raise ValueError("Duplicate step ids in workflow")
+
+    in_degree = {node.node_id: 0 for node in nodes}
+    children: Dict[str, List[str]] = {node.node_id: [] for node in nodes}
+    for node in nodes:
+        for dependency in node.depends_on or ():
+            if dependency not in by_id:
+                raise ValueError(f"Step {node.node_id} depends on unknown step {dependency}")
+            in_degree[node.node_id] += 1
+            children[dependency].append(node.node_id)
+
+    queue = deque(node.node_id for node in nodes if in_degree[node.node_id] == 0)
+    order = []
+    while queue:
+        node_id = queue.popleft()
+        order.append(by_id[node_id])
+        for child in children[node_id]:
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                queue.append(child)
+
+    if len(order) != len(nodes):
+        cyclic = sorted(node_id for node_id, degree in in_degree.items() if degree > 0)
+        raise ValueError(f"Circular dependency detected in workflow steps: {cyclic}")
+    return order
+
+class DagScheduler:
+    """Runs DAG nodes concurrently as soon as their dependencies complete
+
+    Keeps an in-degree counter per node and a ready queue (Kahn's algorithm):
+    when a node finishes, its children's counters drop and any that reach zero
+    become ready. Up to ``max_parallelism`` ready nodes run at once, longest
+    remaining chain (by ``cost``) first, so completion time is bounded by the
+    critical path rather than the number of steps. Nodes whose resource tags
+    are held by a running node wait without taking a slot.
+
+    Each attempt of a node is limited to its ``timeout`` and retried up to
+    ``max_attempts`` with exponential backoff. When a node fails for good its
+    dependents never become ready and are reported as cancelled; with the
+    ``cancel_all`` policy running nodes are cancelled too and nothing new starts.
+
+    Completed nodes are handled in dispatch order, so a run under a
+    deterministic event loop (such as a Temporal workflow) replays identically.
+    """
+
+    def __init__(self, nodes: Iterable[DagNode], max_parallelism: int = 8,
+                 failure_policy: str = "cancel_dependents", retry_backoff: float = 1.0,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep):
+        if max_parallelism < 1:
+            raise ValueError("max_parallelism must be at least 1")
+        if failure_policy not in FAILURE_POLICIES:
+            raise ValueError(f"Unknown failure policy: {failure_policy}")
+
+        self.order = topological_order(nodes)
+        self.nodes = {node.node_id: node for node in self.order}
+        self.max_parallelism = max_parallelism
+        self.failure_policy = failure_policy
+        self.retry_backoff = retry_backoff
+        self.sleep = sleep
+
+        self.children: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        for node in self.order:
+            for dependency in node.depends_on or ():
+                self.children[dependency].append(node.node_id)
+        self.rank = self._critical_path_ranks()
+
+    def _critical_path_ranks(self) -> Dict[str, float]:
+        """Longest cost-weighted path from each node to the end of the DAG"""
+        rank: Dict[str, float] = {}
+        for node in reversed(self.order):
+            rank[node.node_id] = node.cost + max((rank[child] for child in self.children[node.node_id]), default=0.0)
+        return rank
+
+    def critical_path_length(self) -> float:
+        """Cost of the longest chain, the lower bound on completion time"""
+        return max(self.rank.values(), default=0.0)
+
+    async def _run_node(self, node: DagNode, execute: Callable[[DagNode], Awaitable[Any]],
+                        attempts: Dict[str, int]) -> Any:
+        for attempt in range(1, node.max_attempts + 1):
+            attempts[node.node_id] = attempt
+            try:
+                if node.timeout is None:
+                    return await execute(node)
+                return await asyncio.wait_for(execute(node), timeout=node.timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == node.max_attempts:
+                    raise
+                logger.warning(f"Step {node.node_id} attempt {attempt} failed, retrying: {e!r}")
+                await self.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+    async def run(self, execute: Callable[[DagNode], Awaitable[Any]]) -> DagResult:
+        """Execute every node with ``execute(node)`` and collect the outcome"""
+        result = DagResult()
+        in_degree = {node_id: len(node.depends_on or ()) for node_id, node in self.nodes.items()}
+        ready: List[tuple] = []
+        for position, node in enumerate(self.order):
+            if in_degree[node.node_id] == 0:
+                heapq.heappush(ready, (-self.rank[node.node_id], position, node.node_id))
+        position_of = {node.node_id: position for position, node in enumerate(self.order)}
+
+        running: Dict[asyncio.Task, tuple] = {}
+        busy_resources: set = set()
+        sequence = 0
+        stop = False
+
+        try:
+            while (ready and not stop) or running:
+                blocked = []
+                while ready and not stop and len(running) < self.max_parallelism:
+                    entry = heapq.heappop(ready)
+                    node = self.nodes[entry[2]]
+                    if node.resources & busy_resources:
+                        blocked.append(entry)
+                        continue
+                    busy_resources |= node.resources
+                    task = asyncio.ensure_future(self._run_node(node, execute, result.attempts))
+                    running[task] = (sequence, node)
+                    sequence += 1
+                for entry in blocked:
+                    heapq.heappush(ready, entry)
+
+                if not running:
+                    break
+                done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+
+                for task in sorted(done, key=lambda finished: running[finished][0]):
+                    _, node = running.pop(task)
+                    busy_resources -= node.resources
+                    error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+
+                    if error is None:
+                        result.results[node.node_id] = task.result()
+                        result.completion_order.append(node.node_id)
+                        for child in self.children[node.node_id]:
+                            in_degree[child] -= 1
+                            if in_degree[child] == 0:
+                                heapq.heappush(ready, (-self.rank[child], position_of[child], child))
+                        continue
+
+                    result.errors[node.node_id] = error
+                    logger.error(f"Step {node.node_id} failed: {error!r}")
+                    if self.failure_policy == "cancel_all" and not stop:
+                        stop = True
+                        for other in running:
+                            other.cancel()
+        finally:
+            # Only reached with tasks still running if the run itself was cancelled
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        result.cancelled = [
+            node_id for node_id in self.nodes
+            if node_id not in result.results and not isinstance(result.errors.get(node_id), Exception)
+        ]
+        for node_id in result.cancelled:
+            result.errors.pop(node_id, None)
+        return result
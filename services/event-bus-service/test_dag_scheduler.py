@@ -0,0 +1,153 @@
+"""
+Tests for the DAG step scheduler, using simulated activities
+"""
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.workflows.scheduler import DagNode, DagScheduler, topological_order
+
+STEP = 0.05
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+class SimulatedActivities:
+    """Sleeps for each node's cost in steps and records concurrency"""
+
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.active = {}
+        self.max_active = 0
+        self.overlaps = []
+        self.started = []
+
+    async def __call__(self, node):
+        self.started.append(node.node_id)
+        for other in self.active.values():
+            if node.resources & other.resources:
+                self.overlaps.append((node.node_id, other.node_id))
+        self.active[node.node_id] = node
+        self.max_active = max(self.max_active, len(self.active))
+        try:
+            await asyncio.sleep(node.cost * STEP)
+            if self.failures.get(node.node_id, 0) > 0:
+                self.failures[node.node_id] -= 1
+                raise RuntimeError(f"{node.node_id} failed")
+            return node.node_id
+        finally:
+            self.active.pop(node.node_id)
+
+def wide_dag(width=20):
+    """source -> width parallel branches of two steps -> sink"""
+    nodes = [DagNode("source")]
+    for i in range(width):
+        nodes.append(DagNode(f"a{i}", ["source"]))
+        nodes.append(DagNode(f"b{i}", [f"a{i}"]))
+    nodes.append(DagNode("sink", [f"b{i}" for i in range(width)]))
+    return nodes
+
+def test_topological_order_respects_dependencies():
+    nodes = wide_dag(5)
+    order = [node.node_id for node in topological_order(reversed(nodes))]
+    position = {node_id: i for i, node_id in enumerate(order)}
+    for node in nodes:
+        for dependency in node.depends_on:
+            assert position[dependency] < position[node.node_id]
+
+def test_cycles_and_unknown_dependencies_are_rejected():
+    with pytest.raises(ValueError, match="Circular"):
+        topological_order([DagNode("a", ["c"]), DagNode("b", ["a"]), DagNode("c", ["b"]), DagNode("d")])
+    with pytest.raises(ValueError, match="unknown"):
+        DagScheduler([DagNode("a", ["missing"])])
+
+def test_wide_dag_finishes_in_critical_path_time():
+    nodes = wide_dag(20)
+    scheduler = DagScheduler(nodes, max_parallelism=64)
+    activities = SimulatedActivities()
+
+    start = time.perf_counter()
+    result = run(scheduler.run(activities))
+    elapsed = time.perf_counter() - start
+
+    assert result.succeeded and len(result.results) == len(nodes)
+    assert scheduler.critical_path_length() == 4
+    # 42 steps sequentially would take 42 * STEP
+    assert elapsed < 4 * STEP * 1.8
+    assert activities.max_active == 20
+    assert result.completion_order[0] == "source" and result.completion_order[-1] == "sink"
+
+def test_parallelism_limit_is_respected():
+    activities = SimulatedActivities()
+    result = run(DagScheduler(wide_dag(10), max_parallelism=3).run(activities))
+    assert result.succeeded
+    assert activities.max_active == 3
+
+def test_longest_chain_starts_first():
+    nodes = [DagNode("short"), DagNode("long1"), DagNode("long2", ["long1"]), DagNode("long3", ["long2"])]
+    activities = SimulatedActivities()
+    run(DagScheduler(nodes, max_parallelism=1).run(activities))
+    assert activities.started[0] == "long1"
+
+def test_resource_tags_are_mutually_exclusive():
+    nodes = [DagNode(f"write{i}", resources=frozenset({"db"})) for i in range(4)]
+    nodes += [DagNode(f"read{i}") for i in range(4)]
+    activities = SimulatedActivities()
+
+    start = time.perf_counter()
+    result = run(DagScheduler(nodes, max_parallelism=8).run(activities))
+    elapsed = time.perf_counter() - start
+
+    assert result.succeeded
+    assert activities.overlaps == []
+    # Writers run one after another while readers fill the other slots
+    assert 4 * STEP <= elapsed < 4 * STEP * 1.8
+    assert set(activities.started[:5]) == {"write0", "read0", "read1", "read2", "read3"}
+
+def test_retries_recover_and_timeouts_fail():
+    nodes = [
+        DagNode("flaky", max_attempts=3),
+        DagNode("slow", cost=10, timeout=STEP, max_attempts=2),
+        DagNode("after_slow", ["slow"])
+    ]
+    activities = SimulatedActivities(failures={"flaky": 2})
+    result = run(DagScheduler(nodes, retry_backoff=0.001).run(activities))
+
+    assert result.results["flaky"] == "flaky" and result.attempts["flaky"] == 3
+    assert isinstance(result.errors["slow"], asyncio.TimeoutError) and result.attempts["slow"] == 2
+    assert result.cancelled == ["after_slow"]
+    assert not result.succeeded
+
+def test_failure_cancels_only_dependents_by_default():
+    nodes = [
+        DagNode("root"),
+        DagNode("bad", ["root"]),
+        DagNode("bad_child", ["bad"]),
+        DagNode("bad_grandchild", ["bad_child"]),
+        DagNode("good", ["root"], cost=3),
+        DagNode("good_child", ["good"])
+    ]
+    activities = SimulatedActivities(failures={"bad": 1})
+    result = run(DagScheduler(nodes).run(activities))
+
+    assert set(result.errors) == {"bad"}
+    assert result.cancelled == ["bad_child", "bad_grandchild"]
+    assert set(result.results) == {"root", "good", "good_child"}
+
+def test_cancel_all_stops_running_branches():
+    nodes = [DagNode("bad"), DagNode("long", cost=20), DagNode("after_long", ["long"])]
+    activities = SimulatedActivities(failures={"bad": 1})
+
+    start = time.perf_counter()
+    result = run(DagScheduler(nodes, failure_policy="cancel_all").run(activities))
+    elapsed = time.perf_counter() - start
+
+    assert set(result.errors) == {"bad"}
+    assert sorted(result.cancelled) == ["after_long", "long"]
+    assert elapsed < 5 * STEP
+    assert activities.active == {}
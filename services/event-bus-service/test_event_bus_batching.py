@@ -0,0 +1,182 @@
+"""
+Tests for pipelined publishing and keyed concurrent consumption, on the in-memory broker
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from kafka.structs import TopicPartition
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.dispatch import KeyedDispatcher
+from app.core.event_bus import EventBus
+from tests.memory_broker import MemoryBroker
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def make_bus(broker, **config):
+    return EventBus(
+        {"bootstrap_servers": ["memory"], **config},
+        producer_factory=broker.create_producer,
+        consumer_factory=broker.create_consumer
+    )
+
+async def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+def test_dispatcher_keeps_key_order_and_bounds_pending():
+    async def scenario():
+        seen = {}
+        active = 0
+        peak = 0
+
+        async def handler(message):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(random.random() * 0.005)
+            seen.setdefault(message[0], []).append(message[1])
+            active -= 1
+
+        dispatcher = KeyedDispatcher(handler, concurrency=8, max_pending=20)
+        for offset in range(400):
+            key = f"key{offset % 13}"
+            await dispatcher.submit("p0", offset, key.encode(), (key, offset))
+            assert dispatcher.pending <= 20
+        await dispatcher.close()
+        return seen, peak, dispatcher
+
+    seen, peak, dispatcher = run(scenario())
+    assert all(offsets == sorted(offsets) for offsets in seen.values())
+    assert sum(len(offsets) for offsets in seen.values()) == 400
+    assert 1 < peak <= 8
+    assert dispatcher.tracker.take_committable() == {"p0": 400}
+
+def test_publish_many_pipelines_sends():
+    async def scenario():
+        broker = MemoryBroker(request_latency_ms=20)
+        bus = make_bus(broker, max_in_flight=100)
+        await bus.initialize()
+
+        start = time.perf_counter()
+        for i in range(10):
+            await bus.publish_event("events", "tick", {"i": i}, "test")
+        one_by_one = (time.perf_counter() - start) / 10
+        requests_before = broker.produce_requests
+
+        start = time.perf_counter()
+        ids = await bus.publish_many(
+            "events", [{"event_type": "tick", "data": {"i": i}, "key": "same"} for i in range(500)], "test"
+        )
+        pipelined = (time.perf_counter() - start) / 500
+        await bus.shutdown()
+        return broker, ids, one_by_one, pipelined, broker.produce_requests - requests_before
+
+    broker, ids, one_by_one, pipelined, requests = run(scenario())
+    assert len(set(ids)) == 500
+    # Never more than max_in_flight unacknowledged, so at least five round trips
+    assert 5 <= requests <= 30
+    assert pipelined * 20 < one_by_one
+    # Same key, same partition, in publish order
+    keyed = [record for record in broker.records("events") if record.key == b"same"]
+    assert len({record.partition for record in keyed}) == 1
+    assert [json.loads(record.value)["data"]["i"] for record in keyed] == list(range(500))
+
+def test_consumer_handles_keys_concurrently_in_order_and_commits():
+    async def scenario():
+        broker = MemoryBroker(num_partitions=2)
+        bus = make_bus(broker, consumer_concurrency=8, consumer_max_pending=50)
+        await bus.initialize()
+
+        seen = {}
+        active = 0
+        peak = 0
+
+        async def handler(topic, event):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(random.random() * 0.004)
+            seen.setdefault(event.correlation_id, []).append(event.data["seq"])
+            active -= 1
+
+        await bus.subscribe_to_events(["events"], "group", handler)
+        await asyncio.sleep(0.05)
+        events = [
+            {"event_type": "tick", "data": {"seq": i}, "key": f"user{i % 20}", "correlation_id": f"user{i % 20}"}
+            for i in range(600)
+        ]
+        await bus.publish_many("events", events, "test")
+        await wait_until(lambda: sum(len(values) for values in seen.values()) == 600)
+        await bus.shutdown()
+        return broker, seen, peak
+
+    broker, seen, peak = run(scenario())
+    assert all(values == sorted(values) for values in seen.values())
+    assert peak > 1
+    for tp in broker.partitions_for("events"):
+        assert broker.committed("group", tp) == broker.end_offset(tp)
+
+def test_failed_events_go_to_dead_letter_and_are_committed():
+    async def scenario():
+        broker = MemoryBroker(num_partitions=1)
+        bus = make_bus(broker)
+        await bus.initialize()
+
+        async def handler(topic, event):
+            if event.data["seq"] == 3:
+                raise ValueError("bad event")
+
+        await bus.subscribe_to_events(["events"], "group", handler)
+        await asyncio.sleep(0.05)
+        await bus.publish_many("events", [{"event_type": "tick", "data": {"seq": i}} for i in range(6)], "test")
+        await wait_until(lambda: broker.committed("group", TopicPartition("events", 0)) == 6)
+        await wait_until(lambda: broker.records("events.dead_letter"))
+        await bus.shutdown()
+        return broker
+
+    broker = run(scenario())
+    dead = broker.records("events.dead_letter")
+    assert len(dead) == 1 and "bad event" in dead[0].value.decode()
+
+def test_offsets_stay_behind_an_unfinished_event():
+    async def scenario():
+        broker = MemoryBroker(num_partitions=1)
+        bus = make_bus(broker, consumer_concurrency=4)
+        await bus.initialize()
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(topic, event):
+            if event.correlation_id == "slow":
+                await release.wait()
+            handled.append(event.data["seq"])
+
+        await bus.subscribe_to_events(["events"], "group", handler)
+        await asyncio.sleep(0.05)
+        events = [{"event_type": "tick", "data": {"seq": 0}, "key": "slow", "correlation_id": "slow"}]
+        events += [{"event_type": "tick", "data": {"seq": i}, "key": f"k{i}"} for i in range(1, 10)]
+        await bus.publish_many("events", events, "test")
+
+        # Later events on other lanes finish, but the commit waits for offset 0
+        await wait_until(lambda: len(handled) >= 5)
+        await asyncio.sleep(0.05)
+        blocked_commit = broker.committed("group", TopicPartition("events", 0))
+
+        release.set()
+        await wait_until(lambda: len(handled) == 10)
+        await bus.shutdown()
+        return broker, blocked_commit
+
+    broker, blocked_commit = run(scenario())
+    assert not blocked_commit
+    assert broker.committed("group", TopicPartition("events", 0)) == 10
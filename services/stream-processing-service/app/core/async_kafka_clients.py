@@ -0,0 +1,456 @@
+"""
+Asyncio-native Kafka producer and consumer
+
+kafka-python is a blocking client, so the consumer runs ``poll`` and commits on a
+dedicated thread and hands record batches to the event loop through a bounded queue.
+The producer never waits on a send: completions arrive through delivery callbacks
+and the number of unacknowledged messages is capped by an in-flight window.
+"""
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from kafka import KafkaConsumer, KafkaProducer
+from kafka.structs import OffsetAndMetadata, TopicPartition
+import structlog
+
+from shared.messaging import PartitionOffsetTracker
+
+from .kafka_config import AsyncClientSettings, KafkaStreamConfig
+
+logger = structlog.get_logger()
+
+
+def _offset_and_metadata(offset: int) -> OffsetAndMetadata:
+    """Build OffsetAndMetadata across kafka-python versions (leader_epoch added in 2.1)"""
+    if len(OffsetAndMetadata._fields) == 3:
+        return OffsetAndMetadata(offset, "", -1)
+    return OffsetAndMetadata(offset, "")
+
+
+def _producer_tuning(settings: AsyncClientSettings) -> Dict[str, Any]:
+    """Producer tuning options the installed kafka-python accepts (buffer_memory was dropped in 2.1)"""
+    tuning = {
+        "linger_ms": settings.linger_ms,
+        "batch_size": settings.batch_size,
+        "compression_type": settings.compression_type,
+        "max_block_ms": int(settings.send_timeout_seconds * 1000)
+    }
+    if "buffer_memory" in KafkaProducer.DEFAULT_CONFIG:
+        tuning["buffer_memory"] = settings.buffer_memory
+    return tuning
+
+
+def serialize_value(value: Any) -> bytes:
+    """Serialize a message value to JSON bytes"""
+    if isinstance(value, bytes):
+        return value
+    return json.dumps(value, default=str).encode('utf-8')
+
+
+class AsyncKafkaProducer:
+    """Pipelined producer with callback-based completion and an in-flight window"""
+
+    def __init__(self, config: KafkaStreamConfig,
+                 settings: Optional[AsyncClientSettings] = None,
+                 producer_factory: Optional[Callable[..., Any]] = None):
+        self.config = config
+        self.settings = settings or AsyncClientSettings()
+        self.settings.validate()
+        self.metrics = {
+            "messages_sent": 0,
+            "messages_failed": 0,
+            "bytes_sent": 0,
+            "in_flight": 0,
+            "window_waits": 0,
+            "last_send_time": None
+        }
+        self._window: Optional[asyncio.Semaphore] = None
+        self._window_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        producer_factory = producer_factory or KafkaProducer
+        try:
+            self.producer = producer_factory(
+                **self.config.producer_config,
+                **_producer_tuning(self.settings)
+            )
+            logger.info("Async Kafka producer initialized",
+                        max_in_flight=self.settings.max_in_flight_messages,
+                        linger_ms=self.settings.linger_ms)
+        except Exception as e:
+            logger.error("Failed to initialize Kafka producer", error=str(e))
+            raise
+
+    def _get_window(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._window is None or self._window_loop is not loop:
+            self._window = asyncio.Semaphore(self.settings.max_in_flight_messages)
+            self._window_loop = loop
+        return self._window
+
+    async def send(self, topic: str, value: Any,
+                   key: Optional[str] = None,
+                   partition: Optional[int] = None,
+                   headers: Optional[Dict[str, str]] = None) -> asyncio.Future:
+        """Enqueue a message and return a future resolved with its record metadata
+
+        Waits only while the in-flight window is full.
+        """
+        window = self._get_window()
+        if window.locked():
+            self.metrics["window_waits"] += 1
+        await window.acquire()
+
+        loop = asyncio.get_running_loop()
+        delivery = loop.create_future()
+        try:
+            payload = serialize_value(value)
+            kafka_headers = [(k, v.encode('utf-8')) for k, v in headers.items()] if headers else None
+            future = self.producer.send(
+                topic,
+                value=payload,
+                key=key.encode('utf-8') if key else None,
+                partition=partition,
+                headers=kafka_headers
+            )
+        except Exception as e:
+            window.release()
+            self.metrics["messages_failed"] += 1
+            logger.error("Kafka send failed", topic=topic, error=str(e))
+            delivery.set_exception(e)
+            return delivery
+
+        self.metrics["in_flight"] += 1
+        size = len(payload)
+        future.add_callback(self._on_delivery_thread, loop, delivery, window, size)
+        future.add_errback(self._on_error_thread, loop, delivery, window, topic)
+        return delivery
+
+    def _on_delivery_thread(self, loop, delivery, window, size, record_metadata):
+        loop.call_soon_threadsafe(self._complete, delivery, window, size, record_metadata, None)
+
+    def _on_error_thread(self, loop, delivery, window, topic, error):
+        logger.error("Kafka send error", topic=topic, error=str(error))
+        loop.call_soon_threadsafe(self._complete, delivery, window, 0, None, error)
+
+    def _complete(self, delivery: asyncio.Future, window: asyncio.Semaphore,
+                  size: int, record_metadata: Any, error: Optional[BaseException]):
+        window.release()
+        self.metrics["in_flight"] -= 1
+        if error is None:
+            self.metrics["messages_sent"] += 1
+            self.metrics["bytes_sent"] += size
+            self.metrics["last_send_time"] = datetime.utcnow().isoformat()
+            if not delivery.done():
+                delivery.set_result(record_metadata)
+        else:
+            self.metrics["messages_failed"] += 1
+            if not delivery.done():
+                delivery.set_exception(error)
+
+    async def send_and_wait(self, topic: str, value: Any, **kwargs) -> Any:
+        """Send a message and wait for the broker acknowledgement"""
+        delivery = await self.send(topic, value, **kwargs)
+        return await asyncio.wait_for(delivery, timeout=self.settings.send_timeout_seconds)
+
+    async def send_batch(self, topic: str, messages: List[Dict[str, Any]],
+                         key_func: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None) -> int:
+        """Pipeline a batch of messages and return how many were acknowledged"""
+        deliveries = []
+        for message in messages:
+            key = key_func(message) if key_func else None
+            deliveries.append(await self.send(topic, message, key=key))
+
+        results = await asyncio.gather(*deliveries, return_exceptions=True)
+        successful = sum(1 for result in results if not isinstance(result, BaseException))
+        if successful < len(messages):
+            logger.warning("Batch send had failures", topic=topic,
+                           total_messages=len(messages), failed=len(messages) - successful)
+        return successful
+
+    async def flush(self, timeout: Optional[float] = None):
+        """Wait until every buffered message has been delivered or failed"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.producer.flush, timeout)
+        # Let completions scheduled by the sender thread run
+        await asyncio.sleep(0)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get producer metrics"""
+        return self.metrics.copy()
+
+    async def close(self):
+        """Flush and close the producer"""
+        await self.flush(self.settings.send_timeout_seconds)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.producer.close)
+        logger.info("Async Kafka producer closed")
+
+
+@dataclass
+class PolledRecord:
+    """Deserialized record handed from the poll thread to the event loop"""
+    topic: str
+    partition: int
+    offset: int
+    timestamp: Optional[int]
+    key: Optional[str]
+    value: Any
+    headers: Dict[str, Any]
+    error: Optional[str] = None
+
+    @property
+    def topic_partition(self) -> TopicPartition:
+        return TopicPartition(self.topic, self.partition)
+
+
+class AsyncKafkaConsumer:
+    """Consumer that polls on a dedicated thread and commits after handlers finish
+
+    The poll thread is the only thread that touches the underlying consumer. Record
+    batches reach the event loop through a queue of at most ``queue_max_batches``
+    batches; when handlers fall behind the poll thread blocks on the hand-off instead
+    of buffering without bound. Handler completions advance per-partition offsets,
+    which the poll thread commits with ``commit_async`` every ``commit_interval_ms``.
+    """
+
+    def __init__(self, config: KafkaStreamConfig, topics: List[str],
+                 settings: Optional[AsyncClientSettings] = None,
+                 consumer_factory: Optional[Callable[..., Any]] = None):
+        self.config = config
+        self.topics = topics
+        self.settings = settings or AsyncClientSettings()
+        self.settings.validate()
+        self.message_handlers: Dict[str, Callable] = {}
+        self.metrics = {
+            "messages_consumed": 0,
+            "messages_processed": 0,
+            "messages_failed": 0,
+            "offsets_committed": 0,
+            "commit_failures": 0,
+            "backpressure_waits": 0,
+            "last_consume_time": None
+        }
+        self.running = False
+        self.offsets = PartitionOffsetTracker()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._drained = threading.Event()
+        self._last_commit = 0.0
+
+        consumer_factory = consumer_factory or KafkaConsumer
+        consumer_config = {
+            **self.config.consumer_config,
+            "enable_auto_commit": False,
+            "max_poll_records": self.settings.max_poll_records
+        }
+        try:
+            self.consumer = consumer_factory(*self.topics, **consumer_config)
+            logger.info("Async Kafka consumer initialized", topics=self.topics)
+        except Exception as e:
+            logger.error("Failed to initialize Kafka consumer", error=str(e))
+            raise
+
+    def register_handler(self, topic: str, handler: Callable):
+        """Register message handler for specific topic"""
+        self.message_handlers[topic] = handler
+        logger.info("Registered handler for topic", topic=topic)
+
+    # Poll thread
+
+    def _deserialize(self, record) -> PolledRecord:
+        error = None
+        try:
+            value = json.loads(record.value.decode('utf-8')) if record.value is not None else None
+        except (ValueError, UnicodeDecodeError) as e:
+            value, error = None, f"deserialization failed: {e}"
+        key = record.key.decode('utf-8', errors='replace') if isinstance(record.key, bytes) else record.key
+        return PolledRecord(
+            topic=record.topic,
+            partition=record.partition,
+            offset=record.offset,
+            timestamp=record.timestamp,
+            key=key,
+            value=value,
+            headers=dict(record.headers) if record.headers else {},
+            error=error
+        )
+
+    def _poll_loop(self):
+        try:
+            while not self._stopping.is_set():
+                self._commit_due()
+                try:
+                    polled = self.consumer.poll(timeout_ms=self.settings.poll_timeout_ms,
+                                                max_records=self.settings.max_poll_records)
+                except Exception as e:
+                    logger.error("Kafka poll error", error=str(e))
+                    self._stopping.wait(1.0)
+                    continue
+
+                if polled:
+                    batch = [self._deserialize(record) for records in polled.values() for record in records]
+                    self._hand_off(batch)
+        finally:
+            self._drained.wait(self.settings.shutdown_timeout_seconds)
+            self._commit(sync=True)
+            try:
+                self.consumer.close()
+            except Exception as e:
+                logger.warning("Error closing Kafka consumer", error=str(e))
+            logger.info("Kafka poll thread stopped")
+
+    def _hand_off(self, batch: List[PolledRecord]):
+        """Put a batch on the loop queue, blocking (but still committing) while it is full"""
+        if self._queue.full():
+            # Approximate read from the poll thread; only feeds the metric
+            self._loop.call_soon_threadsafe(self._count_backpressure)
+        put = asyncio.run_coroutine_threadsafe(self._queue.put(batch), self._loop)
+        while True:
+            try:
+                put.result(timeout=0.05)
+                return
+            except concurrent.futures.TimeoutError:
+                if self._stopping.is_set():
+                    put.cancel()
+                    return
+                self._commit_due()
+
+    def _count_backpressure(self):
+        self.metrics["backpressure_waits"] += 1
+
+    def _commit_due(self):
+        now = time.monotonic()
+        if (now - self._last_commit) * 1000 >= self.settings.commit_interval_ms:
+            self._last_commit = now
+            self._commit(sync=False)
+
+    def _commit(self, sync: bool):
+        offsets = self.offsets.take_committable()
+        if not offsets:
+            return
+        kafka_offsets = {tp: _offset_and_metadata(offset) for tp, offset in offsets.items()}
+
+        if sync:
+            try:
+                self.consumer.commit(offsets=kafka_offsets)
+                self._on_commit(offsets, None)
+            except Exception as e:
+                self._on_commit(offsets, e)
+            return
+
+        try:
+            self.consumer.commit_async(
+                offsets=kafka_offsets,
+                callback=lambda _offsets, response: self._on_commit(offsets, response)
+            )
+        except Exception as e:
+            self._on_commit(offsets, e)
+
+    def _on_commit(self, offsets: Dict[TopicPartition, int], response: Any):
+        if isinstance(response, BaseException):
+            logger.error("Failed to commit offsets", error=str(response))
+            self.metrics["commit_failures"] += 1
+            self.offsets.restore(offsets)
+        else:
+            self.metrics["offsets_committed"] += len(offsets)
+
+    # Event loop
+
+    async def start_consuming(self):
+        """Consume until ``stop_consuming`` is called"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.settings.queue_max_batches)
+        self._stopping.clear()
+        self._drained.clear()
+        self.running = True
+
+        handler_slots = asyncio.Semaphore(self.settings.max_concurrent_handlers)
+        tasks: Set[asyncio.Task] = set()
+
+        self._thread = threading.Thread(target=self._poll_loop, name="kafka-poll", daemon=True)
+        self._thread.start()
+        logger.info("Starting message consumption", topics=self.topics)
+
+        try:
+            while True:
+                batch = await self._queue.get()
+                if batch is None:
+                    break
+
+                self.metrics["messages_consumed"] += len(batch)
+                self.metrics["last_consume_time"] = datetime.utcnow().isoformat()
+                for record in batch:
+                    self.offsets.track(record.topic_partition, record.offset)
+                    await handler_slots.acquire()
+                    task = asyncio.create_task(self._process_record(record))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    task.add_done_callback(lambda _: handler_slots.release())
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self._stopping.set()
+            self._drained.set()
+            await self._loop.run_in_executor(None, self._thread.join)
+            self.running = False
+
+    async def _process_record(self, record: PolledRecord):
+        success = False
+        try:
+            handler = self.message_handlers.get(record.topic)
+            if record.error:
+                logger.error("Skipping undecodable message", topic=record.topic,
+                             partition=record.partition, offset=record.offset, error=record.error)
+            elif not handler:
+                logger.warning("No handler registered for topic", topic=record.topic)
+            else:
+                context = {
+                    "topic": record.topic,
+                    "partition": record.partition,
+                    "offset": record.offset,
+                    "timestamp": record.timestamp,
+                    "key": record.key,
+                    "headers": record.headers
+                }
+                await handler(record.value, context)
+                success = True
+        except Exception as e:
+            logger.error("Error processing message",
+                         topic=record.topic,
+                         partition=record.partition,
+                         offset=record.offset,
+                         error=str(e))
+        finally:
+            # Failed messages are committed too; retries go through the dead letter queue
+            self.offsets.complete(record.topic_partition, record.offset)
+            if success:
+                self.metrics["messages_processed"] += 1
+            else:
+                self.metrics["messages_failed"] += 1
+
+    def stop_consuming(self):
+        """Stop consuming; batches not yet handed to handlers are left uncommitted"""
+        self._stopping.set()
+        if self._queue is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._signal_stop)
+        logger.info("Stopping message consumption")
+
+    def _signal_stop(self):
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get consumer metrics"""
+        metrics = self.metrics.copy()
+        metrics["pending_offsets"] = self.offsets.pending_count()
+        return metrics
@@ -15,7 +15,10 @@ logger = structlog.get_logger()
 
 
 class EnhancedKafkaProducer:
-    """Enhanced Kafka producer with retry logic and monitoring"""
+    """Enhanced Kafka producer with retry logic and monitoring
+    
+    Each send waits for its acknowledgement; use AsyncKafkaProducer for pipelined sends.
+    """
     
     def __init__(self, config: KafkaStreamConfig):
         self.config = config
@@ -33,7 +36,7 @@ class EnhancedKafkaProducer:
         try:
             self.producer = KafkaProducer(
                 **self.config.producer_config,
-                value_serializer=lambda x: json.dumps(x, default=str).encode('utf-8'),
+                # Values are serialized in send_message so their size is known without re-encoding
                 key_serializer=lambda x: x.encode('utf-8') if x else None,
                 # Enhanced reliability settings
                 max_block_ms=60000,
@@ -69,10 +72,12 @@ class EnhancedKafkaProducer:
             if headers:
                 kafka_headers = [(k, v.encode('utf-8')) for k, v in headers.items()]
             
+            payload = json.dumps(enhanced_message, default=str).encode('utf-8')
+            
             # Send message
             future = self.producer.send(
                 topic=topic,
-                value=enhanced_message,
+                value=payload,
                 key=key,
                 partition=partition,
                 headers=kafka_headers
@@ -83,7 +88,7 @@ class EnhancedKafkaProducer:
             
             # Update metrics
             self.metrics["messages_sent"] += 1
-            self.metrics["bytes_sent"] += len(json.dumps(enhanced_message))
+            self.metrics["bytes_sent"] += len(payload)
             self.metrics["last_send_time"] = datetime.utcnow().isoformat()
             
             logger.debug("Message sent successfully",
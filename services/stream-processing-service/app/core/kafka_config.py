@@ -45,6 +45,38 @@ class KafkaStreamConfig:
         }
 
 
+@dataclass
+class AsyncClientSettings:
+    """Tuning for the asyncio Kafka client layer"""
+    # Producer pipelining
+    max_in_flight_messages: int = int(os.getenv("KAFKA_MAX_IN_FLIGHT_MESSAGES", "1000"))
+    linger_ms: int = int(os.getenv("KAFKA_LINGER_MS", "5"))
+    batch_size: int = int(os.getenv("KAFKA_BATCH_SIZE", "65536"))
+    # gzip ships with kafka-python; snappy/lz4/zstd need extra codec packages
+    compression_type: Optional[str] = os.getenv("KAFKA_COMPRESSION_TYPE", "gzip") or None
+    buffer_memory: int = int(os.getenv("KAFKA_BUFFER_MEMORY", "33554432"))
+    send_timeout_seconds: float = float(os.getenv("KAFKA_SEND_TIMEOUT_SECONDS", "30"))
+
+    # Consumer hand-off and commits
+    poll_timeout_ms: int = int(os.getenv("KAFKA_POLL_TIMEOUT_MS", "100"))
+    max_poll_records: int = int(os.getenv("KAFKA_MAX_POLL_RECORDS", "500"))
+    queue_max_batches: int = int(os.getenv("KAFKA_QUEUE_MAX_BATCHES", "4"))
+    max_concurrent_handlers: int = int(os.getenv("KAFKA_MAX_CONCURRENT_HANDLERS", "256"))
+    commit_interval_ms: int = int(os.getenv("KAFKA_COMMIT_INTERVAL_MS", "1000"))
+    shutdown_timeout_seconds: float = float(os.getenv("KAFKA_SHUTDOWN_TIMEOUT_SECONDS", "30"))
+
+    def validate(self):
+        """Validate settings"""
+        if self.max_in_flight_messages <= 0:
+            raise ValueError("max_in_flight_messages must be positive")
+        if self.queue_max_batches <= 0:
+            raise ValueError("queue_max_batches must be positive")
+        if self.max_concurrent_handlers <= 0:
+            raise ValueError("max_concurrent_handlers must be positive")
+        if self.linger_ms < 0 or self.poll_timeout_ms < 0 or self.commit_interval_ms < 0:
+            raise ValueError("linger_ms, poll_timeout_ms and commit_interval_ms must be non-negative")
+
+
 class KafkaTopicManager:
     """Manages Kafka topics for streaming pipeline"""
     
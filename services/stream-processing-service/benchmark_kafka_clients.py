@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Benchmark end-to-end Kafka throughput and latency against the in-memory broker.
+
+Produces messages and consumes them in the same event loop, comparing the blocking
+Enhanced* clients (one acknowledgement wait per send, ``poll`` on the loop, synchronous
+commits) with the async client layer (pipelined sends, threaded poll, async commits).
+Every broker request costs ``--latency-ms`` to stand in for the network round-trip.
+Latency is measured from produce timestamp to handler completion.
+
+Usage:
+    python benchmark_kafka_clients.py
+    python benchmark_kafka_clients.py --messages 50000 --latency-ms 2 --handler-ms 1
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import numpy as np
+import structlog
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.kafka_config import KafkaStreamConfig, AsyncClientSettings
+from app.core.kafka_clients import EnhancedKafkaProducer, EnhancedKafkaConsumer
+from app.core.async_kafka_clients import AsyncKafkaProducer, AsyncKafkaConsumer
+from tests.memory_broker import MemoryBroker
+
+TOPIC = "dharma.raw.twitter"
+
+
+def make_message(i: int):
+    return {"post_id": f"post_{i}", "platform": "twitter", "content": "x" * 200, "user_id": f"user_{i % 500}"}
+
+
+async def run_legacy(args, messages: int):
+    broker = MemoryBroker(request_latency_ms=args.latency_ms)
+    config = KafkaStreamConfig()
+    latencies = []
+    done = asyncio.Event()
+
+    with patch('app.core.kafka_clients.KafkaProducer', broker.create_producer), \
+         patch('app.core.kafka_clients.KafkaConsumer', broker.create_consumer):
+        producer = EnhancedKafkaProducer(config)
+        consumer = EnhancedKafkaConsumer(config, [TOPIC])
+
+    async def handler(value, context):
+        if args.handler_ms:
+            await asyncio.sleep(args.handler_ms / 1000)
+        latencies.append(time.time() * 1000 - context["timestamp"])
+        if len(latencies) >= messages:
+            consumer.stop_consuming()
+            done.set()
+
+    consumer.register_handler(TOPIC, handler)
+
+    async def produce():
+        for i in range(messages):
+            await producer.send_message(TOPIC, make_message(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(produce(), consumer.start_consuming())
+    elapsed = time.perf_counter() - start
+    producer.close()
+    return elapsed, latencies
+
+
+async def run_async(args, messages: int):
+    broker = MemoryBroker(request_latency_ms=args.latency_ms)
+    config = KafkaStreamConfig()
+    settings = AsyncClientSettings(max_in_flight_messages=args.in_flight, linger_ms=args.linger_ms)
+    latencies = []
+
+    producer = AsyncKafkaProducer(config, settings, producer_factory=broker.create_producer)
+    consumer = AsyncKafkaConsumer(config, [TOPIC], settings, consumer_factory=broker.create_consumer)
+
+    async def handler(value, context):
+        if args.handler_ms:
+            await asyncio.sleep(args.handler_ms / 1000)
+        latencies.append(time.time() * 1000 - context["timestamp"])
+        if len(latencies) >= messages:
+            consumer.stop_consuming()
+
+    consumer.register_handler(TOPIC, handler)
+
+    async def produce():
+        for i in range(messages):
+            await producer.send(TOPIC, make_message(i))
+        await producer.flush()
+
+    start = time.perf_counter()
+    await asyncio.gather(produce(), consumer.start_consuming())
+    elapsed = time.perf_counter() - start
+    await producer.close()
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--legacy-messages', type=int, default=1000,
+                        help="the blocking clients are slow; run them on fewer messages")
+    parser.add_argument('--latency-ms', type=float, default=1.0, help="simulated broker round-trip")
+    parser.add_argument('--handler-ms', type=float, default=0.0, help="simulated async handler work")
+    parser.add_argument('--in-flight', type=int, default=1000)
+    parser.add_argument('--linger-ms', type=int, default=5)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'clients':>8} {'messages':>9} {'msgs/sec':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for label, runner, count in (("legacy", run_legacy, args.legacy_messages),
+                                 ("async", run_async, args.messages)):
+        elapsed, latencies = asyncio.run(runner(args, count))
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"{label:>8} {count:>9} {count / elapsed:>10.0f} {p50:>9.1f} {p99:>9.1f}", flush=True)
+
+
+if __name__ == '__main__':
+    main()
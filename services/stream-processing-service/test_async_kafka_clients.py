@@ -0,0 +1,153 @@
+"""
+Test asyncio Kafka clients against the in-memory broker
+"""
+import pytest
+import asyncio
+import functools
+import os
+import sys
+
+from kafka import KafkaProducer
+from kafka.structs import TopicPartition
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.core.kafka_config import KafkaStreamConfig, AsyncClientSettings
+from app.core.async_kafka_clients import AsyncKafkaProducer, AsyncKafkaConsumer
+from tests.memory_broker import MemoryBroker
+
+
+TOPIC = "dharma.raw.twitter"
+
+
+def make_settings(**overrides):
+    settings = AsyncClientSettings(linger_ms=2, poll_timeout_ms=20, commit_interval_ms=10)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    return settings
+
+
+async def produce(broker, count, settings=None):
+    producer = AsyncKafkaProducer(KafkaStreamConfig(), settings or make_settings(),
+                                  producer_factory=broker.create_producer)
+    sent = await producer.send_batch(TOPIC, [{"post_id": i} for i in range(count)])
+    await producer.close()
+    return producer, sent
+
+
+async def consume(broker, expected, handler=None, settings=None):
+    consumer = AsyncKafkaConsumer(KafkaStreamConfig(), [TOPIC], settings or make_settings(),
+                                  consumer_factory=broker.create_consumer)
+    received = []
+
+    async def collect(value, context):
+        if handler:
+            await handler(value, context)
+        received.append(value["post_id"])
+        if len(received) == expected:
+            consumer.stop_consuming()
+
+    consumer.register_handler(TOPIC, collect)
+    await asyncio.wait_for(consumer.start_consuming(), timeout=10)
+    return consumer, received
+
+
+class TestAsyncKafkaProducer:
+    """Test pipelined sends"""
+
+    @pytest.mark.asyncio
+    async def test_in_flight_window_bounds_unacknowledged_sends(self):
+        broker = MemoryBroker(request_latency_ms=5)
+        producer = AsyncKafkaProducer(KafkaStreamConfig(), make_settings(max_in_flight_messages=16),
+                                      producer_factory=broker.create_producer)
+        peak = 0
+
+        async def sample():
+            nonlocal peak
+            while True:
+                peak = max(peak, producer.metrics["in_flight"])
+                await asyncio.sleep(0)
+
+        sampler = asyncio.create_task(sample())
+        sent = await producer.send_batch(TOPIC, [{"post_id": i} for i in range(200)])
+        sampler.cancel()
+        await producer.close()
+
+        assert sent == 200
+        assert 1 < peak <= 16
+        assert producer.metrics["window_waits"] > 0
+        assert sum(broker.end_offset(tp) for tp in broker.partitions_for(TOPIC)) == 200
+        assert producer.metrics["bytes_sent"] == sum(len(f'{{"post_id": {i}}}') for i in range(200))
+
+    def test_default_settings_build_a_real_producer(self):
+        # A fixed api_version skips the broker probe; nothing else is stubbed
+        producer = AsyncKafkaProducer(KafkaStreamConfig(), AsyncClientSettings(),
+                                      producer_factory=functools.partial(KafkaProducer, api_version=(2, 5)))
+        try:
+            assert producer.producer.config["compression_type"] == AsyncClientSettings().compression_type
+        finally:
+            producer.producer.close(timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_keyed_messages_share_a_partition(self):
+        broker = MemoryBroker()
+        producer = AsyncKafkaProducer(KafkaStreamConfig(), make_settings(), producer_factory=broker.create_producer)
+        metadata = [await producer.send_and_wait(TOPIC, {"n": i}, key="user-1") for i in range(5)]
+        await producer.close()
+
+        assert len({m.partition for m in metadata}) == 1
+        assert [m.offset for m in metadata] == list(range(5))
+
+
+class TestAsyncKafkaConsumer:
+    """Test threaded polling, backpressure and offset commits"""
+
+    @pytest.mark.asyncio
+    async def test_consumes_everything_and_commits_final_offsets(self):
+        broker = MemoryBroker()
+        await produce(broker, 300)
+
+        consumer, received = await consume(broker, 300)
+
+        assert sorted(received) == list(range(300))
+        for tp in broker.partitions_for(TOPIC):
+            assert broker.committed(consumer.config.consumer_group_id, tp) == broker.end_offset(tp)
+        assert consumer.get_metrics()["messages_processed"] == 300
+        assert consumer.get_metrics()["pending_offsets"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_handlers_apply_backpressure_to_poll_thread(self):
+        broker = MemoryBroker()
+        await produce(broker, 60)
+        settings = make_settings(max_poll_records=5, queue_max_batches=1, max_concurrent_handlers=2)
+
+        async def slow(value, context):
+            await asyncio.sleep(0.005)
+
+        consumer, received = await consume(broker, 60, handler=slow, settings=settings)
+
+        assert len(received) == 60
+        assert consumer.metrics["backpressure_waits"] > 0
+
+    @pytest.mark.asyncio
+    async def test_failed_messages_are_counted_and_committed(self):
+        broker = MemoryBroker(num_partitions=1)
+        await produce(broker, 10)
+        consumer = AsyncKafkaConsumer(KafkaStreamConfig(), [TOPIC], make_settings(),
+                                      consumer_factory=broker.create_consumer)
+        seen = 0
+
+        async def flaky(value, context):
+            nonlocal seen
+            seen += 1
+            if seen == 10:
+                consumer.stop_consuming()
+            if value["post_id"] % 2:
+                raise ValueError("bad message")
+
+        consumer.register_handler(TOPIC, flaky)
+        await asyncio.wait_for(consumer.start_consuming(), timeout=10)
+
+        assert consumer.metrics["messages_failed"] == 5
+        assert consumer.metrics["messages_processed"] == 5
+        assert broker.committed(consumer.config.consumer_group_id, TopicPartition(TOPIC, 0)) == 10
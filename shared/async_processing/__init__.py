@@ -2,6 +2,7 @@
 
 from .async_manager import AsyncManager
 from .task_queue import TaskQueue, BackgroundTaskManager
+from .queue_backends import QueueBackend, MemoryQueueBackend, SQLiteQueueBackend
 from .connection_pool import ConnectionPoolManager
 from .concurrency_limiter import ConcurrencyLimiter
 from .worker_pool import WorkerPool
@@ -10,6 +11,9 @@ __all__ = [
     "AsyncManager",
     "TaskQueue",
     "BackgroundTaskManager", 
+    "QueueBackend",
+    "MemoryQueueBackend",
+    "SQLiteQueueBackend",
     "ConnectionPoolManager",
     "ConcurrencyLimiter",
     "WorkerPool"
@@ -0,0 +1,451 @@
+"""Storage backends for TaskQueue: in-memory and durable SQLite (WAL)."""
+
+import asyncio
+import heapq
+import itertools
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+TaskData = Dict[str, Any]
+
+
+class QueueBackend(ABC):
+    """Where queued tasks live between enqueue and acknowledgement.
+
+    Tasks are dequeued highest ``priority`` first, then in enqueue order.
+    A dequeued task is leased for ``visibility_timeout`` seconds: unless it is
+    acknowledged or released before then, it becomes available again, so a
+    task taken by a worker that crashed is redelivered. Every delivery carries
+    a new ``lease`` token; ``extend`` and ``release`` are refused for a token
+    that is no longer the task's current one. ``dequeue`` waits for work by
+    being woken on enqueue rather than polling.
+    """
+
+    @abstractmethod
+    async def put_many(self, tasks: List[TaskData]) -> None:
+        """Add tasks; raises asyncio.QueueFull if there is no room for all of them."""
+
+    async def put(self, task: TaskData) -> None:
+        await self.put_many([task])
+
+    @abstractmethod
+    async def dequeue(self, max_items: int, visibility_timeout: float) -> List[TaskData]:
+        """Lease up to ``max_items`` available tasks, waiting until at least one is."""
+
+    @abstractmethod
+    async def ack(self, task_id: str) -> None:
+        """Remove a task for good (completed, failed or cancelled)."""
+
+    @abstractmethod
+    async def release(self, task: TaskData, delay: float = 0.0) -> None:
+        """Return a leased task, storing its updated data, to be available after ``delay`` seconds.
+
+        Ignored unless ``task["lease"]`` is still the task's current lease.
+        """
+
+    @abstractmethod
+    async def extend(self, task_id: str, lease: str, visibility_timeout: float) -> bool:
+        """Lease a task for another ``visibility_timeout`` seconds from now.
+
+        Also takes back a task whose lease lapsed but that has not been
+        redelivered yet. Returns False once the task has been acknowledged,
+        released or delivered again under a different lease.
+        """
+
+    @abstractmethod
+    def qsize(self) -> int:
+        """Tasks waiting or leased."""
+
+    async def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class MemoryQueueBackend(QueueBackend):
+    """Process-local backend; tasks are lost on restart."""
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._tasks: Dict[str, TaskData] = {}
+        self._ready: List[Tuple[int, int, str]] = []
+        self._delayed: List[Tuple[float, int, str]] = []
+        self._leases: Dict[str, float] = {}
+        # Lease token of each task's latest delivery, kept after the lease lapses
+        self._owners: Dict[str, str] = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    async def put_many(self, tasks: List[TaskData]) -> None:
+        if len(self._tasks) + len(tasks) > self.max_size:
+            raise asyncio.QueueFull()
+        for task in tasks:
+            self._tasks[task["task_id"]] = task
+            self._push_ready(task)
+        self._wakeup.set()
+
+    def _push_ready(self, task: TaskData) -> None:
+        priority = task["config"].get("priority", 0)
+        heapq.heappush(self._ready, (-priority, next(self._sequence), task["task_id"]))
+
+    def _promote_due(self, now: float) -> None:
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, task_id = heapq.heappop(self._delayed)
+            if task_id in self._tasks and task_id not in self._leases:
+                self._push_ready(self._tasks[task_id])
+        for task_id, until in list(self._leases.items()):
+            if until <= now:
+                del self._leases[task_id]
+                logger.warning("Task lease expired, redelivering", task_id=task_id)
+                self._push_ready(self._tasks[task_id])
+
+    def _next_due(self) -> Optional[float]:
+        times = [until for until in self._leases.values()]
+        if self._delayed:
+            times.append(self._delayed[0][0])
+        return min(times) if times else None
+
+    async def dequeue(self, max_items: int, visibility_timeout: float) -> List[TaskData]:
+        while True:
+            now = time.monotonic()
+            self._promote_due(now)
+            batch = []
+            while self._ready and len(batch) < max_items:
+                _, _, task_id = heapq.heappop(self._ready)
+                # Skip tasks acknowledged (cancelled) or leased since they were pushed
+                if task_id not in self._tasks or task_id in self._leases:
+                    continue
+                lease = uuid.uuid4().hex
+                self._leases[task_id] = now + visibility_timeout
+                self._owners[task_id] = lease
+                batch.append({**self._tasks[task_id], "lease": lease})
+            if batch:
+                return batch
+
+            self._wakeup.clear()
+            next_due = self._next_due()
+            timeout = None if next_due is None else max(next_due - now, 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def ack(self, task_id: str) -> None:
+        self._tasks.pop(task_id, None)
+        self._leases.pop(task_id, None)
+        self._owners.pop(task_id, None)
+
+    async def release(self, task: TaskData, delay: float = 0.0) -> None:
+        task_id = task["task_id"]
+        if task_id not in self._tasks or self._owners.get(task_id) != task.get("lease"):
+            return
+        self._leases.pop(task_id, None)
+        del self._owners[task_id]
+        self._tasks[task_id] = task
+        if delay > 0:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._sequence), task_id))
+        else:
+            self._push_ready(task)
+        self._wakeup.set()
+
+    async def extend(self, task_id: str, lease: str, visibility_timeout: float) -> bool:
+        if task_id not in self._tasks or self._owners.get(task_id) != lease:
+            return False
+        # A ready heap entry left by an expired lease is skipped while leased
+        self._leases[task_id] = time.monotonic() + visibility_timeout
+        return True
+
+    def qsize(self) -> int:
+        return len(self._tasks)
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, tuple):
+        return list(value)
+    raise TypeError(f"Task data of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """Durable backend in a SQLite database in WAL mode.
+
+    Task arguments must be JSON serializable. Several processes may share
+    the database file; enqueues in this process wake its waiting dequeues
+    immediately, while tasks enqueued by other processes are picked up
+    within ``poll_interval`` seconds. All statements run on one thread so
+    the event loop never blocks on disk.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            queue TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            available_at REAL NOT NULL,
+            deliveries INTEGER NOT NULL DEFAULT 0,
+            lease TEXT,
+            payload TEXT NOT NULL,
+            UNIQUE (queue, task_id)
+        );
+        -- Dequeue walks this in priority order and skips leased or delayed rows
+        -- from the index alone; an available_at index would make it sort every ready row
+        CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (queue, priority DESC, seq, available_at);
+    """
+
+    def __init__(self, path: str, queue: str = "default", max_size: int = 100000,
+                 poll_interval: float = 1.0):
+        self.path = path
+        self.queue = queue
+        self.max_size = max_size
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sqlite-queue-{queue}")
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._pending_acks: List[str] = []
+        self._ack_flush: Optional[asyncio.Future] = None
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps committed transactions durable across process crashes with NORMAL
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "lease" not in columns:
+            # Databases created before leases carried a token
+            try:
+                self._conn.execute("ALTER TABLE tasks ADD COLUMN lease TEXT")
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e):
+                    raise
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._conn, self._lock)
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM tasks WHERE queue = ?", (self.queue,)).fetchone()[0]
+
+    def _insert(self, tasks: List[TaskData]) -> None:
+        now = time.time()
+        rows = [
+            (self.queue, task["task_id"], task["config"].get("priority", 0), now,
+             json.dumps(task, default=_encode))
+            for task in tasks
+        ]
+        with self._transaction():
+            if self._count() + len(rows) > self.max_size:
+                raise asyncio.QueueFull()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tasks (queue, task_id, priority, available_at, payload) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    async def put_many(self, tasks: List[TaskData]) -> None:
+        await self._run(self._insert, tasks)
+        self._wakeup.set()
+
+    def _lease(self, max_items: int, visibility_timeout: float) -> Tuple[List[TaskData], Optional[float]]:
+        now = time.time()
+        with self._transaction():
+            rows = self._conn.execute(
+                "SELECT seq, payload, deliveries FROM tasks WHERE queue = ? AND available_at <= ? "
+                "ORDER BY priority DESC, seq LIMIT ?",
+                (self.queue, now, max_items)
+            ).fetchall()
+            if rows:
+                leases = [uuid.uuid4().hex for _ in rows]
+                self._conn.executemany(
+                    "UPDATE tasks SET available_at = ?, deliveries = deliveries + 1, lease = ? WHERE seq = ?",
+                    [(now + visibility_timeout, lease, seq) for (seq, _, _), lease in zip(rows, leases)]
+                )
+                tasks = []
+                for (_, payload, deliveries), lease in zip(rows, leases):
+                    task = json.loads(payload, object_hook=_decode)
+                    task["delivery_count"] = deliveries + 1
+                    task["lease"] = lease
+                    tasks.append(task)
+                return tasks, None
+            next_due = self._conn.execute(
+                "SELECT MIN(available_at) FROM tasks WHERE queue = ?", (self.queue,)
+            ).fetchone()[0]
+            return [], next_due
+
+    async def dequeue(self, max_items: int, visibility_timeout: float) -> List[TaskData]:
+        while True:
+            self._wakeup.clear()
+            lease = asyncio.ensure_future(self._run(self._lease, max_items, visibility_timeout))
+            try:
+                tasks, next_due = await asyncio.shield(lease)
+            except asyncio.CancelledError:
+                # Don't strand tasks leased for a caller that is gone
+                lease.add_done_callback(self._release_abandoned)
+                raise
+            if tasks:
+                return tasks
+            # Sleep until woken by a local enqueue, the next delayed or leased task
+            # comes due, or it is time to look for tasks from other processes
+            timeout = self.poll_interval
+            if next_due is not None:
+                timeout = min(timeout, max(next_due - time.time(), 0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release_abandoned(self, lease: "asyncio.Future") -> None:
+        if lease.cancelled() or lease.exception() is not None:
+            return
+        for task in lease.result()[0]:
+            self._executor.submit(self._update, task, 0.0)
+
+    def _delete(self, task_ids: List[str]) -> None:
+        with self._transaction():
+            self._conn.executemany(
+                "DELETE FROM tasks WHERE queue = ? AND task_id = ?", [(self.queue, task_id) for task_id in task_ids]
+            )
+
+    async def _flush_acks(self) -> None:
+        await asyncio.sleep(0)  # let acks from other workers in this loop iteration join
+        task_ids, self._pending_acks = self._pending_acks, []
+        self._ack_flush = None
+        await self._run(self._delete, task_ids)
+
+    async def ack(self, task_id: str) -> None:
+        # Acks that arrive together share one transaction
+        self._pending_acks.append(task_id)
+        if self._ack_flush is None:
+            self._ack_flush = asyncio.ensure_future(self._flush_acks())
+        await asyncio.shield(self._ack_flush)
+
+    def _update(self, task: TaskData, delay: float) -> None:
+        payload = {key: value for key, value in task.items() if key != "lease"}
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE tasks SET available_at = ?, payload = ?, lease = NULL "
+                "WHERE queue = ? AND task_id = ? AND lease = ?",
+                (time.time() + delay, json.dumps(payload, default=_encode), self.queue, task["task_id"],
+                 task.get("lease"))
+            )
+
+    async def release(self, task: TaskData, delay: float = 0.0) -> None:
+        await self._run(self._update, task, delay)
+        self._wakeup.set()
+
+    def _touch(self, task_id: str, lease: str, visibility_timeout: float) -> bool:
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET available_at = ? WHERE queue = ? AND task_id = ? AND lease = ?",
+                (time.time() + visibility_timeout, self.queue, task_id, lease)
+            )
+            return cursor.rowcount > 0
+
+    async def extend(self, task_id: str, lease: str, visibility_timeout: float) -> bool:
+        return await self._run(self._touch, task_id, lease, visibility_timeout)
+
+    def qsize(self) -> int:
+        with self._lock:
+            return self._count()
+
+    async def close(self) -> None:
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=False)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT under the backend's connection lock."""
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self.conn = conn
+        self.lock = lock
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+        return False
+
+
+class ResultStore:
+    """Task results, with finished results kept for ``ttl`` seconds and at most ``max_entries`` in total.
+
+    Results of pending and running tasks are never evicted; finished results
+    are dropped oldest first once expired or when the store is over its cap.
+    Supports the mapping operations TaskQueue uses on its results.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Any] = {}
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self.evicted = 0
+
+    def __setitem__(self, task_id: str, result: Any) -> None:
+        self._finished.pop(task_id, None)
+        self._entries[task_id] = result
+        self._evict()
+
+    def __getitem__(self, task_id: str) -> Any:
+        return self._entries[task_id]
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def get(self, task_id: str, default: Any = None) -> Any:
+        return self._entries.get(task_id, default)
+
+    def values(self):
+        return self._entries.values()
+
+    def finished(self, task_id: str) -> None:
+        """Start the TTL of a result whose task reached a final state."""
+        if task_id in self._entries:
+            self._finished.pop(task_id, None)
+            self._finished[task_id] = time.monotonic() + self.ttl
+            self._evict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._finished:
+            task_id, expires_at = next(iter(self._finished.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._finished[task_id]
+            del self._entries[task_id]
+            self.evicted += 1
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from enum import Enum
 import structlog
 
+from .queue_backends import MemoryQueueBackend, QueueBackend, ResultStore
+
 logger = structlog.get_logger(__name__)
 
 
@@ -23,6 +25,9 @@ class TaskStatus(Enum):
     CANCELLED = "cancelled"
 
 
+FINAL_STATUSES = (TaskStatus.SUCCESS, TaskStatus.FAILURE, TaskStatus.CANCELLED)
+
+
 @dataclass
 class TaskResult:
     """Task execution result."""
@@ -49,16 +54,44 @@ class TaskConfig:
 
 
 class TaskQueue:
-    """Async task queue implementation."""
+    """Async task queue implementation.
+    
+    Tasks are kept in a pluggable ``QueueBackend``: in memory by default, or
+    durable (``SQLiteQueueBackend``) so they survive restarts. Higher
+    ``TaskConfig.priority`` runs first. A fetcher leases tasks in batches,
+    keeping up to ``prefetch`` of them ready for the workers, and sleeps until
+    woken by new work rather than polling. The lease is renewed when a worker
+    picks the task up and every ``visibility_timeout / 3`` seconds while it
+    runs, so only a task whose process died is redelivered, after
+    ``visibility_timeout`` seconds. A prefetched task whose lease lapsed and
+    was taken by another worker or process is dropped instead of run, since
+    the renewal is refused for its stale lease token. Finished results are
+    kept for ``result_ttl`` seconds, at most ``max_results`` of them.
+    """
     
-    def __init__(self, name: str = "default", max_size: int = 1000):
+    def __init__(
+        self,
+        name: str = "default",
+        max_size: int = 1000,
+        backend: Optional[QueueBackend] = None,
+        prefetch: int = 32,
+        visibility_timeout: float = 330.0,
+        result_ttl: float = 3600.0,
+        max_results: int = 10000
+    ):
         self.name = name
         self.max_size = max_size
-        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
-        self._results: Dict[str, TaskResult] = {}
+        self.backend = backend or MemoryQueueBackend(max_size)
+        self.prefetch = prefetch
+        self.visibility_timeout = visibility_timeout
+        self._results = ResultStore(ttl=result_ttl, max_entries=max_results)
         self._registered_tasks: Dict[str, Callable] = {}
         self._running_tasks: Dict[str, asyncio.Task] = {}
         self._workers: List[asyncio.Task] = []
+        self._fetcher: Optional[asyncio.Task] = None
+        self._dispatch: Optional[asyncio.Queue] = None
+        self._slot_free = asyncio.Event()
+        self._result_waiters: Dict[str, List[asyncio.Future]] = {}
         self._shutdown_event = asyncio.Event()
     
     def register_task(self, name: str, func: Callable):
@@ -101,14 +134,7 @@ class TaskQueue:
                          task_name=task_name)
             return task_id
         
-        task_data = {
-            "task_id": task_id,
-            "task_name": task_name,
-            "args": args,
-            "kwargs": kwargs,
-            "config": asdict(config),
-            "enqueued_at": datetime.utcnow().isoformat()
-        }
+        task_data = self._build_task_data(task_name, task_id, args, kwargs, config)
         
         # Initialize task result
         self._results[task_id] = TaskResult(
@@ -118,11 +144,11 @@ class TaskQueue:
         )
         
         try:
-            await self._queue.put(task_data)
+            await self.backend.put(task_data)
+            # No queue size here: for durable backends it is a query on every enqueue
             logger.debug("Task enqueued", 
                         task_id=task_id, 
-                        task_name=task_name,
-                        queue_size=self._queue.qsize())
+                        task_name=task_name)
             
         except asyncio.QueueFull:
             logger.error("Queue full, cannot enqueue task", 
@@ -130,27 +156,90 @@ class TaskQueue:
                         task_name=task_name)
             self._results[task_id].status = TaskStatus.FAILURE
             self._results[task_id].error = "Queue full"
+            self._finish(task_id)
             raise
         
         return task_id
     
+    async def enqueue_many(
+        self,
+        task_name: str,
+        arg_list: List[tuple],
+        config: Optional[TaskConfig] = None
+    ) -> List[str]:
+        """Enqueue one task per argument tuple in a single backend write."""
+        if task_name not in self._registered_tasks:
+            raise ValueError(f"Task '{task_name}' not registered")
+        
+        config = config or TaskConfig()
+        tasks = [
+            self._build_task_data(task_name, str(uuid.uuid4()), tuple(args), {}, config)
+            for args in arg_list
+        ]
+        for task in tasks:
+            self._results[task["task_id"]] = TaskResult(
+                task_id=task["task_id"],
+                status=TaskStatus.PENDING,
+                max_retries=config.max_retries
+            )
+        
+        try:
+            await self.backend.put_many(tasks)
+        except asyncio.QueueFull:
+            logger.error("Queue full, cannot enqueue tasks", task_name=task_name, count=len(tasks))
+            for task in tasks:
+                self._results[task["task_id"]].status = TaskStatus.FAILURE
+                self._results[task["task_id"]].error = "Queue full"
+                self._finish(task["task_id"])
+            raise
+        return [task["task_id"] for task in tasks]
+    
+    def _build_task_data(
+        self,
+        task_name: str,
+        task_id: str,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        config: TaskConfig
+    ) -> Dict[str, Any]:
+        return {
+            "task_id": task_id,
+            "task_name": task_name,
+            "args": args,
+            "kwargs": kwargs,
+            "config": asdict(config),
+            "retry_count": 0,
+            "enqueued_at": datetime.utcnow().isoformat()
+        }
+    
+    def _finish(self, task_id: str):
+        """Mark a result final: start its TTL and wake anyone waiting for it."""
+        self._results.finished(task_id)
+        for waiter in self._result_waiters.pop(task_id, []):
+            if not waiter.done():
+                waiter.set_result(None)
+    
     async def get_result(self, task_id: str, timeout: Optional[float] = None) -> TaskResult:
         """Get task result, waiting if necessary."""
         if task_id not in self._results:
             raise ValueError(f"Task '{task_id}' not found")
         
-        start_time = time.time()
+        result = self._results[task_id]
+        if result.status in FINAL_STATUSES:
+            return result
         
-        while True:
-            result = self._results[task_id]
-            
-            if result.status in [TaskStatus.SUCCESS, TaskStatus.FAILURE, TaskStatus.CANCELLED]:
-                return result
-            
-            if timeout and (time.time() - start_time) > timeout:
-                raise asyncio.TimeoutError(f"Task '{task_id}' result timeout")
-            
-            await asyncio.sleep(0.1)
+        waiter = asyncio.get_running_loop().create_future()
+        self._result_waiters.setdefault(task_id, []).append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Task '{task_id}' result timeout")
+        finally:
+            waiters = self._result_waiters.get(task_id)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+        
+        return result
     
     async def cancel_task(self, task_id: str) -> bool:
         """Cancel a pending or running task."""
@@ -159,8 +248,10 @@ class TaskQueue:
         
         result = self._results[task_id]
         
-        if result.status == TaskStatus.PENDING:
+        if result.status in (TaskStatus.PENDING, TaskStatus.RETRY):
             result.status = TaskStatus.CANCELLED
+            await self.backend.ack(task_id)
+            self._finish(task_id)
             logger.info("Pending task cancelled", task_id=task_id)
             return True
         
@@ -175,6 +266,10 @@ class TaskQueue:
     
     async def start_workers(self, worker_count: int = 3):
         """Start worker tasks to process the queue."""
+        self._shutdown_event.clear()
+        if self._dispatch is None:
+            self._dispatch = asyncio.Queue()
+        
         for i in range(worker_count):
             worker = asyncio.create_task(
                 self._worker_loop(f"worker-{i}"),
@@ -182,6 +277,9 @@ class TaskQueue:
             )
             self._workers.append(worker)
         
+        if self._fetcher is None:
+            self._fetcher = asyncio.create_task(self._fetch_loop(), name=f"{self.name}-fetcher")
+        
         logger.info("Workers started", 
                    queue=self.name, 
                    worker_count=worker_count)
@@ -190,35 +288,54 @@ class TaskQueue:
         """Stop all worker tasks."""
         self._shutdown_event.set()
         
-        # Cancel all workers
-        for worker in self._workers:
-            worker.cancel()
+        # Cancel the fetcher and all workers
+        tasks = self._workers + ([self._fetcher] if self._fetcher else [])
+        for task in tasks:
+            task.cancel()
         
         # Wait for workers to finish
-        if self._workers:
-            await asyncio.gather(*self._workers, return_exceptions=True)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Hand back tasks fetched but not started so they are not held until their lease expires
+        while self._dispatch is not None and not self._dispatch.empty():
+            await self.backend.release(self._dispatch.get_nowait())
         
         self._workers.clear()
+        self._fetcher = None
         logger.info("Workers stopped", queue=self.name)
     
+    async def _fetch_loop(self):
+        """Lease tasks from the backend for idle workers."""
+        while not self._shutdown_event.is_set():
+            capacity = self.prefetch - self._dispatch.qsize()
+            if capacity <= 0:
+                self._slot_free.clear()
+                await self._slot_free.wait()
+                continue
+            
+            try:
+                tasks = await self.backend.dequeue(capacity, self.visibility_timeout)
+            except Exception as e:
+                logger.error("Task fetch failed", queue=self.name, error=str(e))
+                await asyncio.sleep(1.0)
+                continue
+            
+            for task_data in tasks:
+                self._dispatch.put_nowait(task_data)
+    
     async def _worker_loop(self, worker_name: str):
         """Worker loop to process tasks from the queue."""
         logger.debug("Worker started", worker=worker_name, queue=self.name)
         
         try:
             while not self._shutdown_event.is_set():
+                # Woken by the fetcher; no timed polling while idle
+                task_data = await self._dispatch.get()
+                self._slot_free.set()
+                
                 try:
-                    # Get task with timeout to allow periodic shutdown checks
-                    task_data = await asyncio.wait_for(
-                        self._queue.get(), 
-                        timeout=1.0
-                    )
-                    
                     await self._execute_task(task_data, worker_name)
-                    
-                except asyncio.TimeoutError:
-                    # No task available, continue loop
-                    continue
                 except Exception as e:
                     logger.error("Worker error", 
                                worker=worker_name, 
@@ -237,7 +354,24 @@ class TaskQueue:
         kwargs = task_data["kwargs"]
         config = TaskConfig(**task_data["config"])
         
-        result = self._results[task_id]
+        result = self._results.get(task_id)
+        if result is None:
+            # Enqueued before a restart, or by another process sharing the backend
+            result = TaskResult(task_id=task_id, status=TaskStatus.PENDING, max_retries=config.max_retries)
+            self._results[task_id] = result
+        elif result.status in FINAL_STATUSES:
+            # Cancelled while waiting, or redelivered after it already finished here
+            await self.backend.ack(task_id)
+            return
+        elif result.status == TaskStatus.RUNNING:
+            # Redelivered while another worker here runs it; that worker holds the lease
+            return
+        # The lease was taken when the task was prefetched; restart it now that it runs.
+        # Refused if it lapsed while buffered and someone else has the task now
+        if not await self.backend.extend(task_id, task_data["lease"], self.visibility_timeout):
+            logger.debug("Dropping prefetched task leased elsewhere", task_id=task_id)
+            return
+        result.retry_count = task_data.get("retry_count", result.retry_count)
         result.status = TaskStatus.RUNNING
         result.started_at = datetime.utcnow()
         
@@ -260,6 +394,7 @@ class TaskQueue:
             )
             
             self._running_tasks[task_id] = execution_task
+            heartbeat = asyncio.create_task(self._keep_leased(task_id, task_data["lease"]))
             
             try:
                 if config.timeout:
@@ -281,18 +416,28 @@ class TaskQueue:
                 logger.debug("Task execution completed", 
                            task_id=task_id, 
                            execution_time=result.execution_time)
+                await self.backend.ack(task_id)
+                self._finish(task_id)
                 
             except asyncio.TimeoutError:
                 execution_task.cancel()
                 raise Exception(f"Task timeout after {config.timeout} seconds")
             
             finally:
+                heartbeat.cancel()
                 if task_id in self._running_tasks:
                     del self._running_tasks[task_id]
         
         except asyncio.CancelledError:
+            if self._shutdown_event.is_set() and result.status != TaskStatus.CANCELLED:
+                # Interrupted by shutdown rather than cancelled: run it again later
+                result.status = TaskStatus.PENDING
+                await self.backend.release(task_data)
+                raise
             result.status = TaskStatus.CANCELLED
             result.completed_at = datetime.utcnow()
+            await self.backend.ack(task_id)
+            self._finish(task_id)
             logger.info("Task cancelled during execution", task_id=task_id)
         
         except Exception as e:
@@ -315,15 +460,27 @@ class TaskQueue:
                              retry_delay=retry_delay,
                              error=error_msg)
                 
-                # Re-enqueue task after delay
-                asyncio.create_task(self._retry_task(task_data, retry_delay))
+                # Hand the task back to become available after the delay
+                await self.backend.release({**task_data, "retry_count": result.retry_count}, retry_delay)
             else:
                 result.status = TaskStatus.FAILURE
+                await self.backend.ack(task_id)
+                self._finish(task_id)
                 logger.error("Task failed after max retries", 
                            task_id=task_id,
                            max_retries=config.max_retries,
                            error=error_msg)
     
+    async def _keep_leased(self, task_id: str, lease: str):
+        """Renew a running task's lease so it is not redelivered while it runs."""
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                if not await self.backend.extend(task_id, lease, self.visibility_timeout):
+                    return
+            except Exception as e:
+                logger.warning("Task lease renewal failed", task_id=task_id, error=str(e))
+    
     async def _run_task_function(self, func: Callable, *args, **kwargs) -> Any:
         """Run task function, handling both sync and async functions."""
         if asyncio.iscoroutinefunction(func):
@@ -333,16 +490,6 @@ class TaskQueue:
             loop = asyncio.get_event_loop()
             return await loop.run_in_executor(None, func, *args, **kwargs)
     
-    async def _retry_task(self, task_data: Dict[str, Any], delay: float):
-        """Retry a failed task after delay."""
-        await asyncio.sleep(delay)
-        
-        # Reset task status to pending
-        task_id = task_data["task_id"]
-        if task_id in self._results:
-            self._results[task_id].status = TaskStatus.PENDING
-            await self._queue.put(task_data)
-    
     def get_queue_stats(self) -> Dict[str, Any]:
         """Get queue statistics."""
         status_counts = {}
@@ -352,8 +499,10 @@ class TaskQueue:
         
         return {
             "queue_name": self.name,
-            "queue_size": self._queue.qsize(),
+            "queue_size": self.backend.qsize(),
             "max_size": self.max_size,
+            "backend": type(self.backend).__name__,
+            "evicted_results": self._results.evicted,
             "total_tasks": len(self._results),
             "running_tasks": len(self._running_tasks),
             "worker_count": len(self._workers),
@@ -3,11 +3,14 @@
 from .cache_manager import CacheManager
 from .cache_policies import CachePolicies
 from .invalidation_handler import CacheInvalidationHandler
+from .local_cache import LocalCache, SingleFlight
 from .monitoring import CacheMonitor
 
 __all__ = [
     "CacheManager",
     "CachePolicies", 
     "CacheInvalidationHandler",
-    "CacheMonitor"
+    "CacheMonitor",
+    "LocalCache",
+    "SingleFlight"
 ]
\ No newline at end of file
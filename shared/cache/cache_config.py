@@ -7,6 +7,7 @@ from enum import Enum
 import structlog
 from ..database.redis import RedisManager
 from .cache_manager import CacheManager
+from .local_cache import LocalCache
 from .cache_policies import CachePolicies
 from .invalidation_handler import CacheInvalidationHandler
 from .monitoring import CacheMonitor
@@ -48,6 +49,13 @@ class CacheConfig:
     enable_compression: bool = False
     compression_threshold: int = 1024
     
+    # In-process L1 tier
+    enable_local_cache: bool = False
+    local_cache_max_bytes: int = 64 * 1024 * 1024
+    local_cache_max_entries: int = 100000
+    local_cache_ttl: float = 30.0
+    stats_flush_interval: float = 5.0
+    
     # Monitoring
     enable_monitoring: bool = True
     metrics_retention_days: int = 7
@@ -98,9 +106,19 @@ class CacheSystemBuilder:
         if not self.redis_manager:
             await self.build_redis_manager()
         
+        local_cache = None
+        if self.config.enable_local_cache:
+            local_cache = LocalCache(
+                max_bytes=self.config.local_cache_max_bytes,
+                max_entries=self.config.local_cache_max_entries,
+                default_ttl=self.config.local_cache_ttl
+            )
+        
         self.cache_manager = CacheManager(
             redis_manager=self.redis_manager,
-            namespace=self.config.namespace
+            namespace=self.config.namespace,
+            local_cache=local_cache,
+            stats_flush_interval=self.config.stats_flush_interval
         )
         
         logger.info("Cache manager initialized")
@@ -232,6 +250,13 @@ def create_cache_config_from_env() -> CacheConfig:
     config.default_ttl = int(os.getenv("CACHE_DEFAULT_TTL", "3600"))
     config.health_check_interval = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
     
+    # In-process L1 tier
+    config.enable_local_cache = os.getenv("CACHE_ENABLE_LOCAL", "false").lower() == "true"
+    config.local_cache_max_bytes = int(os.getenv("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024)))
+    config.local_cache_max_entries = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "100000"))
+    config.local_cache_ttl = float(os.getenv("CACHE_LOCAL_TTL", "30"))
+    config.stats_flush_interval = float(os.getenv("CACHE_STATS_FLUSH_INTERVAL", "5"))
+    
     # Monitoring
     config.enable_monitoring = os.getenv("CACHE_ENABLE_MONITORING", "true").lower() == "true"
     config.metrics_retention_days = int(os.getenv("CACHE_METRICS_RETENTION_DAYS", "7"))
@@ -1,13 +1,16 @@
 """Redis cache manager with intelligent invalidation and cache-aside pattern."""
 
+import asyncio
 import json
 import time
 import hashlib
+import uuid
 from typing import Any, Dict, List, Optional, Union, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import structlog
 from ..database.redis import RedisManager
+from .local_cache import LocalCache, SingleFlight
 
 logger = structlog.get_logger(__name__)
 
@@ -40,15 +43,48 @@ class CacheStats:
         return self.hits / total if total > 0 else 0.0
 
 
+L1_EVICT_EVENT = "l1_evict"
+
+
 class CacheManager:
-    """Advanced Redis cache manager with intelligent invalidation."""
+    """Advanced Redis cache manager with intelligent invalidation.
     
-    def __init__(self, redis_manager: RedisManager, namespace: str = "dharma"):
+    An optional in-process ``LocalCache`` can sit in front of Redis as an L1 tier.
+    Writes and invalidations evict the key locally and publish an ``l1_evict`` event on
+    the ``cache_invalidation:*`` channel so that other instances drop their copies
+    (see ``CacheInvalidationHandler``). Per-entry hit statistics are aggregated in
+    memory and flushed to Redis in pipelined batches every ``stats_flush_interval``
+    seconds rather than being written on every read.
+    """
+    
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        namespace: str = "dharma",
+        local_cache: Optional[LocalCache] = None,
+        instance_id: Optional[str] = None,
+        stats_flush_interval: float = 5.0,
+        stats_ttl: int = 86400,
+        broadcast_invalidations: Optional[bool] = None
+    ):
         self.redis = redis_manager
         self.namespace = namespace
         self.stats = CacheStats()
         self._invalidation_handlers: Dict[str, List[Callable]] = {}
         
+        self.local_cache = local_cache
+        self.instance_id = instance_id or uuid.uuid4().hex
+        self.broadcast_invalidations = (
+            local_cache is not None if broadcast_invalidations is None else broadcast_invalidations
+        )
+        self._single_flight = SingleFlight()
+        
+        # key -> [hit_count, last_accessed] awaiting the next pipelined flush
+        self.stats_flush_interval = stats_flush_interval
+        self.stats_ttl = stats_ttl
+        self._pending_hits: Dict[str, List[Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        
     def _make_key(self, key: str) -> str:
         """Create namespaced cache key."""
         return f"{self.namespace}:cache:{key}"
@@ -61,32 +97,38 @@ class CacheManager:
         """Create tag key for cache invalidation."""
         return f"{self.namespace}:tag:{tag}"
     
+    def _make_stats_key(self, key: str) -> str:
+        """Create hit statistics key for cache entry."""
+        return f"{self.namespace}:stats:{key}"
+    
     async def get(self, key: str, default: Any = None) -> Any:
         """Get value from cache with cache-aside pattern."""
+        if self.local_cache is not None:
+            found, value = self.local_cache.get(key)
+            if found:
+                self.stats.hits += 1
+                self._record_hit(key)
+                return value
+        
         cache_key = self._make_key(key)
-        meta_key = self._make_metadata_key(key)
         
         try:
-            # Get value and metadata
-            value = await self.redis.get(cache_key)
-            metadata = await self.redis.get(meta_key)
+            if self.local_cache is None:
+                value = await self.redis.get(cache_key)
+            else:
+                value, remaining_ttl = await self.redis.get_with_ttl(cache_key)
             
             if value is None:
                 self.stats.misses += 1
                 logger.debug("Cache miss", key=key)
                 return default
             
-            # Update access statistics
-            if metadata:
-                try:
-                    meta_dict = json.loads(metadata) if isinstance(metadata, str) else metadata
-                    meta_dict['hit_count'] = meta_dict.get('hit_count', 0) + 1
-                    meta_dict['last_accessed'] = datetime.utcnow().isoformat()
-                    await self.redis.set(meta_key, json.dumps(meta_dict))
-                except Exception as e:
-                    logger.warning("Failed to update cache metadata", key=key, error=str(e))
+            # The L1 copy must not outlive the Redis entry it was read from
+            if self.local_cache is not None and (remaining_ttl is None or remaining_ttl > 0):
+                self.local_cache.set(key, value, ttl=remaining_ttl)
             
             self.stats.hits += 1
+            self._record_hit(key)
             logger.debug("Cache hit", key=key)
             return value
             
@@ -95,6 +137,114 @@ class CacheManager:
             self.stats.misses += 1
             return default
     
+    def _record_hit(self, key: str):
+        """Aggregate a hit locally; it is written to Redis by the next stats flush."""
+        pending = self._pending_hits.get(key)
+        if pending is None:
+            self._pending_hits[key] = [1, time.time()]
+        else:
+            pending[0] += 1
+            pending[1] = time.time()
+        
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._stats_flush_loop())
+            except RuntimeError:
+                pass  # No running loop; stats are flushed on the next explicit flush_stats()
+    
+    async def _stats_flush_loop(self):
+        """Periodically flush aggregated hit statistics."""
+        while self._pending_hits:
+            await asyncio.sleep(self.stats_flush_interval)
+            await self.flush_stats()
+    
+    async def flush_stats(self) -> int:
+        """Write aggregated hit statistics to Redis in one pipelined batch.
+        
+        Returns:
+            Number of keys whose statistics were flushed
+        """
+        if not self._pending_hits:
+            return 0
+        
+        pending, self._pending_hits = self._pending_hits, {}
+        try:
+            pipe = self.redis.client.pipeline(transaction=False)
+            for key, (hit_count, last_accessed) in pending.items():
+                stats_key = self._make_stats_key(key)
+                pipe.hincrby(stats_key, "hit_count", hit_count)
+                pipe.hset(stats_key, "last_accessed", datetime.utcfromtimestamp(last_accessed).isoformat())
+                pipe.expire(stats_key, self.stats_ttl)
+            await pipe.execute()
+            return len(pending)
+            
+        except Exception as e:
+            logger.warning("Failed to flush cache hit statistics", keys=len(pending), error=str(e))
+            return 0
+    
+    async def close(self):
+        """Stop the statistics flusher and write any pending statistics."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        await self.flush_stats()
+    
+    async def _broadcast_local_eviction(
+        self,
+        keys: Optional[List[str]] = None,
+        patterns: Optional[List[str]] = None,
+        clear: bool = False
+    ):
+        """Ask other instances to drop L1 copies of keys or patterns."""
+        if not self.broadcast_invalidations:
+            return
+        
+        event_data = {
+            "event_type": L1_EVICT_EVENT,
+            "data": {
+                "origin": self.instance_id,
+                "namespace": self.namespace,
+                "keys": keys or [],
+                "patterns": patterns or [],
+                "clear": clear
+            },
+            "origin": self.instance_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "cache_manager"
+        }
+        try:
+            await self.redis.publish(f"cache_invalidation:{L1_EVICT_EVENT}", event_data)
+        except Exception as e:
+            logger.warning("Failed to broadcast L1 eviction", error=str(e))
+    
+    def evict_local(self, data: Dict[str, Any]) -> int:
+        """Apply an ``l1_evict`` event published by another instance.
+        
+        Args:
+            data: Event payload with ``origin``, ``namespace``, ``keys``, ``patterns`` and ``clear``
+            
+        Returns:
+            Number of local entries evicted
+        """
+        if self.local_cache is None or data.get("origin") == self.instance_id:
+            return 0
+        if data.get("namespace", self.namespace) != self.namespace:
+            return 0
+        
+        if data.get("clear"):
+            evicted = len(self.local_cache)
+            self.local_cache.clear()
+            return evicted
+        
+        evicted = self.local_cache.delete_many(data.get("keys", []))
+        for pattern in data.get("patterns", []):
+            evicted += self.local_cache.delete_pattern(pattern)
+        return evicted
+    
     async def set(
         self, 
         key: str, 
@@ -116,6 +266,9 @@ class CacheManager:
                 'tags': tags or []
             }
             
+            if self.local_cache is not None:
+                self.local_cache.delete(key)
+            
             # Set value and metadata
             success = await self.redis.set(cache_key, value, expire=ttl)
             if success:
@@ -129,6 +282,10 @@ class CacheManager:
                         if ttl:
                             await self.redis.expire(tag_key, ttl + 3600)  # Tag expires 1 hour after data
                 
+                if self.local_cache is not None:
+                    self.local_cache.set(key, value, ttl=ttl)
+                await self._broadcast_local_eviction(keys=[key])
+                
                 self.stats.sets += 1
                 logger.debug("Cache set", key=key, ttl=ttl, tags=tags)
                 return True
@@ -139,11 +296,21 @@ class CacheManager:
             logger.error("Cache set failed", key=key, error=str(e))
             return False
     
-    async def delete(self, key: str) -> bool:
-        """Delete key from cache."""
+    async def delete(self, key: str, broadcast: bool = True) -> bool:
+        """Delete key from cache.
+        
+        Args:
+            key: Cache key
+            broadcast: Publish an L1 eviction for the key; bulk invalidations
+                publish once for the whole batch instead
+        """
         cache_key = self._make_key(key)
         meta_key = self._make_metadata_key(key)
         
+        if self.local_cache is not None:
+            self.local_cache.delete(key)
+        self._pending_hits.pop(key, None)
+        
         try:
             # Get metadata to find tags
             metadata = await self.redis.get(meta_key)
@@ -161,8 +328,10 @@ class CacheManager:
                 except Exception as e:
                     logger.warning("Failed to clean up tag indexes", key=key, error=str(e))
             
-            # Delete cache entry and metadata
-            deleted = await self.redis.delete(cache_key, meta_key)
+            # Delete cache entry, metadata and hit statistics
+            deleted = await self.redis.delete(cache_key, meta_key, self._make_stats_key(key))
+            if broadcast:
+                await self._broadcast_local_eviction(keys=[key])
             
             if deleted > 0:
                 self.stats.deletes += 1
@@ -177,6 +346,9 @@ class CacheManager:
     
     async def invalidate_by_pattern(self, pattern: str) -> int:
         """Invalidate cache entries matching pattern."""
+        if self.local_cache is not None:
+            self.local_cache.delete_pattern(pattern)
+        
         try:
             # Use Redis SCAN to find matching keys
             cache_pattern = self._make_key(pattern)
@@ -205,8 +377,9 @@ class CacheManager:
             
             deleted_count = 0
             for key in original_keys:
-                if await self.delete(key):
+                if await self.delete(key, broadcast=False):
                     deleted_count += 1
+            await self._broadcast_local_eviction(patterns=[pattern])
             
             logger.info("Pattern invalidation", pattern=pattern, deleted=deleted_count)
             return deleted_count
@@ -242,8 +415,10 @@ class CacheManager:
             # Delete all tagged keys
             deleted_count = 0
             for key in keys_to_delete:
-                if await self.delete(key):
+                if await self.delete(key, broadcast=False):
                     deleted_count += 1
+            if keys_to_delete:
+                await self._broadcast_local_eviction(keys=sorted(keys_to_delete))
             
             logger.info("Tag invalidation", tags=tags, deleted=deleted_count)
             return deleted_count
@@ -265,6 +440,10 @@ class CacheManager:
         success = await self.redis.expire(cache_key, seconds)
         if success:
             await self.redis.expire(meta_key, seconds)
+            if self.local_cache is not None:
+                found, value = self.local_cache.get(key)
+                if found:
+                    self.local_cache.set(key, value, ttl=seconds)
         
         return success
     
@@ -277,16 +456,38 @@ class CacheManager:
         meta_key = self._make_metadata_key(key)
         metadata = await self.redis.get(meta_key)
         
-        if metadata:
-            try:
-                return json.loads(metadata) if isinstance(metadata, str) else metadata
-            except Exception:
-                return None
+        if not metadata:
+            return None
+        
+        try:
+            info = json.loads(metadata) if isinstance(metadata, str) else dict(metadata)
+        except Exception:
+            return None
+        
+        try:
+            hit_stats = await self.redis.client.hgetall(self._make_stats_key(key)) or {}
+        except Exception as e:
+            logger.warning("Failed to read cache hit statistics", key=key, error=str(e))
+            hit_stats = {}
         
-        return None
+        hit_count = int(hit_stats.get("hit_count", 0))
+        last_accessed = hit_stats.get("last_accessed")
+        pending = self._pending_hits.get(key)
+        if pending:
+            hit_count += pending[0]
+            last_accessed = datetime.utcfromtimestamp(pending[1]).isoformat()
+        
+        info["hit_count"] = info.get("hit_count", 0) + hit_count
+        if last_accessed:
+            info["last_accessed"] = last_accessed
+        return info
     
     async def clear_namespace(self) -> int:
         """Clear all cache entries in namespace."""
+        if self.local_cache is not None:
+            self.local_cache.clear()
+        self._pending_hits.clear()
+        
         try:
             pattern = f"{self.namespace}:*"
             keys = []
@@ -302,12 +503,12 @@ class CacheManager:
                 if cursor == 0:
                     break
             
-            if keys:
-                deleted = await self.redis.delete(*keys)
-                logger.info("Namespace cleared", namespace=self.namespace, deleted=deleted)
-                return deleted
+            deleted = await self.redis.delete(*keys) if keys else 0
+            await self._broadcast_local_eviction(clear=True)
             
-            return 0
+            if deleted:
+                logger.info("Namespace cleared", namespace=self.namespace, deleted=deleted)
+            return deleted
             
         except Exception as e:
             logger.error("Namespace clear failed", namespace=self.namespace, error=str(e))
@@ -333,7 +534,14 @@ class CacheManager:
                            event_type=event_type, error=str(e))
         
         # Publish event to Redis for other instances
-        await self.redis.publish(f"cache_invalidation:{event_type}", data)
+        event_data = {
+            "event_type": event_type,
+            "data": data,
+            "origin": self.instance_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "cache_manager"
+        }
+        await self.redis.publish(f"cache_invalidation:{event_type}", event_data)
     
     async def cache_aside_get(
         self, 
@@ -342,18 +550,24 @@ class CacheManager:
         ttl: Optional[int] = None,
         tags: Optional[List[str]] = None
     ) -> Any:
-        """Cache-aside pattern: get from cache or fetch and cache."""
+        """Cache-aside pattern: get from cache or fetch and cache.
+        
+        Concurrent misses for the same key share a single ``fetch_func`` call.
+        """
         # Try cache first
         value = await self.get(key)
         if value is not None:
             return value
         
-        # Cache miss - fetch from source
-        try:
+        async def load():
             value = await fetch_func()
             if value is not None:
                 await self.set(key, value, ttl=ttl, tags=tags)
             return value
+        
+        # Cache miss - fetch from source
+        try:
+            return await self._single_flight.do(key, load)
             
         except Exception as e:
             logger.error("Cache-aside fetch failed", key=key, error=str(e))
@@ -4,7 +4,7 @@ import json
 from typing import Dict, List, Callable, Any
 from datetime import datetime
 import structlog
-from .cache_manager import CacheManager
+from .cache_manager import CacheManager, L1_EVICT_EVENT
 from .cache_policies import CachePolicies
 
 logger = structlog.get_logger(__name__)
@@ -43,6 +43,9 @@ class CacheInvalidationHandler:
         # System events
         self.register_handler("database_updated", self._handle_database_update)
         self.register_handler("content_updated", self._handle_content_update)
+        
+        # L1 tier coherence between instances
+        self.register_handler(L1_EVICT_EVENT, self._handle_l1_eviction)
     
     def register_handler(self, event_type: str, handler: Callable):
         """Register event handler."""
@@ -52,8 +55,15 @@ class CacheInvalidationHandler:
         self._event_handlers[event_type].append(handler)
         logger.debug("Invalidation handler registered", event_type=event_type)
     
-    async def handle_event(self, event_type: str, data: Dict[str, Any]):
-        """Handle cache invalidation event."""
+    async def handle_event(self, event_type: str, data: Dict[str, Any], publish: bool = True):
+        """Handle cache invalidation event.
+        
+        Args:
+            event_type: Invalidation event type
+            data: Event payload
+            publish: Re-publish the event for other instances; events received from
+                pub/sub are not re-published
+        """
         logger.info("Processing cache invalidation event", 
                    event_type=event_type, data=data)
         
@@ -67,13 +77,15 @@ class CacheInvalidationHandler:
                            event_type=event_type, handler=handler.__name__, error=str(e))
         
         # Publish event for other instances
-        await self._publish_invalidation_event(event_type, data)
+        if publish and event_type != L1_EVICT_EVENT:
+            await self._publish_invalidation_event(event_type, data)
     
     async def _publish_invalidation_event(self, event_type: str, data: Dict):
         """Publish invalidation event to Redis."""
         event_data = {
             "event_type": event_type,
             "data": data,
+            "origin": self.cache_manager.instance_id,
             "timestamp": datetime.utcnow().isoformat(),
             "source": "cache_invalidation_handler"
         }
@@ -284,20 +296,30 @@ class CacheInvalidationHandler:
         logger.info("Content update cache invalidated", 
                    content_type=content_type, content_id=content_id)
     
+    async def _handle_l1_eviction(self, data: Dict):
+        """Drop local L1 copies invalidated on another instance."""
+        evicted = self.cache_manager.evict_local(data)
+        if evicted:
+            logger.debug("L1 entries evicted", evicted=evicted, origin=data.get("origin"))
+    
     async def setup_event_listeners(self):
         """Setup Redis pub/sub listeners for cache invalidation events."""
         try:
             # Subscribe to all cache invalidation events
-            pubsub = await self.cache_manager.redis.subscribe("cache_invalidation:*")
+            pubsub = await self.cache_manager.redis.psubscribe("cache_invalidation:*")
             
             async for message in pubsub.listen():
-                if message["type"] == "message":
+                if message["type"] in ("message", "pmessage"):
                     try:
                         channel = message["channel"]
                         event_type = channel.split(":")[-1]
                         data = json.loads(message["data"])
                         
-                        await self.handle_event(event_type, data.get("data", {}))
+                        # Handlers already ran locally when this instance published
+                        if data.get("origin") == self.cache_manager.instance_id:
+                            continue
+                        
+                        await self.handle_event(event_type, data.get("data", {}), publish=False)
                         
                     except Exception as e:
                         logger.error("Failed to process invalidation event", 
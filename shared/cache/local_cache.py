@@ -0,0 +1,195 @@
+"""In-process L1 cache tier and per-key single-flight for the Redis cache."""
+
+import asyncio
+import fnmatch
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class LocalCacheStats:
+    """L1 cache statistics."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Calculate L1 hit rate."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the in-memory footprint of a cached value in bytes."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore"))
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with byte-size accounting and per-entry TTL.
+
+    Entries are evicted least-recently-used first whenever the total estimated size
+    exceeds ``max_bytes`` or the entry count exceeds ``max_entries``. Values larger
+    than ``max_entry_bytes`` are never stored locally.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entries: int = 100_000,
+        default_ttl: float = 30.0,
+        max_entry_bytes: Optional[int] = None
+    ):
+        if max_bytes <= 0 or max_entries <= 0:
+            raise ValueError("max_bytes and max_entries must be positive")
+        if default_ttl <= 0:
+            raise ValueError("default_ttl must be positive")
+
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 16
+        self.stats = LocalCacheStats()
+
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total estimated size of cached values."""
+        return self._bytes
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Look up a key, returning ``(found, value)``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return False, None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a value; the local TTL never exceeds ``default_ttl``."""
+        size = estimate_size(value)
+        if size > self.max_entry_bytes:
+            self.delete(key)
+            return False
+
+        local_ttl = min(ttl, self.default_ttl) if ttl else self.default_ttl
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + local_ttl, size)
+        self._bytes += size
+
+        while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Remove a key if present."""
+        if self._remove(key):
+            self.stats.invalidations += 1
+            return True
+        return False
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Remove several keys."""
+        return sum(1 for key in keys if self.delete(key))
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Remove keys matching a glob-style pattern (same syntax as Redis MATCH)."""
+        matches = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        return self.delete_many(matches)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def get_info(self) -> Dict[str, Any]:
+        """Occupancy and hit statistics."""
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_rate": self.stats.hit_rate,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "invalidations": self.stats.invalidations,
+        }
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one in-flight call."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.shared_calls = 0
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for ``key`` is currently running."""
+        return key in self._calls
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``func`` unless a call for ``key`` is in flight, then share its outcome."""
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared_calls += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so unshared failures are not logged twice
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
@@ -2,27 +2,99 @@
 
 import time
 import asyncio
-from typing import Optional, Dict, Any, List, Callable
+import base64
+import hashlib
+from typing import Optional, Dict, Any, List, Callable, Tuple
 from datetime import datetime
+from bson import json_util
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.errors import BulkWriteError, ConnectionFailure, ServerSelectionTimeoutError
 import structlog
 
 from .mongodb import MongoDBManager
 from .performance import MongoDBOptimizer, DatabasePerformanceOptimizer
+from ..cache.local_cache import LocalCache
 
 logger = structlog.get_logger(__name__)
 
+# Fields list views need; full documents are only read by id
+POST_LIST_PROJECTION = {
+    'content': 1,
+    'user_id': 1,
+    'platform': 1,
+    'timestamp': 1,
+    'analysis_results': 1,
+    'metrics': 1
+}
+
+# Newest first, _id breaks ties so every post has a unique position
+POST_PAGE_SORT = [('timestamp', -1), ('_id', -1)]
+
+
+def query_fingerprint(*parts: Any) -> str:
+    """Stable digest of query documents, for cache keys and cursor checks."""
+    encoded = json_util.dumps(parts, sort_keys=True)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()[:20]
+
+
+def encode_page_cursor(last_document: Dict[str, Any], fingerprint: str) -> str:
+    """Opaque continuation token for the page after ``last_document``."""
+    payload = json_util.dumps({
+        't': last_document.get('timestamp'),
+        'id': last_document['_id'],
+        'q': fingerprint
+    })
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_page_cursor(token: str, fingerprint: str) -> Tuple[Any, Any]:
+    """Return the ``(timestamp, _id)`` position encoded in a continuation token."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        position = payload['t'], payload['id']
+        query = payload['q']
+    except (ValueError, TypeError, KeyError, UnicodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if query != fingerprint:
+        raise ValueError("Pagination cursor does not belong to this query")
+    return position
+
+
+def keyset_filter(timestamp: Any, last_id: Any) -> Dict[str, Any]:
+    """Match posts that sort after ``(timestamp, last_id)`` in ``POST_PAGE_SORT`` order."""
+    if timestamp is None:
+        # Posts without a timestamp sort last, ordered by _id alone
+        return {'timestamp': None, '_id': {'$lt': last_id}}
+    return {'$or': [
+        {'timestamp': {'$lt': timestamp}},
+        {'timestamp': timestamp, '_id': {'$lt': last_id}},
+        {'timestamp': None}
+    ]}
+
 
 class EnhancedMongoDBManager(MongoDBManager):
     """Enhanced MongoDB manager with performance monitoring and optimization."""
     
-    def __init__(self, connection_string: str, database_name: str):
+    def __init__(
+        self,
+        connection_string: str,
+        database_name: str,
+        cache_max_entries: int = 1000,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_ttl: float = 300.0
+    ):
         super().__init__(connection_string, database_name)
         self.optimizer = None
         self.performance_tracker = DatabasePerformanceOptimizer()
-        self._query_cache = {}
-        self._cache_ttl = 300  # 5 minutes
+        self._cache_ttl = cache_ttl
+        self._query_cache = LocalCache(
+            max_bytes=cache_max_bytes,
+            max_entries=cache_max_entries,
+            default_ttl=cache_ttl
+        )
+        # Bumped on every write through this manager; cache keys embed it
+        self._collection_versions: Dict[str, int] = {}
     
     async def connect(self) -> None:
         """Establish connection to MongoDB with optimized settings."""
@@ -99,47 +171,54 @@ class EnhancedMongoDBManager(MongoDBManager):
                         error=str(e))
             raise
     
+    def _cache_key(self, collection_name: str, kind: str, *parts: Any) -> str:
+        """Cache key tied to the collection's current version."""
+        version = self._collection_versions.get(collection_name, 0)
+        return f"{collection_name}:v{version}:{kind}:" + ":".join(str(part) for part in parts)
+    
+    def invalidate_collection(self, collection_name: str) -> None:
+        """Make every cached result for a collection unreachable.
+        
+        Stale entries are not scanned for; they age out of the LRU.
+        """
+        self._collection_versions[collection_name] = self._collection_versions.get(collection_name, 0) + 1
+    
+    def _cached(self, use_cache: bool, cache_key: str) -> Tuple[bool, Any]:
+        if not use_cache:
+            return False, None
+        found, value = self._query_cache.get(cache_key)
+        if found:
+            logger.debug("Query cache hit", cache_key=cache_key)
+        return found, value
+    
     async def find_posts_optimized(
         self, 
         filter_query: Dict[str, Any], 
         limit: int = 100,
         skip: int = 0,
-        use_cache: bool = True
+        use_cache: bool = True,
+        projection: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Optimized post finding with caching and performance monitoring."""
-        
-        # Generate cache key
-        cache_key = f"posts:{hash(str(filter_query))}:{limit}:{skip}"
+        """Optimized post finding with caching and performance monitoring.
         
-        # Check cache first
-        if use_cache and cache_key in self._query_cache:
-            cache_entry = self._query_cache[cache_key]
-            if time.time() - cache_entry['timestamp'] < self._cache_ttl:
-                logger.debug("Cache hit for posts query", cache_key=cache_key)
-                return cache_entry['data']
+        ``skip`` costs a scan of every skipped post; page through large
+        result sets with ``find_posts_page`` instead.
+        """
+        projection = projection or POST_LIST_PROJECTION
+        cache_key = self._cache_key(
+            'posts', 'find', query_fingerprint(filter_query, projection), limit, skip
+        )
+        found, cached = self._cached(use_cache, cache_key)
+        if found:
+            return cached
         
         async def find_operation():
-            if not self.database:
+            if self.database is None:
                 raise RuntimeError("Database not connected")
             
-            # Use optimized query with proper indexing
-            cursor = self.database.posts.find(
-                filter_query,
-                {
-                    # Project only needed fields to reduce network transfer
-                    'content': 1,
-                    'user_id': 1,
-                    'platform': 1,
-                    'timestamp': 1,
-                    'analysis_results': 1,
-                    'metrics': 1
-                }
-            ).skip(skip).limit(limit)
-            
-            # Add sorting for consistent results and index usage
-            if 'timestamp' not in filter_query:
-                cursor = cursor.sort('timestamp', -1)
-            
+            # Sort on the (timestamp, _id) index for consistent results
+            cursor = self.database.posts.find(filter_query, projection).sort(POST_PAGE_SORT)
+            cursor = cursor.skip(skip).limit(limit)
             return await cursor.to_list(length=limit)
         
         result = await self._execute_with_monitoring(
@@ -147,15 +226,83 @@ class EnhancedMongoDBManager(MongoDBManager):
             find_operation
         )
         
-        # Cache the result
         if use_cache:
-            self._query_cache[cache_key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
+            self._query_cache.set(cache_key, result)
         
         return result
     
+    async def find_posts_page(
+        self,
+        filter_query: Dict[str, Any],
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        use_cache: bool = True,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Fetch one page of posts, newest first, using keyset pagination.
+        
+        Each page seeks directly to its first post on the ``(timestamp, _id)``
+        index, so page 1000 costs the same as page 1. Pass the returned
+        ``next_cursor`` back to get the following page; it is ``None`` after
+        the last page.
+        
+        Returns:
+            ``{"items": [...], "next_cursor": str or None}``
+        
+        Raises:
+            ValueError: If ``cursor`` is malformed or was issued for another query
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        projection = dict(projection or POST_LIST_PROJECTION)
+        # The cursor is built from the sort key, so the projection must keep it
+        if not projection.get('_id', 1):
+            del projection['_id']
+        if any(projection.values()):
+            projection['timestamp'] = 1
+        fingerprint = query_fingerprint(filter_query, projection)
+        page_filter = filter_query
+        if cursor:
+            seek = keyset_filter(*decode_page_cursor(cursor, fingerprint))
+            page_filter = {'$and': [filter_query, seek]} if filter_query else seek
+        
+        cache_key = self._cache_key('posts', 'page', fingerprint, limit, cursor or '')
+        found, cached = self._cached(use_cache, cache_key)
+        if found:
+            return cached
+        
+        async def page_operation():
+            if self.database is None:
+                raise RuntimeError("Database not connected")
+            
+            # One extra post tells whether another page exists
+            db_cursor = self.database.posts.find(page_filter, projection).sort(POST_PAGE_SORT).limit(limit + 1)
+            return await db_cursor.to_list(length=limit + 1)
+        
+        documents = await self._execute_with_monitoring("find_posts_page", page_operation)
+        items = documents[:limit]
+        page = {
+            'items': items,
+            'next_cursor': encode_page_cursor(items[-1], fingerprint) if len(documents) > limit else None
+        }
+        
+        if use_cache:
+            self._query_cache.set(cache_key, page)
+        
+        return page
+    
+    async def insert_post(self, post_data: Dict[str, Any]) -> str:
+        """Insert a new post document."""
+        post_id = await super().insert_post(post_data)
+        self.invalidate_collection('posts')
+        return post_id
+    
+    async def update_post_analysis(self, post_id: str, analysis_results: Dict[str, Any]) -> bool:
+        """Update post with analysis results."""
+        updated = await super().update_post_analysis(post_id, analysis_results)
+        self.invalidate_collection('posts')
+        return updated
+    
     async def aggregate_with_optimization(
         self,
         collection_name: str,
@@ -164,13 +311,10 @@ class EnhancedMongoDBManager(MongoDBManager):
     ) -> List[Dict[str, Any]]:
         """Execute aggregation pipeline with optimization."""
         
-        cache_key = f"agg:{collection_name}:{hash(str(pipeline))}"
-        
-        # Check cache
-        if use_cache and cache_key in self._query_cache:
-            cache_entry = self._query_cache[cache_key]
-            if time.time() - cache_entry['timestamp'] < self._cache_ttl:
-                return cache_entry['data']
+        cache_key = self._cache_key(collection_name, 'agg', query_fingerprint(pipeline))
+        found, cached = self._cached(use_cache, cache_key)
+        if found:
+            return cached
         
         async def aggregate_operation():
             if not self.database:
@@ -191,10 +335,7 @@ class EnhancedMongoDBManager(MongoDBManager):
         
         # Cache result
         if use_cache:
-            self._query_cache[cache_key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
+            self._query_cache.set(cache_key, result)
         
         return result
     
@@ -237,7 +378,16 @@ class EnhancedMongoDBManager(MongoDBManager):
                 batch = documents[i:i + batch_size]
                 
                 # Use ordered=False for better performance
-                result = await collection.insert_many(batch, ordered=False)
+                try:
+                    result = await collection.insert_many(batch, ordered=False)
+                except BulkWriteError as e:
+                    # The rest of the batch landed and still has to be counted
+                    failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                    await self._count_inserted(collection_name, [
+                        document for index, document in enumerate(batch) if index not in failed
+                    ])
+                    raise
+                await self._count_inserted(collection_name, batch)
                 inserted_ids.extend([str(id) for id in result.inserted_ids])
                 
                 logger.debug("Bulk insert batch completed", 
@@ -246,10 +396,25 @@ class EnhancedMongoDBManager(MongoDBManager):
             
             return inserted_ids
         
-        return await self._execute_with_monitoring(
-            f"bulk_insert_{collection_name}",
-            bulk_insert_operation
-        )
+        try:
+            return await self._execute_with_monitoring(
+                f"bulk_insert_{collection_name}",
+                bulk_insert_operation
+            )
+        finally:
+            # Unordered inserts may land partially even when the call fails
+            self.invalidate_collection(collection_name)
+    
+    async def _count_inserted(self, collection_name: str, documents: List[Dict[str, Any]]) -> None:
+        """Add bulk-inserted analysed posts to the sentiment rollups, as insert_post does."""
+        if collection_name != 'posts':
+            return
+        changes = [
+            (document, 1) for document in documents
+            if (document.get("analysis_results") or {}).get("sentiment") is not None
+        ]
+        if changes:
+            await self._update_rollups(changes)
     
     async def update_many_optimized(
         self,
@@ -274,10 +439,13 @@ class EnhancedMongoDBManager(MongoDBManager):
             
             return result.modified_count
         
-        return await self._execute_with_monitoring(
-            f"update_many_{collection_name}",
-            update_operation
-        )
+        try:
+            return await self._execute_with_monitoring(
+                f"update_many_{collection_name}",
+                update_operation
+            )
+        finally:
+            self.invalidate_collection(collection_name)
     
     async def get_performance_metrics(self) -> Dict[str, Any]:
         """Get database performance metrics."""
@@ -285,7 +453,8 @@ class EnhancedMongoDBManager(MongoDBManager):
             "query_performance": self.performance_tracker.generate_performance_report(),
             "cache_stats": {
                 "cache_size": len(self._query_cache),
-                "cache_ttl": self._cache_ttl
+                "cache_ttl": self._cache_ttl,
+                **self._query_cache.get_info()
             }
         }
         
@@ -2,7 +2,10 @@
 
 import time
 import asyncio
-from typing import Optional, Dict, Any, List, Union, Tuple, Callable
+import functools
+import hashlib
+import re
+from typing import Optional, Dict, Any, List, Union, Tuple, Callable, FrozenSet, NamedTuple
 from datetime import datetime
 import asyncpg
 from asyncpg import Pool
@@ -10,20 +13,127 @@ import structlog
 
 from .postgresql import PostgreSQLManager
 from .performance import PostgreSQLOptimizer, DatabasePerformanceOptimizer
+from ..cache.local_cache import LocalCache
 
 logger = structlog.get_logger(__name__)
 
+_TABLE_NAME = r'((?:"[^"]+"|\w+)(?:\.(?:"[^"]+"|\w+))?)'
+_READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+(?:ONLY\s+)?' + _TABLE_NAME, re.IGNORECASE)
+_WRITE_TABLES = re.compile(
+    r'\b(?:INSERT\s+INTO|DELETE\s+FROM|MERGE\s+INTO|COPY'
+    r'|ALTER\s+TABLE(?:\s+IF\s+EXISTS)?|DROP\s+TABLE(?:\s+IF\s+EXISTS)?'
+    # "UPDATE t [alias] SET", so SELECT ... FOR UPDATE and ON CONFLICT DO UPDATE do not match
+    r'|UPDATE(?=\s+(?:ONLY\s+)?\S+\s+(?:(?:AS\s+)?\w+\s+)?SET\b))'
+    r'\s+(?:ONLY\s+)?' + _TABLE_NAME,
+    re.IGNORECASE
+)
+_TRUNCATE_TABLES = re.compile(r'\bTRUNCATE\s+(?:TABLE\s+)?(?:ONLY\s+)?([\w".,\s]+)', re.IGNORECASE)
+_DATA_CHANGING = {'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'TRUNCATE', 'COPY', 'ALTER', 'DROP'}
+_OPAQUE_WRITES = {'CALL', 'DO'}
+
+
+class StatementTables(NamedTuple):
+    """Tables a SQL statement reads and writes."""
+    reads: FrozenSet[str]
+    writes: FrozenSet[str]
+    writes_unknown: bool  # Writes that cannot be attributed to tables
+
+    @property
+    def is_read_only(self) -> bool:
+        return not self.writes and not self.writes_unknown
+
+
+def _table_key(name: str) -> str:
+    # "public"."Alerts" and alerts name the same cache tag
+    return name.replace('"', '').split('.')[-1].lower()
+
+
+@functools.lru_cache(maxsize=2048)
+def statement_tables(query: str) -> StatementTables:
+    """Classify a statement by the tables it reads and writes, for cache tagging."""
+    keyword = query.lstrip(' \t\n\r(').split(None, 1)[0].upper() if query.strip() else ''
+    writes = {_table_key(name) for name in _WRITE_TABLES.findall(query)}
+    for tables in _TRUNCATE_TABLES.findall(query):
+        writes.update(_table_key(name.strip()) for name in tables.split(',') if name.strip())
+    writes_unknown = keyword in _OPAQUE_WRITES or (keyword in _DATA_CHANGING and not writes)
+    reads = {_table_key(name) for name in _READ_TABLES.findall(query)}
+    return StatementTables(frozenset(reads), frozenset(writes), writes_unknown)
+
+
+def _normalize_param(value: Any) -> Any:
+    """Type-tagged, order-independent form of a query parameter."""
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted((repr(key), _normalize_param(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_normalize_param(item) for item in value))
+    # 1, 1.0, True and '1' bind differently, so they must not share an entry
+    return (type(value).__qualname__, repr(value))
+
+
+def query_digest(query: str, args: Tuple[Any, ...]) -> str:
+    """Digest of the whitespace-normalized SQL and its normalized parameters."""
+    normalized = ' '.join(query.split()) + '\x00' + repr(_normalize_param(tuple(args)))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class StatementRegistry:
+    """Pool-wide named statements, run through asyncpg's per-connection statement cache.
+    
+    Only the SQL text is kept. An asyncpg ``PreparedStatement`` is unusable once
+    the connection it came from goes back to the pool, so named statements run
+    as ordinary queries: each connection prepares a statement the first time it
+    runs it and reuses it from its statement cache afterwards.
+    """
+    
+    def __init__(self):
+        self.statements: Dict[str, str] = {}
+        self.uses: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self.statements)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.statements
+    
+    def register(self, name: str, query: str) -> None:
+        self.statements[name] = query
+        self.uses.setdefault(name, 0)
+    
+    def query(self, name: str) -> str:
+        """The SQL of a named statement, counting the use."""
+        self.uses[name] += 1
+        return self.statements[name]
+    
+    def clear(self) -> None:
+        self.statements.clear()
+        self.uses.clear()
+
 
 class EnhancedPostgreSQLManager(PostgreSQLManager):
     """Enhanced PostgreSQL manager with performance monitoring and optimization."""
     
-    def __init__(self, connection_string: str):
+    def __init__(
+        self,
+        connection_string: str,
+        cache_max_entries: int = 10000,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_ttl: float = 300.0,
+        statement_cache_size: int = 256
+    ):
         super().__init__(connection_string)
         self.optimizer = None
         self.performance_tracker = DatabasePerformanceOptimizer()
-        self._prepared_statements = {}
-        self._query_cache = {}
-        self._cache_ttl = 300  # 5 minutes
+        # asyncpg's per-connection LRU of statements it prepared for ad-hoc queries
+        self.statement_cache_size = statement_cache_size
+        self._prepared_statements = StatementRegistry()
+        self._cache_ttl = cache_ttl
+        self._query_cache = LocalCache(
+            max_bytes=cache_max_bytes,
+            max_entries=cache_max_entries,
+            default_ttl=cache_ttl
+        )
+        # Bumped whenever a table is written through this manager; cache keys embed it
+        self._table_versions: Dict[str, int] = {}
     
     async def connect(self) -> None:
         """Establish connection pool to PostgreSQL with optimized settings."""
@@ -33,6 +143,7 @@ class EnhancedPostgreSQLManager(PostgreSQLManager):
                 min_size=10,
                 max_size=50,
                 command_timeout=60,
+                statement_cache_size=self.statement_cache_size,
                 server_settings={
                     'jit': 'off',  # Disable JIT for better performance on small queries
                     'shared_preload_libraries': 'pg_stat_statements',
@@ -99,6 +210,7 @@ class EnhancedPostgreSQLManager(PostgreSQLManager):
                 else:
                     raise ValueError(f"Unknown fetch method: {fetch_method}")
             
+            self._invalidate_written(query)
             execution_time = time.time() - start_time
             
             # Track performance
@@ -121,67 +233,114 @@ class EnhancedPostgreSQLManager(PostgreSQLManager):
                         error=str(e))
             raise
     
+    def invalidate_tables(self, *table_names: str) -> None:
+        """Make every cached result that read these tables unreachable.
+        
+        Stale entries are not scanned for; they age out of the LRU.
+        """
+        for name in table_names:
+            table = _table_key(name)
+            self._table_versions[table] = self._table_versions.get(table, 0) + 1
+    
+    def _invalidate_written(self, query: str) -> None:
+        tables = statement_tables(query)
+        if tables.writes_unknown:
+            self.clear_query_cache()
+        elif tables.writes:
+            self.invalidate_tables(*tables.writes)
+    
+    def _cache_key(self, fetch_method: str, query: str, args: Tuple[Any, ...]) -> str:
+        """Cache key tagged with the current version of every table the query reads."""
+        tags = ",".join(
+            f"{table}@{self._table_versions.get(table, 0)}"
+            for table in sorted(statement_tables(query).reads)
+        )
+        return f"{fetch_method}:{tags}:{query_digest(query, args)}"
+    
+    async def _fetch_cached(self, fetch_method: str, query: str, args: Tuple[Any, ...], use_cache: bool) -> Any:
+        """Run a read through the result cache; writes are never cached."""
+        if not use_cache or not statement_tables(query).is_read_only:
+            return await self._execute_with_monitoring(fetch_method, query, *args, fetch_method=fetch_method)
+        
+        # Keyed before the query runs, so a concurrent write leaves this result unreachable
+        cache_key = self._cache_key(fetch_method, query, args)
+        found, cached = self._query_cache.get(cache_key)
+        if found:
+            logger.debug("Cache hit for query", cache_key=cache_key[:50])
+            return cached
+        
+        result = await self._execute_with_monitoring(fetch_method, query, *args, fetch_method=fetch_method)
+        self._query_cache.set(cache_key, result)
+        return result
+    
+    async def execute(self, query: str, *args) -> str:
+        """Execute a query and return status."""
+        try:
+            return await super().execute(query, *args)
+        finally:
+            self._invalidate_written(query)
+    
+    async def fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        """Fetch multiple rows as dictionaries."""
+        try:
+            return await super().fetch(query, *args)
+        finally:
+            self._invalidate_written(query)
+    
+    async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        """Fetch single row as dictionary."""
+        try:
+            return await super().fetchrow(query, *args)
+        finally:
+            self._invalidate_written(query)
+    
+    async def fetchval(self, query: str, *args) -> Any:
+        """Fetch single value."""
+        try:
+            return await super().fetchval(query, *args)
+        finally:
+            self._invalidate_written(query)
+    
     async def execute_optimized(self, query: str, *args) -> str:
         """Execute query with performance monitoring."""
         return await self._execute_with_monitoring("execute", query, *args, fetch_method="execute")
     
     async def fetch_optimized(self, query: str, *args, use_cache: bool = True) -> List[Dict[str, Any]]:
-        """Fetch multiple rows with caching and performance monitoring."""
-        
-        # Generate cache key
-        cache_key = f"fetch:{hash(query)}:{hash(str(args))}"
-        
-        # Check cache first
-        if use_cache and cache_key in self._query_cache:
-            cache_entry = self._query_cache[cache_key]
-            if time.time() - cache_entry['timestamp'] < self._cache_ttl:
-                logger.debug("Cache hit for query", cache_key=cache_key[:50])
-                return cache_entry['data']
-        
-        result = await self._execute_with_monitoring("fetch", query, *args, fetch_method="fetch")
-        
-        # Cache the result
-        if use_cache and result:
-            self._query_cache[cache_key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
+        """Fetch multiple rows with caching and performance monitoring.
         
-        return result
+        Results are cached by SQL and parameters and dropped when a table the
+        query reads is written through this manager. Writes made on connections
+        taken from ``transaction()`` or by other processes are only bounded by
+        the cache TTL.
+        """
+        return await self._fetch_cached("fetch", query, args, use_cache)
     
     async def fetchrow_optimized(self, query: str, *args, use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """Fetch single row with caching and performance monitoring."""
-        
-        cache_key = f"fetchrow:{hash(query)}:{hash(str(args))}"
-        
-        if use_cache and cache_key in self._query_cache:
-            cache_entry = self._query_cache[cache_key]
-            if time.time() - cache_entry['timestamp'] < self._cache_ttl:
-                return cache_entry['data']
-        
-        result = await self._execute_with_monitoring("fetchrow", query, *args, fetch_method="fetchrow")
-        
-        if use_cache:
-            self._query_cache[cache_key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
-        
-        return result
+        return await self._fetch_cached("fetchrow", query, args, use_cache)
     
     async def prepare_statement(self, name: str, query: str) -> None:
-        """Prepare a statement for repeated execution."""
+        """Register a named statement for repeated execution on any pooled connection.
+        
+        The SQL is prepared once here to validate it; every connection then
+        prepares it into its statement cache the first time it runs it.
+        """
         if not self.pool:
             raise RuntimeError("Database not connected")
         
         async with self.pool.acquire() as conn:
-            await conn.execute(f"PREPARE {name} AS {query}")
+            # The statement object is only valid until the connection is released
+            await conn.prepare(query)
+        self._prepared_statements.register(name, query)
         
-        self._prepared_statements[name] = query
         logger.debug("Prepared statement", name=name)
     
-    async def execute_prepared(self, name: str, *args) -> Any:
-        """Execute a prepared statement."""
+    async def execute_prepared(self, name: str, *args, fetch_method: str = "execute") -> Any:
+        """Execute a prepared statement.
+        
+        ``fetch_method`` is ``execute`` (returns the status), ``fetch``,
+        ``fetchrow`` or ``fetchval``, as for the other query methods.
+        """
         if name not in self._prepared_statements:
             raise ValueError(f"Prepared statement '{name}' not found")
         
@@ -189,11 +348,23 @@ class EnhancedPostgreSQLManager(PostgreSQLManager):
             raise RuntimeError("Database not connected")
         
         start_time = time.time()
+        query = self._prepared_statements.query(name)
         
         try:
             async with self.pool.acquire() as conn:
-                result = await conn.execute(f"EXECUTE {name}", *args)
+                if fetch_method == "execute":
+                    result = await conn.execute(query, *args)
+                elif fetch_method == "fetch":
+                    result = [dict(row) for row in await conn.fetch(query, *args)]
+                elif fetch_method == "fetchrow":
+                    row = await conn.fetchrow(query, *args)
+                    result = dict(row) if row else None
+                elif fetch_method == "fetchval":
+                    result = await conn.fetchval(query, *args)
+                else:
+                    raise ValueError(f"Unknown fetch method: {fetch_method}")
             
+            self._invalidate_written(query)
             execution_time = time.time() - start_time
             self.performance_tracker.track_query_performance(
                 f"prepared_{name}", 
@@ -250,6 +421,9 @@ class EnhancedPostgreSQLManager(PostgreSQLManager):
         except Exception as e:
             logger.error("Bulk insert failed", table=table_name, error=str(e))
             raise
+        finally:
+            # Earlier batches may have been copied even if a later one failed
+            self.invalidate_tables(table_name)
     
     async def get_alerts_optimized(
         self, 
@@ -344,7 +518,9 @@ class EnhancedPostgreSQLManager(PostgreSQLManager):
             "cache_stats": {
                 "cache_size": len(self._query_cache),
                 "cache_ttl": self._cache_ttl,
-                "prepared_statements": len(self._prepared_statements)
+                "prepared_statements": len(self._prepared_statements),
+                "prepared_statement_executions": sum(self._prepared_statements.uses.values()),
+                **self._query_cache.get_info()
             }
         }
         
@@ -1,12 +1,15 @@
 """MongoDB connection manager and utilities."""
 
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 import structlog
 
+from .sentiment_rollups import SentimentRollups, to_utc_naive
+
 logger = structlog.get_logger(__name__)
 
 
@@ -19,6 +22,23 @@ class MongoDBManager:
         self.client: Optional[AsyncIOMotorClient] = None
         self.database: Optional[AsyncIOMotorDatabase] = None
         self._connected = False
+        self._rollups: Optional[SentimentRollups] = None
+    
+    @property
+    def sentiment_rollups(self) -> SentimentRollups:
+        """Sentiment/platform trend counters maintained on ingest."""
+        if not self.database:
+            raise RuntimeError("Database not connected")
+        if self._rollups is None or self._rollups.database is not self.database:
+            self._rollups = SentimentRollups(self.database)
+        return self._rollups
+    
+    async def _update_rollups(self, changes: List[tuple], post_id: Any = None) -> None:
+        try:
+            await self.sentiment_rollups.apply(changes)
+        except Exception as e:
+            # Never fail ingestion; reset and backfill to repair the counters
+            logger.error("Failed to update sentiment rollups", post_id=str(post_id), error=str(e))
     
     async def connect(self) -> None:
         """Establish connection to MongoDB."""
@@ -76,6 +96,8 @@ class MongoDBManager:
         await posts.create_index([("analysis_results.risk_score", -1)])
         await posts.create_index([("content", "text")])
         await posts.create_index([("geolocation.coordinates", "2dsphere")])
+        # Upsert key of the ingestion write-behind buffer
+        await posts.create_index([("content_hash", 1)], unique=True, sparse=True)
         
         # Campaigns collection indexes
         campaigns = self.database.campaigns
@@ -89,6 +111,8 @@ class MongoDBManager:
         await user_profiles.create_index([("bot_probability", -1)])
         await user_profiles.create_index([("username", 1)])
         
+        await self.sentiment_rollups.ensure_indexes()
+        
         logger.info("MongoDB indexes created successfully")
     
     async def insert_post(self, post_data: Dict[str, Any]) -> str:
@@ -97,6 +121,8 @@ class MongoDBManager:
             raise RuntimeError("Database not connected")
         
         result = await self.database.posts.insert_one(post_data)
+        if (post_data.get("analysis_results") or {}).get("sentiment") is not None:
+            await self._update_rollups([(post_data, 1)], result.inserted_id)
         return str(result.inserted_id)
     
     async def find_posts(
@@ -121,11 +147,23 @@ class MongoDBManager:
         if not self.database:
             raise RuntimeError("Database not connected")
         
-        result = await self.database.posts.update_one(
+        before = await self.database.posts.find_one_and_update(
             {"_id": post_id},
-            {"$set": {"analysis_results": analysis_results}}
+            {"$set": {"analysis_results": analysis_results}},
+            projection={"timestamp": 1, "platform": 1, "analysis_results": 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        if before is None:
+            return False
+        
+        # Re-analysis moves the post from its old sentiment counter to the new one
+        old_sentiment = (before.get("analysis_results") or {}).get("sentiment")
+        if old_sentiment != analysis_results.get("sentiment"):
+            await self._update_rollups([
+                (before, -1),
+                ({**before, "analysis_results": analysis_results}, 1)
+            ], post_id)
+        return before.get("analysis_results") != analysis_results
     
     async def insert_campaign(self, campaign_data: Dict[str, Any]) -> str:
         """Insert a new campaign document."""
@@ -245,17 +283,26 @@ class MongoDBManager:
         self, 
         start_date: datetime,
         end_date: datetime,
-        interval: str = "1d"
+        interval: str = "1d",
+        use_rollups: bool = True
     ) -> List[Dict[str, Any]]:
-        """Aggregate sentiment trends over time."""
+        """Aggregate sentiment trends over time.
+        
+        Served from the pre-aggregated rollups unless ``use_rollups`` is False,
+        which groups the raw posts instead. Both return
+        ``{"_id": {"date", "sentiment"}, "count"}`` rows ordered by date.
+        """
         if not self.database:
             raise RuntimeError("Database not connected")
         
+        if use_rollups:
+            return await self._rollup_trends(start_date, end_date, interval, "sentiment")
+        
         pipeline = [
             {
                 "$match": {
                     "timestamp": {"$gte": start_date, "$lte": end_date},
-                    "analysis_results.sentiment": {"$exists": True}
+                    "analysis_results.sentiment": {"$ne": None}
                 }
             },
             {
@@ -280,6 +327,42 @@ class MongoDBManager:
         cursor = self.database.posts.aggregate(pipeline)
         return await cursor.to_list(length=None)
     
+    async def aggregate_platform_trends(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        interval: str = "1d"
+    ) -> List[Dict[str, Any]]:
+        """Aggregate analysed post counts per platform over time."""
+        if not self.database:
+            raise RuntimeError("Database not connected")
+        
+        return await self._rollup_trends(start_date, end_date, interval, "platform")
+    
+    async def _rollup_trends(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        interval: str,
+        dimension: str
+    ) -> List[Dict[str, Any]]:
+        granularity, date_format = ("day", "%Y-%m-%d") if interval == "1d" else ("hour", "%Y-%m-%d %H:00:00")
+        # end_date is inclusive; timestamps are stored at millisecond precision
+        end = to_utc_naive(end_date) + timedelta(milliseconds=1)
+        buckets = await self.sentiment_rollups.trend_buckets(start_date, end, granularity, dimension)
+        return [
+            {"_id": {"date": bucket["bucket"].strftime(date_format), dimension: value}, "count": count}
+            for bucket in buckets
+            for value, count in sorted(bucket["counts"].items())
+        ]
+    
+    async def backfill_sentiment_rollups(self, start_date: Optional[datetime] = None) -> Dict[str, Any]:
+        """Count posts stored before the rollup coverage start, e.g. history from before the rollups."""
+        if not self.database:
+            raise RuntimeError("Database not connected")
+        
+        return await self.sentiment_rollups.backfill(start_date)
+    
     async def get_campaign_participants(self, campaign_id: str) -> List[Dict[str, Any]]:
         """Get detailed information about campaign participants."""
         if not self.database:
@@ -166,6 +166,12 @@ class MongoDBOptimizer:
             ("timestamp", -1)
         ], name="risk_score_time_idx")
         
+        # Keyset pagination seeks on (timestamp, _id)
+        await posts.create_index([
+            ("timestamp", -1),
+            ("_id", -1)
+        ], name="timestamp_id_keyset_idx")
+        
         await posts.create_index([
             ("analysis_results.bot_probability", -1),
             ("platform", 1)
@@ -1,7 +1,7 @@
 """Redis connection manager and utilities."""
 
 import json
-from typing import Optional, Any, Dict, List, Union
+from typing import Optional, Any, Dict, List, Tuple, Union
 import redis.asyncio as redis
 from redis.asyncio import ConnectionPool
 from redis.asyncio.cluster import RedisCluster
@@ -127,6 +127,34 @@ class RedisManager:
             logger.error("Redis get failed", key=key, error=str(e))
             return default
     
+    async def get_with_ttl(self, key: str, default: Any = None) -> Tuple[Any, Optional[float]]:
+        """Get value by key together with its remaining time to live.
+        
+        Returns:
+            ``(value, ttl)`` where ``ttl`` is the remaining lifetime in seconds, or
+            ``None`` if the key has no expiry
+        """
+        if not self.client:
+            raise RuntimeError("Redis not connected")
+        
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                value, pttl = await pipe.execute()
+            if value is None:
+                return default, None
+            
+            ttl = pttl / 1000 if pttl >= 0 else None
+            try:
+                return json.loads(value), ttl
+            except (json.JSONDecodeError, TypeError):
+                return value, ttl
+                
+        except Exception as e:
+            logger.error("Redis get failed", key=key, error=str(e))
+            return default, None
+    
     async def delete(self, *keys: str) -> int:
         """Delete one or more keys."""
         if not self.client:
@@ -232,6 +260,15 @@ class RedisManager:
         await pubsub.subscribe(*channels)
         return pubsub
     
+    async def psubscribe(self, *patterns: str):
+        """Subscribe to channels matching glob-style patterns."""
+        if not self.client:
+            raise RuntimeError("Redis not connected")
+        
+        pubsub = self.client.pubsub()
+        await pubsub.psubscribe(*patterns)
+        return pubsub
+    
     async def get_cluster_info(self) -> Optional[Dict[str, Any]]:
         """Get Redis cluster information (cluster mode only)."""
         if not self.cluster_mode or not isinstance(self.client, RedisCluster):
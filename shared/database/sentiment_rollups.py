@@ -0,0 +1,330 @@
+"""Pre-aggregated sentiment and platform counters for trend queries.
+
+Every analysed post increments per-minute, per-hour and per-day bucket
+documents in the ``sentiment_rollups`` collection with ``$inc`` upserts when
+it is ingested. A trend query reads the largest aligned buckets that cover the
+requested range (whole days, then the hours and minutes at the edges) and only
+aggregates raw posts for what the rollups cannot answer: the sub-minute edges
+of the range, the still-open current minute and anything older than the
+coverage start.
+
+The coverage document records the earliest timestamp the counters are
+complete from. Ingest only counts posts at or after it; ``backfill`` counts
+the history before it, newest day first, and moves it back as it goes.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from pymongo import UpdateOne
+
+logger = structlog.get_logger(__name__)
+
+# Coarsest first; trend queries cover a range with the largest buckets that fit
+GRANULARITIES: Dict[str, timedelta] = {
+    "day": timedelta(days=1),
+    "hour": timedelta(hours=1),
+    "minute": timedelta(minutes=1),
+}
+DIMENSIONS = {
+    "sentiment": "$analysis_results.sentiment",
+    "platform": {"$ifNull": ["$platform", "unknown"]},
+}
+COVERAGE_ID = "coverage"
+
+_EPOCH = datetime(1970, 1, 1)
+_BUCKET_FORMATS = {"day": "%Y-%m-%d", "hour": "%Y-%m-%dT%H", "minute": "%Y-%m-%dT%H:%M"}
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize to the naive UTC datetimes pymongo returns, at millisecond precision."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def floor_bucket(value: datetime, granularity: str) -> datetime:
+    """Start of the bucket containing ``value``."""
+    size = GRANULARITIES[granularity]
+    return value - (value - _EPOCH) % size
+
+
+def ceil_bucket(value: datetime, granularity: str) -> datetime:
+    """Start of the first bucket beginning at or after ``value``."""
+    start = floor_bucket(value, granularity)
+    return start if start == value else start + GRANULARITIES[granularity]
+
+
+def bucket_id(granularity: str, start: datetime) -> str:
+    return f"{granularity}:{start.isoformat()}"
+
+
+def escape_key(value: Any) -> str:
+    """Counter field name for a sentiment or platform value."""
+    return str(value).replace(".", "．").replace("$", "＄")
+
+
+def unescape_key(key: str) -> str:
+    return key.replace("．", ".").replace("＄", "$")
+
+
+def plan_trend_query(
+    start: datetime,
+    end: datetime,
+    coverage_start: Optional[datetime],
+    open_start: datetime,
+    granularity: str = "day"
+) -> Tuple[List[Tuple[str, datetime, datetime]], List[Tuple[datetime, datetime]]]:
+    """Split ``[start, end)`` into rollup bucket ranges and raw post ranges.
+
+    Returns ``(rollups, raw)``: rollups is a list of ``(granularity, first,
+    last)`` bucket-start ranges, raw a list of ``(start, end)`` timestamp
+    ranges that have to be aggregated from posts. Buckets are never coarser
+    than ``granularity``, the resolution of the result.
+    """
+    rollups: List[Tuple[str, datetime, datetime]] = []
+    raw: List[Tuple[datetime, datetime]] = []
+    if coverage_start is None:
+        trusted_start = trusted_end = end
+    else:
+        trusted_start = min(max(start, coverage_start), end)
+        trusted_end = max(min(end, open_start), trusted_start)
+
+    def cover(low: datetime, high: datetime, level: int) -> None:
+        if low >= high:
+            return
+        if level == len(GRANULARITIES):
+            raw.append((low, high))
+            return
+        size = list(GRANULARITIES)[level]
+        first, last = ceil_bucket(low, size), floor_bucket(high, size)
+        if first >= last:
+            cover(low, high, level + 1)
+            return
+        cover(low, first, level + 1)
+        rollups.append((size, first, last))
+        cover(last, high, level + 1)
+
+    if start < trusted_start:
+        raw.append((start, trusted_start))
+    cover(trusted_start, trusted_end, list(GRANULARITIES).index(granularity))
+    if trusted_end < end:
+        raw.append((trusted_end, end))
+
+    merged: List[Tuple[datetime, datetime]] = []
+    for low, high in sorted(raw):
+        if merged and merged[-1][1] >= low:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return rollups, merged
+
+
+class SentimentRollups:
+    """Bucketed sentiment/platform counters kept next to the posts collection."""
+
+    def __init__(self, database, coverage_refresh: float = 60.0, clock=datetime.utcnow):
+        self.database = database
+        self.coverage_refresh = coverage_refresh
+        self.clock = clock
+        self._coverage: Optional[datetime] = None
+        self._coverage_read_at = 0.0
+
+    @property
+    def collection(self):
+        return self.database.sentiment_rollups
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("granularity", 1), ("bucket", 1)])
+
+    async def coverage_start(self, refresh: bool = False) -> Optional[datetime]:
+        """Earliest timestamp the counters are complete from, if any."""
+        stale = time.monotonic() - self._coverage_read_at > self.coverage_refresh
+        if refresh or stale or self._coverage is None:
+            document = await self.collection.find_one({"_id": COVERAGE_ID})
+            self._coverage = document["start"] if document else None
+            self._coverage_read_at = time.monotonic()
+        return self._coverage
+
+    async def _ensure_coverage(self) -> datetime:
+        coverage = await self.coverage_start()
+        if coverage is None:
+            # Posts earlier in the current minute may have gone uncounted
+            await self.collection.update_one(
+                {"_id": COVERAGE_ID},
+                {"$setOnInsert": {"start": ceil_bucket(to_utc_naive(self.clock()), "minute")}},
+                upsert=True
+            )
+            coverage = await self.coverage_start(refresh=True)
+        return coverage
+
+    @staticmethod
+    def _add(increments: Dict[str, Dict[str, Any]], timestamp: datetime,
+             sentiment: Any, platform: Any, count: int) -> None:
+        for granularity in GRANULARITIES:
+            start = floor_bucket(timestamp, granularity)
+            entry = increments.setdefault(bucket_id(granularity, start), {
+                "granularity": granularity, "bucket": start, "counts": {}
+            })
+            counts = entry["counts"]
+            for field in ("total", f"sentiment.{escape_key(sentiment)}", f"platform.{escape_key(platform)}"):
+                counts[field] = counts.get(field, 0) + count
+
+    async def _write(self, increments: Dict[str, Dict[str, Any]]) -> None:
+        operations = [
+            UpdateOne(
+                {"_id": key},
+                {
+                    "$inc": entry["counts"],
+                    "$setOnInsert": {"granularity": entry["granularity"], "bucket": entry["bucket"]}
+                },
+                upsert=True
+            )
+            for key, entry in increments.items()
+        ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def apply(self, changes: Iterable[Tuple[Dict[str, Any], int]]) -> int:
+        """Apply ``(post, +1/-1)`` changes to the counters in one bulk write.
+
+        Posts without a timestamp or a sentiment, and posts from before the
+        coverage start (backfill counts those), are skipped. Returns the
+        number of changes counted.
+        """
+        changes = [
+            (post, sign) for post, sign in changes
+            if post.get("timestamp") and (post.get("analysis_results") or {}).get("sentiment") is not None
+        ]
+        if not changes:
+            return 0
+        coverage = await self._ensure_coverage()
+        if any(to_utc_naive(post["timestamp"]) < coverage for post, _ in changes):
+            # A backfill in another process may have moved coverage back
+            coverage = await self.coverage_start(refresh=True)
+
+        increments: Dict[str, Dict[str, Any]] = {}
+        counted = 0
+        for post, sign in changes:
+            timestamp = to_utc_naive(post["timestamp"])
+            if timestamp < coverage:
+                continue
+            self._add(increments, timestamp, post["analysis_results"]["sentiment"],
+                      post.get("platform") or "unknown", sign)
+            counted += 1
+        await self._write(increments)
+        return counted
+
+    async def record(self, posts: Iterable[Dict[str, Any]]) -> int:
+        """Count newly ingested posts."""
+        return await self.apply((post, 1) for post in posts)
+
+    async def _aggregate_raw(self, low: datetime, high: datetime, granularity: str,
+                             dimensions: List[str]) -> List[Dict[str, Any]]:
+        group_id = {
+            "bucket": {"$dateToString": {"format": _BUCKET_FORMATS[granularity], "date": "$timestamp"}}
+        }
+        group_id.update({dimension: DIMENSIONS[dimension] for dimension in dimensions})
+        pipeline = [
+            {
+                "$match": {
+                    "timestamp": {"$gte": low, "$lt": high},
+                    # Posts with a null sentiment are never counted on ingest
+                    "analysis_results.sentiment": {"$ne": None}
+                }
+            },
+            {"$group": {"_id": group_id, "count": {"$sum": 1}}}
+        ]
+        rows = await self.database.posts.aggregate(pipeline).to_list(length=None)
+        for row in rows:
+            row["_id"]["bucket"] = datetime.strptime(row["_id"]["bucket"], _BUCKET_FORMATS[granularity])
+        return rows
+
+    async def trend_buckets(
+        self,
+        start: datetime,
+        end: datetime,
+        granularity: str = "day",
+        dimension: str = "sentiment"
+    ) -> List[Dict[str, Any]]:
+        """Counts per ``granularity`` bucket and ``dimension`` value over ``[start, end)``.
+
+        Returns ``[{"bucket": datetime, "counts": {value: count}}]`` ordered by
+        bucket, where edge buckets only count posts inside the range.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+        start, end = to_utc_naive(start), to_utc_naive(end)
+        coverage = await self.coverage_start()
+        open_start = floor_bucket(to_utc_naive(self.clock()), "minute")
+        rollups, raw = plan_trend_query(start, end, coverage, open_start, granularity)
+
+        totals: Dict[datetime, Dict[str, int]] = {}
+
+        def add(bucket: datetime, value: str, count: int) -> None:
+            if count:
+                counts = totals.setdefault(floor_bucket(bucket, granularity), {})
+                counts[value] = counts.get(value, 0) + count
+
+        if rollups:
+            query = {"$or": [
+                {"granularity": level, "bucket": {"$gte": first, "$lt": last}}
+                for level, first, last in rollups
+            ]}
+            documents = await self.collection.find(query, {"bucket": 1, dimension: 1}).to_list(length=None)
+            for document in documents:
+                for key, count in document.get(dimension, {}).items():
+                    add(document["bucket"], unescape_key(key), count)
+
+        for low, high in raw:
+            for row in await self._aggregate_raw(low, high, granularity, [dimension]):
+                add(row["_id"]["bucket"], str(row["_id"][dimension]), row["count"])
+
+        logger.debug("Trend query planned", rollup_ranges=len(rollups), raw_ranges=len(raw))
+        return [{"bucket": bucket, "counts": totals[bucket]} for bucket in sorted(totals)]
+
+    async def backfill(self, start: Optional[datetime] = None,
+                       chunk: timedelta = timedelta(days=1)) -> Dict[str, Any]:
+        """Count posts from ``start`` (default: the oldest post) up to the coverage start.
+
+        Works back one ``chunk`` at a time and moves the coverage start after
+        each, so an interrupted backfill can be resumed by running it again.
+        Run one backfill at a time.
+        """
+        end = await self._ensure_coverage()
+        if start is None:
+            oldest = await self.database.posts.find(
+                {"timestamp": {"$ne": None}}, {"timestamp": 1}
+            ).sort("timestamp", 1).limit(1).to_list(length=1)
+            if not oldest:
+                return {"start": end, "end": end, "posts": 0, "buckets": 0}
+            start = oldest[0]["timestamp"]
+        start = floor_bucket(to_utc_naive(start), "minute")
+
+        posts = buckets = 0
+        high = end
+        while high > start:
+            low = max(start, high - chunk)
+            increments: Dict[str, Dict[str, Any]] = {}
+            for row in await self._aggregate_raw(low, high, "minute", ["sentiment", "platform"]):
+                self._add(increments, row["_id"]["bucket"], row["_id"]["sentiment"],
+                          row["_id"]["platform"], row["count"])
+                posts += row["count"]
+            await self._write(increments)
+            await self.collection.update_one({"_id": COVERAGE_ID}, {"$min": {"start": low}}, upsert=True)
+            self._coverage = low
+            buckets += len(increments)
+            high = low
+            logger.info("Backfilled sentiment rollups", start=low.isoformat(), posts=posts)
+
+        return {"start": start, "end": end, "posts": posts, "buckets": buckets}
+
+    async def reset(self) -> None:
+        """Drop all counters and the coverage start; pause ingestion first."""
+        await self.collection.delete_many({})
+        self._coverage = None
+        self._coverage_read_at = 0.0
@@ -0,0 +1,7 @@
+"""Messaging utilities shared by the Kafka producing and consuming services."""
+
+from .offset_tracker import PartitionOffsetTracker
+
+__all__ = [
+    "PartitionOffsetTracker"
+]
@@ -0,0 +1,63 @@
+"""Committable offset bookkeeping for consumers that handle records concurrently."""
+
+import collections
+import threading
+from typing import Deque, Dict, Hashable, Set
+
+
+class PartitionOffsetTracker:
+    """Tracks handler completion per partition and exposes committable offsets.
+
+    Records may complete out of order; a partition's committable offset only
+    advances past a record once every earlier record on that partition is done,
+    so a crash never skips a record that was still in flight. Offsets follow
+    Kafka's convention of naming the next record to read.
+
+    ``track`` and ``complete`` are called from the thread that runs the
+    handlers; ``take_committable`` and ``restore`` may be called from the
+    thread that commits.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Hashable, Deque[int]] = {}
+        self._done: Dict[Hashable, Set[int]] = {}
+        self._committable: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def track(self, partition: Hashable, offset: int):
+        """Register a record that has been handed to a handler."""
+        self._pending.setdefault(partition, collections.deque()).append(offset)
+
+    def complete(self, partition: Hashable, offset: int):
+        """Mark a record as handled."""
+        pending = self._pending.get(partition)
+        if not pending:
+            return
+        done = self._done.setdefault(partition, set())
+        done.add(offset)
+
+        next_offset = None
+        while pending and pending[0] in done:
+            head = pending.popleft()
+            done.discard(head)
+            next_offset = head + 1
+
+        if next_offset is not None:
+            with self._lock:
+                self._committable[partition] = max(next_offset, self._committable.get(partition, 0))
+
+    def take_committable(self) -> Dict[Hashable, int]:
+        """Remove and return offsets that are ready to commit."""
+        with self._lock:
+            committable, self._committable = self._committable, {}
+        return committable
+
+    def restore(self, offsets: Dict[Hashable, int]):
+        """Re-queue offsets whose commit failed so the next commit retries them."""
+        with self._lock:
+            for partition, offset in offsets.items():
+                self._committable[partition] = max(offset, self._committable.get(partition, 0))
+
+    def pending_count(self) -> int:
+        """Number of records handed out but not yet committable."""
+        return sum(len(pending) for pending in self._pending.values())
@@ -0,0 +1,272 @@
+"""
+Tensor-batched sentiment inference with a micro-batching front door
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Queued by MicroBatcher.close() behind the last request to flush
+_CLOSE = object()
+
+
+@dataclass
+class BatchInferenceConfig:
+    """Configuration for batched pipeline inference"""
+    batch_size: int = 32
+    max_batch_size: int = 64
+    max_wait_ms: float = 5.0
+    max_length: int = 512
+
+    def validate(self) -> None:
+        """Validate configuration parameters"""
+        if self.batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if self.max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if self.max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative")
+
+
+class BatchInferenceEngine:
+    """
+    Runs fixed-size tensor batches through per-language HF pipelines
+
+    Texts are grouped by model language and sorted by token length inside each group so
+    that every forward pass pads to a similar length. All forward passes run on one
+    dedicated executor thread, keeping the event loop free, and outputs are returned in
+    the caller's input order.
+    """
+
+    def __init__(
+        self,
+        pipeline_loader: Callable[[str], Any],
+        config: Optional[BatchInferenceConfig] = None
+    ):
+        """
+        Args:
+            pipeline_loader: Callable returning the sentiment pipeline for a language
+            config: Batch inference configuration
+        """
+        self.pipeline_loader = pipeline_loader
+        self.config = config or BatchInferenceConfig()
+        self.config.validate()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sentiment-inference')
+
+        # Statistics
+        self.forward_passes = 0
+        self.texts_processed = 0
+
+    @staticmethod
+    def _token_lengths(pipeline: Any, texts: Sequence[str]) -> List[int]:
+        """Token length per text, falling back to whitespace tokens without a tokenizer"""
+        tokenizer = getattr(pipeline, 'tokenizer', None)
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(list(texts), add_special_tokens=True, truncation=True)
+                return [len(ids) for ids in encoded['input_ids']]
+            except Exception as e:
+                logger.debug(f"Tokenizer length estimate failed, using word counts: {e}")
+        return [len(text.split()) for text in texts]
+
+    def _run_language(self, language: str, texts: List[str]) -> List[Any]:
+        """Run one language group through its pipeline (executor thread)"""
+        pipeline = self.pipeline_loader(language)
+        lengths = self._token_lengths(pipeline, texts)
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+
+        outputs: List[Any] = [None] * len(texts)
+        batch_size = self.config.batch_size
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            batch = [texts[i] for i in chunk]
+            try:
+                results = pipeline(
+                    batch,
+                    batch_size=len(batch),
+                    truncation=True,
+                    max_length=self.config.max_length
+                )
+            except Exception as e:
+                logger.error(f"Batched inference failed for {language} ({len(batch)} texts): {e}")
+                results = [e] * len(batch)
+
+            for index, result in zip(chunk, results):
+                outputs[index] = result
+            self.forward_passes += 1
+
+        self.texts_processed += len(texts)
+        return outputs
+
+    def infer_sync(self, texts: Sequence[str], languages: Sequence[str]) -> List[Any]:
+        """
+        Run batched inference synchronously
+
+        Returns:
+            One raw pipeline output per text (or the exception raised for its batch)
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, language in enumerate(languages):
+            groups.setdefault(language, []).append(index)
+
+        outputs: List[Any] = [None] * len(texts)
+        for language, indices in groups.items():
+            try:
+                language_outputs = self._run_language(language, [texts[i] for i in indices])
+            except Exception as e:
+                logger.error(f"Failed to run sentiment pipeline for {language}: {e}")
+                language_outputs = [e] * len(indices)
+            for index, output in zip(indices, language_outputs):
+                outputs[index] = output
+        return outputs
+
+    async def infer(self, texts: Sequence[str], languages: Sequence[str]) -> List[Any]:
+        """Run batched inference on the dedicated inference thread"""
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.infer_sync, list(texts), list(languages))
+
+    def shutdown(self) -> None:
+        """Stop the inference thread"""
+        self._executor.shutdown(wait=False)
+
+
+class MicroBatcher:
+    """
+    Merges concurrent single-text requests into shared forward passes
+
+    Requests are queued and flushed to the engine when ``max_batch_size`` texts are
+    waiting or ``max_wait_ms`` has elapsed since the first one arrived. ``close``
+    flushes the requests queued before it without waiting.
+    """
+
+    def __init__(self, engine: BatchInferenceEngine, config: Optional[BatchInferenceConfig] = None):
+        self.engine = engine
+        self.config = config or engine.config
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Statistics
+        self.batches_flushed = 0
+        self.requests_merged = 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        return self._queue
+
+    async def submit(self, text: str, language: str) -> Any:
+        """Queue one text for inference and wait for its raw pipeline output"""
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((text, language, future))
+        result = await future
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _collect(self, pending: List[Tuple[str, str, asyncio.Future]]) -> bool:
+        """
+        Wait for the first request, then gather more into ``pending`` until size or time limit
+
+        Returns:
+            True once the close marker is reached
+        """
+        item = await self._queue.get()
+        if item is _CLOSE:
+            return True
+        pending.append(item)
+        deadline = time.monotonic() + self.config.max_wait_ms / 1000.0
+
+        while len(pending) < self.config.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _CLOSE:
+                return True
+            pending.append(item)
+
+        # Drain anything already queued without waiting further
+        while len(pending) < self.config.max_batch_size and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is _CLOSE:
+                return True
+            pending.append(item)
+        return False
+
+    async def _run(self) -> None:
+        pending: List[Tuple[str, str, asyncio.Future]] = []
+        try:
+            closing = False
+            while not closing:
+                pending = []
+                closing = await self._collect(pending)
+                if pending:
+                    await self._flush(pending)
+        except asyncio.CancelledError:
+            # Callers of a batch that will never run are not left waiting
+            for _, _, future in pending:
+                future.cancel()
+            raise
+
+    async def _flush(self, pending: List[Tuple[str, str, asyncio.Future]]) -> None:
+        texts = [item[0] for item in pending]
+        languages = [item[1] for item in pending]
+        try:
+            outputs = await self.engine.infer(texts, languages)
+        except Exception as e:
+            outputs = [e] * len(pending)
+
+        for (_, _, future), output in zip(pending, outputs):
+            if not future.done():
+                future.set_result(output)
+        self.batches_flushed += 1
+        self.requests_merged += len(pending)
+
+    async def close(self) -> None:
+        """
+        Flush the queued requests, then stop the background flush task
+
+        Requests that reach the queue after the flush are cancelled.
+        """
+        worker, queue = self._worker, self._queue
+        if worker is None:
+            return
+        self._worker = None
+        if self._loop is not asyncio.get_running_loop():
+            # The worker belongs to a loop that is gone, along with its callers
+            return
+
+        try:
+            if not worker.done():
+                await queue.put(_CLOSE)
+                await worker
+        finally:
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not _CLOSE:
+                    item[2].cancel()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Micro-batching statistics"""
+        return {
+            'batches_flushed': self.batches_flushed,
+            'requests_merged': self.requests_merged,
+            'average_batch_size': (
+                self.requests_merged / self.batches_flushed if self.batches_flushed else 0.0
+            )
+        }
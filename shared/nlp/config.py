@@ -14,6 +14,8 @@ class NLPConfig:
     use_gpu: bool = False
     cache_models: bool = True
     model_cache_dir: str = "./models"
+    model_memory_budget_mb: float = 4096.0
+    model_warmup: List[str] = None
     
     # Language detection settings
     language_detection_confidence_threshold: float = 0.7
@@ -21,12 +23,20 @@ class NLPConfig:
     
     # Translation settings
     translation_cache_size: int = 1000
+    translation_cache_max_bytes: int = 32 * 1024 * 1024
+    translation_cache_path: Optional[str] = None
+    translation_batch_size: int = 16
+    translation_num_beams: int = 4
+    translation_max_new_tokens_ratio: float = 2.0
     translation_quality_threshold: float = 0.6
     max_translation_length: int = 5000
     
     # Sentiment analysis settings
     sentiment_confidence_threshold: float = 0.6
     batch_size: int = 32
+    sentiment_micro_batching: bool = True
+    sentiment_max_batch_size: int = 64
+    sentiment_max_wait_ms: float = 5.0
     
     # Supported languages
     supported_languages: List[str] = None
@@ -42,6 +52,10 @@ class NLPConfig:
         
         # Load from environment variables
         self.google_translate_api_key = os.getenv('GOOGLE_TRANSLATE_API_KEY')
+        self.translation_cache_path = self.translation_cache_path or os.getenv('TRANSLATION_CACHE_PATH')
+        self.model_memory_budget_mb = float(os.getenv('MODEL_MEMORY_BUDGET_MB', self.model_memory_budget_mb))
+        if self.model_warmup is None:
+            self.model_warmup = [name.strip() for name in os.getenv('MODEL_WARMUP', '').split(',') if name.strip()]
         
         # GPU detection
         try:
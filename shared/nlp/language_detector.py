@@ -33,8 +33,89 @@ try:
 except ImportError:
     NUMPY_AVAILABLE = False
 
+from .model_pool import ModelPool, get_model_pool
+
 logger = logging.getLogger(__name__)
 
+# Codepoint ranges per script, in SCRIPT_PATTERNS order
+SCRIPT_RANGES = {
+    'devanagari': (0x0900, 0x097F),
+    'bengali': (0x0980, 0x09FF),
+    'tamil': (0x0B80, 0x0BFF),
+    'telugu': (0x0C00, 0x0C7F),
+    'kannada': (0x0C80, 0x0CFF),
+    'malayalam': (0x0D00, 0x0D7F),
+    'gujarati': (0x0A80, 0x0AFF),
+    'gurmukhi': (0x0A00, 0x0A7F),
+    'odia': (0x0B00, 0x0B7F),
+    'arabic': (0x0600, 0x06FF)
+}
+
+SCRIPT_NAMES = list(SCRIPT_RANGES)
+
+# Map script to language
+SCRIPT_TO_LANGUAGE = {
+    'devanagari': 'hi',  # Could also be Marathi, but Hindi is more common
+    'bengali': 'bn',
+    'tamil': 'ta',
+    'telugu': 'te',
+    'kannada': 'kn',
+    'malayalam': 'ml',
+    'gujarati': 'gu',
+    'gurmukhi': 'pa',
+    'odia': 'or',
+    'arabic': 'ur'
+}
+
+_BMP_SIZE = 0x10000
+
+
+def _build_codepoint_tables():
+    """Script id (0 = none, else SCRIPT_NAMES index + 1) and isalpha flag per BMP codepoint"""
+    script_ids = np.zeros(_BMP_SIZE, dtype=np.uint8)
+    for script_id, (low, high) in enumerate(SCRIPT_RANGES.values(), start=1):
+        script_ids[low:high + 1] = script_id
+    alphabetic = np.fromiter((chr(cp).isalpha() for cp in range(_BMP_SIZE)), dtype=bool, count=_BMP_SIZE)
+    return script_ids, alphabetic
+
+
+if NUMPY_AVAILABLE:
+    _SCRIPT_IDS, _ALPHABETIC = _build_codepoint_tables()
+
+
+def script_histograms(texts: List[str]) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Count characters per script and alphabetic characters for a batch of texts
+
+    All texts are decoded once into a single UTF-32 codepoint array and classified
+    with precomputed lookup tables, so each text is scanned once regardless of how
+    many scripts are supported.
+
+    Returns:
+        (counts, alphabetic) where counts[i, j] is the number of characters of text i
+        in script SCRIPT_NAMES[j] and alphabetic[i] is the number of characters of
+        text i for which ``str.isalpha`` holds
+    """
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.intp, count=len(texts))
+    codepoints = np.frombuffer(''.join(texts).encode('utf-32-le', errors='surrogatepass'), dtype=np.uint32)
+    owner = np.repeat(np.arange(len(texts)), lengths)
+
+    bmp = np.minimum(codepoints, _BMP_SIZE - 1)
+    script_ids = _SCRIPT_IDS[bmp]
+    alphabetic = _ALPHABETIC[bmp]
+    astral = codepoints >= _BMP_SIZE
+    if astral.any():
+        # No supported script lies outside the BMP; only isalpha needs checking
+        script_ids = np.where(astral, 0, script_ids)
+        values, inverse = np.unique(codepoints[astral], return_inverse=True)
+        alphabetic[astral] = np.array([chr(cp).isalpha() for cp in values], dtype=bool)[inverse]
+
+    scripts = len(SCRIPT_NAMES) + 1
+    counts = np.bincount(owner * scripts + script_ids, minlength=len(texts) * scripts)
+    counts = counts.reshape(len(texts), scripts)[:, 1:]
+    alphabetic_counts = np.bincount(owner, weights=alphabetic, minlength=len(texts)).astype(np.intp)
+    return counts, alphabetic_counts
+
 @dataclass
 class LanguageDetectionResult:
     """Result of language detection"""
@@ -79,11 +160,29 @@ class LanguageDetector:
         'arabic': r'[\u0600-\u06FF]'  # For Urdu
     }
     
-    def __init__(self, model_path: Optional[str] = None):
-        """Initialize language detector with optional custom model"""
+    # Model pool name of the transformer-based detector
+    TRANSFORMER_MODEL = 'language-detection'
+    
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        model_pool: Optional[ModelPool] = None,
+        decisive_script_ratio: float = 0.8
+    ):
+        """
+        Initialize language detector with optional custom model
+        
+        The transformer-based detector is loaded through the shared model pool the
+        first time it is needed. Texts where one script covers at least
+        ``decisive_script_ratio`` of the alphabetic characters skip it.
+        """
         self.model_path = model_path
+        self.decisive_script_ratio = decisive_script_ratio
         self.fasttext_model = None
-        self.transformer_detector = None
+        self.model_pool = model_pool or get_model_pool()
+        self._transformer_available = TRANSFORMERS_AVAILABLE
+        if TRANSFORMERS_AVAILABLE:
+            self.model_pool.register(self.TRANSFORMER_MODEL, self._create_transformer_detector)
         self._load_models()
     
     def _load_models(self):
@@ -93,18 +192,32 @@ class LanguageDetector:
             if self.model_path and FASTTEXT_AVAILABLE:
                 self.fasttext_model = fasttext.load_model(self.model_path)
             
-            # Load transformer-based detector as fallback
-            if TRANSFORMERS_AVAILABLE:
-                self.transformer_detector = pipeline(
-                    "text-classification",
-                    model="papluca/xlm-roberta-base-language-detection",
-                    return_all_scores=True
-                )
-            
         except Exception as e:
             logger.warning(f"Could not load advanced models: {e}")
             logger.info("Falling back to basic detection methods")
     
+    @staticmethod
+    def _create_transformer_detector():
+        """Create the transformer-based detector pipeline"""
+        return pipeline(
+            "text-classification",
+            model="papluca/xlm-roberta-base-language-detection",
+            return_all_scores=True
+        )
+    
+    @property
+    def transformer_detector(self):
+        """Transformer-based detector, loaded on first use (None if unavailable)"""
+        if not self._transformer_available:
+            return None
+        try:
+            return self.model_pool.get(self.TRANSFORMER_MODEL)
+        except Exception as e:
+            logger.warning(f"Could not load transformer language detector: {e}")
+            logger.info("Falling back to basic detection methods")
+            self._transformer_available = False
+            return None
+    
     def detect_language(self, text: str, min_confidence: float = 0.7) -> LanguageDetectionResult:
         """
         Detect language with confidence scoring
@@ -116,12 +229,50 @@ class LanguageDetector:
         Returns:
             LanguageDetectionResult with detected language and confidence
         """
-        if not text or len(text.strip()) < 3:
-            return LanguageDetectionResult(
-                language='unknown',
-                confidence=0.0,
-                alternatives=[]
-            )
+        return self.batch_detect([text])[0]
+    
+    def batch_detect(self, texts: List[str]) -> List[LanguageDetectionResult]:
+        """
+        Detect languages for multiple texts
+        
+        Scripts are detected for the whole batch in one vectorized pass. Texts without
+        a decisive script go to the transformer detector together, in one call.
+        """
+        texts = list(texts)
+        valid = [i for i, text in enumerate(texts) if text and len(text.strip()) >= 3]
+        script_results = dict(zip(valid, self._script_scores([texts[i] for i in valid])))
+        
+        ambiguous = [
+            i for i in valid
+            if script_results[i] is None or script_results[i][2] < self.decisive_script_ratio
+        ]
+        transformer_results = dict(zip(ambiguous, self._transformer_scores([texts[i] for i in ambiguous])))
+        
+        results = []
+        for i, text in enumerate(texts):
+            if i not in script_results:
+                results.append(LanguageDetectionResult(
+                    language='unknown',
+                    confidence=0.0,
+                    alternatives=[]
+                ))
+                continue
+            
+            script_result = script_results[i]
+            results.append(self._combine_detections(
+                text,
+                script_result[:2] if script_result else None,
+                transformer_results.get(i, [])
+            ))
+        return results
+    
+    def _combine_detections(
+        self,
+        text: str,
+        script_result: Optional[Tuple[str, float]],
+        transformer_results: List[Tuple[str, float]]
+    ) -> LanguageDetectionResult:
+        """Combine per-method detections for one text and find the best match"""
         
         # Try multiple detection methods
         results = []
@@ -137,16 +288,8 @@ class LanguageDetector:
             except Exception as e:
                 logger.debug(f"FastText detection failed: {e}")
         
-        # Method 2: Transformer-based detection
-        if self.transformer_detector:
-            try:
-                predictions = self.transformer_detector(text)
-                for pred in predictions:
-                    lang_code = pred['label'].lower()
-                    if lang_code in self.INDIAN_LANGUAGES:
-                        results.append((lang_code, pred['score']))
-            except Exception as e:
-                logger.debug(f"Transformer detection failed: {e}")
+        # Method 2: Transformer-based detection (batched by the caller)
+        results.extend(transformer_results)
         
         # Method 3: Langdetect (fallback)
         if LANGDETECT_AVAILABLE:
@@ -162,7 +305,6 @@ class LanguageDetector:
             logger.debug("Langdetect not available, using script-based detection only")
         
         # Method 4: Script-based detection
-        script_result = self._detect_by_script(text)
         if script_result:
             results.append(script_result)
         
@@ -198,8 +340,68 @@ class LanguageDetector:
             alternatives=alternatives
         )
     
+    def _transformer_scores(self, texts: List[str]) -> List[List[Tuple[str, float]]]:
+        """Indian-language scores from the transformer detector, one model call per batch"""
+        if not texts:
+            return []
+        detector = self.transformer_detector
+        if detector is None:
+            return [[] for _ in texts]
+        
+        try:
+            predictions = detector(texts)
+        except Exception as e:
+            logger.debug(f"Transformer detection failed: {e}")
+            return [[] for _ in texts]
+        
+        scores = []
+        for prediction in predictions:
+            # One dict per text, or all label scores per text with return_all_scores
+            labels = [prediction] if isinstance(prediction, dict) else prediction
+            scores.append([
+                (pred['label'].lower(), pred['score'])
+                for pred in labels
+                if pred['label'].lower() in self.INDIAN_LANGUAGES
+            ])
+        return scores
+    
+    def _script_scores(self, texts: List[str]) -> List[Optional[Tuple[str, float, float]]]:
+        """
+        Script-based detection for a batch of texts
+        
+        Returns:
+            Per text, None or (language, confidence, ratio), where ratio is the share
+            of alphabetic characters in the dominant script
+        """
+        if not texts:
+            return []
+        if not NUMPY_AVAILABLE:
+            return [self._detect_by_script_regex(text) for text in texts]
+        
+        counts, alphabetic = script_histograms(texts)
+        best = counts.argmax(axis=1)
+        best_counts = counts[np.arange(len(texts)), best]
+        
+        results = []
+        for script_index, matches, total_chars in zip(best.tolist(), best_counts.tolist(), alphabetic.tolist()):
+            if total_chars == 0 or matches == 0:
+                results.append(None)
+                continue
+            ratio = matches / total_chars
+            if ratio > 0.3:  # At least 30% of characters match
+                lang = SCRIPT_TO_LANGUAGE[SCRIPT_NAMES[script_index]]
+                results.append((lang, min(ratio * 2, 0.9), ratio))  # Boost confidence but cap at 0.9
+            else:
+                results.append(None)
+        return results
+    
     def _detect_by_script(self, text: str) -> Optional[Tuple[str, float]]:
         """Detect language based on script patterns"""
+        result = self._script_scores([text])[0]
+        return result[:2] if result else None
+    
+    def _detect_by_script_regex(self, text: str) -> Optional[Tuple[str, float, float]]:
+        """Script detection with one regex scan per script (used without numpy)"""
         import re
         
         script_matches = {}
@@ -216,25 +418,11 @@ class LanguageDetector:
         if not script_matches:
             return None
         
-        # Map script to language
-        script_to_lang = {
-            'devanagari': 'hi',  # Could also be Marathi, but Hindi is more common
-            'bengali': 'bn',
-            'tamil': 'ta',
-            'telugu': 'te',
-            'kannada': 'kn',
-            'malayalam': 'ml',
-            'gujarati': 'gu',
-            'gurmukhi': 'pa',
-            'odia': 'or',
-            'arabic': 'ur'
-        }
-        
         best_script = max(script_matches.items(), key=lambda x: x[1])
         if best_script[1] > 0.3:  # At least 30% of characters match
-            lang = script_to_lang.get(best_script[0])
+            lang = SCRIPT_TO_LANGUAGE.get(best_script[0])
             if lang:
-                return (lang, min(best_script[1] * 2, 0.9))  # Boost confidence but cap at 0.9
+                return (lang, min(best_script[1] * 2, 0.9), best_script[1])  # Boost confidence but cap at 0.9
         
         return None
     
@@ -273,10 +461,3 @@ class LanguageDetector:
     def get_language_name(self, language_code: str) -> str:
         """Get full language name from code"""
         return self.INDIAN_LANGUAGES.get(language_code, language_code)
-    
-    def batch_detect(self, texts: List[str]) -> List[LanguageDetectionResult]:
-        """Detect languages for multiple texts"""
-        results = []
-        for text in texts:
-            results.append(self.detect_language(text))
-        return results
\ No newline at end of file
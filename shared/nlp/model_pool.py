@@ -0,0 +1,330 @@
+"""
+Shared pool of lazily loaded NLP models with an LRU memory budget
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelPoolConfig:
+    """Configuration for the shared model pool"""
+    # Total estimated size of loaded models; least recently used models are
+    # evicted above it. 0 disables the budget.
+    memory_budget_mb: float = 4096.0
+    # Models loaded in the background once the service reports ready
+    warmup_models: List[str] = field(default_factory=list)
+    load_workers: int = 2
+
+    def validate(self) -> None:
+        """Validate configuration parameters"""
+        if self.memory_budget_mb < 0:
+            raise ValueError("memory_budget_mb must be non-negative")
+        if self.load_workers <= 0:
+            raise ValueError("load_workers must be positive")
+
+
+@dataclass
+class ModelPoolStats:
+    """Model pool statistics"""
+    hits: int = 0
+    loads: int = 0
+    shared_loads: int = 0
+    failed_loads: int = 0
+    evictions: int = 0
+    load_seconds: float = 0.0
+
+
+@dataclass
+class _PooledModel:
+    model: Any
+    size_bytes: int
+    load_seconds: float
+
+
+def estimate_model_bytes(model: Any) -> int:
+    """Parameter and buffer bytes of a torch model or HF pipeline, 0 if unknown"""
+    module = getattr(model, 'model', model)
+    total = 0
+    for attribute in ('parameters', 'buffers'):
+        tensors = getattr(module, attribute, None)
+        if not callable(tensors):
+            continue
+        try:
+            total += sum(t.numel() * t.element_size() for t in tensors())
+        except Exception as e:
+            logger.debug(f"Could not size model {type(module).__name__}: {e}")
+    return total
+
+
+class ModelPool:
+    """
+    Loads models on first use and keeps them within a memory budget
+
+    Models are registered by name with a zero-argument loader and loaded the first
+    time they are requested. Concurrent first requests for the same model share one
+    load. When the estimated size of loaded models exceeds the budget, the least
+    recently used models are dropped; they are reloaded on their next use.
+    ``get`` is thread-safe and may be called from inference threads.
+    """
+
+    def __init__(
+        self,
+        config: Optional[ModelPoolConfig] = None,
+        size_estimator: Callable[[Any], int] = estimate_model_bytes
+    ):
+        self.config = config or ModelPoolConfig()
+        self.config.validate()
+        self.size_estimator = size_estimator
+        self.stats = ModelPoolStats()
+
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: "OrderedDict[str, _PooledModel]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.config.load_workers, thread_name_prefix='model-pool')
+        self._warmup_task: Optional[asyncio.Task] = None
+
+    @property
+    def memory_budget_bytes(self) -> int:
+        return int(self.config.memory_budget_mb * 1024 * 1024)
+
+    def configure(self, config: ModelPoolConfig) -> None:
+        """
+        Apply a new configuration, keeping loaded models that fit the new budget
+        """
+        config.validate()
+        with self._lock:
+            if config.load_workers != self.config.load_workers:
+                # Loads already running finish on the old threads
+                self._executor.shutdown(wait=False)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=config.load_workers, thread_name_prefix='model-pool'
+                )
+            self.config = config
+            self._enforce_budget(keep=None)
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """
+        Register the loader for a model name
+
+        A new loader replaces the registered one, and a model it loaded is dropped
+        so the next ``get`` loads it with the new loader's settings (e.g. device).
+        """
+        with self._lock:
+            previous = self._loaders.get(name)
+            self._loaders[name] = loader
+            if previous is not None and previous is not loader and self._models.pop(name, None) is not None:
+                logger.info(f"Dropped model {name} loaded by a replaced loader")
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._loaders
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def loaded_models(self) -> List[str]:
+        """Loaded model names, least recently used first"""
+        with self._lock:
+            return list(self._models)
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Return a loaded model without loading it or updating recency"""
+        entry = self._models.get(name)
+        return entry.model if entry is not None else None
+
+    def get(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Return a model, loading it on first use
+
+        Args:
+            name: Registered model name
+            loader: Loader to register if the name is not registered yet
+
+        Raises:
+            KeyError: If no loader is registered for the name
+            Exception: Whatever the loader raised; failed loads are not cached
+        """
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+                self.stats.hits += 1
+                return entry.model
+
+            pending = self._loading.get(name)
+            if pending is None:
+                if loader is not None:
+                    self._loaders.setdefault(name, loader)
+                load = self._loaders.get(name)
+                if load is None:
+                    raise KeyError(f"No loader registered for model {name}")
+                pending = self._loading[name] = Future()
+                owner = True
+            else:
+                self.stats.shared_loads += 1
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        start = time.perf_counter()
+        try:
+            model = load()
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(name, None)
+                self.stats.failed_loads += 1
+            pending.set_exception(e)
+            raise
+
+        load_seconds = time.perf_counter() - start
+        size = self.size_estimator(model)
+        with self._lock:
+            self._models[name] = _PooledModel(model, size, load_seconds)
+            self._loading.pop(name, None)
+            self.stats.loads += 1
+            self.stats.load_seconds += load_seconds
+            self._enforce_budget(keep=name)
+        pending.set_result(model)
+
+        logger.info(f"Loaded model {name} in {load_seconds:.2f}s ({size / 1024 / 1024:.0f} MB)")
+        return model
+
+    async def aget(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """Return a model, loading it on the pool's loader threads"""
+        if name in self._models:
+            return self.get(name)
+        return await self.run_async(self.get, name, loader)
+
+    async def run_async(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking (loading) call on the pool's loader threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _enforce_budget(self, keep: Optional[str]) -> None:
+        """Evict least recently used models until within budget (lock held)"""
+        budget = self.memory_budget_bytes
+        if not budget:
+            return
+        total = sum(entry.size_bytes for entry in self._models.values())
+        for name in list(self._models):
+            if total <= budget:
+                break
+            if name == keep:
+                continue
+            total -= self._models.pop(name).size_bytes
+            self.stats.evictions += 1
+            logger.info(f"Evicted model {name} to stay within the {self.config.memory_budget_mb:.0f} MB budget")
+
+    def evict(self, name: str) -> bool:
+        """Drop a loaded model"""
+        with self._lock:
+            return self._models.pop(name, None) is not None
+
+    def clear(self) -> None:
+        """Drop all loaded models"""
+        with self._lock:
+            self._models.clear()
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Load models synchronously, skipping unknown names and failed loads
+
+        Returns:
+            Names that are loaded afterwards
+        """
+        warmed = []
+        for name in (self.config.warmup_models if names is None else names):
+            if not self.is_registered(name):
+                logger.warning(f"Cannot warm unregistered model {name}")
+                continue
+            try:
+                self.get(name)
+                warmed.append(name)
+            except Exception as e:
+                logger.warning(f"Failed to warm model {name}: {e}")
+        return warmed
+
+    def start_warmup(self, names: Optional[Iterable[str]] = None) -> Optional[asyncio.Task]:
+        """
+        Warm models in the background on the pool's loader threads
+
+        Only one warm-up runs at a time; later calls return the running task.
+        """
+        if self._warmup_task is not None and not self._warmup_task.done():
+            return self._warmup_task
+        names = list(self.config.warmup_models if names is None else names)
+        if not names:
+            return None
+        self._warmup_task = asyncio.get_running_loop().create_task(self.run_async(self.warm, names))
+        return self._warmup_task
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Loaded models, memory use and load statistics"""
+        with self._lock:
+            models = {
+                name: {
+                    'size_mb': entry.size_bytes / 1024 / 1024,
+                    'load_seconds': entry.load_seconds
+                }
+                for name, entry in self._models.items()
+            }
+        return {
+            'loaded_models': models,
+            'memory_mb': sum(model['size_mb'] for model in models.values()),
+            'memory_budget_mb': self.config.memory_budget_mb,
+            'registered_models': len(self._loaders),
+            'hits': self.stats.hits,
+            'loads': self.stats.loads,
+            'shared_loads': self.stats.shared_loads,
+            'failed_loads': self.stats.failed_loads,
+            'evictions': self.stats.evictions,
+            'load_seconds': self.stats.load_seconds
+        }
+
+    def shutdown(self) -> None:
+        """Stop the loader threads"""
+        self._executor.shutdown(wait=False)
+
+
+# Global pool shared by the NLP components
+_model_pool_instance: Optional[ModelPool] = None
+# Whether the global pool was given an explicit configuration
+_model_pool_configured = False
+
+
+def get_model_pool(config: Optional[ModelPoolConfig] = None) -> ModelPool:
+    """
+    Get singleton model pool instance
+
+    Components that only need the pool call this without a config; the first
+    explicit config is applied to the pool even if it was already created with
+    the defaults, so the order in which components start does not matter.
+
+    Raises:
+        ValueError: If ``config`` differs from an explicit configuration applied earlier
+    """
+    global _model_pool_instance, _model_pool_configured
+
+    if _model_pool_instance is None:
+        _model_pool_instance = ModelPool(config)
+        _model_pool_configured = config is not None
+    elif config is not None:
+        if not _model_pool_configured:
+            _model_pool_instance.configure(config)
+            _model_pool_configured = True
+        elif config != _model_pool_instance.config:
+            raise ValueError(
+                f"Model pool already initialized with {_model_pool_instance.config}, cannot apply {config}"
+            )
+
+    return _model_pool_instance
@@ -11,6 +11,7 @@ from .language_detector import LanguageDetector, LanguageDetectionResult
 from .translator import IndianLanguageTranslator, TranslationResult
 from .sentiment_models import MultiLanguageSentimentAnalyzer, SentimentResult
 from .quality_scorer import TranslationQualityScorer, QualityMetrics
+from .model_pool import ModelPoolConfig, get_model_pool
 from .config import NLPConfig, DEFAULT_NLP_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -37,15 +38,31 @@ class MultiLanguageNLPService:
         """Initialize NLP service with configuration"""
         self.config = config or DEFAULT_NLP_CONFIG
         
+        # Models are loaded on first use through the shared pool
+        self.model_pool = get_model_pool(ModelPoolConfig(
+            memory_budget_mb=self.config.model_memory_budget_mb,
+            warmup_models=self.config.model_warmup
+        ))
+        
         # Initialize components
-        self.language_detector = LanguageDetector()
+        self.language_detector = LanguageDetector(model_pool=self.model_pool)
         self.translator = IndianLanguageTranslator(
             cache_size=self.config.translation_cache_size,
-            use_gpu=self.config.use_gpu
+            use_gpu=self.config.use_gpu,
+            cache_max_bytes=self.config.translation_cache_max_bytes,
+            cache_path=self.config.translation_cache_path,
+            batch_size=self.config.translation_batch_size,
+            num_beams=self.config.translation_num_beams,
+            max_new_tokens_ratio=self.config.translation_max_new_tokens_ratio
         )
         self.sentiment_analyzer = MultiLanguageSentimentAnalyzer(
             use_gpu=self.config.use_gpu,
-            cache_models=self.config.cache_models
+            cache_models=self.config.cache_models,
+            batch_size=self.config.batch_size,
+            max_batch_size=self.config.sentiment_max_batch_size,
+            max_batch_wait_ms=self.config.sentiment_max_wait_ms,
+            micro_batching=self.config.sentiment_micro_batching,
+            model_pool=self.model_pool
         )
         self.quality_scorer = TranslationQualityScorer()
         
@@ -274,6 +291,7 @@ class MultiLanguageNLPService:
             'supported_languages': len(self.get_supported_languages()),
             'translation_cache_size': len(self.translator.translation_cache),
             'sentiment_models_loaded': len(self.sentiment_analyzer.pipelines),
+            'model_pool': self.model_pool.get_stats(),
             'gpu_available': self.config.use_gpu,
             'configuration': {
                 'language_detection_threshold': self.config.language_detection_confidence_threshold,
@@ -336,6 +354,10 @@ class MultiLanguageNLPService:
             }
             health_status['overall'] = 'degraded'
         
+        # Once ready, load the configured models in the background
+        if health_status['overall'] == 'healthy':
+            self.model_pool.start_warmup()
+        
         return health_status
     
     def clear_caches(self):
@@ -25,6 +25,8 @@ except ImportError:
 
 from .language_detector import LanguageDetector
 from .translator import IndianLanguageTranslator, TranslationResult
+from .batch_inference import BatchInferenceEngine, BatchInferenceConfig, MicroBatcher
+from .model_pool import ModelPool, get_model_pool
 
 logger = logging.getLogger(__name__)
 
@@ -73,8 +75,22 @@ class MultiLanguageSentimentAnalyzer:
         'NEUTRAL': 'neutral'
     }
     
-    def __init__(self, use_gpu: bool = False, cache_models: bool = True):
-        """Initialize multi-language sentiment analyzer"""
+    def __init__(
+        self,
+        use_gpu: bool = False,
+        cache_models: bool = True,
+        batch_size: int = 32,
+        max_batch_size: int = 64,
+        max_batch_wait_ms: float = 5.0,
+        micro_batching: bool = True,
+        model_pool: Optional[ModelPool] = None
+    ):
+        """
+        Initialize multi-language sentiment analyzer
+        
+        Sentiment pipelines are loaded on first use through the shared model pool;
+        nothing is loaded here.
+        """
         self.use_gpu = use_gpu and TRANSFORMERS_AVAILABLE and torch.cuda.is_available()
         self.device = 'cuda' if self.use_gpu else 'cpu'
         self.cache_models = cache_models
@@ -82,60 +98,76 @@ class MultiLanguageSentimentAnalyzer:
         # Model cache
         self.models = {}
         self.tokenizers = {}
-        self.pipelines = {}
+        self.model_pool = model_pool or get_model_pool()
+        self._unavailable_languages = set()
+        for language in self.LANGUAGE_MODELS:
+            self.model_pool.register(self.model_name(language), lambda language=language: self._create_pipeline(language))
         
         # Language services
-        self.language_detector = LanguageDetector()
+        self.language_detector = LanguageDetector(model_pool=self.model_pool)
         self.translator = IndianLanguageTranslator(use_gpu=use_gpu)
         
-        # Load default English model
-        self._load_model('en')
-        
-        # Preload common Indian language models
-        if cache_models:
-            self._preload_common_models()
+        # Batched inference: forward passes run on a dedicated thread, and concurrent
+        # single-text requests are merged by the micro-batcher
+        self.inference_config = BatchInferenceConfig(
+            batch_size=batch_size,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_batch_wait_ms
+        )
+        self.inference_engine = BatchInferenceEngine(self._load_model, self.inference_config)
+        self.micro_batcher = MicroBatcher(self.inference_engine) if micro_batching else None
     
-    def _preload_common_models(self):
-        """Preload commonly used models"""
-        common_languages = ['hi', 'bn', 'ta']
-        for lang in common_languages:
-            try:
-                self._load_model(lang)
-            except Exception as e:
-                logger.warning(f"Failed to preload model for {lang}: {e}")
+    @staticmethod
+    def model_name(language: str) -> str:
+        """Model pool name of the sentiment pipeline for a language"""
+        return f"sentiment:{language}"
+    
+    @property
+    def pipelines(self) -> Dict[str, 'Pipeline']:
+        """Sentiment pipelines currently loaded in the model pool, by language"""
+        prefix = self.model_name('')
+        return {
+            name[len(prefix):]: self.model_pool.peek(name)
+            for name in self.model_pool.loaded_models()
+            if name.startswith(prefix)
+        }
     
-    def _load_model(self, language: str) -> Pipeline:
+    def _create_pipeline(self, language: str) -> 'Pipeline':
+        """Create the sentiment pipeline for a language"""
+        model_name = self.LANGUAGE_MODELS.get(language)
+        if not model_name:
+            # Use multilingual fallback
+            model_name = self.MULTILINGUAL_MODELS['xlm-roberta']
+        
+        logger.info(f"Loading sentiment model for {language}: {model_name}")
+        
+        return pipeline(
+            "sentiment-analysis",
+            model=model_name,
+            tokenizer=model_name,
+            device=0 if self.use_gpu else -1,
+            return_all_scores=True
+        )
+    
+    def _load_model(self, language: str) -> 'Pipeline':
         """Load sentiment model for specific language"""
         if not TRANSFORMERS_AVAILABLE:
             raise ImportError("Transformers library not available for sentiment analysis")
-            
-        if language in self.pipelines:
-            return self.pipelines[language]
+        
+        # Languages whose model failed to load go straight to the English fallback
+        if language in self._unavailable_languages:
+            return self._load_model('en')
         
         try:
-            model_name = self.LANGUAGE_MODELS.get(language)
-            if not model_name:
-                # Use multilingual fallback
-                model_name = self.MULTILINGUAL_MODELS['xlm-roberta']
-            
-            logger.info(f"Loading sentiment model for {language}: {model_name}")
-            
-            # Create pipeline
-            sentiment_pipeline = pipeline(
-                "sentiment-analysis",
-                model=model_name,
-                tokenizer=model_name,
-                device=0 if self.use_gpu else -1,
-                return_all_scores=True
+            return self.model_pool.get(
+                self.model_name(language), lambda: self._create_pipeline(language)
             )
             
-            self.pipelines[language] = sentiment_pipeline
-            return sentiment_pipeline
-            
         except Exception as e:
             logger.error(f"Failed to load model for {language}: {e}")
             # Fallback to English model
             if language != 'en':
+                self._unavailable_languages.add(language)
                 return self._load_model('en')
             raise
     
@@ -156,6 +188,27 @@ class MultiLanguageSentimentAnalyzer:
         Returns:
             SentimentResult with sentiment classification
         """
+        prepared = await self._prepare_analysis(text, language, translate_if_needed)
+        
+        try:
+            if self.micro_batcher is not None:
+                output = await self.micro_batcher.submit(prepared['analysis_text'], prepared['model_language'])
+            else:
+                output = (await self.inference_engine.infer(
+                    [prepared['analysis_text']], [prepared['model_language']]
+                ))[0]
+        except Exception as e:
+            output = e
+        
+        return self._build_result(prepared, output)
+    
+    async def _prepare_analysis(
+        self,
+        text: str,
+        language: Optional[str],
+        translate_if_needed: bool
+    ) -> Dict:
+        """Detect language, translate if needed and pick the model language"""
         
         # Detect language if not provided
         if not language:
@@ -196,26 +249,40 @@ class MultiLanguageSentimentAnalyzer:
             except Exception as e:
                 logger.warning(f"Translation failed, using original text: {e}")
         
-        # Load appropriate model
+        # Make sure the model for this language can be loaded, off the event loop
         try:
-            model = self._load_model(language)
+            if language not in self._unavailable_languages and not self.model_pool.is_loaded(self.model_name(language)):
+                await self.model_pool.run_async(self._load_model, language)
+            if language in self._unavailable_languages:
+                language = 'en'
         except Exception as e:
             logger.error(f"Model loading failed, using English fallback: {e}")
-            model = self._load_model('en')
             language = 'en'
         
-        # Perform sentiment analysis
+        return {
+            'text': text,
+            'original_language': original_language,
+            'analysis_text': analysis_text,
+            'model_language': language,
+            'translation_used': translation_used,
+            'translation_quality': translation_quality
+        }
+    
+    def _build_result(self, prepared: Dict, output) -> SentimentResult:
+        """Turn one raw pipeline output into a SentimentResult"""
         try:
-            results = model(analysis_text)
+            if isinstance(output, Exception):
+                raise output
             
             # Process results
-            if isinstance(results, list) and len(results) > 0:
-                if isinstance(results[0], list):
-                    # Multiple scores returned
-                    scores = {item['label']: item['score'] for item in results[0]}
-                else:
-                    # Single result
-                    scores = {results[0]['label']: results[0]['score']}
+            if isinstance(output, list) and len(output) > 0:
+                if isinstance(output[0], list):
+                    # Output for a single-text call wrapping all scores
+                    output = output[0]
+                scores = {item['label']: item['score'] for item in output}
+            elif isinstance(output, dict):
+                # Single result
+                scores = {output['label']: output['score']}
             else:
                 scores = {'neutral': 1.0}
             
@@ -225,38 +292,35 @@ class MultiLanguageSentimentAnalyzer:
                 mapped_label = self.SENTIMENT_MAPPING.get(label, label.lower())
                 mapped_scores[mapped_label] = score
             
-            # Determine final sentiment
-            final_sentiment = max(mapped_scores.items(), key=lambda x: x[1])
-            
             # Apply India-specific adjustments
             adjusted_scores = self._apply_india_context_adjustments(
-                analysis_text, mapped_scores, original_language
+                prepared['analysis_text'], mapped_scores, prepared['original_language']
             )
             
             final_sentiment = max(adjusted_scores.items(), key=lambda x: x[1])
             
             return SentimentResult(
-                text=text,
-                language=original_language,
+                text=prepared['text'],
+                language=prepared['original_language'],
                 sentiment=final_sentiment[0],
                 confidence=final_sentiment[1],
                 scores=adjusted_scores,
-                model_used=f"{language}_model",
-                translation_used=translation_used,
-                translation_quality=translation_quality
+                model_used=f"{prepared['model_language']}_model",
+                translation_used=prepared['translation_used'],
+                translation_quality=prepared['translation_quality']
             )
             
         except Exception as e:
             logger.error(f"Sentiment analysis failed: {e}")
             return SentimentResult(
-                text=text,
-                language=original_language,
+                text=prepared['text'],
+                language=prepared['original_language'],
                 sentiment='neutral',
                 confidence=0.0,
                 scores={'neutral': 1.0},
                 model_used='fallback',
-                translation_used=translation_used,
-                translation_quality=translation_quality
+                translation_used=prepared['translation_used'],
+                translation_quality=prepared['translation_quality']
             )
     
     def _apply_india_context_adjustments(
@@ -310,24 +374,34 @@ class MultiLanguageSentimentAnalyzer:
         texts: List[str], 
         languages: Optional[List[str]] = None
     ) -> List[SentimentResult]:
-        """Analyze sentiment for multiple texts"""
+        """
+        Analyze sentiment for multiple texts
+        
+        Language detection and translation run per text; model inference is grouped by
+        language and executed as length-sorted tensor batches on the inference thread.
+        """
         
         if languages is None:
             languages = [None] * len(texts)
         
-        tasks = []
-        for text, lang in zip(texts, languages):
-            task = self.analyze_sentiment(text, lang)
-            tasks.append(task)
-        
         import asyncio
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        prepared = await asyncio.gather(
+            *(self._prepare_analysis(text, lang, True) for text, lang in zip(texts, languages)),
+            return_exceptions=True
+        )
+        
+        ready = [i for i, item in enumerate(prepared) if not isinstance(item, Exception)]
+        outputs = await self.inference_engine.infer(
+            [prepared[i]['analysis_text'] for i in ready],
+            [prepared[i]['model_language'] for i in ready]
+        )
+        output_by_index = dict(zip(ready, outputs))
         
         # Handle exceptions
         final_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Sentiment analysis failed for text {i}: {result}")
+        for i, item in enumerate(prepared):
+            if isinstance(item, Exception):
+                logger.error(f"Sentiment analysis failed for text {i}: {item}")
                 final_results.append(SentimentResult(
                     text=texts[i],
                     language='unknown',
@@ -337,7 +411,7 @@ class MultiLanguageSentimentAnalyzer:
                     model_used='failed'
                 ))
             else:
-                final_results.append(result)
+                final_results.append(self._build_result(item, output_by_index[i]))
         
         return final_results
     
@@ -355,8 +429,8 @@ class MultiLanguageSentimentAnalyzer:
     
     def get_model_info(self, language: str) -> Dict:
         """Get information about loaded model for language"""
-        if language in self.pipelines:
-            pipeline = self.pipelines[language]
+        pipeline = self.model_pool.peek(self.model_name(language))
+        if pipeline is not None:
             return {
                 'model_name': getattr(pipeline.model, 'name_or_path', 'unknown'),
                 'language': language,
@@ -370,11 +444,18 @@ class MultiLanguageSentimentAnalyzer:
                 'available': language in self.LANGUAGE_MODELS
             }
     
+    async def close(self):
+        """Stop the micro-batcher and the inference thread"""
+        if self.micro_batcher is not None:
+            await self.micro_batcher.close()
+        self.inference_engine.shutdown()
+    
     def clear_cache(self):
         """Clear model cache to free memory"""
         self.models.clear()
         self.tokenizers.clear()
-        self.pipelines.clear()
+        for language in self.pipelines:
+            self.model_pool.evict(self.model_name(language))
         
         # Clear GPU cache if using CUDA
         if self.use_gpu and torch.cuda.is_available():
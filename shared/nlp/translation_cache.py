@@ -0,0 +1,263 @@
+"""
+Bounded LRU translation cache with an optional SQLite persistence tier
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache lookups (NFC, collapsed whitespace)"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def translation_cache_key(
+    text: str,
+    source_lang: str,
+    target_lang: str,
+    generation: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Cache key for a translation: a hash of the language pair, the generation
+    settings that shape the output (method, beam width, length limits) and the
+    normalized text
+    """
+    settings = json.dumps(generation or {}, sort_keys=True, separators=(',', ':'))
+    payload = f"{source_lang}\x1f{target_lang}\x1f{settings}\x1f{normalize_text(text)}"
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+@dataclass
+class TranslationCacheStats:
+    """Translation cache statistics"""
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class TranslationCache:
+    """
+    Byte-bounded LRU cache for translation results
+
+    Values are JSON-serializable dicts. Entries are evicted least-recently-used first
+    once the encoded size of all entries exceeds ``max_bytes`` or the entry count
+    exceeds ``max_entries``. With ``persist_path`` set, persisted entries are also
+    written to a SQLite file, which is consulted on memory misses and survives
+    restarts; it keeps the ``persist_max_entries`` most recently used entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 32 * 1024 * 1024,
+        persist_path: Optional[str] = None,
+        persist_max_entries: int = 100_000,
+        prune_interval: int = 1000
+    ):
+        if max_entries <= 0 or max_bytes <= 0:
+            raise ValueError("max_entries and max_bytes must be positive")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.persist_path = persist_path
+        self.persist_max_entries = persist_max_entries
+        self.prune_interval = prune_interval
+        self.stats = TranslationCacheStats()
+
+        # key -> (value, encoded size)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes_since_prune = 0
+        if persist_path:
+            self._open_db(persist_path)
+
+    def _open_db(self, path: str) -> None:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._prune()
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache persistence disabled ({path}): {e}")
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def size_bytes(self) -> int:
+        """Encoded size of the in-memory entries"""
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a key in memory, then on disk; disk hits are promoted to memory"""
+        if key in self._entries or self._db is None:
+            return self._lookup(key, None)
+        return self._lookup(key, self._disk_get(key))
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """``get`` for the event loop: the disk tier is read in a worker thread"""
+        if key in self._entries or self._db is None:
+            return self._lookup(key, None)
+        return self._lookup(key, await asyncio.to_thread(self._disk_get, key))
+
+    def set(self, key: str, value: Dict[str, Any], persist: bool = True) -> None:
+        """Store a value; ``persist=False`` keeps it out of the disk tier"""
+        encoded = self._remember(key, value)
+        if persist and self._db is not None:
+            self._disk_set(key, encoded)
+
+    async def aset(self, key: str, value: Dict[str, Any], persist: bool = True) -> None:
+        """``set`` for the event loop: the disk tier is written in a worker thread"""
+        encoded = self._remember(key, value)
+        if persist and self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, encoded)
+
+    def _lookup(self, key: str, encoded: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Serve a key from memory, else from its encoded disk value, and count the outcome"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+        if encoded is not None:
+            value = json.loads(encoded)
+            self._store(key, value, len(encoded.encode('utf-8')))
+            self.stats.hits += 1
+            self.stats.disk_hits += 1
+            return value
+
+        self.stats.misses += 1
+        return None
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> str:
+        """Store a value in memory and return its encoding"""
+        encoded = json.dumps(value, ensure_ascii=False, default=str)
+        self._store(key, value, len(encoded.encode('utf-8')))
+        return encoded
+
+    def _store(self, key: str, value: Dict[str, Any], size: int) -> None:
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.stats.evictions += 1
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        try:
+            with self._db_lock:
+                row = self._db.execute("SELECT value FROM translations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE translations SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                    )
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache read failed: {e}")
+            return None
+
+    def _disk_set(self, key: str, encoded: str) -> None:
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, accessed_at) VALUES (?, ?, ?)",
+                    (key, encoded, time.time())
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= self.prune_interval:
+                    self._prune_locked()
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache write failed: {e}")
+
+    def _prune(self) -> None:
+        with self._db_lock:
+            self._prune_locked()
+
+    def _prune_locked(self) -> None:
+        """Keep only the most recently used ``persist_max_entries`` rows"""
+        self._db.execute(
+            "DELETE FROM translations WHERE key NOT IN "
+            "(SELECT key FROM translations ORDER BY accessed_at DESC LIMIT ?)",
+            (self.persist_max_entries,)
+        )
+        self._writes_since_prune = 0
+
+    def disk_entries(self) -> int:
+        """Number of persisted entries"""
+        if self._db is None:
+            return 0
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def clear(self, include_disk: bool = False) -> None:
+        """Remove all in-memory entries, and persisted ones with ``include_disk``"""
+        self._entries.clear()
+        self._bytes = 0
+        if include_disk and self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM translations")
+
+    def close(self) -> None:
+        """Close the persistence tier"""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Occupancy and hit statistics"""
+        return {
+            'cache_size': len(self._entries),
+            'max_size': self.max_entries,
+            'size_bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.stats.hits,
+            'misses': self.stats.misses,
+            'disk_hits': self.stats.disk_hits,
+            'evictions': self.stats.evictions,
+            'hit_rate': self.stats.hit_rate,
+            'persistent': self._db is not None,
+            'disk_entries': self.disk_entries()
+        }
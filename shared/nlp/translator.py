@@ -3,8 +3,8 @@ Translation service for Indian languages with quality scoring
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 import time
@@ -23,6 +23,8 @@ try:
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
 
+from .translation_cache import TranslationCache, translation_cache_key
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -69,14 +71,50 @@ class IndianLanguageTranslator:
         'en-ur': 'Helsinki-NLP/opus-mt-en-ur'
     }
     
-    def __init__(self, cache_size: int = 1000, use_gpu: bool = False):
-        """Initialize translator with caching and GPU support"""
+    # Decoding strategies accepted by translate_batch
+    DECODING_STRATEGIES = ('beam', 'greedy')
+    
+    def __init__(
+        self,
+        cache_size: int = 1000,
+        use_gpu: bool = False,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+        cache_path: Optional[str] = None,
+        batch_size: int = 16,
+        num_beams: int = 4,
+        max_new_tokens_ratio: float = 2.0,
+        max_new_tokens_offset: int = 16,
+        max_length: int = 512
+    ):
+        """
+        Initialize translator with caching and GPU support
+        
+        Args:
+            cache_size: Maximum number of cached translations in memory
+            use_gpu: Run Marian models on GPU when available
+            cache_max_bytes: Maximum encoded size of cached translations in memory
+            cache_path: SQLite file for a cache tier that survives restarts
+            batch_size: Texts per Marian forward pass in translate_batch
+            num_beams: Beam width for beam decoding
+            max_new_tokens_ratio: Generated tokens allowed per input token
+            max_new_tokens_offset: Generated tokens allowed on top of the ratio
+            max_length: Maximum input and output length in tokens
+        """
         self.cache_size = cache_size
         self.use_gpu = use_gpu and torch.cuda.is_available()
         self.device = 'cuda' if self.use_gpu else 'cpu'
-        
-        # Translation cache
-        self.translation_cache = {}
+        self.batch_size = batch_size
+        self.num_beams = num_beams
+        self.max_new_tokens_ratio = max_new_tokens_ratio
+        self.max_new_tokens_offset = max_new_tokens_offset
+        self.max_length = max_length
+        
+        # Translation cache, keyed by a hash of language pair, generation settings and normalized text
+        self.translation_cache = TranslationCache(
+            max_entries=cache_size,
+            max_bytes=cache_max_bytes,
+            persist_path=cache_path
+        )
         
         # Initialize services
         self.google_translator = GoogleTranslator() if GOOGLETRANS_AVAILABLE else None
@@ -98,17 +136,8 @@ class IndianLanguageTranslator:
         for pair in model_pairs:
             if pair in self.MARIAN_MODELS:
                 try:
-                    model_name = self.MARIAN_MODELS[pair]
-                    logger.info(f"Loading Marian model: {model_name}")
-                    
-                    tokenizer = MarianTokenizer.from_pretrained(model_name)
-                    model = MarianMTModel.from_pretrained(model_name)
-                    
-                    if self.use_gpu:
-                        model = model.to(self.device)
-                    
-                    self.marian_tokenizers[pair] = tokenizer
-                    self.marian_models[pair] = model
+                    logger.info(f"Loading Marian model: {self.MARIAN_MODELS[pair]}")
+                    self._load_marian(pair)
                     
                 except Exception as e:
                     logger.warning(f"Failed to load Marian model {pair}: {e}")
@@ -134,13 +163,6 @@ class IndianLanguageTranslator:
         """
         start_time = time.time()
         
-        # Check cache first
-        cache_key = f"{text}:{source_lang}:{target_lang}"
-        if cache_key in self.translation_cache:
-            cached_result = self.translation_cache[cache_key]
-            cached_result.processing_time = time.time() - start_time
-            return cached_result
-        
         # Skip translation if already in target language
         if source_lang == target_lang:
             return TranslationResult(
@@ -158,6 +180,14 @@ class IndianLanguageTranslator:
         if method == 'auto':
             method = self._choose_best_method(source_lang, target_lang)
         
+        # Check cache first
+        cache_key = translation_cache_key(
+            text, source_lang, target_lang, self._generation_params(method, self.num_beams)
+        )
+        cached = await self.translation_cache.aget(cache_key)
+        if cached is not None:
+            return self._cached_result(cached, text, start_time)
+        
         # Perform translation
         try:
             if method == 'marian':
@@ -168,8 +198,7 @@ class IndianLanguageTranslator:
             result.processing_time = time.time() - start_time
             
             # Cache result
-            if len(self.translation_cache) < self.cache_size:
-                self.translation_cache[cache_key] = result
+            await self._cache_result(cache_key, result)
             
             return result
             
@@ -198,6 +227,18 @@ class IndianLanguageTranslator:
         # Use Google Translate for other pairs
         return 'google'
     
+    def _generation_params(self, method: str, num_beams: int) -> Dict[str, Any]:
+        """Settings that change the output of a translation, part of its cache key"""
+        if method != 'marian':
+            return {'method': 'google'}
+        return {
+            'method': 'marian',
+            'num_beams': num_beams,
+            'max_length': self.max_length,
+            'max_new_tokens_ratio': self.max_new_tokens_ratio,
+            'max_new_tokens_offset': self.max_new_tokens_offset
+        }
+    
     async def _translate_with_marian(
         self, 
         text: str, 
@@ -207,34 +248,11 @@ class IndianLanguageTranslator:
         """Translate using Marian MT models"""
         pair = f"{source_lang}-{target_lang}"
         
-        if pair not in self.marian_models:
-            # Try to load model on demand
-            if pair in self.MARIAN_MODELS:
-                model_name = self.MARIAN_MODELS[pair]
-                tokenizer = MarianTokenizer.from_pretrained(model_name)
-                model = MarianMTModel.from_pretrained(model_name)
-                
-                if self.use_gpu:
-                    model = model.to(self.device)
-                
-                self.marian_tokenizers[pair] = tokenizer
-                self.marian_models[pair] = model
-            else:
-                raise ValueError(f"Marian model not available for {pair}")
-        
-        tokenizer = self.marian_tokenizers[pair]
-        model = self.marian_models[pair]
-        
-        # Tokenize and translate
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-        
-        if self.use_gpu:
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        
-        with torch.no_grad():
-            outputs = model.generate(**inputs, max_length=512, num_beams=4)
-        
-        translated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
+        loop = asyncio.get_running_loop()
+        translations = await loop.run_in_executor(
+            self.executor, self._marian_generate, [text], pair, self.num_beams
+        )
+        translated_text = translations[0]
         
         # Calculate confidence (simplified)
         confidence = 0.8  # Marian models generally have good quality
@@ -251,6 +269,68 @@ class IndianLanguageTranslator:
             processing_time=0.0  # Will be set by caller
         )
     
+    def _load_marian(self, pair: str) -> Tuple[object, object]:
+        """Get the Marian tokenizer and model for a language pair, loading on demand"""
+        if pair not in self.marian_models:
+            if pair not in self.MARIAN_MODELS:
+                raise ValueError(f"Marian model not available for {pair}")
+            
+            model_name = self.MARIAN_MODELS[pair]
+            tokenizer = MarianTokenizer.from_pretrained(model_name)
+            model = MarianMTModel.from_pretrained(model_name)
+            
+            if self.use_gpu:
+                model = model.to(self.device)
+            
+            self.marian_tokenizers[pair] = tokenizer
+            self.marian_models[pair] = model
+        
+        return self.marian_tokenizers[pair], self.marian_models[pair]
+    
+    def _max_new_tokens(self, input_length: int) -> int:
+        """Generation cap relative to the longest input in a batch"""
+        return min(self.max_length, int(input_length * self.max_new_tokens_ratio) + self.max_new_tokens_offset)
+    
+    def _marian_generate(self, texts: List[str], pair: str, num_beams: int) -> List[str]:
+        """
+        Translate texts with a Marian model (executor thread)
+        
+        Texts are sorted by token length and split into batches of ``batch_size`` so
+        each forward pass pads to a similar length. Outputs keep the input order.
+        """
+        tokenizer, model = self._load_marian(pair)
+        
+        lengths = [
+            len(ids) for ids in tokenizer(texts, truncation=True, max_length=self.max_length)['input_ids']
+        ]
+        order = sorted(range(len(texts)), key=lengths.__getitem__)
+        
+        translations: List[Optional[str]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            chunk = order[start:start + self.batch_size]
+            inputs = tokenizer(
+                [texts[i] for i in chunk],
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=self.max_length
+            )
+            
+            if self.use_gpu:
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            
+            with torch.no_grad():
+                outputs = model.generate(
+                    **inputs,
+                    num_beams=num_beams,
+                    max_new_tokens=self._max_new_tokens(max(lengths[i] for i in chunk))
+                )
+            
+            for index, translated in zip(chunk, tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                translations[index] = translated
+        
+        return translations
+    
     async def _translate_with_google(
         self, 
         text: str, 
@@ -332,40 +412,164 @@ class IndianLanguageTranslator:
         
         return min(score, 1.0)
     
-    async def batch_translate(
-        self, 
-        texts: List[str], 
-        source_lang: str, 
-        target_lang: str = 'en'
+    async def translate_batch(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str = 'en',
+        method: str = 'auto',
+        decoding: str = 'beam',
+        num_beams: Optional[int] = None
     ) -> List[TranslationResult]:
-        """Translate multiple texts in batch"""
+        """
+        Translate many texts with shared cache lookups and batched decoding
+        
+        Cached and repeated texts are translated once. Marian translations run in
+        length-sorted batches on the executor; greedy decoding trades some quality
+        for lower latency.
+        
+        Args:
+            texts: Texts to translate
+            source_lang: Source language code
+            target_lang: Target language code
+            method: Translation method ('auto', 'google', 'marian')
+            decoding: 'beam' or 'greedy'
+            num_beams: Beam width for beam decoding (defaults to ``num_beams``)
+            
+        Returns:
+            One TranslationResult per text, in input order
+        """
+        if decoding not in self.DECODING_STRATEGIES:
+            raise ValueError(f"Unknown decoding strategy: {decoding}")
+        beams = 1 if decoding == 'greedy' else (num_beams or self.num_beams)
+        if method == 'auto':
+            method = self._choose_best_method(source_lang, target_lang)
+        generation = self._generation_params(method, beams)
         
-        tasks = []
-        for text in texts:
-            task = self.translate(text, source_lang, target_lang)
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Handle exceptions
-        final_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Translation failed for text {i}: {result}")
-                final_results.append(TranslationResult(
-                    original_text=texts[i],
-                    translated_text=texts[i],
+        start_time = time.time()
+        results: List[Optional[TranslationResult]] = [None] * len(texts)
+        
+        # Serve cache hits and collapse repeated texts
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if source_lang == target_lang:
+                results[i] = TranslationResult(
+                    original_text=text,
+                    translated_text=text,
                     source_language=source_lang,
                     target_language=target_lang,
-                    confidence=0.0,
-                    quality_score=0.0,
-                    method='failed',
+                    confidence=1.0,
+                    quality_score=1.0,
+                    method='no_translation',
                     processing_time=0.0
-                ))
+                )
+                continue
+            
+            cache_key = translation_cache_key(text, source_lang, target_lang, generation)
+            if cache_key in pending:
+                pending[cache_key].append(i)
+                continue
+            
+            cached = await self.translation_cache.aget(cache_key)
+            if cached is not None:
+                results[i] = self._cached_result(cached, text, start_time)
             else:
-                final_results.append(result)
+                pending[cache_key] = [i]
+        
+        if pending:
+            unique_texts = [texts[indices[0]] for indices in pending.values()]
+            
+            if method == 'marian':
+                translated = await self._translate_batch_with_marian(unique_texts, source_lang, target_lang, beams)
+            else:
+                translated = await asyncio.gather(
+                    *(self._translate_with_google(text, source_lang, target_lang) for text in unique_texts),
+                    return_exceptions=True
+                )
+            
+            processing_time = time.time() - start_time
+            for (cache_key, indices), text, result in zip(pending.items(), unique_texts, translated):
+                if isinstance(result, Exception):
+                    logger.error(f"Translation failed for text {indices[0]}: {result}")
+                    result = self._failed_result(text, source_lang, target_lang)
+                else:
+                    await self._cache_result(cache_key, result)
+                result.processing_time = processing_time
+                
+                results[indices[0]] = result
+                for i in indices[1:]:
+                    results[i] = TranslationResult(**{**asdict(result), 'original_text': texts[i]})
+        
+        return results
+    
+    async def _translate_batch_with_marian(
+        self,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        num_beams: int
+    ) -> List[object]:
+        """Translate texts in Marian batches, returning a result or exception per text"""
+        pair = f"{source_lang}-{target_lang}"
+        loop = asyncio.get_running_loop()
+        try:
+            translations = await loop.run_in_executor(
+                self.executor, self._marian_generate, texts, pair, num_beams
+            )
+        except Exception as e:
+            return [e] * len(texts)
         
-        return final_results
+        return [
+            TranslationResult(
+                original_text=text,
+                translated_text=translated_text,
+                source_language=source_lang,
+                target_language=target_lang,
+                confidence=0.8,
+                quality_score=self._calculate_quality_score(text, translated_text, source_lang, target_lang),
+                method='marian',
+                processing_time=0.0
+            )
+            for text, translated_text in zip(texts, translations)
+        ]
+    
+    async def batch_translate(
+        self, 
+        texts: List[str], 
+        source_lang: str, 
+        target_lang: str = 'en'
+    ) -> List[TranslationResult]:
+        """Translate multiple texts in batch"""
+        return await self.translate_batch(texts, source_lang, target_lang)
+    
+    async def _cache_result(self, cache_key: str, result: TranslationResult) -> None:
+        """Cache a translation; only real translations reach the persistent tier"""
+        if result.method == 'failed':
+            return
+        await self.translation_cache.aset(cache_key, asdict(result), persist=result.method in ('marian', 'google'))
+    
+    @staticmethod
+    def _cached_result(cached: Dict, text: str, start_time: float) -> TranslationResult:
+        """Build a result from a cache entry for the requested text"""
+        return TranslationResult(**{
+            **cached,
+            'original_text': text,
+            'processing_time': time.time() - start_time
+        })
+    
+    @staticmethod
+    def _failed_result(text: str, source_lang: str, target_lang: str) -> TranslationResult:
+        """Fallback result returning the original text"""
+        return TranslationResult(
+            original_text=text,
+            translated_text=text,
+            source_language=source_lang,
+            target_language=target_lang,
+            confidence=0.0,
+            quality_score=0.0,
+            method='failed',
+            processing_time=0.0
+        )
     
     def get_supported_languages(self) -> Dict[str, str]:
         """Get list of supported languages"""
@@ -383,14 +587,10 @@ class IndianLanguageTranslator:
             'en': 'English'
         }
     
-    def clear_cache(self):
-        """Clear translation cache"""
-        self.translation_cache.clear()
+    def clear_cache(self, include_disk: bool = False):
+        """Clear translation cache (and its persistent tier with ``include_disk``)"""
+        self.translation_cache.clear(include_disk=include_disk)
     
     def get_cache_stats(self) -> Dict:
         """Get cache statistics"""
-        return {
-            'cache_size': len(self.translation_cache),
-            'max_size': self.cache_size,
-            'hit_rate': getattr(self, '_cache_hits', 0) / max(getattr(self, '_cache_requests', 1), 1)
-        }
\ No newline at end of file
+        return self.translation_cache.get_stats()
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Embedded asyncpg stand-in backed by SQLite, for tests and benchmarks
+
+Implements the part of the asyncpg pool/connection API the database managers
+use, with a simulated network round trip per query and a simulated
+parse/plan cost whenever a statement is prepared. Like asyncpg, each
+connection keeps an LRU of statements prepared for ad-hoc queries, and a
+statement returned by ``prepare`` stops working once its connection is
+released back to the pool.
+"""
+
+import asyncio
+import itertools
+import re
+import sqlite3
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, List, Optional
+
+from asyncpg.exceptions import InterfaceError
+
+_PARAM = re.compile(r'\$(\d+)')
+_pids = itertools.count(1000)
+
+
+def _to_sqlite(query: str) -> str:
+    return _PARAM.sub(r'?\1', query)
+
+
+def _status(query: str, rowcount: int) -> str:
+    keyword = query.split(None, 1)[0].upper()
+    if keyword == 'INSERT':
+        return f"INSERT 0 {rowcount}"
+    if keyword in ('UPDATE', 'DELETE'):
+        return f"{keyword} {rowcount}"
+    return keyword
+
+
+class StandinStatement:
+    """Prepared statement bound to one stand-in connection."""
+
+    def __init__(self, connection: "StandinConnection", query: str, release_ctr: Optional[int] = None):
+        self.connection = connection
+        self.query = query
+        # Set for statements handed out by prepare(), as asyncpg guards them
+        self.release_ctr = release_ctr
+        self._status = ""
+
+    def _check_acquired(self) -> None:
+        if self.release_ctr is not None and self.release_ctr != self.connection.release_ctr:
+            raise InterfaceError("cannot call PreparedStatement.fetch(): "
+                                 "the underlying connection has been released back to the pool")
+
+    async def fetch(self, *args) -> List[sqlite3.Row]:
+        self._check_acquired()
+        rows, self._status = await self.connection._run(self.query, args)
+        return rows
+
+    async def fetchrow(self, *args) -> Optional[sqlite3.Row]:
+        rows = await self.fetch(*args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, *args) -> Any:
+        row = await self.fetchrow(*args)
+        return row[0] if row else None
+
+    def get_statusmsg(self) -> str:
+        self._check_acquired()
+        return self._status
+
+
+class StandinConnection:
+    """One pooled connection with its own statement cache."""
+
+    def __init__(self, pool: "StandinPool"):
+        self.pool = pool
+        self.pid = next(_pids)
+        self.release_ctr = 0
+        self._statement_cache: "OrderedDict[str, StandinStatement]" = OrderedDict()
+
+    def get_server_pid(self) -> int:
+        return self.pid
+
+    async def _prepare(self) -> None:
+        self.pool.prepares += 1
+        await asyncio.sleep(self.pool.round_trip + self.pool.prepare_cost)
+
+    async def prepare(self, query: str) -> StandinStatement:
+        await self._prepare()
+        return StandinStatement(self, query, self.release_ctr)
+
+    async def _cached_statement(self, query: str) -> StandinStatement:
+        statement = self._statement_cache.get(query)
+        if statement is not None:
+            self._statement_cache.move_to_end(query)
+            return statement
+        await self._prepare()
+        statement = StandinStatement(self, query)
+        if self.pool.statement_cache_size:
+            self._statement_cache[query] = statement
+            while len(self._statement_cache) > self.pool.statement_cache_size:
+                self._statement_cache.popitem(last=False)
+        return statement
+
+    async def _run(self, query: str, args) -> tuple:
+        self.pool.round_trips += 1
+        await asyncio.sleep(self.pool.round_trip)
+        cursor = self.pool.db.execute(_to_sqlite(query), args)
+        rows = cursor.fetchall()
+        self.pool.db.commit()
+        return rows, _status(query, cursor.rowcount)
+
+    async def fetch(self, query: str, *args) -> List[sqlite3.Row]:
+        return await (await self._cached_statement(query)).fetch(*args)
+
+    async def fetchrow(self, query: str, *args) -> Optional[sqlite3.Row]:
+        return await (await self._cached_statement(query)).fetchrow(*args)
+
+    async def fetchval(self, query: str, *args) -> Any:
+        return await (await self._cached_statement(query)).fetchval(*args)
+
+    async def execute(self, query: str, *args) -> str:
+        if not args:
+            # Simple query protocol: no statement is prepared
+            self.pool.round_trips += 1
+            await asyncio.sleep(self.pool.round_trip)
+            self.pool.db.executescript(query)
+            return _status(query, 0)
+        statement = await self._cached_statement(query)
+        await statement.fetch(*args)
+        return statement.get_statusmsg()
+
+    async def copy_records_to_table(self, table_name: str, records, columns: List[str]) -> str:
+        self.pool.round_trips += 1
+        await asyncio.sleep(self.pool.round_trip)
+        placeholders = ", ".join("?" for _ in columns)
+        self.pool.db.executemany(
+            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})", records
+        )
+        self.pool.db.commit()
+        return f"COPY {len(records)}"
+
+
+class StandinPool:
+    """Fixed-size pool of stand-in connections sharing one SQLite database."""
+
+    def __init__(self, size: int = 4, round_trip: float = 0.0, prepare_cost: float = 0.0,
+                 statement_cache_size: int = 100,
+                 init: Optional[Callable[[StandinConnection], Awaitable[None]]] = None):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.size = size
+        self.round_trip = round_trip
+        self.prepare_cost = prepare_cost
+        self.statement_cache_size = statement_cache_size
+        self.init = init
+        self.round_trips = 0
+        self.prepares = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._opened = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        if self._idle.empty() and self._opened < self.size:
+            self._opened += 1
+            connection = StandinConnection(self)
+            if self.init is not None:
+                await self.init(connection)
+        else:
+            connection = await self._idle.get()
+        try:
+            yield connection
+        finally:
+            connection.release_ctr += 1
+            self._idle.put_nowait(connection)
+
+    def get_size(self) -> int:
+        return self._opened
+
+    def get_max_size(self) -> int:
+        return self.size
+
+    def get_min_size(self) -> int:
+        return 0
+
+    async def close(self) -> None:
+        self.db.close()
@@ -0,0 +1,306 @@
+"""
+In-memory Kafka broker fake for tests and benchmarks
+
+Implements the subset of the kafka-python producer and consumer API used by the
+stream processing clients and the event bus: ``send`` futures with callbacks,
+linger-based batching on a sender thread, ``poll``, ``commit`` and ``commit_async``.
+An optional per-request latency simulates the network round-trip to a real broker.
+"""
+import itertools
+import threading
+import time
+import zlib
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from kafka.errors import KafkaTimeoutError
+from kafka.structs import TopicPartition
+
+MemoryRecord = namedtuple("MemoryRecord", ["topic", "partition", "offset", "timestamp", "key", "value", "headers"])
+MemoryRecordMetadata = namedtuple("MemoryRecordMetadata", ["topic", "partition", "offset", "timestamp",
+                                                           "serialized_value_size"])
+
+
+class MemoryBroker:
+    """Partitioned append-only logs plus committed offsets per consumer group"""
+
+    def __init__(self, num_partitions: int = 3, request_latency_ms: float = 0.0):
+        self.num_partitions = num_partitions
+        self.request_latency_ms = request_latency_ms
+        self._logs: Dict[TopicPartition, List[MemoryRecord]] = {}
+        self._committed: Dict[Tuple[str, TopicPartition], int] = {}
+        self._condition = threading.Condition()
+        self.produce_requests = 0
+
+    def partitions_for(self, topic: str) -> List[TopicPartition]:
+        """Partitions of a topic, created on first use"""
+        with self._condition:
+            partitions = [TopicPartition(topic, p) for p in range(self.num_partitions)]
+            for tp in partitions:
+                self._logs.setdefault(tp, [])
+            return partitions
+
+    def simulate_request(self):
+        """Block for one broker round-trip"""
+        if self.request_latency_ms > 0:
+            time.sleep(self.request_latency_ms / 1000)
+
+    def append(self, tp: TopicPartition, entries: List[Tuple[Any, Any, Any, int]]) -> int:
+        """Append ``(key, value, headers, timestamp)`` entries and return the base offset"""
+        with self._condition:
+            log = self._logs.setdefault(tp, [])
+            base = len(log)
+            for i, (key, value, headers, timestamp) in enumerate(entries):
+                log.append(MemoryRecord(tp.topic, tp.partition, base + i, timestamp, key, value, headers))
+            self._condition.notify_all()
+            return base
+
+    def fetch(self, positions: Dict[TopicPartition, int], max_records: int,
+              timeout_ms: float) -> Dict[TopicPartition, List[MemoryRecord]]:
+        """Return records past ``positions``, waiting up to ``timeout_ms`` for data"""
+        deadline = time.monotonic() + timeout_ms / 1000
+        with self._condition:
+            while True:
+                result = {}
+                remaining = max_records
+                for tp, position in positions.items():
+                    log = self._logs.get(tp, [])
+                    if position < len(log) and remaining > 0:
+                        records = log[position:position + remaining]
+                        result[tp] = records
+                        remaining -= len(records)
+                if result:
+                    return result
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    return {}
+                self._condition.wait(wait)
+
+    def commit(self, group_id: str, offsets: Dict[TopicPartition, int]):
+        with self._condition:
+            for tp, offset in offsets.items():
+                self._committed[(group_id, tp)] = offset
+
+    def committed(self, group_id: str, tp: TopicPartition) -> Optional[int]:
+        """Committed offset for a group, if any"""
+        with self._condition:
+            return self._committed.get((group_id, tp))
+
+    def end_offset(self, tp: TopicPartition) -> int:
+        with self._condition:
+            return len(self._logs.get(tp, []))
+
+    def records(self, topic: str) -> List[MemoryRecord]:
+        """Every record of a topic, partition by partition"""
+        with self._condition:
+            return [record for tp in sorted(self._logs) if tp.topic == topic for record in self._logs[tp]]
+
+    def create_producer(self, **configs) -> "MemoryProducer":
+        """Factory compatible with ``KafkaProducer(**configs)``"""
+        return MemoryProducer(self, **configs)
+
+    def create_consumer(self, *topics: str, **configs) -> "MemoryConsumer":
+        """Factory compatible with ``KafkaConsumer(*topics, **configs)``"""
+        return MemoryConsumer(self, *topics, **configs)
+
+
+class MemoryFuture:
+    """Send future with kafka-python style callbacks"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable] = []
+        self._errbacks: List[Callable] = []
+        self._lock = threading.Lock()
+        self.value = None
+        self.exception = None
+
+    def add_callback(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(lambda value: fn(*args, value, **kwargs))
+                return self
+        if self.exception is None:
+            fn(*args, self.value, **kwargs)
+        return self
+
+    def add_errback(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            if not self._event.is_set():
+                self._errbacks.append(lambda error: fn(*args, error, **kwargs))
+                return self
+        if self.exception is not None:
+            fn(*args, self.exception, **kwargs)
+        return self
+
+    def _resolve(self, value=None, exception=None):
+        with self._lock:
+            self.value, self.exception = value, exception
+            self._event.set()
+            callbacks = self._errbacks if exception is not None else self._callbacks
+        for callback in callbacks:
+            callback(exception if exception is not None else value)
+
+    def get(self, timeout: Optional[float] = None):
+        if not self._event.wait(timeout):
+            raise KafkaTimeoutError("Timeout waiting for send")
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+
+class MemoryProducer:
+    """Producer that batches sends on a sender thread, one request per partition batch"""
+
+    def __init__(self, broker: MemoryBroker, value_serializer: Optional[Callable] = None,
+                 key_serializer: Optional[Callable] = None, linger_ms: float = 0,
+                 batch_size: int = 16384, **_configs):
+        self.broker = broker
+        self.value_serializer = value_serializer
+        self.key_serializer = key_serializer
+        self.linger_ms = linger_ms
+        self.batch_size = batch_size
+        self._round_robin = itertools.count()
+        self._pending: Dict[TopicPartition, List[Tuple[Any, Any, Any, int, MemoryFuture]]] = {}
+        self._pending_bytes = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._in_request = 0
+        self._sender = threading.Thread(target=self._run, name="memory-producer", daemon=True)
+        self._sender.start()
+
+    def send(self, topic: str, value: Any = None, key: Any = None, partition: Optional[int] = None,
+             headers: Optional[List[Tuple[str, bytes]]] = None, timestamp_ms: Optional[int] = None) -> MemoryFuture:
+        if self._closed:
+            raise KafkaTimeoutError("Producer closed")
+        if self.value_serializer is not None:
+            value = self.value_serializer(value)
+        if self.key_serializer is not None:
+            key = self.key_serializer(key)
+
+        partitions = self.broker.partitions_for(topic)
+        if partition is None:
+            if key is not None:
+                partition = zlib.crc32(key if isinstance(key, bytes) else str(key).encode()) % len(partitions)
+            else:
+                partition = next(self._round_robin) % len(partitions)
+
+        future = MemoryFuture()
+        timestamp = timestamp_ms or int(time.time() * 1000)
+        with self._condition:
+            was_empty = not self._pending
+            self._pending.setdefault(partitions[partition], []).append((key, value, headers, timestamp, future))
+            self._pending_bytes += len(value) if isinstance(value, (bytes, str)) else 0
+            if was_empty or self._pending_bytes >= self.batch_size:
+                self._condition.notify_all()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._pending:
+                    return
+                if self.linger_ms and self._pending_bytes < self.batch_size and not self._closed:
+                    self._condition.wait(self.linger_ms / 1000)
+                pending, self._pending, self._pending_bytes = self._pending, {}, 0
+                self._in_request += 1
+                self._condition.notify_all()
+
+            self.broker.produce_requests += 1
+            self.broker.simulate_request()
+            for tp, entries in pending.items():
+                base = self.broker.append(tp, [entry[:4] for entry in entries])
+                for i, (key, value, headers, timestamp, future) in enumerate(entries):
+                    size = len(value) if isinstance(value, (bytes, str)) else -1
+                    future._resolve(MemoryRecordMetadata(tp.topic, tp.partition, base + i, timestamp, size))
+
+            with self._condition:
+                self._in_request -= 1
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify_all()
+            while self._pending or self._in_request:
+                wait = None if deadline is None else deadline - time.monotonic()
+                if wait is not None and wait <= 0:
+                    raise KafkaTimeoutError("Timeout flushing producer")
+                self._condition.wait(wait)
+
+    def close(self, timeout: Optional[float] = None):
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._sender.join(timeout)
+
+
+class MemoryConsumer:
+    """Single-member consumer group assigned every partition of its topics"""
+
+    def __init__(self, broker: MemoryBroker, *topics: str, group_id: str = "default",
+                 value_deserializer: Optional[Callable] = None,
+                 key_deserializer: Optional[Callable] = None,
+                 max_poll_records: int = 500, auto_offset_reset: str = "latest", **_configs):
+        self.broker = broker
+        self.group_id = group_id
+        self.value_deserializer = value_deserializer
+        self.key_deserializer = key_deserializer
+        self.max_poll_records = max_poll_records
+        self.auto_offset_reset = auto_offset_reset
+        self._positions: Dict[TopicPartition, int] = {}
+        self.commit_calls = 0
+        self.subscribe(list(topics))
+
+    def subscribe(self, topics: List[str]):
+        for topic in topics:
+            for tp in self.broker.partitions_for(topic):
+                position = self.broker.committed(self.group_id, tp)
+                if position is None:
+                    position = 0 if self.auto_offset_reset == "earliest" else self.broker.end_offset(tp)
+                self._positions.setdefault(tp, position)
+
+    def assignment(self):
+        return set(self._positions)
+
+    def poll(self, timeout_ms: float = 0, max_records: Optional[int] = None, update_offsets: bool = True):
+        fetched = self.broker.fetch(self._positions, max_records or self.max_poll_records, timeout_ms)
+        result = {}
+        for tp, records in fetched.items():
+            self._positions[tp] = records[-1].offset + 1
+            if self.value_deserializer or self.key_deserializer:
+                records = [
+                    record._replace(
+                        value=self.value_deserializer(record.value) if self.value_deserializer else record.value,
+                        key=self.key_deserializer(record.key) if self.key_deserializer else record.key
+                    )
+                    for record in records
+                ]
+            result[tp] = records
+        return result
+
+    def _committable(self, offsets) -> Dict[TopicPartition, int]:
+        if offsets is None:
+            return dict(self._positions)
+        return {tp: getattr(meta, "offset", meta) for tp, meta in offsets.items()}
+
+    def commit(self, offsets=None):
+        self.commit_calls += 1
+        self.broker.simulate_request()
+        self.broker.commit(self.group_id, self._committable(offsets))
+
+    def commit_async(self, offsets=None, callback: Optional[Callable] = None):
+        self.commit_calls += 1
+        committable = self._committable(offsets)
+        self.broker.commit(self.group_id, committable)
+        if callback:
+            callback(offsets, None)
+
+    def committed(self, tp: TopicPartition) -> Optional[int]:
+        return self.broker.committed(self.group_id, tp)
+
+    def close(self, autocommit: bool = True):
+        pass
@@ -0,0 +1,101 @@
+"""
+Motor-style async adapter over mongomock, for tests and benchmarks
+
+Wraps the part of the motor database/collection/cursor API the MongoDB
+managers use. bulk_write is replayed operation by operation, since mongomock's
+own implementation does not accept the operations of current pymongo.
+"""
+
+from types import SimpleNamespace
+
+import mongomock
+from pymongo import UpdateOne
+
+
+class AsyncCursor:
+    """Motor-style cursor over a mongomock cursor."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args):
+        self.cursor = self.cursor.sort(*args)
+        return self
+
+    def skip(self, count):
+        self.cursor = self.cursor.skip(count)
+        return self
+
+    def limit(self, count):
+        self.cursor = self.cursor.limit(count)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.cursor)[:length]
+
+
+class AsyncCollection:
+    def __init__(self, collection):
+        self.collection = collection
+        self.finds = 0
+        self.aggregates = 0
+
+    def find(self, *args, **kwargs):
+        self.finds += 1
+        return AsyncCursor(self.collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline):
+        self.aggregates += 1
+        return AsyncCursor(iter(self.collection.aggregate(pipeline)))
+
+    async def find_one(self, *args, **kwargs):
+        return self.collection.find_one(*args, **kwargs)
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return self.collection.find_one_and_update(*args, **kwargs)
+
+    async def insert_one(self, document):
+        return self.collection.insert_one(document)
+
+    async def insert_many(self, documents, ordered=True):
+        return self.collection.insert_many(documents, ordered=ordered)
+
+    async def update_one(self, *args, **kwargs):
+        return self.collection.update_one(*args, **kwargs)
+
+    async def delete_many(self, filter_query):
+        return self.collection.delete_many(filter_query)
+
+    async def bulk_write(self, operations, ordered=True):
+        upserted = modified = 0
+        for operation in operations:
+            if not isinstance(operation, UpdateOne):
+                raise NotImplementedError(type(operation).__name__)
+            result = self.collection.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            upserted += result.upserted_id is not None
+            modified += result.modified_count
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+    async def create_index(self, keys, **kwargs):
+        return self.collection.create_index(keys, **kwargs)
+
+    async def estimated_document_count(self):
+        return self.collection.estimated_document_count()
+
+
+class AsyncDatabase:
+    """Collections are created on first attribute access, as with motor."""
+
+    def __init__(self):
+        self._database = mongomock.MongoClient().db
+        self._collections = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name not in self._collections:
+            self._collections[name] = AsyncCollection(self._database[name])
+        return self._collections[name]
+
+    def __getitem__(self, name):
+        return getattr(self, name)
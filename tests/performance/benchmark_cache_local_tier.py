@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Read-path benchmark for CacheManager with and without the L1 tier
+
+Replays a Zipf-distributed read workload and reports reads/sec and Redis
+commands per read, then fires concurrent cache-aside misses at one key and
+reports how many loader calls were made. Uses fakeredis with an injected
+per-command latency unless --redis-url points at a real server.
+
+Usage:
+    python tests/performance/benchmark_cache_local_tier.py
+    python tests/performance/benchmark_cache_local_tier.py --redis-url redis://localhost:6379 --reads 50000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import structlog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.database.redis import RedisManager
+from shared.cache.cache_manager import CacheManager
+from shared.cache.local_cache import LocalCache
+
+
+def make_fake_client(latency_ms: float):
+    import fakeredis.aioredis
+
+    class LatencyRedis(fakeredis.aioredis.FakeRedis):
+        commands = 0
+
+        async def execute_command(self, *args, **options):
+            LatencyRedis.commands += 1
+            await asyncio.sleep(latency_ms / 1000)
+            return await super().execute_command(*args, **options)
+
+    return LatencyRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+
+async def make_manager(args, local: bool) -> CacheManager:
+    redis_manager = RedisManager(args.redis_url or "redis://fake")
+    if args.redis_url:
+        await redis_manager.connect()
+    else:
+        redis_manager.client = make_fake_client(args.latency_ms)
+    local_cache = LocalCache(max_bytes=args.l1_mb * 1024 * 1024, default_ttl=60) if local else None
+    return CacheManager(redis_manager, namespace=f"bench{int(local)}", local_cache=local_cache)
+
+
+async def run_reads(args, local: bool):
+    manager = await make_manager(args, local)
+    payload = {"sentiment": "pro_india", "confidence": 0.93, "tokens": ["x"] * 20}
+    for key in range(args.keys):
+        await manager.set(f"post:{key}", payload, ttl=600)
+
+    rng = np.random.default_rng(3)
+    keys = np.minimum(rng.zipf(args.zipf, args.reads), args.keys) - 1
+    counter = type(manager.redis.client)
+    before = getattr(counter, 'commands', 0)
+
+    start = time.perf_counter()
+    for key in keys:
+        await manager.get(f"post:{key}")
+    elapsed = time.perf_counter() - start
+    commands = getattr(counter, 'commands', 0) - before
+
+    await manager.close()
+    await manager.clear_namespace()
+    return elapsed, commands
+
+
+async def run_herd(args, local: bool):
+    manager = await make_manager(args, local)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+
+    await asyncio.gather(*(manager.cache_aside_get("hot", loader) for _ in range(args.herd)))
+    await manager.close()
+    await manager.clear_namespace()
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CacheManager L1 tier benchmark")
+    parser.add_argument('--redis-url', default=None)
+    parser.add_argument('--latency-ms', type=float, default=0.2, help="injected per-command latency (fakeredis)")
+    parser.add_argument('--keys', type=int, default=1000)
+    parser.add_argument('--reads', type=int, default=20000)
+    parser.add_argument('--zipf', type=float, default=1.2)
+    parser.add_argument('--l1-mb', type=int, default=16)
+    parser.add_argument('--herd', type=int, default=40)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    print(f"{'tier':>10} {'reads/sec':>12} {'cmds/read':>10} {'herd loader calls':>18}")
+    for local in (False, True):
+        elapsed, commands = asyncio.run(run_reads(args, local))
+        calls = asyncio.run(run_herd(args, local))
+        label = "redis+L1" if local else "redis"
+        cmds = f"{commands / args.reads:.3f}" if not args.redis_url else "n/a"
+        print(f"{label:>10} {args.reads / elapsed:>12.0f} {cmds:>10} {calls:>18}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for NLP model loading: eager vs lazy
+
+Starts MultiLanguageNLPService in a fresh interpreter per mode and reports the time
+until the health check passes, RSS at that point, and the latency of the first
+English sentiment request.
+
+* eager: loads what the analyzers used to load in their constructors (the en, hi,
+  bn and ta sentiment pipelines and the language detection pipeline) before the
+  health check.
+* lazy: loads nothing up front; models are loaded by the first requests. With
+  --warmup, the listed models then load in the background after the health check.
+
+Usage:
+    python tests/performance/benchmark_model_startup.py
+    python tests/performance/benchmark_model_startup.py --warmup sentiment:en language-detection
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+EAGER_MODELS = ['sentiment:en', 'sentiment:hi', 'sentiment:bn', 'sentiment:ta', 'language-detection']
+
+
+def rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+async def measure(mode: str, warmup):
+    start = time.perf_counter()
+    from shared.nlp.config import NLPConfig
+    from shared.nlp.nlp_service import MultiLanguageNLPService
+
+    service = MultiLanguageNLPService(NLPConfig(use_gpu=False, model_warmup=warmup))
+    if mode == 'eager':
+        service.model_pool.warm(EAGER_MODELS)
+    health = await service.health_check()
+    ready_seconds = time.perf_counter() - start
+    ready_rss = rss_mb()
+
+    start = time.perf_counter()
+    await service.sentiment_analyzer.analyze_sentiment("The new metro line is great", 'en')
+    first_request_ms = (time.perf_counter() - start) * 1000
+
+    if service.model_pool._warmup_task is not None:
+        await service.model_pool._warmup_task
+    return {
+        'mode': mode,
+        'health': health['overall'],
+        'ready_seconds': ready_seconds,
+        'ready_rss_mb': ready_rss,
+        'first_request_ms': first_request_ms,
+        'final_rss_mb': rss_mb(),
+        'loaded_models': service.model_pool.loaded_models()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NLP model startup time and memory")
+    parser.add_argument('--modes', nargs='+', default=['eager', 'lazy'], choices=['eager', 'lazy'])
+    parser.add_argument('--warmup', nargs='*', default=[], help="model pool names to warm in lazy mode")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(measure(args.child, args.warmup))))
+        return
+
+    print(f"{'mode':<6} {'ready s':>8} {'ready RSS MB':>13} {'first req ms':>13} {'final RSS MB':>13}  loaded")
+    for mode in args.modes:
+        # A fresh interpreter per mode, so imports and RSS are not shared
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', mode, '--warmup', *args.warmup],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<6} {result['ready_seconds']:>8.2f} {result['ready_rss_mb']:>13.0f} "
+              f"{result['first_request_ms']:>13.1f} {result['final_rss_mb']:>13.0f}  "
+              f"{', '.join(result['loaded_models']) or '-'} ({result['health']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Deep-page latency benchmark: skip/limit vs keyset pagination of posts
+
+Fills a posts collection with --docs synthetic posts (once; reused on later
+runs), creates the (timestamp, _id) keyset index, then times fetching page
+--page of --page-size posts with EnhancedMongoDBManager.find_posts_optimized
+(skip) and find_posts_page (continuation token). Reports the median latency
+and the index keys / documents the server examined, from explain().
+
+Needs a running MongoDB server.
+
+Usage:
+    python tests/performance/benchmark_mongodb_pagination.py
+    python tests/performance/benchmark_mongodb_pagination.py --uri mongodb://localhost:27017 --docs 1000000 --page 1000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import structlog
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.database.enhanced_mongodb import (
+    EnhancedMongoDBManager, POST_LIST_PROJECTION, POST_PAGE_SORT,
+    encode_page_cursor, keyset_filter, query_fingerprint
+)
+
+PLATFORMS = ['twitter', 'facebook', 'youtube', 'telegram']
+
+
+async def fill(posts, count: int, batch_size: int = 10000):
+    existing = await posts.estimated_document_count()
+    if existing >= count:
+        return
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    for offset in range(existing, count, batch_size):
+        await posts.insert_many([
+            {
+                'content': f"post {i} " + 'lorem ipsum ' * rng.randint(5, 40),
+                'user_id': f"user_{rng.randint(0, 50000)}",
+                'platform': rng.choice(PLATFORMS),
+                # Several posts per second, so the _id tie-break is exercised
+                'timestamp': start + timedelta(seconds=i // 3),
+                'analysis_results': {'sentiment': rng.choice(['pro_india', 'neutral', 'anti_india']),
+                                     'risk_score': rng.random()},
+                'metrics': {'likes': rng.randint(0, 500)},
+                'raw_payload': 'x' * 500
+            }
+            for i in range(offset, min(offset + batch_size, count))
+        ], ordered=False)
+        print(f"  inserted {min(offset + batch_size, count)}/{count}", flush=True)
+
+
+async def explain(posts, filter_query, skip: int, limit: int):
+    plan = await posts.find(filter_query, POST_LIST_PROJECTION).sort(POST_PAGE_SORT).skip(skip).limit(limit).explain()
+    stats = plan.get('executionStats', {})
+    return stats.get('totalKeysExamined', 'n/a'), stats.get('totalDocsExamined', 'n/a')
+
+
+async def timed(coroutine_factory, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await coroutine_factory()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MongoDB skip vs keyset pagination benchmark")
+    parser.add_argument('--uri', default='mongodb://localhost:27017')
+    parser.add_argument('--database', default='pagination_benchmark')
+    parser.add_argument('--docs', type=int, default=1_000_000)
+    parser.add_argument('--page', type=int, default=1000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    manager = EnhancedMongoDBManager(args.uri, args.database)
+    manager.client = AsyncIOMotorClient(args.uri)
+    manager.database = manager.client[args.database]
+    posts = manager.database.posts
+
+    await fill(posts, args.docs)
+    await posts.create_index([('timestamp', -1), ('_id', -1)], name="timestamp_id_keyset_idx")
+
+    skip = (args.page - 1) * args.page_size
+    filter_query = {}
+    # Position of the last post on the previous page, as a client would hold it
+    previous = await posts.find(filter_query, {'timestamp': 1}).sort(POST_PAGE_SORT).skip(skip - 1).limit(1).to_list(1)
+    projection = dict(POST_LIST_PROJECTION)
+    cursor = encode_page_cursor(previous[0], query_fingerprint(filter_query, projection))
+
+    skip_page = await manager.find_posts_optimized(filter_query, limit=args.page_size, skip=skip, use_cache=False)
+    keyset_page = await manager.find_posts_page(filter_query, limit=args.page_size, cursor=cursor, use_cache=False)
+    assert [doc['_id'] for doc in skip_page] == [doc['_id'] for doc in keyset_page['items']]
+
+    skip_ms = await timed(lambda: manager.find_posts_optimized(
+        filter_query, limit=args.page_size, skip=skip, use_cache=False), args.rounds)
+    keyset_ms = await timed(lambda: manager.find_posts_page(
+        filter_query, limit=args.page_size, cursor=cursor, use_cache=False), args.rounds)
+    first_ms = await timed(lambda: manager.find_posts_page(
+        filter_query, limit=args.page_size, use_cache=False), args.rounds)
+
+    skip_keys, skip_docs = await explain(posts, filter_query, skip, args.page_size)
+    seek = keyset_filter(previous[0]['timestamp'], previous[0]['_id'])
+    keyset_keys, keyset_docs = await explain(posts, seek, 0, args.page_size + 1)
+
+    print(f"{args.docs} posts, page {args.page} of {args.page_size}")
+    print(f"{'method':>10} {'median ms':>10} {'keys examined':>14} {'docs examined':>14}")
+    print(f"{'skip':>10} {skip_ms:>10.2f} {skip_keys:>14} {skip_docs:>14}")
+    print(f"{'keyset':>10} {keyset_ms:>10.2f} {keyset_keys:>14} {keyset_docs:>14}")
+    print(f"{'page 1':>10} {first_ms:>10.2f}")
+    manager.client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for script-based language detection
+
+Compares the previous per-script regex scan (one ``re.findall`` per supported
+script per text) with the single-pass UTF-32 histogram on mixed Devanagari,
+Bengali, Tamil and Latin corpora, and reports texts/sec for script detection
+alone and for LanguageDetector.batch_detect vs detect_language in a loop.
+
+Usage:
+    python tests/performance/benchmark_script_detection.py
+    python tests/performance/benchmark_script_detection.py --texts 100000 --batch-sizes 1 64 1024
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.nlp.language_detector import LanguageDetector
+from shared.nlp.model_pool import ModelPool
+
+SAMPLE_SENTENCES = {
+    'devanagari': [
+        "भारत प्रौद्योगिकी में तेजी से प्रगति कर रहा है",
+        "सोशल मीडिया पर फर्जी खबरें तेजी से फैल रही हैं",
+        "शहर में आज नई मेट्रो लाइन खुली",
+    ],
+    'bengali': [
+        "আজ শহরে নতুন মেট্রো লাইন খুলেছে",
+        "সামাজিক মাধ্যমে ভুয়া খবর দ্রুত ছড়িয়ে পড়ছে",
+    ],
+    'tamil': [
+        "இன்று நகரில் புதிய மெட்ரோ பாதை திறக்கப்பட்டது",
+        "சமூக ஊடகங்களில் போலி செய்திகள் வேகமாக பரவுகின்றன",
+    ],
+    'latin': [
+        "India is making rapid progress in technology",
+        "Fake news is spreading fast on social media, please verify before sharing",
+        "Watching the cricket match with friends tonight #IndvsAus",
+    ],
+}
+
+
+def build_corpus(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    scripts = list(SAMPLE_SENTENCES)
+    corpus = []
+    for _ in range(size):
+        # Mostly single-script posts, some code-mixed with English
+        parts = [rng.choice(SAMPLE_SENTENCES[rng.choice(scripts)])]
+        if rng.random() < 0.3:
+            parts.append(rng.choice(SAMPLE_SENTENCES['latin']))
+        corpus.append(' '.join(parts))
+    return corpus
+
+
+def rate(function, corpus, batch_size=None):
+    start = time.perf_counter()
+    if batch_size is None:
+        for text in corpus:
+            function(text)
+    else:
+        for offset in range(0, len(corpus), batch_size):
+            function(corpus[offset:offset + batch_size])
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Script detection throughput")
+    parser.add_argument('--texts', type=int, default=20000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 256, 4096])
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.texts)
+    detector = LanguageDetector(model_pool=ModelPool())
+
+    legacy = rate(detector._detect_by_script_regex, corpus)
+    print(f"{'mode':<32} {'texts/sec':>12}")
+    print(f"{'regex scan per script':<32} {legacy:>12.0f}")
+    for batch_size in args.batch_sizes:
+        texts_per_second = rate(detector._script_scores, corpus, batch_size)
+        print(f"{f'histogram batch={batch_size}':<32} {texts_per_second:>12.0f}  ({texts_per_second / legacy:.1f}x)")
+
+    single = rate(detector.detect_language, corpus)
+    print(f"{'detect_language loop':<32} {single:>12.0f}")
+    for batch_size in args.batch_sizes[1:]:
+        texts_per_second = rate(detector.batch_detect, corpus, batch_size)
+        print(f"{f'batch_detect batch={batch_size}':<32} {texts_per_second:>12.0f}  ({texts_per_second / single:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+CPU throughput benchmark for batched sentiment inference
+
+Runs the same corpus through a Hugging Face sentiment pipeline with
+BatchInferenceEngine at several tensor batch sizes and reports texts/sec.
+Batch size 1 corresponds to the previous one-forward-pass-per-text behaviour.
+
+Usage:
+    python tests/performance/benchmark_sentiment_batching.py
+    python tests/performance/benchmark_sentiment_batching.py --texts 2000 --batch-sizes 1 8 32 64
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.nlp.batch_inference import BatchInferenceEngine, BatchInferenceConfig, MicroBatcher
+
+SAMPLE_SENTENCES = [
+    "India is making great progress in technology and space research",
+    "The government policies are failing the common people",
+    "Watching the cricket match with friends tonight",
+    "This is propaganda spread by anti-national elements to divide the country",
+    "Proud of our armed forces for their service",
+    "Prices keep rising and nobody is listening to our complaints about it",
+    "New metro line opened in the city today",
+    "Fake news about the border situation is spreading fast on social media, please verify before sharing",
+]
+
+
+def build_corpus(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = ' '.join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(1, 4)))
+        corpus.append(words)
+    return corpus
+
+
+async def run_engine(engine: BatchInferenceEngine, texts):
+    start = time.perf_counter()
+    await engine.infer(texts, ['en'] * len(texts))
+    return time.perf_counter() - start
+
+
+async def run_micro_batched(engine: BatchInferenceEngine, texts, concurrency: int):
+    batcher = MicroBatcher(engine)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(text):
+        async with semaphore:
+            return await batcher.submit(text, 'en')
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in texts))
+    elapsed = time.perf_counter() - start
+    await batcher.close()
+    return elapsed, batcher.get_stats()['average_batch_size']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched sentiment inference throughput")
+    parser.add_argument('--model', default='cardiffnlp/twitter-roberta-base-sentiment-latest')
+    parser.add_argument('--texts', type=int, default=512)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--threads', type=int, default=None, help="torch intra-op threads")
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help="concurrent single-text requests for the micro-batching run")
+    args = parser.parse_args()
+
+    import torch
+    from transformers import pipeline
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    sentiment = pipeline("sentiment-analysis", model=args.model, tokenizer=args.model,
+                         device=-1, return_all_scores=True)
+    texts = build_corpus(args.texts)
+
+    # Warm-up so lazy initialisation is not timed
+    sentiment(texts[:8], batch_size=8, truncation=True)
+
+    print(f"model={args.model} texts={len(texts)} torch_threads={torch.get_num_threads()}")
+    print(f"{'mode':>14} {'batch':>6} {'seconds':>9} {'texts/sec':>10}")
+    for batch_size in args.batch_sizes:
+        engine = BatchInferenceEngine(lambda language: sentiment, BatchInferenceConfig(batch_size=batch_size))
+        elapsed = asyncio.run(run_engine(engine, texts))
+        engine.shutdown()
+        print(f"{'batched':>14} {batch_size:>6} {elapsed:>9.2f} {len(texts) / elapsed:>10.1f}")
+
+    batch_size = max(args.batch_sizes)
+    engine = BatchInferenceEngine(
+        lambda language: sentiment,
+        BatchInferenceConfig(batch_size=batch_size, max_batch_size=batch_size, max_wait_ms=5.0)
+    )
+    elapsed, average_batch = asyncio.run(run_micro_batched(engine, texts, args.concurrency))
+    engine.shutdown()
+    print(f"{'micro-batched':>14} {batch_size:>6} {elapsed:>9.2f} {len(texts) / elapsed:>10.1f}"
+          f"  (avg merged batch {average_batch:.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Trend-query latency benchmark: raw $group pipeline vs sentiment rollups
+
+Writes --posts synthetic analysed posts spread over the last --days days,
+backfills the minute/hour/day rollups, then times
+MongoDBManager.aggregate_sentiment_trends over the whole range (daily) and
+over the last week (hourly), with ragged range edges, grouping the raw posts
+and reading the rollups. Besides the median latency it reports the documents
+each approach has to read (posts in range vs rollup buckets plus the posts in
+the sub-minute edges), and the per-post cost of maintaining the counters on
+insert_post.
+
+Runs in-process on the mongomock adapter unless --uri points at a MongoDB
+server. mongomock scans whole collections for every find and upsert, so its
+timings say little; the documents-read columns do not depend on the backend.
+
+Usage:
+    python tests/performance/benchmark_sentiment_rollups.py
+    python tests/performance/benchmark_sentiment_rollups.py --uri mongodb://localhost:27017 --posts 2000000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import structlog
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from shared.database.mongodb import MongoDBManager
+from shared.database.sentiment_rollups import floor_bucket, plan_trend_query, to_utc_naive
+from tests.mongomock_motor import AsyncDatabase
+
+PLATFORMS = ['twitter', 'facebook', 'youtube', 'telegram']
+SENTIMENTS = ['pro_india', 'neutral', 'anti_india']
+
+
+async def make_manager(args) -> MongoDBManager:
+    manager = MongoDBManager(args.uri or "mongodb://mongomock", args.database)
+    if args.uri:
+        await manager.connect()
+        await manager.database.posts.drop()
+        await manager.database.sentiment_rollups.drop()
+        await manager.database.posts.create_index([("timestamp", 1)])
+    else:
+        manager.database = AsyncDatabase()
+    await manager.sentiment_rollups.ensure_indexes()
+    return manager
+
+
+def synthetic_posts(rng, count: int, start: datetime, span: timedelta):
+    span_ms = int(span.total_seconds() * 1000)
+    return [
+        {
+            'content': f"post {i}",
+            'platform': rng.choice(PLATFORMS),
+            'timestamp': start + timedelta(milliseconds=rng.randrange(span_ms)),
+            'analysis_results': {'sentiment': rng.choice(SENTIMENTS), 'risk_score': rng.random()}
+        }
+        for i in range(count)
+    ]
+
+
+async def fill(manager, args, start: datetime, span: timedelta, batch_size: int = 10000):
+    rng = random.Random(42)
+    for offset in range(0, args.posts, batch_size):
+        count = min(batch_size, args.posts - offset)
+        await manager.database.posts.insert_many(synthetic_posts(rng, count, start, span), ordered=False)
+
+
+async def timed(coroutine_factory, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        begin = time.perf_counter()
+        await coroutine_factory()
+        samples.append((time.perf_counter() - begin) * 1000)
+    return statistics.median(samples)
+
+
+async def count(collection, filter_query) -> int:
+    return len(await collection.find(filter_query, {'_id': 1}).to_list(length=None))
+
+
+async def documents_read(manager, low: datetime, high: datetime, interval: str):
+    low, high = to_utc_naive(low), to_utc_naive(high) + timedelta(milliseconds=1)
+    rollups = manager.sentiment_rollups
+    plan, raw = plan_trend_query(
+        low, high, await rollups.coverage_start(), floor_bucket(to_utc_naive(datetime.utcnow()), 'minute'),
+        'day' if interval == '1d' else 'hour'
+    )
+    posts = manager.database.posts
+    read = 0
+    for granularity, first, last in plan:
+        read += await count(rollups.collection, {'granularity': granularity, 'bucket': {'$gte': first, '$lt': last}})
+    for raw_low, raw_high in raw:
+        read += await count(posts, {'timestamp': {'$gte': raw_low, '$lt': raw_high}})
+    return await count(posts, {'timestamp': {'$gte': low, '$lt': high}}), read
+
+
+def as_counts(rows):
+    return {(row['_id']['date'], row['_id']['sentiment']): row['count'] for row in rows}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sentiment trend rollup benchmark")
+    parser.add_argument('--uri', default=None)
+    parser.add_argument('--database', default='rollup_benchmark')
+    parser.add_argument('--posts', type=int, default=5000, help="raise well beyond this with --uri")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--inserts', type=int, default=200)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    print(f"backend: {'mongodb ' + args.uri if args.uri else 'mongomock (in-process)'}")
+
+    manager = await make_manager(args)
+    now = datetime.utcnow()
+    start = now - timedelta(days=args.days)
+    await fill(manager, args, start, now - start)
+
+    begin = time.perf_counter()
+    summary = await manager.backfill_sentiment_rollups()
+    print(f"backfill: {summary['posts']} posts, {summary['buckets']} bucket updates "
+          f"in {time.perf_counter() - begin:.1f} s")
+
+    queries = [
+        ('30d daily', start + timedelta(minutes=17, seconds=23), now, '1d'),
+        ('7d hourly', now - timedelta(days=7, seconds=41), now, '1h'),
+    ]
+    print(f"\n{'query':>10} {'raw ms':>10} {'rollup ms':>10} {'speedup':>8} {'raw docs':>9} {'rollup docs':>12}")
+    for label, low, high, interval in queries:
+        raw = await manager.aggregate_sentiment_trends(low, high, interval, use_rollups=False)
+        rolled = await manager.aggregate_sentiment_trends(low, high, interval)
+        assert as_counts(raw) == as_counts(rolled)
+        raw_ms = await timed(lambda: manager.aggregate_sentiment_trends(low, high, interval, use_rollups=False),
+                             args.rounds)
+        rollup_ms = await timed(lambda: manager.aggregate_sentiment_trends(low, high, interval), args.rounds)
+        raw_docs, rollup_docs = await documents_read(manager, low, high, interval)
+        print(f"{label:>10} {raw_ms:>10.1f} {rollup_ms:>10.1f} {raw_ms / rollup_ms:>7.1f}x "
+              f"{raw_docs:>9} {rollup_docs:>12}")
+
+    # Ingest cost: plain insert_one vs insert_post with the counter upserts
+    rng = random.Random(7)
+    plain = synthetic_posts(rng, args.inserts, now - timedelta(minutes=5), timedelta(minutes=5))
+    counted = synthetic_posts(rng, args.inserts, now - timedelta(minutes=5), timedelta(minutes=5))
+    begin = time.perf_counter()
+    for post in plain:
+        await manager.database.posts.insert_one(post)
+    plain_us = (time.perf_counter() - begin) / args.inserts * 1e6
+    begin = time.perf_counter()
+    for post in counted:
+        await manager.insert_post(post)
+    counted_us = (time.perf_counter() - begin) / args.inserts * 1e6
+    print(f"\ninsert: {plain_us:.0f} us/post plain, {counted_us:.0f} us/post with rollups")
+
+    if args.uri:
+        await manager.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Throughput and wake-up latency benchmark for TaskQueue backends
+
+For the in-memory backend and the durable SQLite (WAL) backend, measures:
+
+* enqueue throughput, one enqueue call per task and with enqueue_many
+* end-to-end throughput of no-op tasks through the workers, dequeuing one
+  task per backend call and in batches (prefetch)
+* idle-to-dispatch latency: time from enqueue to the task starting on an
+  idle worker, for tasks enqueued in the same process and, for SQLite,
+  through a second connection as another process would
+
+Usage:
+    python tests/performance/benchmark_task_queue.py
+    python tests/performance/benchmark_task_queue.py --tasks 20000 --workers 8 --latency-samples 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import structlog
+
+from shared.async_processing.queue_backends import MemoryQueueBackend, SQLiteQueueBackend
+from shared.async_processing.task_queue import TaskQueue
+
+
+def make_backend(kind, directory, name):
+    if kind == "memory":
+        return MemoryQueueBackend(max_size=10 ** 7)
+    return SQLiteQueueBackend(os.path.join(directory, f"{name}.db"), queue=name)
+
+
+def make_queue(kind, directory, name, prefetch=32):
+    queue = TaskQueue(name, backend=make_backend(kind, directory, name), prefetch=prefetch,
+                      max_results=10 ** 7)
+    done = asyncio.Event()
+    state = {"remaining": 0, "started": []}
+
+    @queue.task("noop")
+    async def noop(index):
+        state["remaining"] -= 1
+        if state["remaining"] == 0:
+            done.set()
+
+    @queue.task("mark")
+    async def mark():
+        state["started"].append(time.perf_counter())
+
+    return queue, done, state
+
+
+async def measure_enqueue(kind, directory, tasks):
+    queue, _, _ = make_queue(kind, directory, f"enqueue-{kind}")
+    start = time.perf_counter()
+    for i in range(tasks):
+        await queue.enqueue("noop", i)
+    single = tasks / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, tasks, 500):
+        await queue.enqueue_many("noop", [(i,) for i in range(offset, min(offset + 500, tasks))])
+    batched = tasks / (time.perf_counter() - start)
+    await queue.backend.close()
+    return single, batched
+
+
+async def measure_processing(kind, directory, tasks, workers, prefetch):
+    queue, done, state = make_queue(kind, directory, f"process-{kind}-{prefetch}", prefetch)
+    for offset in range(0, tasks, 500):
+        await queue.enqueue_many("noop", [(i,) for i in range(offset, min(offset + 500, tasks))])
+    state["remaining"] = tasks
+
+    start = time.perf_counter()
+    await queue.start_workers(workers)
+    await done.wait()
+    elapsed = time.perf_counter() - start
+    await queue.stop_workers()
+    await queue.backend.close()
+    return tasks / elapsed
+
+
+async def measure_latency(kind, directory, workers, samples, external):
+    queue, _, state = make_queue(kind, directory, f"latency-{kind}-{external}")
+    producer = queue
+    if external:
+        # A second connection to the same database stands in for another process
+        producer = TaskQueue(queue.name, backend=SQLiteQueueBackend(queue.backend.path, queue=queue.name))
+        producer.register_task("mark", queue._registered_tasks["mark"])
+
+    await queue.start_workers(workers)
+    latencies = []
+    for _ in range(samples):
+        await asyncio.sleep(0.05)  # workers are idle
+        enqueued = time.perf_counter()
+        await producer.enqueue("mark")
+        while len(state["started"]) <= len(latencies):
+            await asyncio.sleep(0.0005 if not external else 0.005)
+        latencies.append((state["started"][-1] - enqueued) * 1000)
+    await queue.stop_workers()
+    await queue.backend.close()
+    if external:
+        await producer.backend.close()
+    return statistics.median(latencies), max(latencies)
+
+
+async def main_async(args):
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{args.tasks} tasks, {args.workers} workers")
+        for kind in ("memory", "sqlite"):
+            single, batched = await measure_enqueue(kind, directory, args.tasks)
+            print(f"{kind}:")
+            print(f"  enqueue           {single:10,.0f} tasks/s one by one, {batched:10,.0f} tasks/s enqueue_many")
+            for prefetch in (1, 32):
+                throughput = await measure_processing(kind, directory, args.tasks, args.workers, prefetch)
+                print(f"  process prefetch={prefetch:<3} {throughput:10,.0f} tasks/s")
+            median, worst = await measure_latency(kind, directory, args.workers, args.latency_samples, False)
+            print(f"  idle-to-dispatch  median {median:6.2f} ms, max {worst:6.2f} ms (same process)")
+            if kind == "sqlite":
+                median, worst = await measure_latency(kind, directory, args.workers, args.latency_samples, True)
+                print(f"  idle-to-dispatch  median {median:6.2f} ms, max {worst:6.2f} ms (other process, 1 s poll interval)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TaskQueue backend throughput and latency benchmark')
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency-samples', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Test the L1 cache tier, single-flight loads and batched hit statistics."""
+
+import asyncio
+import json
+
+import pytest
+import fakeredis.aioredis
+
+from shared.database.redis import RedisManager
+from shared.cache.cache_manager import CacheManager, L1_EVICT_EVENT
+from shared.cache.cache_policies import CachePolicies
+from shared.cache.invalidation_handler import CacheInvalidationHandler
+from shared.cache.local_cache import LocalCache, SingleFlight
+
+
+class CountingRedis(fakeredis.aioredis.FakeRedis):
+    """Fake Redis client that counts round-trips."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = []
+
+    async def execute_command(self, *args, **options):
+        self.commands.append(args[0])
+        return await super().execute_command(*args, **options)
+
+
+def make_redis_manager(server):
+    manager = RedisManager("redis://fake")
+    manager.client = CountingRedis(server=server, decode_responses=True)
+    return manager
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def cache_manager(server):
+    return CacheManager(make_redis_manager(server), namespace="test",
+                        local_cache=LocalCache(max_bytes=1 << 20, default_ttl=60))
+
+
+class TestLocalCache:
+    """Test LRU eviction and TTL of the in-process tier."""
+
+    def test_evicts_least_recently_used_by_size(self):
+        cache = LocalCache(max_bytes=30, max_entry_bytes=30)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+        cache.get("a")
+        cache.set("c", "z" * 15)
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, "x" * 10)
+        assert cache.size_bytes == 25
+        assert cache.stats.evictions == 1
+
+    def test_entry_ttl_is_capped_by_default_ttl(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("shared.cache.local_cache.time.monotonic", lambda: clock[0])
+        cache = LocalCache(default_ttl=10)
+        cache.set("short", 1, ttl=2)
+        cache.set("long", 2, ttl=3600)
+
+        clock[0] += 5
+        assert cache.get("short") == (False, None)
+        assert cache.get("long") == (True, 2)
+        clock[0] += 6
+        assert cache.get("long") == (False, None)
+
+    def test_pattern_delete(self):
+        cache = LocalCache()
+        cache.set("user:1:profile", {})
+        cache.set("user:2:profile", {})
+        cache.set("post:1", {})
+
+        assert cache.delete_pattern("user:*") == 2
+        assert len(cache) == 1
+
+
+class TestSingleFlight:
+    """Test collapsing of concurrent calls."""
+
+    @pytest.mark.asyncio
+    async def test_failure_is_shared_and_not_cached(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(flight.do("k", failing) for _ in range(5)), return_exceptions=True)
+        assert calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+        assert not flight.in_flight("k")
+
+
+class TestCacheManagerLocalTier:
+    """Test CacheManager with an L1 tier in front of Redis."""
+
+    @pytest.mark.asyncio
+    async def test_hits_are_served_locally_without_round_trips(self, cache_manager):
+        await cache_manager.set("user:1", {"name": "a"}, ttl=300)
+        client = cache_manager.redis.client
+        client.commands.clear()
+
+        for _ in range(100):
+            assert await cache_manager.get("user:1") == {"name": "a"}
+
+        assert client.commands == []
+        assert cache_manager.stats.hits == 100
+        await cache_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_is_a_single_round_trip(self, server):
+        manager = CacheManager(make_redis_manager(server), namespace="test")
+        await manager.set("k", "v")
+        manager.redis.client.commands.clear()
+
+        assert await manager.get("k") == "v"
+        assert manager.redis.client.commands == ["GET"]
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_hit_statistics_are_flushed_in_one_pipeline(self, cache_manager):
+        await cache_manager.set("a", 1)
+        await cache_manager.set("b", 2)
+        for _ in range(3):
+            await cache_manager.get("a")
+        await cache_manager.get("b")
+
+        assert await cache_manager.flush_stats() == 2
+        info = await cache_manager.get_cache_info("a")
+        assert info["hit_count"] == 3
+        assert "last_accessed" in info
+        assert await cache_manager.flush_stats() == 0
+        await cache_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_call_loader_once(self, cache_manager):
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"loaded": True}
+
+        results = await asyncio.gather(*(cache_manager.cache_aside_get("slow", loader) for _ in range(20)))
+
+        assert calls == 1
+        assert all(result == {"loaded": True} for result in results)
+        assert await cache_manager.redis.get("test:cache:slow") == {"loaded": True}
+        await cache_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_writes_on_one_instance_evict_other_instances(self, server):
+        writer = CacheManager(make_redis_manager(server), namespace="test", local_cache=LocalCache())
+        reader = CacheManager(make_redis_manager(server), namespace="test", local_cache=LocalCache())
+        handler = CacheInvalidationHandler(reader, CachePolicies())
+
+        pubsub = await reader.redis.psubscribe("cache_invalidation:*")
+        await pubsub.get_message(timeout=1)  # subscription confirmation
+
+        await writer.set("user:1", "old")
+        assert await reader.get("user:1") == "old"
+        await writer.set("user:1", "new")
+
+        message = await pubsub.get_message(timeout=1)
+        while message is not None:
+            event = json.loads(message["data"])
+            await handler.handle_event(event["event_type"], event["data"], publish=False)
+            message = await pubsub.get_message(timeout=0.1)
+
+        assert await reader.get("user:1") == "new"
+        assert event["event_type"] == L1_EVICT_EVENT
+        await pubsub.aclose()
+        await writer.close()
+        await reader.close()
+
+    @pytest.mark.asyncio
+    async def test_own_evictions_are_ignored(self, cache_manager):
+        await cache_manager.set("k", "v")
+        evicted = cache_manager.evict_local({"origin": cache_manager.instance_id, "keys": ["k"]})
+
+        assert evicted == 0
+        assert cache_manager.local_cache.get("k") == (True, "v")
+
+    @pytest.mark.asyncio
+    async def test_local_copy_expires_with_the_redis_entry(self, server, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("shared.cache.local_cache.time.monotonic", lambda: clock[0])
+        writer = CacheManager(make_redis_manager(server), namespace="test")
+        reader = CacheManager(make_redis_manager(server), namespace="test",
+                              local_cache=LocalCache(default_ttl=60))
+        await writer.set("k", "v", ttl=5)
+
+        assert await reader.get("k") == "v"
+        clock[0] += 6
+        assert reader.local_cache.get("k") == (False, None)
+        await writer.close()
+        await reader.close()
+
+    @pytest.mark.asyncio
+    async def test_listener_skips_its_own_publishes(self, server):
+        local = CacheManager(make_redis_manager(server), namespace="test", local_cache=LocalCache())
+        remote = CacheManager(make_redis_manager(server), namespace="test", local_cache=LocalCache())
+        handler = CacheInvalidationHandler(local, CachePolicies())
+        seen = []
+
+        async def record(data):
+            seen.append(data["source"])
+
+        handler.register_handler("content_updated", record)
+        listener = asyncio.create_task(handler.setup_event_listeners())
+        await asyncio.sleep(0.05)
+
+        await handler.handle_event("content_updated", {"source": "local"})
+        await CacheInvalidationHandler(remote, CachePolicies()).handle_event(
+            "content_updated", {"source": "remote"})
+        await asyncio.sleep(0.1)
+
+        assert seen == ["local", "remote"]
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await local.close()
+        await remote.close()
@@ -0,0 +1,137 @@
+"""
+Tests for keyset pagination and the versioned query cache of EnhancedMongoDBManager
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from shared.database.enhanced_mongodb import EnhancedMongoDBManager, POST_PAGE_SORT
+from tests.mongomock_motor import AsyncDatabase
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def make_manager(posts=250, **kwargs):
+    manager = EnhancedMongoDBManager("mongodb://localhost", "test", **kwargs)
+    manager.database = AsyncDatabase()
+    start = datetime(2024, 3, 1)
+    manager.database.posts.collection.insert_many([
+        {
+            'content': f"post {i}",
+            'platform': 'twitter' if i % 3 else 'facebook',
+            'user_id': f"user_{i % 7}",
+            # Runs of equal timestamps exercise the _id tie-break
+            'timestamp': start + timedelta(minutes=i // 4) if i % 50 else None,
+            'raw_payload': 'x' * 100
+        }
+        for i in range(posts)
+    ])
+    return manager
+
+
+def expected_order(manager, filter_query):
+    return [doc['_id'] for doc in manager.database.posts.collection.find(filter_query).sort(POST_PAGE_SORT)]
+
+
+def collect_pages(manager, filter_query, limit, **kwargs):
+    async def scenario():
+        ids, cursor, pages = [], None, 0
+        while True:
+            page = await manager.find_posts_page(filter_query, limit=limit, cursor=cursor, **kwargs)
+            ids.extend(doc['_id'] for doc in page['items'])
+            pages += 1
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids, pages
+    return run(scenario())
+
+
+@pytest.mark.parametrize("filter_query", [{}, {'platform': 'twitter'}])
+def test_keyset_pages_cover_every_post_once_in_order(filter_query):
+    manager = make_manager()
+    ids, pages = collect_pages(manager, filter_query, limit=40)
+    expected = expected_order(manager, filter_query)
+    assert ids == expected
+    assert pages == -(-len(expected) // 40)
+
+
+def test_keyset_matches_skip_pagination():
+    manager = make_manager()
+
+    async def scenario():
+        first = await manager.find_posts_page({'platform': 'twitter'}, limit=30)
+        second = await manager.find_posts_page({'platform': 'twitter'}, limit=30, cursor=first['next_cursor'])
+        skipped = await manager.find_posts_optimized({'platform': 'twitter'}, limit=30, skip=30)
+        return second['items'], skipped
+
+    keyset, skipped = run(scenario())
+    assert [doc['_id'] for doc in keyset] == [doc['_id'] for doc in skipped]
+
+
+def test_cursor_is_opaque_and_bound_to_its_query():
+    manager = make_manager()
+
+    async def scenario():
+        page = await manager.find_posts_page({'platform': 'twitter'}, limit=10)
+        assert isinstance(page['next_cursor'], str)
+        with pytest.raises(ValueError):
+            await manager.find_posts_page({'platform': 'facebook'}, limit=10, cursor=page['next_cursor'])
+        with pytest.raises(ValueError):
+            await manager.find_posts_page({}, limit=10, cursor="not-a-cursor")
+
+    run(scenario())
+
+
+def test_list_views_fetch_projected_fields_only():
+    manager = make_manager(posts=20)
+
+    async def scenario():
+        default = await manager.find_posts_page({}, limit=5)
+        narrow = await manager.find_posts_page({}, limit=5, projection={'content': 1})
+        following = await manager.find_posts_page({}, limit=5, projection={'content': 1}, cursor=narrow['next_cursor'])
+        return default, narrow, following
+
+    default, narrow, following = run(scenario())
+    assert all('raw_payload' not in doc for doc in default['items'])
+    assert set(narrow['items'][0]) == {'_id', 'content', 'timestamp'}
+    assert following['items'][0]['_id'] == expected_order(manager, {})[5]
+
+
+def test_cache_hits_and_invalidates_on_write():
+    manager = make_manager(posts=20)
+    posts = manager.database.posts
+
+    async def scenario():
+        first = await manager.find_posts_page({}, limit=5)
+        again = await manager.find_posts_page({}, limit=5)
+        assert again is first and posts.finds == 1
+
+        await manager.insert_post({'content': 'new', 'timestamp': datetime(2030, 1, 1)})
+        fresh = await manager.find_posts_page({}, limit=5)
+        assert posts.finds == 2
+        assert fresh['items'][0]['content'] == 'new'
+
+    run(scenario())
+
+
+def test_cache_is_bounded_and_expires():
+    manager = make_manager(posts=20, cache_max_entries=2, cache_ttl=0.05)
+    posts = manager.database.posts
+
+    async def scenario():
+        for skip in range(4):
+            await manager.find_posts_optimized({}, limit=5, skip=skip)
+        assert len(manager._query_cache) == 2
+
+        await manager.find_posts_optimized({}, limit=5, skip=3)
+        assert posts.finds == 4
+        time.sleep(0.06)
+        await manager.find_posts_optimized({}, limit=5, skip=3)
+        assert posts.finds == 5
+
+    run(scenario())
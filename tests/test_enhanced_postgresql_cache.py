@@ -0,0 +1,158 @@
+"""
+Tests for the bounded, table-tagged result cache and pool-wide prepared statements
+of EnhancedPostgreSQLManager
+"""
+
+import asyncio
+
+import pytest
+from asyncpg.exceptions import InterfaceError
+
+from shared.database.enhanced_postgresql import EnhancedPostgreSQLManager, query_digest, statement_tables
+from tests.asyncpg_standin import StandinPool
+
+SELECT_ALERTS = "SELECT id, status FROM alerts WHERE severity = $1 ORDER BY id"
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def make_manager(pool_size=4, **kwargs):
+    manager = EnhancedPostgreSQLManager("postgresql://localhost/test", **kwargs)
+    manager.pool = StandinPool(size=pool_size)
+    manager.pool.db.executescript("""
+        CREATE TABLE alerts (id INTEGER PRIMARY KEY, status TEXT, severity TEXT);
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT);
+        INSERT INTO alerts (status, severity) VALUES ('new', 'high'), ('new', 'low'), ('resolved', 'high');
+        INSERT INTO users (username) VALUES ('analyst');
+    """)
+    return manager
+
+
+def test_statement_tables():
+    assert statement_tables("SELECT * FROM alerts a JOIN users u ON u.id = a.assigned_to").reads == {"alerts", "users"}
+    assert statement_tables("UPDATE alerts a SET status = $1 WHERE id = $2").writes == {"alerts"}
+    assert statement_tables('DELETE FROM public."Alerts" WHERE id = 1').writes == {"alerts"}
+    assert statement_tables("TRUNCATE TABLE alerts, users").writes == {"alerts", "users"}
+    assert statement_tables("SELECT * FROM alerts FOR UPDATE SKIP LOCKED").is_read_only
+    upsert = statement_tables("INSERT INTO users (id) VALUES ($1) ON CONFLICT (id) DO UPDATE SET username = $2")
+    assert upsert.writes == {"users"}
+    assert statement_tables("CALL refresh_everything()").writes_unknown
+    assert statement_tables("VACUUM ANALYZE alerts").is_read_only
+
+
+def test_cache_key_normalizes_sql_and_param_types():
+    assert query_digest("SELECT  *\n FROM alerts WHERE id = $1", (1,)) == query_digest("SELECT * FROM alerts WHERE id = $1", (1,))
+    assert len({query_digest("SELECT $1", (value,)) for value in (1, True, 1.0, "1")}) == 4
+    assert query_digest("SELECT $1", ({"a": 1, "b": 2},)) == query_digest("SELECT $1", ({"b": 2, "a": 1},))
+
+
+def test_reads_are_cached_until_a_read_table_is_written():
+    manager = make_manager()
+    pool = manager.pool
+
+    async def scenario():
+        first = await manager.fetch_optimized(SELECT_ALERTS, "high")
+        trips = pool.round_trips
+        assert await manager.fetch_optimized(SELECT_ALERTS, "high") == first
+        assert pool.round_trips == trips
+
+        users = await manager.fetch_optimized("SELECT id, username FROM users")
+        await manager.execute_optimized("UPDATE alerts SET status = $1 WHERE id = $2", "acknowledged", 1)
+        refreshed = await manager.fetch_optimized(SELECT_ALERTS, "high")
+        assert refreshed[0]["status"] == "acknowledged"
+
+        # Unrelated tables keep their entries
+        trips = pool.round_trips
+        assert await manager.fetch_optimized("SELECT id, username FROM users") == users
+        assert pool.round_trips == trips
+
+        # Base-class write paths invalidate too
+        await manager.execute("INSERT INTO users (username) VALUES ($1)", "second")
+        assert len(await manager.fetch_optimized("SELECT id, username FROM users")) == 2
+
+    run(scenario())
+
+
+def test_writes_through_fetch_are_not_cached():
+    manager = make_manager()
+
+    async def scenario():
+        query = "INSERT INTO users (username) VALUES ($1) RETURNING id"
+        first = await manager.fetchrow_optimized(query, "a")
+        second = await manager.fetchrow_optimized(query, "a")
+        assert first["id"] != second["id"]
+
+    run(scenario())
+
+
+def test_cache_is_byte_bounded():
+    manager = make_manager(cache_max_bytes=16384)
+
+    async def scenario():
+        for i in range(50):
+            await manager.fetch_optimized("SELECT id, status, severity, $1 AS tag FROM alerts", f"tag-{i}" * 10)
+
+    run(scenario())
+    info = manager._query_cache.get_info()
+    assert 0 < info["size_bytes"] <= 16384
+    assert info["evictions"] > 0
+
+
+def test_named_statements_prepare_once_per_connection():
+    manager = make_manager(pool_size=3)
+    pool = manager.pool
+
+    async def scenario():
+        await manager.prepare_statement("alerts_by_severity", SELECT_ALERTS)
+
+        async def use():
+            rows = await manager.execute_prepared("alerts_by_severity", "high", fetch_method="fetch")
+            await asyncio.sleep(0.001)
+            return rows
+
+        results = await asyncio.gather(*(use() for _ in range(30)))
+        assert all(len(rows) == 2 for rows in results)
+
+    run(scenario())
+    assert pool.get_size() == 3
+    # Validated once, then prepared into each connection's statement cache once
+    assert pool.prepares == 1 + 3
+    assert manager._prepared_statements.uses["alerts_by_severity"] == 30
+
+
+def test_named_statements_outlive_the_connection_they_were_prepared_on():
+    manager = make_manager(pool_size=1)
+    pool = manager.pool
+
+    async def scenario():
+        # Statement objects, as in asyncpg, die with their acquisition
+        async with pool.acquire() as conn:
+            statement = await conn.prepare(SELECT_ALERTS)
+        with pytest.raises(InterfaceError):
+            await statement.fetch("high")
+
+        await manager.prepare_statement("alerts_by_severity", SELECT_ALERTS)
+        for severity, count in (("high", 2), ("low", 1), ("high", 2)):
+            rows = await manager.execute_prepared("alerts_by_severity", severity, fetch_method="fetch")
+            assert len(rows) == count
+        assert await manager.execute_prepared("alerts_by_severity", "low", fetch_method="fetchval") == 2
+
+    run(scenario())
+
+
+def test_prepared_and_bulk_writes_invalidate():
+    manager = make_manager()
+
+    async def scenario():
+        await manager.prepare_statement("resolve", "UPDATE alerts SET status = 'resolved' WHERE id = $1")
+        assert len(await manager.fetch_optimized(SELECT_ALERTS, "low")) == 1
+        status = await manager.execute_prepared("resolve", 2)
+        assert status == "UPDATE 1"
+        assert (await manager.fetch_optimized(SELECT_ALERTS, "low"))[0]["status"] == "resolved"
+
+        await manager.bulk_insert_optimized("alerts", ["status", "severity"], [("new", "low")] * 3)
+        assert len(await manager.fetch_optimized(SELECT_ALERTS, "low")) == 4
+
+    run(scenario())
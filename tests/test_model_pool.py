@@ -0,0 +1,195 @@
+"""
+Tests for the lazily loading, memory-bounded NLP model pool
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import shared.nlp.model_pool as model_pool_module
+from shared.nlp.model_pool import ModelPool, ModelPoolConfig, get_model_pool
+from shared.nlp.sentiment_models import MultiLanguageSentimentAnalyzer
+
+
+class FakeModel:
+    def __init__(self, name, size_mb):
+        self.name = name
+        self.size_bytes = int(size_mb * 1024 * 1024)
+
+
+class Loaders:
+    """Counts loader calls; loads sleep briefly so concurrent callers overlap"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, name, size_mb=100, fail=False):
+        def load():
+            self.calls.append(name)
+            time.sleep(self.delay)
+            if fail:
+                raise OSError(f"cannot download {name}")
+            return FakeModel(name, size_mb)
+        return load
+
+
+def make_pool(budget_mb=1000, warmup=None):
+    return ModelPool(
+        ModelPoolConfig(memory_budget_mb=budget_mb, warmup_models=warmup or []),
+        size_estimator=lambda model: model.size_bytes
+    )
+
+
+def test_models_load_on_first_use():
+    pool, loaders = make_pool(), Loaders()
+    pool.register('en', loaders('en'))
+
+    assert not pool.is_loaded('en') and loaders.calls == []
+    first = pool.get('en')
+    assert pool.get('en') is first
+    assert loaders.calls == ['en']
+    assert pool.stats.loads == 1 and pool.stats.hits == 1
+
+    with pytest.raises(KeyError):
+        pool.get('unknown')
+    assert pool.get('hi', loaders('hi')).name == 'hi'
+
+
+def test_registering_a_new_loader_reloads_the_model():
+    pool, loaders = make_pool(), Loaders()
+    cpu_loader = loaders('en')
+    pool.register('en', cpu_loader)
+    pool.get('en')
+
+    # Registering the same loader again keeps the loaded model
+    pool.register('en', cpu_loader)
+    assert pool.is_loaded('en')
+
+    pool.register('en', lambda: FakeModel('en-gpu', 100))
+    assert not pool.is_loaded('en')
+    assert pool.get('en').name == 'en-gpu'
+
+
+def test_global_pool_rejects_a_different_config(monkeypatch):
+    monkeypatch.setattr(model_pool_module, '_model_pool_instance', None)
+    monkeypatch.setattr(model_pool_module, '_model_pool_configured', False)
+    config = ModelPoolConfig(memory_budget_mb=512, warmup_models=['en'])
+    pool = get_model_pool(config)
+
+    assert get_model_pool() is pool
+    assert get_model_pool(ModelPoolConfig(memory_budget_mb=512, warmup_models=['en'])) is pool
+    with pytest.raises(ValueError):
+        get_model_pool(ModelPoolConfig(memory_budget_mb=1024))
+    pool.shutdown()
+
+
+def test_global_pool_takes_the_first_explicit_config(monkeypatch):
+    monkeypatch.setattr(model_pool_module, '_model_pool_instance', None)
+    monkeypatch.setattr(model_pool_module, '_model_pool_configured', False)
+    pool = get_model_pool()
+    pool.size_estimator = lambda model: model.size_bytes
+    loaders = Loaders()
+    pool.register('en', loaders('en', size_mb=300))
+    pool.register('hi', loaders('hi', size_mb=300))
+    pool.get('en')
+    pool.get('hi')
+
+    # A component started first created the pool with the defaults
+    config = ModelPoolConfig(memory_budget_mb=400, warmup_models=['hi'], load_workers=1)
+    assert get_model_pool(config) is pool
+    assert pool.config == config
+    assert pool.loaded_models() == ['hi']
+    assert pool._executor._max_workers == 1
+    with pytest.raises(ValueError):
+        get_model_pool(ModelPoolConfig(memory_budget_mb=1024))
+    pool.shutdown()
+
+
+def test_concurrent_first_loads_are_shared():
+    pool, loaders = make_pool(), Loaders(delay=0.1)
+    pool.register('en', loaders('en'))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.get('en'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loaders.calls == ['en']
+    assert len(results) == 8 and all(result is results[0] for result in results)
+    assert pool.stats.shared_loads == 7
+
+
+def test_failed_loads_propagate_and_are_retried():
+    pool, loaders = make_pool(), Loaders(delay=0.05)
+    pool.register('bn', loaders('bn', fail=True))
+
+    errors = []
+
+    def load():
+        try:
+            pool.get('bn')
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=load) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3 and loaders.calls == ['bn']
+    with pytest.raises(OSError):
+        pool.get('bn')
+    assert loaders.calls == ['bn', 'bn'] and pool.stats.failed_loads == 2
+
+
+def test_least_recently_used_models_are_evicted_over_budget():
+    pool, loaders = make_pool(budget_mb=250), Loaders()
+    for name in ('en', 'hi', 'bn'):
+        pool.register(name, loaders(name))
+
+    pool.get('en')
+    pool.get('hi')
+    pool.get('en')
+    pool.get('bn')
+
+    assert pool.loaded_models() == ['en', 'bn']
+    assert pool.stats.evictions == 1
+    assert pool.get_stats()['memory_mb'] == pytest.approx(200)
+
+    # A model larger than the budget is still kept while it is the only one in use
+    pool.register('xl', loaders('xl', size_mb=400))
+    pool.get('xl')
+    assert pool.loaded_models() == ['xl']
+
+
+@pytest.mark.asyncio
+async def test_background_warmup_and_async_get():
+    pool, loaders = make_pool(warmup=['en', 'missing', 'hi']), Loaders(delay=0.05)
+    pool.register('en', loaders('en'))
+    pool.register('hi', loaders('hi'))
+
+    task = pool.start_warmup()
+    assert pool.start_warmup() is task
+    # A request during warm-up shares the in-flight load
+    model = await pool.aget('en')
+
+    assert await task == ['en', 'hi']
+    assert model is pool.get('en')
+    assert loaders.calls == ['en', 'hi']
+    assert make_pool().start_warmup() is None
+
+
+def test_sentiment_analyzer_does_not_load_models_eagerly():
+    pool = make_pool()
+    analyzer = MultiLanguageSentimentAnalyzer(use_gpu=False, micro_batching=False, model_pool=pool)
+
+    assert pool.stats.loads == 0
+    assert pool.is_registered('sentiment:en') and pool.is_registered('sentiment:hi')
+    assert analyzer.pipelines == {}
+    assert analyzer.get_model_info('hi') == {'language': 'hi', 'loaded': False, 'available': True}
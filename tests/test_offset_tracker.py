@@ -0,0 +1,51 @@
+"""Test committable offset bookkeeping shared by the Kafka consumers."""
+
+from kafka.structs import TopicPartition
+
+from shared.messaging import PartitionOffsetTracker
+
+
+def test_out_of_order_completion_waits_for_earlier_offsets():
+    tracker = PartitionOffsetTracker()
+    tp = TopicPartition("events", 0)
+    for offset in (10, 11, 12):
+        tracker.track(tp, offset)
+
+    tracker.complete(tp, 12)
+    tracker.complete(tp, 11)
+    assert tracker.take_committable() == {}
+
+    tracker.complete(tp, 10)
+    assert tracker.take_committable() == {tp: 13}
+    assert tracker.pending_count() == 0
+
+
+def test_partitions_advance_independently_and_failed_commits_are_retried():
+    tracker = PartitionOffsetTracker()
+    for offset in (10, 11, 12, 14):
+        tracker.track("p0", offset)
+    tracker.track("p1", 0)
+
+    tracker.complete("p0", 11)
+    tracker.complete("p0", 14)
+    assert tracker.take_committable() == {}
+
+    tracker.complete("p0", 10)
+    tracker.complete("p1", 0)
+    offsets = tracker.take_committable()
+    assert offsets == {"p0": 12, "p1": 1}
+    assert tracker.take_committable() == {}
+
+    # A failed commit is offered again, merged with later progress
+    tracker.complete("p0", 12)
+    tracker.restore(offsets)
+    assert tracker.take_committable() == {"p0": 15, "p1": 1}
+    assert tracker.pending_count() == 0
+
+
+def test_unknown_completions_are_ignored():
+    tracker = PartitionOffsetTracker()
+    tracker.complete("p0", 3)
+
+    assert tracker.take_committable() == {}
+    assert tracker.pending_count() == 0
@@ -0,0 +1,96 @@
+"""
+Tests for single-pass script detection and batched transformer fallback
+"""
+
+import random
+
+import pytest
+
+from shared.nlp.language_detector import SCRIPT_NAMES, LanguageDetector, script_histograms
+from shared.nlp.model_pool import ModelPool
+
+
+class FakeTransformerDetector:
+    """Language detection pipeline stand-in that records its calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [
+            [{'label': 'mr', 'score': 0.95}, {'label': 'en', 'score': 0.05}] if 'मराठी' in text
+            else [{'label': 'en', 'score': 0.99}]
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def detector():
+    pool = ModelPool()
+    fake = FakeTransformerDetector()
+    detector = LanguageDetector(model_pool=pool)
+    pool.register(LanguageDetector.TRANSFORMER_MODEL, lambda: fake)
+    detector._transformer_available = True
+    return detector, fake
+
+
+def test_script_histograms():
+    counts, alphabetic = script_histograms(["नमस्ते दुनिया", "আমি ভাত খাই", "hello 😀 𐐀", "", "தமிழ் and English"])
+
+    column = {name: index for index, name in enumerate(SCRIPT_NAMES)}
+    assert counts[0, column['devanagari']] == 12 and counts[0].sum() == 12
+    assert counts[1, column['bengali']] == 9
+    assert counts[2].sum() == 0 and alphabetic[2] == 6  # The Deseret letter is alphabetic, the emoji is not
+    assert counts[3].sum() == 0 and alphabetic[3] == 0
+    assert counts[4, column['tamil']] == 5 and alphabetic[4] == 3 + 10  # Tamil vowel signs are not isalpha
+
+
+def test_matches_per_script_regex_scan():
+    rng = random.Random(5)
+    ranges = [(0x0900, 0x097F), (0x0980, 0x09FF), (0x0B80, 0x0BFF), (0x0600, 0x06FF),
+              (0x0A00, 0x0DFF), (0x61, 0x7A), (0x20, 0x20), (0x1F600, 0x1F64F)]
+    texts = [
+        ''.join(chr(rng.randint(*rng.choice(ranges))) for _ in range(rng.randint(0, 40)))
+        for _ in range(2000)
+    ]
+    detector = LanguageDetector(model_pool=ModelPool())
+
+    for text, result in zip(texts, detector._script_scores(texts)):
+        expected = detector._detect_by_script_regex(text)
+        assert (result is None) == (expected is None)
+        if expected:
+            assert result[0] == expected[0]
+            assert result[1] == pytest.approx(expected[1])
+
+
+def test_decisive_scripts_skip_the_transformer(detector):
+    detector, fake = detector
+    texts = [
+        "यह एक हिंदी वाक्य है।",
+        "এটি একটি বাংলা বাক্য।",
+        "This is an English sentence.",
+        "मराठी mixed with English words here",
+        "",
+        "இது தமிழ்"
+    ]
+
+    results = detector.batch_detect(texts)
+
+    # Only the texts without a decisive script reach the model, in one call
+    assert fake.calls == [[texts[2], texts[3]]]
+    assert [r.language for r in results] == ['hi', 'bn', 'en', 'mr', 'unknown', 'ta']
+    assert results[3].confidence == 0.95
+    assert results[0].script == 'devanagari' and results[5].script == 'tamil'
+
+
+def test_single_text_detection_uses_the_same_path(detector):
+    detector, fake = detector
+
+    assert detector.detect_language("यह एक हिंदी वाक्य है।").language == 'hi'
+    assert fake.calls == []
+    assert detector.detect_language("ab").language == 'unknown'
+
+    detector.decisive_script_ratio = float('inf')
+    detector.detect_language("यह एक हिंदी वाक्य है।")
+    assert len(fake.calls) == 1
@@ -0,0 +1,145 @@
+"""
+Tests for batched sentiment inference and micro-batching
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from shared.nlp.batch_inference import BatchInferenceEngine, BatchInferenceConfig, MicroBatcher
+
+
+class FakePipeline:
+    """Sentiment pipeline stand-in that records every forward pass"""
+
+    def __init__(self, language):
+        self.language = language
+        self.calls = []
+        self.threads = set()
+
+    def __call__(self, texts, batch_size=None, truncation=True, max_length=512):
+        self.calls.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        if any('explode' in text for text in texts):
+            raise RuntimeError("forward pass failed")
+        return [
+            [
+                {'label': 'positive', 'score': 0.9 if 'good' in text else 0.1},
+                {'label': 'negative', 'score': 0.1 if 'good' in text else 0.9},
+            ]
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def pipelines():
+    return {}
+
+
+@pytest.fixture
+def engine(pipelines):
+    def loader(language):
+        return pipelines.setdefault(language, FakePipeline(language))
+
+    engine = BatchInferenceEngine(loader, BatchInferenceConfig(batch_size=4, max_batch_size=16, max_wait_ms=20))
+    yield engine
+    engine.shutdown()
+
+
+class TestBatchInferenceEngine:
+    """Test grouped, length-sorted batch inference"""
+
+    @pytest.mark.asyncio
+    async def test_groups_by_language_and_preserves_order(self, engine, pipelines):
+        texts = ['good one', 'bad', 'अच्छा good', 'bad bad bad', 'good', 'खराब']
+        languages = ['en', 'en', 'hi', 'en', 'en', 'hi']
+
+        outputs = await engine.infer(texts, languages)
+
+        assert len(outputs) == len(texts)
+        for text, output in zip(texts, outputs):
+            positive = output[0]['score']
+            assert positive == (0.9 if 'good' in text else 0.1)
+        assert len(pipelines['en'].calls) == 1
+        assert len(pipelines['hi'].calls) == 1
+        assert pipelines['en'].threads == pipelines['hi'].threads
+        assert threading.current_thread().name not in pipelines['en'].threads
+
+    @pytest.mark.asyncio
+    async def test_sorts_by_length_into_fixed_batches(self, engine, pipelines):
+        texts = [' '.join(['w'] * n) for n in (9, 1, 7, 3, 5, 2)]
+        await engine.infer(texts, ['en'] * len(texts))
+
+        calls = pipelines['en'].calls
+        assert [len(batch) for batch in calls] == [4, 2]
+        lengths = [len(text.split()) for batch in calls for text in batch]
+        assert lengths == sorted(lengths)
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_reports_exception_per_text(self, engine):
+        outputs = await engine.infer(['good', 'explode'], ['en', 'en'])
+        assert all(isinstance(output, RuntimeError) for output in outputs)
+
+
+class TestMicroBatcher:
+    """Test merging of concurrent single-text requests"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_forward_passes(self, engine, pipelines):
+        batcher = MicroBatcher(engine)
+        texts = [f"good text {i}" if i % 2 else f"bad text {i}" for i in range(12)]
+
+        outputs = await asyncio.gather(*(batcher.submit(text, 'en') for text in texts))
+        await batcher.close()
+
+        for text, output in zip(texts, outputs):
+            assert output[0]['score'] == (0.9 if 'good' in text else 0.1)
+        assert batcher.batches_flushed == 1
+        assert batcher.get_stats()['average_batch_size'] == 12
+        assert len(pipelines['en'].calls) == 3  # 12 texts in batches of 4
+
+    @pytest.mark.asyncio
+    async def test_error_is_raised_to_caller(self, engine):
+        batcher = MicroBatcher(engine)
+        with pytest.raises(RuntimeError):
+            await batcher.submit('explode', 'en')
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_flushed_without_waiting(self, engine):
+        batcher = MicroBatcher(engine, BatchInferenceConfig(max_batch_size=4, max_wait_ms=10_000))
+
+        outputs = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(f"good {i}", 'en') for i in range(4))), timeout=1
+        )
+        await batcher.close()
+
+        assert len(outputs) == 4
+        assert batcher.get_stats()['batches_flushed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_is_flushed_after_max_wait(self, engine):
+        batcher = MicroBatcher(engine, BatchInferenceConfig(max_batch_size=16, max_wait_ms=20))
+
+        output = await asyncio.wait_for(batcher.submit('good', 'en'), timeout=1)
+        await batcher.close()
+
+        assert output[0]['score'] == 0.9
+        assert batcher.batches_flushed == 1 and batcher.requests_merged == 1
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_requests(self, engine, pipelines):
+        batcher = MicroBatcher(engine, BatchInferenceConfig(max_batch_size=16, max_wait_ms=10_000))
+        requests = [asyncio.create_task(batcher.submit(f"good {i}", 'en')) for i in range(3)]
+        await asyncio.sleep(0.01)
+        assert not any(request.done() for request in requests)
+
+        await asyncio.wait_for(batcher.close(), timeout=1)
+
+        outputs = [request.result() for request in requests]
+        assert all(output[0]['score'] == 0.9 for output in outputs)
+        assert pipelines['en'].calls == [['good 0', 'good 1', 'good 2']]
+        # A closed batcher starts a new flush task on the next request
+        assert (await batcher.submit('bad', 'en'))[0]['score'] == 0.1
+        await batcher.close()
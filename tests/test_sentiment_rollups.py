@@ -0,0 +1,236 @@
+"""
+Tests for the pre-aggregated sentiment trend rollups of MongoDBManager
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from shared.database.enhanced_mongodb import EnhancedMongoDBManager
+from shared.database.mongodb import MongoDBManager
+from shared.database.sentiment_rollups import SentimentRollups, plan_trend_query
+from tests.mongomock_motor import AsyncDatabase
+
+SENTIMENTS = ['pro_india', 'neutral', 'anti_india']
+PLATFORMS = ['twitter', 'facebook', 'telegram']
+START = datetime(2024, 3, 1)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_manager(now=START, manager_class=MongoDBManager):
+    manager = manager_class("mongodb://localhost", "test")
+    manager.database = AsyncDatabase()
+    clock = Clock(now)
+    manager._rollups = SentimentRollups(manager.database, clock=clock)
+    return manager, clock
+
+
+def synthetic_posts(count, start=START, span=timedelta(days=3), seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            'content': f"post {i}",
+            'platform': rng.choice(PLATFORMS),
+            'timestamp': start + timedelta(milliseconds=rng.randrange(int(span.total_seconds() * 1000))),
+            'analysis_results': {'sentiment': rng.choice(SENTIMENTS)}
+        }
+        for i in range(count)
+    ]
+
+
+def trends(manager, start, end, interval, use_rollups=True):
+    return run(manager.aggregate_sentiment_trends(start, end, interval, use_rollups=use_rollups))
+
+
+def as_counts(rows):
+    return {(row['_id']['date'], row['_id']['sentiment']): row['count'] for row in rows}
+
+
+def test_plan_covers_range_with_largest_buckets():
+    start, end = datetime(2024, 3, 1, 10, 37, 20), datetime(2024, 3, 4, 5, 12, 30)
+    rollups, raw = plan_trend_query(start, end, coverage_start=START, open_start=datetime(2024, 4, 1))
+    assert rollups == [
+        ('minute', datetime(2024, 3, 1, 10, 38), datetime(2024, 3, 1, 11)),
+        ('hour', datetime(2024, 3, 1, 11), datetime(2024, 3, 2)),
+        ('day', datetime(2024, 3, 2), datetime(2024, 3, 4)),
+        ('hour', datetime(2024, 3, 4), datetime(2024, 3, 4, 5)),
+        ('minute', datetime(2024, 3, 4, 5), datetime(2024, 3, 4, 5, 12)),
+    ]
+    assert raw == [(start, datetime(2024, 3, 1, 10, 38)), (datetime(2024, 3, 4, 5, 12), end)]
+
+    # Hourly trends never read day buckets
+    hourly, _ = plan_trend_query(start, end, START, datetime(2024, 4, 1), granularity="hour")
+    assert [granularity for granularity, _, _ in hourly] == ['minute', 'hour', 'minute']
+
+
+def test_plan_falls_back_to_raw_outside_coverage():
+    start, end = datetime(2024, 3, 1), datetime(2024, 3, 3)
+    assert plan_trend_query(start, end, None, end) == ([], [(start, end)])
+    # Before coverage and from the open minute on, posts are aggregated directly
+    rollups, raw = plan_trend_query(start, end, datetime(2024, 3, 1, 12), datetime(2024, 3, 2, 23, 59))
+    assert rollups == [
+        ('hour', datetime(2024, 3, 1, 12), datetime(2024, 3, 2, 23)),
+        ('minute', datetime(2024, 3, 2, 23), datetime(2024, 3, 2, 23, 59)),
+    ]
+    assert raw == [(start, datetime(2024, 3, 1, 12)), (datetime(2024, 3, 2, 23, 59), end)]
+
+
+@pytest.mark.parametrize("interval", ["1d", "1h"])
+def test_rollup_trends_match_raw_aggregation(interval):
+    manager, clock = make_manager()
+    posts = manager.database.posts
+
+    async def ingest():
+        for post in synthetic_posts(600):
+            await manager.insert_post(post)
+        # Inclusive end of the queried range
+        await manager.insert_post({'platform': 'twitter', 'timestamp': datetime(2024, 3, 3, 17, 45, 10),
+                                   'analysis_results': {'sentiment': 'neutral'}})
+
+    run(ingest())
+    clock.now = START + timedelta(days=10)
+    start, end = datetime(2024, 3, 1, 6, 30, 15), datetime(2024, 3, 3, 17, 45, 10)
+
+    aggregates = posts.aggregates
+    rolled = trends(manager, start, end, interval)
+    # Only the two sub-minute edges are read from posts
+    assert posts.aggregates - aggregates == 2
+    assert as_counts(rolled) == as_counts(trends(manager, start, end, interval, use_rollups=False))
+    assert [row['_id']['date'] for row in rolled] == sorted(row['_id']['date'] for row in rolled)
+
+
+def test_reanalysis_moves_post_between_counters():
+    manager, clock = make_manager()
+    posts = manager.database.posts.collection
+
+    async def scenario():
+        await manager.insert_post({'platform': 'twitter', 'timestamp': datetime(2024, 3, 1, 9),
+                                   'analysis_results': {'sentiment': 'neutral'}})
+        await manager.insert_post({'platform': 'twitter', 'timestamp': datetime(2024, 3, 1, 10)})
+        clock.now = START + timedelta(days=1)
+        analysed = posts.find_one({'timestamp': datetime(2024, 3, 1, 9)})['_id']
+        assert await manager.update_post_analysis(analysed, {'sentiment': 'anti_india', 'risk_score': 0.9})
+        assert not await manager.update_post_analysis(analysed, {'sentiment': 'anti_india', 'risk_score': 0.9})
+        assert not await manager.update_post_analysis('missing', {'sentiment': 'neutral'})
+        # First analysis of a post ingested without one
+        unanalysed = posts.find_one({'timestamp': datetime(2024, 3, 1, 10)})['_id']
+        await manager.update_post_analysis(unanalysed, {'sentiment': 'pro_india'})
+
+    run(scenario())
+    rows = trends(manager, START, START + timedelta(hours=23), "1d")
+    assert as_counts(rows) == {('2024-03-01', 'anti_india'): 1, ('2024-03-01', 'pro_india'): 1}
+    day = manager.database.sentiment_rollups.collection.find_one({'_id': 'day:2024-03-01T00:00:00'})
+    assert day['total'] == 2 and day['sentiment']['neutral'] == 0
+
+
+def test_backfill_counts_posts_written_before_rollups():
+    manager, clock = make_manager(now=START + timedelta(days=5, seconds=30))
+    posts = manager.database.posts
+    posts.collection.insert_many(synthetic_posts(500, span=timedelta(days=4)))
+
+    async def scenario():
+        # First ingest through the manager starts coverage at the next minute
+        await manager.insert_post({'platform': 'facebook', 'timestamp': clock.now + timedelta(minutes=5),
+                                   'analysis_results': {'sentiment': 'neutral'}})
+        assert await manager.sentiment_rollups.coverage_start() == START + timedelta(days=5, minutes=1)
+        before = await manager.aggregate_sentiment_trends(START, START + timedelta(days=6), "1d")
+
+        summary = await manager.backfill_sentiment_rollups()
+        assert summary['posts'] == 500
+        assert await manager.sentiment_rollups.coverage_start(refresh=True) == posts.collection.find_one(
+            sort=[('timestamp', 1)])['timestamp'].replace(second=0, microsecond=0)
+        return before
+
+    before = run(scenario())
+    clock.now = START + timedelta(days=7)
+    aggregates = posts.aggregates
+    after = trends(manager, START, START + timedelta(days=6), "1d")
+    assert posts.aggregates - aggregates <= 2
+    assert as_counts(after) == as_counts(before)
+    assert as_counts(after) == as_counts(trends(manager, START, START + timedelta(days=6), "1d", use_rollups=False))
+
+
+def test_null_sentiment_is_not_counted():
+    manager, clock = make_manager(now=START + timedelta(days=2))
+    unanalysed = {'platform': 'twitter', 'timestamp': datetime(2024, 3, 1, 9), 'analysis_results': {'sentiment': None}}
+    manager.database.posts.collection.insert_one(dict(unanalysed))
+
+    async def scenario():
+        await manager.insert_post(dict(unanalysed))
+        await manager.insert_post({'platform': 'twitter', 'timestamp': datetime(2024, 3, 1, 10),
+                                   'analysis_results': {'sentiment': 'neutral'}})
+        return await manager.backfill_sentiment_rollups()
+
+    # Only the analysed post, which predates coverage
+    assert run(scenario())['posts'] == 1
+    expected = {('2024-03-01', 'neutral'): 1}
+    assert as_counts(trends(manager, START, START + timedelta(days=1), "1d", use_rollups=False)) == expected
+    clock.now = START + timedelta(days=3)
+    assert as_counts(trends(manager, START, START + timedelta(days=1), "1d")) == expected
+
+
+def test_bulk_insert_updates_rollups():
+    manager, clock = make_manager(now=START - timedelta(days=1), manager_class=EnhancedMongoDBManager)
+    posts = synthetic_posts(200)
+    posts[5]['analysis_results'] = {}
+    duplicate = {'_id': 'dup', 'platform': 'twitter', 'timestamp': START, 'analysis_results': {'sentiment': 'neutral'}}
+
+    async def scenario():
+        await manager.bulk_insert_optimized('posts', posts, batch_size=64)
+        await manager.database.posts.insert_one(dict(duplicate))
+        # The unordered batch lands around the duplicate and those posts are still counted
+        with pytest.raises(BulkWriteError):
+            await manager.bulk_insert_optimized('posts', [dict(duplicate)] + synthetic_posts(10, seed=3))
+
+    run(scenario())
+    clock.now = START + timedelta(days=10)
+    end = START + timedelta(days=3)
+    rolled = trends(manager, START, end, "1d")
+    assert sum(row['count'] for row in rolled) == 199 + 10
+    # Only the duplicate's own insert_one bypassed the counters
+    raw = as_counts(trends(manager, START, end, "1d", use_rollups=False))
+    raw[('2024-03-01', 'neutral')] -= 1
+    assert as_counts(rolled) == raw
+
+
+def test_open_minute_is_aggregated_from_posts():
+    now = datetime(2024, 3, 2, 12, 30, 40)
+    manager, clock = make_manager(now=START)
+
+    async def scenario():
+        await manager.insert_post({'platform': 'twitter', 'timestamp': datetime(2024, 3, 2, 12, 29),
+                                   'analysis_results': {'sentiment': 'neutral'}})
+        # Written straight to posts, so only a raw read of the open minute sees it
+        manager.database.posts.collection.insert_one({'platform': 'twitter', 'timestamp': datetime(2024, 3, 2, 12, 30, 5),
+                                                      'analysis_results': {'sentiment': 'pro_india'}})
+        clock.now = now
+        return await manager.aggregate_sentiment_trends(START, now, "1h")
+
+    rows = run(scenario())
+    assert as_counts(rows) == {('2024-03-02 12:00:00', 'neutral'): 1, ('2024-03-02 12:00:00', 'pro_india'): 1}
+
+
+def test_platform_trends():
+    manager, clock = make_manager()
+    run(manager.sentiment_rollups.record([
+        {'platform': 'tele.gram', 'timestamp': datetime(2024, 3, 1, 1), 'analysis_results': {'sentiment': 'neutral'}},
+        {'timestamp': datetime(2024, 3, 1, 2), 'analysis_results': {'sentiment': 'neutral'}},
+        {'platform': 'twitter', 'timestamp': datetime(2024, 3, 1, 3)}
+    ]))
+    clock.now = START + timedelta(days=2)
+    rows = run(manager.aggregate_platform_trends(START, START + timedelta(days=1), "1d"))
+    assert {(row['_id']['platform'], row['count']) for row in rows} == {('tele.gram', 1), ('unknown', 1)}
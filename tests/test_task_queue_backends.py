@@ -0,0 +1,328 @@
+"""
+Tests for TaskQueue storage backends, priorities, redelivery and result retention
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from shared.async_processing.queue_backends import MemoryQueueBackend, ResultStore, SQLiteQueueBackend
+from shared.async_processing.task_queue import TaskConfig, TaskQueue, TaskStatus
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def factory(**kwargs):
+        if request.param == "memory":
+            return MemoryQueueBackend()
+        return SQLiteQueueBackend(str(tmp_path / "tasks.db"), **kwargs)
+    return factory
+
+
+def test_priorities_run_first_and_results_are_awaited(make_backend):
+    async def scenario():
+        queue = TaskQueue("test", backend=make_backend())
+        order = []
+
+        @queue.task("record")
+        async def record(label):
+            order.append(label)
+            return label.upper()
+
+        low = [await queue.enqueue("record", f"low{i}") for i in range(3)]
+        high = await queue.enqueue("record", "high", config=TaskConfig(priority=5))
+        await queue.start_workers(1)
+        results = [await queue.get_result(task_id, timeout=5) for task_id in low + [high]]
+        await queue.stop_workers()
+        await queue.backend.close()
+        return order, results
+
+    order, results = run(scenario())
+    assert order == ["high", "low0", "low1", "low2"]
+    assert [result.result for result in results] == ["LOW0", "LOW1", "LOW2", "HIGH"]
+    assert all(result.status == TaskStatus.SUCCESS for result in results)
+
+
+def test_idle_workers_are_woken_by_enqueue(make_backend):
+    async def scenario():
+        # A long poll interval shows that wake-ups come from the enqueue
+        queue = TaskQueue("test", backend=make_backend(poll_interval=30))
+        started = []
+
+        @queue.task("mark")
+        async def mark():
+            started.append(time.perf_counter())
+
+        await queue.start_workers(2)
+        await asyncio.sleep(0.05)
+        enqueued = time.perf_counter()
+        task_id = await queue.enqueue("mark")
+        await queue.get_result(task_id, timeout=5)
+        await queue.stop_workers()
+        await queue.backend.close()
+        return started[0] - enqueued
+
+    assert run(scenario()) < 0.05
+
+
+def test_failed_tasks_are_retried_through_the_backend(make_backend):
+    async def scenario():
+        queue = TaskQueue("test", backend=make_backend())
+        attempts = []
+
+        @queue.task("flaky")
+        async def flaky():
+            attempts.append(time.perf_counter())
+            if len(attempts) < 3:
+                raise RuntimeError("try again")
+            return "ok"
+
+        task_id = await queue.enqueue("flaky", config=TaskConfig(max_retries=3, retry_delay=0.02, retry_backoff=2))
+        await queue.start_workers(1)
+        result = await queue.get_result(task_id, timeout=5)
+        size = queue.backend.qsize()
+        await queue.stop_workers()
+        await queue.backend.close()
+        return result, attempts, size
+
+    result, attempts, size = run(scenario())
+    assert result.status == TaskStatus.SUCCESS and result.retry_count == 2
+    assert attempts[2] - attempts[1] >= 0.04
+    assert size == 0
+
+
+def test_cancelled_pending_task_never_runs(make_backend):
+    async def scenario():
+        queue = TaskQueue("test", backend=make_backend())
+        ran = []
+
+        @queue.task("work")
+        async def work(value):
+            ran.append(value)
+
+        keep = await queue.enqueue("work", 1)
+        drop = await queue.enqueue("work", 2)
+        assert await queue.cancel_task(drop)
+        await queue.start_workers(1)
+        await queue.get_result(keep, timeout=5)
+        await queue.stop_workers()
+        await queue.backend.close()
+        return ran, queue._results[drop].status
+
+    ran, status = run(scenario())
+    assert ran == [1] and status == TaskStatus.CANCELLED
+
+
+def test_prefetched_tasks_run_once_when_the_buffer_outlasts_the_lease(make_backend):
+    async def scenario():
+        # 32 prefetched tasks of 50 ms take longer than one lease to drain
+        queue = TaskQueue("test", backend=make_backend(), prefetch=32, visibility_timeout=0.3)
+        runs = []
+
+        @queue.task("work")
+        async def work(value):
+            runs.append(value)
+            await asyncio.sleep(0.05)
+
+        task_ids = [await queue.enqueue("work", i) for i in range(20)]
+        await queue.start_workers(1)
+        for task_id in task_ids:
+            await queue.get_result(task_id, timeout=10)
+        await asyncio.sleep(0.4)
+        await queue.stop_workers()
+        await queue.backend.close()
+        return runs
+
+    assert sorted(run(scenario())) == list(range(20))
+
+
+def test_long_task_keeps_its_lease_while_running(make_backend):
+    async def scenario():
+        queue = TaskQueue("test", backend=make_backend(poll_interval=0.05), visibility_timeout=0.2)
+        runs = []
+
+        @queue.task("slow")
+        async def slow():
+            runs.append(time.perf_counter())
+            await asyncio.sleep(0.8)
+
+        task_id = await queue.enqueue("slow", config=TaskConfig(timeout=None))
+        await queue.start_workers(2)
+        result = await queue.get_result(task_id, timeout=5)
+        await asyncio.sleep(0.3)
+        await queue.stop_workers()
+        await queue.backend.close()
+        return runs, result
+
+    runs, result = run(scenario())
+    assert len(runs) == 1 and result.status == TaskStatus.SUCCESS
+
+
+def test_sqlite_tasks_survive_a_crash_and_leases_are_redelivered(tmp_path):
+    path = str(tmp_path / "tasks.db")
+
+    async def before_crash():
+        queue = TaskQueue("jobs", backend=SQLiteQueueBackend(path, queue="jobs"))
+
+        @queue.task("square")
+        def square(value):
+            return value * value
+
+        task_ids = await queue.enqueue_many("square", [(i,) for i in range(5)])
+        # A worker leases two tasks and the process dies before acknowledging them
+        leased = await queue.backend.dequeue(2, visibility_timeout=0.3)
+        queue.backend._conn.close()
+        return task_ids, [task["task_id"] for task in leased]
+
+    async def after_restart():
+        queue = TaskQueue("jobs", backend=SQLiteQueueBackend(path, queue="jobs"))
+        runs = {}
+
+        @queue.task("square")
+        def square(value):
+            runs[value] = time.perf_counter()
+            return value * value
+
+        started = time.perf_counter()
+        await queue.start_workers(2)
+        deadline = time.monotonic() + 5
+        while len(runs) < 5 and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        remaining = queue.backend.qsize()
+        await queue.stop_workers()
+        await queue.backend.close()
+        return runs, started, remaining
+
+    task_ids, leased = run(before_crash())
+    runs, started, remaining = run(after_restart())
+
+    assert sorted(runs) == [0, 1, 2, 3, 4]
+    assert remaining == 0
+    # Tasks that were leased at the crash come back only after the visibility timeout
+    leased_values = [task_ids.index(task_id) for task_id in leased]
+    assert all(runs[value] - started >= 0.2 for value in leased_values)
+    unleased = [value for value in range(5) if value not in leased_values]
+    assert all(runs[value] - started < 0.2 for value in unleased)
+
+
+def test_stopping_workers_returns_unstarted_tasks(tmp_path):
+    path = str(tmp_path / "tasks.db")
+
+    async def scenario():
+        queue = TaskQueue("jobs", backend=SQLiteQueueBackend(path, queue="jobs"), visibility_timeout=60)
+        release = asyncio.Event()
+
+        @queue.task("block")
+        async def block(value):
+            await release.wait()
+
+        await queue.enqueue_many("block", [(i,) for i in range(4)])
+        await queue.start_workers(2)
+        await asyncio.sleep(0.1)
+        await queue.stop_workers()
+
+        # Nothing waits out the 60s lease: every task is available again at once
+        leased = await asyncio.wait_for(queue.backend.dequeue(10, visibility_timeout=60), timeout=1)
+        await queue.backend.close()
+        return leased
+
+    assert len(run(scenario())) == 4
+
+
+def test_stale_leases_cannot_extend_or_release(make_backend):
+    async def scenario():
+        backend = make_backend(poll_interval=0.01)
+        await backend.put({"task_id": "t1", "config": {}})
+        first, = await backend.dequeue(1, visibility_timeout=0.05)
+        await asyncio.sleep(0.1)
+        # The owner of a lapsed lease may take it back until it is redelivered
+        assert await backend.extend("t1", first["lease"], 0.05)
+        await asyncio.sleep(0.1)
+        second, = await backend.dequeue(1, visibility_timeout=60)
+
+        refused = not await backend.extend("t1", first["lease"], 60)
+        await backend.release(first)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(backend.dequeue(1, visibility_timeout=60), timeout=0.1)
+        renewed = await backend.extend("t1", second["lease"], 60)
+        await backend.close()
+        return first["lease"] != second["lease"], refused, renewed
+
+    assert run(scenario()) == (True, True, True)
+
+
+def test_prefetched_tasks_run_once_across_processes(tmp_path):
+    path = str(tmp_path / "tasks.db")
+
+    async def scenario():
+        runs = []
+        queues = {}
+        for name in ("a", "b"):
+            queue = TaskQueue("jobs", backend=SQLiteQueueBackend(path, queue="jobs", poll_interval=0.02),
+                              prefetch=12, visibility_timeout=0.15)
+
+            @queue.task("work")
+            async def work(value, name=name):
+                runs.append((value, name))
+                # Holds a's only worker while the leases of its prefetched tasks lapse
+                await asyncio.sleep(0.4 if value == 0 else 0.05)
+
+            queues[name] = queue
+
+        await queues["a"].enqueue_many("work", [(i,) for i in range(12)])
+        await queues["a"].start_workers(1)
+        await asyncio.sleep(0.05)
+        await queues["b"].start_workers(1)
+        deadline = time.monotonic() + 5
+        while queues["a"].backend.qsize() and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.2)
+        for queue in queues.values():
+            await queue.stop_workers()
+            await queue.backend.close()
+        return runs
+
+    runs = run(scenario())
+    assert sorted(value for value, _ in runs) == list(range(12))
+    assert any(name == "b" for _, name in runs)
+
+
+def test_result_store_bounds_finished_results():
+    store = ResultStore(ttl=0.05, max_entries=3)
+    for i in range(5):
+        store[f"t{i}"] = i
+    # Unfinished results are never evicted
+    assert len(store) == 5
+
+    for i in range(4):
+        store.finished(f"t{i}")
+    # Oldest finished results go first once over the cap
+    assert list(store) == ["t2", "t3", "t4"] and store.evicted == 2
+
+    time.sleep(0.06)
+    store["t5"] = 5
+    # Expired finished results go on the next write; t4 never finished
+    assert list(store) == ["t4", "t5"]
+
+
+def test_queue_full_is_reported():
+    async def scenario():
+        queue = TaskQueue("small", max_size=2)
+
+        @queue.task("noop")
+        async def noop():
+            pass
+
+        await queue.enqueue("noop")
+        await queue.enqueue("noop")
+        with pytest.raises(asyncio.QueueFull):
+            await queue.enqueue("noop", task_id="overflow")
+        return queue._results["overflow"]
+
+    result = run(scenario())
+    assert result.status == TaskStatus.FAILURE and result.error == "Queue full"
@@ -0,0 +1,184 @@
+"""
+Tests for the translation LRU cache and batched Marian decoding
+"""
+
+import contextlib
+import threading
+import types
+
+import pytest
+
+import shared.nlp.translator as translator_module
+from shared.nlp.translation_cache import TranslationCache, translation_cache_key
+from shared.nlp.translator import IndianLanguageTranslator
+
+
+class FakeTokenizer:
+    """Marian tokenizer stand-in: one token per word, output reverses the words"""
+
+    def __call__(self, texts, return_tensors=None, padding=False, truncation=True, max_length=512):
+        input_ids = [text.split()[:max_length] for text in texts]
+        if padding:
+            width = max(len(ids) for ids in input_ids)
+            input_ids = [ids + ['<pad>'] * (width - len(ids)) for ids in input_ids]
+        return {'input_ids': input_ids}
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return [' '.join(token for token in ids if token != '<pad>') for ids in outputs]
+
+
+class FakeMarianModel:
+    """Records every generate call and reverses the input words"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def generate(self, input_ids, num_beams, max_new_tokens):
+        self.calls.append({'batch': len(input_ids), 'width': len(input_ids[0]),
+                           'num_beams': num_beams, 'max_new_tokens': max_new_tokens})
+        self.threads.add(threading.current_thread().name)
+        if any('explode' in ids for ids in input_ids):
+            raise RuntimeError("generation failed")
+        return [list(reversed(ids)) for ids in input_ids]
+
+
+@pytest.fixture
+def marian(monkeypatch):
+    monkeypatch.setattr(translator_module, 'torch', types.SimpleNamespace(no_grad=contextlib.nullcontext),
+                        raising=False)
+    model = FakeMarianModel()
+    translator = IndianLanguageTranslator(cache_size=100, batch_size=2)
+    translator.marian_tokenizers['hi-en'] = FakeTokenizer()
+    translator.marian_models['hi-en'] = model
+    return translator, model
+
+
+def entry(text):
+    return {'translated_text': text}
+
+
+def test_cache_key_normalizes_text():
+    key = translation_cache_key("नमस्ते   दुनिया ", 'hi', 'en')
+
+    assert key == translation_cache_key("नमस्ते दुनिया", 'hi', 'en')
+    assert key != translation_cache_key("नमस्ते दुनिया", 'hi', 'bn')
+    assert key != translation_cache_key("नमस्ते", 'hi', 'en')
+
+    beam = translation_cache_key("नमस्ते", 'hi', 'en', {'method': 'marian', 'num_beams': 4})
+    assert beam == translation_cache_key("नमस्ते", 'hi', 'en', {'num_beams': 4, 'method': 'marian'})
+    assert beam != translation_cache_key("नमस्ते", 'hi', 'en', {'method': 'marian', 'num_beams': 1})
+    assert beam != translation_cache_key("नमस्ते", 'hi', 'en', {'method': 'google'})
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = TranslationCache(max_entries=2)
+    cache.set('a', entry('one'))
+    cache.set('b', entry('two'))
+    assert cache.get('a') == entry('one')
+    cache.set('c', entry('three'))
+
+    # 'b' was least recently used
+    assert cache.get('b') is None
+    assert 'a' in cache and 'c' in cache
+    assert cache.stats.evictions == 1
+    assert cache.get_stats()['hits'] == 1 and cache.get_stats()['misses'] == 1
+
+    cache = TranslationCache(max_entries=100, max_bytes=100)
+    for i in range(10):
+        cache.set(str(i), entry('x' * 20))
+    assert cache.size_bytes <= 100
+    assert len(cache) == 100 // len('{"translated_text": "' + 'x' * 20 + '"}')
+
+
+def test_persistent_tier_survives_restart(tmp_path):
+    path = str(tmp_path / 'translations.db')
+    cache = TranslationCache(max_entries=10, persist_path=path)
+    cache.set('kept', entry('hello'))
+    cache.set('memory-only', entry('unavailable'), persist=False)
+    cache.close()
+
+    restarted = TranslationCache(max_entries=10, persist_path=path)
+    assert restarted.get('kept') == entry('hello')
+    assert restarted.get('memory-only') is None
+    assert restarted.stats.disk_hits == 1
+    assert 'kept' in restarted
+
+    restarted.clear(include_disk=True)
+    assert restarted.disk_entries() == 0
+
+
+@pytest.mark.asyncio
+async def test_async_access_uses_the_persistent_tier(tmp_path):
+    path = str(tmp_path / 'translations.db')
+    cache = TranslationCache(max_entries=10, persist_path=path)
+    await cache.aset('kept', entry('hello'))
+    await cache.aset('memory-only', entry('unavailable'), persist=False)
+    assert await cache.aget('kept') == entry('hello')
+    cache.close()
+
+    restarted = TranslationCache(max_entries=10, persist_path=path)
+    assert await restarted.aget('kept') == entry('hello')
+    assert await restarted.aget('memory-only') is None
+    assert restarted.stats.disk_hits == 1 and 'kept' in restarted
+
+
+def test_persistent_tier_is_pruned(tmp_path):
+    cache = TranslationCache(persist_path=str(tmp_path / 'translations.db'), persist_max_entries=3, prune_interval=5)
+    for i in range(5):
+        cache.set(str(i), entry(str(i)))
+
+    assert cache.disk_entries() == 3
+
+
+@pytest.mark.asyncio
+async def test_translate_batch_buckets_by_length(marian):
+    translator, model = marian
+    texts = ["a b c d e f", "one", "x y z w v u", "two words"]
+
+    results = await translator.translate_batch(texts, 'hi', 'en')
+
+    assert [r.translated_text for r in results] == ["f e d c b a", "one", "u v w z y x", "words two"]
+    assert all(r.method == 'marian' for r in results)
+    # Short texts are padded together, long texts together
+    assert [(call['batch'], call['width']) for call in model.calls] == [(2, 2), (2, 6)]
+    assert model.calls[0]['max_new_tokens'] == 2 * 2 + 16
+    assert all(call['num_beams'] == 4 for call in model.calls)
+    assert all(not name.startswith('MainThread') for name in model.threads)
+
+
+@pytest.mark.asyncio
+async def test_translate_batch_decoding_and_cache(marian):
+    translator, model = marian
+
+    await translator.translate_batch(["hello world", "hello  world", "bye"], 'hi', 'en', decoding='greedy')
+    assert [call['num_beams'] for call in model.calls] == [1]
+    assert model.calls[0]['batch'] == 2
+
+    results = await translator.translate_batch(["bye", "hello world", "new text"], 'hi', 'en', decoding='greedy')
+    assert [r.translated_text for r in results] == ["bye", "world hello", "text new"]
+    assert model.calls[-1] == {'batch': 1, 'width': 2, 'num_beams': 1, 'max_new_tokens': 20}
+    assert translator.get_cache_stats()['hits'] == 2
+
+    # Greedy translations are not served for a beam search request
+    await translator.translate_batch(["bye", "hello world"], 'hi', 'en', num_beams=2)
+    assert model.calls[-1] == {'batch': 2, 'width': 2, 'num_beams': 2, 'max_new_tokens': 20}
+    assert translator.get_cache_stats()['hits'] == 2
+
+    with pytest.raises(ValueError):
+        await translator.translate_batch(["hi"], 'hi', 'en', decoding='sampling')
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_not_cached(marian):
+    translator, model = marian
+
+    results = await translator.translate_batch(["explode now", "fine"], 'hi', 'en')
+    assert [r.method for r in results] == ['failed', 'failed']
+    assert results[0].translated_text == "explode now"
+    assert len(translator.translation_cache) == 0
+
+    result = await translator.translate("fine", 'hi', 'en')
+    assert result.translated_text == "fine" and result.method == 'marian'
+    assert (await translator.translate("fine ", 'hi', 'en')).original_text == "fine "
+    assert translator.get_cache_stats()['hits'] == 1